@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ambientes em camadas com cópia na escrita (copy-on-write) para os blocos PAR
+
+Um bloco PAR não copia as variáveis do bloco pai: recebe uma camada nova
+(CowEnvironment) que lê do pai e guarda só o que o bloco escreve, então criar
+o bloco é O(1) no tamanho do programa. Os arrays herdados ganham uma visão
+CowArray na primeira vez que o bloco os acessa; cada elemento é copiado só
+quando é escrito, e os blocos nunca compartilham o buffer do pai (dados do
+TypedArray, ver arrays.py).
+
+Regras de junção (juntar_quadro / juntar_arrays), aplicadas na ordem
+dos blocos do PAR:
+- só entra no pai o que o bloco escreveu; variáveis apenas lidas não
+  sobrescrevem o que outro bloco escreveu;
+- se dois blocos escrevem a mesma variável (ou o mesmo elemento de um
+  array), vale o bloco que vem depois no PAR;
+- arrays declarados dentro do bloco substituem o array do pai;
+- variáveis removidas no bloco são removidas do pai.
+
+As variáveis simples do interpretador ficam em listas indexadas por slot
+(resolucao.py): cada bloco recebe uma visão CowSlots de cada lista do pai,
+que guarda à parte os slots escritos pelo bloco (mesmo os que voltaram ao
+valor do pai); ao terminar, o bloco devolve só esses slots.
+"""
+
+from collections.abc import MutableMapping
+
+class _Removido:
+    """Marca de variável removida numa camada (esconde o valor do pai)"""
+    def __repr__(self):
+        return 'REMOVIDO'
+
+    def __reduce__(self):
+        # Continua sendo a mesma marca depois de enviada a outro processo
+        return 'REMOVIDO'
+
+
+REMOVIDO = _Removido()
+
+
+class CowEnvironment(MutableMapping):
+    """Camada de variáveis sobre um ambiente pai (dict ou outra camada).
+
+    Leituras procuram na camada e depois no pai; escritas e remoções ficam
+    só na camada (self.local), que é o que o bloco alterou."""
+
+    def __init__(self, pai=None):
+        self.pai = pai if pai is not None else {}
+        self.local = {}
+
+    def __getitem__(self, nome):
+        valor = self.local.get(nome, REMOVIDO)
+        if valor is not REMOVIDO:
+            return valor
+        if nome in self.local:
+            raise KeyError(nome)
+        return self.pai[nome]
+
+    def get(self, nome, padrao=None):
+        try:
+            return self[nome]
+        except KeyError:
+            return padrao
+
+    def __contains__(self, nome):
+        if nome in self.local:
+            return self.local[nome] is not REMOVIDO
+        return nome in self.pai
+
+    def __setitem__(self, nome, valor):
+        self.local[nome] = valor
+
+    def __delitem__(self, nome):
+        if nome not in self:
+            raise KeyError(nome)
+        if nome in self.pai:
+            self.local[nome] = REMOVIDO
+        else:
+            del self.local[nome]
+
+    def __iter__(self):
+        vistos = set()
+        for nome, valor in self.local.items():
+            vistos.add(nome)
+            if valor is not REMOVIDO:
+                yield nome
+        for nome in self.pai:
+            if nome not in vistos:
+                yield nome
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        """Cópia da camada (o pai continua compartilhado)"""
+        copia = type(self)(self.pai)
+        copia.local = dict(self.local)
+        return copia
+
+    def alteracoes(self):
+        """nome -> valor escrito pelo bloco (REMOVIDO para as removidas)"""
+        return dict(self.local)
+
+
+class CowArray:
+    """Visão dos dados de um array do pai (TypedArray.dados) com cópia na
+    escrita por elemento: os elementos escritos ficam em self.escritos e os
+    demais são lidos de self.base, que nunca é alterada. Sobre um buffer real
+    ('d'), inteiros escritos viram real, como no próprio buffer."""
+
+    def __init__(self, base):
+        self.base = base
+        self.escritos = {}
+        self.tamanho = len(base)
+        self.real = getattr(base, 'typecode', None) == 'd'
+
+    def __len__(self):
+        return self.tamanho
+
+    def __getitem__(self, pos):
+        if pos < 0:
+            pos += self.tamanho
+        if not 0 <= pos < self.tamanho:
+            raise IndexError('índice do array fora do intervalo')
+        valor = self.escritos.get(pos, REMOVIDO)
+        return self.base[pos] if valor is REMOVIDO else valor
+
+    def __setitem__(self, pos, valor):
+        if pos < 0:
+            pos += self.tamanho
+        if not 0 <= pos < self.tamanho:
+            raise IndexError('índice do array fora do intervalo')
+        if self.real and type(valor) is int:
+            valor = float(valor)
+        self.escritos[pos] = valor
+
+    def __iter__(self):
+        return (self[pos] for pos in range(self.tamanho))
+
+    def materializar(self):
+        """Lista com o conteúdo atual (base + elementos escritos)"""
+        return list(self)
+
+    def __reduce__(self):
+        # Enviado a outro processo como lista comum
+        return (list, (self.materializar(),))
+
+
+class CowSlots:
+    """Visão de um quadro de variáveis do pai (lista de slots) com cópia na
+    escrita por slot: os slots escritos ficam em self.escritos e os demais
+    são lidos de self.base, que nunca é alterada"""
+    __slots__ = ('base', 'escritos')
+
+    def __init__(self, base):
+        self.base = base
+        self.escritos = {}
+
+    def __len__(self):
+        return len(self.base)
+
+    def __getitem__(self, slot):
+        valor = self.escritos.get(slot, REMOVIDO)
+        return self.base[slot] if valor is REMOVIDO else valor
+
+    def __setitem__(self, slot, valor):
+        self.escritos[slot] = valor
+
+    def __iter__(self):
+        return (self[slot] for slot in range(len(self.base)))
+
+    def alteracoes(self):
+        """slot -> valor escrito pelo bloco"""
+        return dict(self.escritos)
+
+    def __reduce__(self):
+        # Enviado a outro processo como lista comum
+        return (list, (list(self),))
+
+
+class CowArrayEnvironment(CowEnvironment):
+    """Camada de array_variables: um array herdado do pai é trocado, no
+    primeiro acesso, por um TypedArray com a mesma forma e os dados numa
+    visão CowArray (O(1), sem copiar os elementos)."""
+
+    def __getitem__(self, nome):
+        if nome in self.local:
+            return super().__getitem__(nome)
+        array = self._info_do_pai(nome)
+        visao = array.com_dados(CowArray(array.dados))
+        self.local[nome] = visao
+        return visao
+
+    def consultar(self, nome):
+        """Informações do array sem criar visão nesta camada"""
+        if nome in self.local:
+            return super().__getitem__(nome)
+        return self._info_do_pai(nome)
+
+    def _info_do_pai(self, nome):
+        # Não cria visões no pai: camadas irmãs podem ler o mesmo pai ao mesmo tempo
+        if isinstance(self.pai, CowArrayEnvironment):
+            return self.pai.consultar(nome)
+        return self.pai[nome]
+
+    def alteracoes(self):
+        """nome -> TypedArray (array declarado no bloco), REMOVIDO ou
+        ('escritos', {posição: valor}) para arrays herdados"""
+        resultado = {}
+        for nome, array in self.local.items():
+            if array is REMOVIDO:
+                resultado[nome] = REMOVIDO
+            elif isinstance(array.dados, CowArray):
+                if array.dados.escritos:
+                    resultado[nome] = ('escritos', dict(array.dados.escritos))
+            else:
+                resultado[nome] = array
+        return resultado
+
+
+def juntar_quadro(destino, alteracoes):
+    """Aplica em destino (lista de slots do pai) os slots alterados por um bloco"""
+    for slot, valor in alteracoes.items():
+        destino[slot] = valor
+
+
+def juntar_arrays(destino, alteracoes):
+    """Aplica em destino (array_variables do pai) os arrays alterados por um
+    bloco: arrays novos substituem os do pai e os herdados recebem só os
+    elementos escritos"""
+    for nome, array in alteracoes.items():
+        if array is REMOVIDO:
+            if nome in destino:
+                del destino[nome]
+        elif isinstance(array, tuple):
+            if nome not in destino:
+                continue
+            alvo = destino[nome]
+            for pos, valor in array[1].items():
+                alvo.escrever(pos, valor)
+        else:
+            destino[nome] = array
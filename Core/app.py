@@ -4,95 +4,33 @@ import sys
 
 # Ajustar path para importar motor_compilador do mesmo diretório
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from motor_compilador import (MiniParLexer, MiniParParser, SemanticAnalyzer, 
-                              C3EGenerator, formatar_ast, ARMv7CodeGenerator, 
-                              MiniParInterpreter)
+from motor_compilador import (CompilationCache, C3EOptimizer, VERSAO_COMPILADOR,
+                              ALVO_PADRAO, compilar_codigo_completo, MiniParVM,
+                              MiniParInterpreter, C3EExecutor, compilar_bytecode_ast,
+                              carregar_c3e_compilado)
 
 # Ajustar template_folder para apontar para o diretório templates no diretório pai
 base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 template_dir = os.path.join(base_dir, 'templates')
 app = Flask(__name__, template_folder=template_dir)
 
-def compilar_codigo_completo(codigo_fonte):
-    """Compila código e retorna todos os resultados incluindo AST"""
-    lexer = MiniParLexer()
-    parser = MiniParParser()
-    semantic_analyzer = SemanticAnalyzer()
-    c3e_generator = C3EGenerator()
-    
-    erros = ""
-    saida_lexer = []
-    ast = None
-    
-    try:
-        tokens = list(lexer.tokenize(codigo_fonte))
-        tokens_validos = []
-        for tok in tokens:
-            saida_lexer.append(f"Tipo: {tok.type}, Valor: '{tok.value}', Linha: {tok.lineno}")
-            if tok.type == 'ERROR':
-                erros += f"Erro Léxico: Caractere inesperado '{tok.value}' na linha {tok.lineno}\n"
-            else:
-                tokens_validos.append(tok)
-        
-        if erros: 
-            return None, None, None, None, None, erros
-        
-        # Tentar parsing múltiplas vezes para garantir que tudo seja parseado
-        ast = None
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                parser.syntax_errors = []  # Limpar erros anteriores
-                ast = parser.parse(iter(tokens_validos))
-                # Verificar se parseou tudo - se não há erros críticos, aceitar
-                if ast and len(parser.syntax_errors) == 0:
-                    break
-                # Se há erros mas AST foi gerada parcialmente, verificar se é suficiente
-                if ast and attempt < max_attempts - 1:
-                    tokens_validos = [t for t in tokens if t.type != 'ERROR']
-            except Exception:
-                if attempt < max_attempts - 1:
-                    tokens_validos = [t for t in tokens if t.type != 'ERROR']
-                    continue
-                break
-        
-        if parser.syntax_errors:
-            # Apenas reportar erros se não tivermos uma AST válida
-            if not ast:
-                erros += "\n".join(parser.syntax_errors)
-                return None, None, None, None, None, erros
-        
-        if not ast:
-            erros += "Erro de Sintaxe: Falha desconhecida. Verifique a estrutura geral."
-            return None, None, None, None, None, erros
-        
-        saida_ast = formatar_ast(ast)
-        
-        semantic_analyzer.visit(ast)
-        if semantic_analyzer.errors:
-            erros += "\n".join(semantic_analyzer.errors)
-            return ast, saida_lexer, saida_ast, None, None, erros
-        
-        saida_c3e = c3e_generator.generate(ast)
-        
-        all_vars = (c3e_generator.declared_vars | 
-                   set(semantic_analyzer.symbol_table.keys()) |
-                   set(semantic_analyzer.channel_table.keys()))
-        
-        asm_generator = ARMv7CodeGenerator(all_vars, c3e_generator.function_code, c3e_generator.array_sizes)
-        saida_asm = asm_generator.generate(saida_c3e)
-        
-        return ast, saida_lexer, saida_ast, saida_c3e, saida_asm, erros
-        
-    except Exception as e:
-        import traceback
-        erros += f"Erro inesperado no compilador: {str(e)}\n"
-        erros += traceback.format_exc()
-        return ast, (saida_lexer if 'saida_lexer' in locals() else []), \
-               (saida_ast if 'saida_ast' in locals() else ""), \
-               (saida_c3e if 'saida_c3e' in locals() else []), \
-               (saida_asm if 'saida_asm' in locals() else []), \
-               erros
+# Opções de compilação (as mesmas do Scripts/compilar_testes.py):
+# MINIPAR_OTIMIZACAO=1 equivale a -O1 e MINIPAR_ALVO a --target
+NIVEL_OTIMIZACAO = int(os.environ.get('MINIPAR_OTIMIZACAO', '0'))
+ALVO = os.environ.get('MINIPAR_ALVO', ALVO_PADRAO)
+
+# Cache de compilação: o mesmo código fonte (ex.: exemplos de Testes/) não é
+# recompilado a cada requisição. Limite de memória em MB via MINIPAR_CACHE_MB.
+cache_compilacao = CompilationCache(
+    limite_bytes=int(os.environ.get('MINIPAR_CACHE_MB', '64')) * 1024 * 1024,
+    versao=f"{VERSAO_COMPILADOR}+O{NIVEL_OTIMIZACAO}+{ALVO}"
+)
+
+def compilar(codigo_fonte):
+    """Compila com as opções da interface web; o resultado vai para o cache,
+    com a listagem dos tokens da aba de tokens"""
+    otimizador = C3EOptimizer(NIVEL_OTIMIZACAO) if NIVEL_OTIMIZACAO else None
+    return compilar_codigo_completo(codigo_fonte, listar_tokens=True, otimizador=otimizador, alvo=ALVO)
 
 @app.route('/', methods=['GET', 'POST'])
 def index():
@@ -103,11 +41,11 @@ def index():
         codigo_original = request.form.get('codigo', '')
         
         try:
-            ast, tokens, ast_formatada, codigo_c3e, codigo_asm, erros = compilar_codigo_completo(codigo_original)
+            ast, tokens, ast_formatada, codigo_c3e, codigo_asm, erros, _ = cache_compilacao.obter_ou_compilar(codigo_original, compilar)
 
             # Formatar tokens e C3E para exibição com quebras de linha
             tokens_formatados = "\n".join(tokens) if tokens else ""
-            c3e_formatado = "\n".join(codigo_c3e) if codigo_c3e else ""
+            c3e_formatado = "\n".join(map(str, codigo_c3e)) if codigo_c3e else ""
             asm_formatado = "\n".join(codigo_asm) if codigo_asm else ""
 
             resultados = {
@@ -163,9 +101,11 @@ def executar():
         dados = request.get_json()
         codigo = dados.get('codigo', '')
         entrada = dados.get('entrada', '')
+        motor = dados.get('motor', 'bytecode')  # 'bytecode' (máquina virtual), 'interpretador' ou 'c3e'
+        executor_par = dados.get('executor_par', 'threads')  # blocos PAR do interpretador: 'threads', 'processos', 'asyncio' ou 'inline'
         
         # Compilar código
-        ast, _, _, _, _, erros = compilar_codigo_completo(codigo)
+        ast, _, _, codigo_c3e, _, erros, dados_c3e = cache_compilacao.obter_ou_compilar(codigo, compilar)
         
         if erros:
             return jsonify({
@@ -181,9 +121,22 @@ def executar():
                 'erros': 'Erro: AST não gerada'
             })
         
-        # Executar programa
-        interpreter = MiniParInterpreter()
-        saida = interpreter.execute(ast, entrada)
+        # Executar programa a partir da AST do cache (com os blocos recuperados),
+        # sem analisar o código de novo. A máquina virtual é o motor padrão; o que
+        # ela (ou o C3E) não executa como o interpretador (programa None: blocos
+        # PAR, canais, comandos não suportados) roda no interpretador.
+        # O motor 'c3e' roda o C3E compilado (com -O1 se MINIPAR_OTIMIZACAO=1)
+        programa = None
+        if motor == 'bytecode':
+            programa, _ = compilar_bytecode_ast(ast)
+            executor = MiniParVM
+        elif motor == 'c3e':
+            programa, _ = carregar_c3e_compilado(codigo_c3e, dados_c3e)
+            executor = C3EExecutor
+        if programa is not None:
+            saida = executor().execute(programa, entrada)
+        else:
+            saida = MiniParInterpreter(executor_par=executor_par).execute(ast, entrada)
         
         return jsonify({
             'sucesso': True,
@@ -199,5 +152,10 @@ def executar():
             'erros': f"Erro na execução: {str(e)}\n{traceback.format_exc()}"
         })
 
+@app.route('/cache', methods=['GET'])
+def estatisticas_cache():
+    """Retorna as estatísticas do cache de compilação (acertos, falhas, memória)"""
+    return jsonify(cache_compilacao.estatisticas())
+
 if __name__ == '__main__':
     app.run(debug=True, port=5001)
\ No newline at end of file
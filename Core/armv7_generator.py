@@ -4,8 +4,59 @@
 Gerador de Código Assembly ARMv7
 """
 
+import struct
+
+try:
+    from .c3e_generator import OpC3E, SIMBOLOS_C3E
+    from .register_allocator import RegisterAllocator
+except ImportError:
+    from c3e_generator import OpC3E, SIMBOLOS_C3E
+    from register_allocator import RegisterAllocator
+
+# Sufixo de condição do ARM para cada comparação do C3E
+CONDICOES_ARM = {
+    OpC3E.EQ: 'eq', OpC3E.NE: 'ne', OpC3E.LT: 'lt',
+    OpC3E.GT: 'gt', OpC3E.LE: 'le', OpC3E.GE: 'ge',
+}
+
+# Após vcmp + vmrs: "menor" é mi e "menor ou igual" é ls (falsos se NaN)
+CONDICOES_VFP = {**CONDICOES_ARM, OpC3E.LT: 'mi', OpC3E.LE: 'ls'}
+
+INSTRUCOES_VFP = {OpC3E.ADD: 'vadd.f32', OpC3E.SUB: 'vsub.f32',
+                  OpC3E.MUL: 'vmul.f32', OpC3E.DIV: 'vdiv.f32'}
+
+# Alvo (--target): arquitetura base com extensões opcionais, ex. "armv7ve+vfpv3".
+# Cada uma habilita recursos do gerador: 'idiv' (sdiv) e 'vfp' (REAL em ponto flutuante).
+ALVO_PADRAO = 'armv7'
+ARQUITETURAS_ARM = {'armv7': frozenset(), 'armv7-a': frozenset(), 'armv7ve': frozenset({'idiv'})}
+EXTENSOES_ARM = {'idiv': frozenset({'idiv'}), 'vfpv3': frozenset({'vfp'}),
+                 'vfpv3-d16': frozenset({'vfp'}), 'vfpv4': frozenset({'vfp'})}
+
+
+def recursos_do_alvo(alvo):
+    """Retorna (arquitetura, fpu ou None, recursos) de um alvo como "armv7ve+vfpv3"."""
+    arquitetura, *extensoes = alvo.lower().split('+')
+    if arquitetura not in ARQUITETURAS_ARM:
+        raise ValueError(f"Arquitetura ARM desconhecida: '{arquitetura}' "
+                         f"(use {', '.join(ARQUITETURAS_ARM)})")
+    recursos = set(ARQUITETURAS_ARM[arquitetura])
+    fpu = None
+    for extensao in extensoes:
+        if extensao not in EXTENSOES_ARM:
+            raise ValueError(f"Extensão ARM desconhecida: '{extensao}' (use {', '.join(EXTENSOES_ARM)})")
+        recursos |= EXTENSOES_ARM[extensao]
+        if 'vfp' in EXTENSOES_ARM[extensao]:
+            fpu = extensao
+    return arquitetura, fpu, frozenset(recursos)
+
+
+def bits_float32(valor):
+    """Padrão de bits IEEE 754 (precisão simples) de um número, como inteiro"""
+    return struct.unpack('<I', struct.pack('<f', float(valor)))[0]
+
 class ARMv7CodeGenerator:
-    def __init__(self, declared_vars, function_code, array_sizes):
+    def __init__(self, declared_vars, function_code, array_sizes, alocar_registradores=True,
+                 alvo=ALVO_PADRAO, var_types=None, function_signatures=None):
         self.asm_code = []
         self.data_section = []
         self.text_section = []
@@ -20,6 +71,20 @@ class ARMv7CodeGenerator:
         self.next_float_reg = 0
         self.param_reg_count = 0
         self.div_counter = 0  # Contador para labels únicos de divisão
+        # Alocação de registradores (r4-r10) do bloco atual: nome -> registrador.
+        # Com alocar_registradores=False todo operando fica na pilha.
+        self.alocar_registradores = alocar_registradores
+        self.registradores = {}
+        self.salvos = []  # registradores r4-r10 usados pela função atual (push/pop)
+        # Recursos do alvo: 'idiv' usa sdiv; 'vfp' calcula REAL com instruções VFP
+        # (os tipos vêm de var_types e function_signatures do C3EGenerator)
+        self.arquitetura, self.fpu, self.recursos = recursos_do_alvo(alvo)
+        self.var_types = var_types or {}
+        self.function_signatures = function_signatures or {}
+        self.reais = set()      # nomes com valor REAL no bloco atual
+        self.enderecos = {}     # temporário de ARRAY_ADDR -> array
+        self.tipos_argumentos = {}  # posição do PUSH_PARAM -> tipo do parâmetro
+        self.tipo_retorno = None    # tipo de retorno da função atual
 
     def generate(self, c3e_code):
         # Inicializações...
@@ -33,6 +98,8 @@ class ARMv7CodeGenerator:
                 else:
                     total_stack_size += 4
         
+        self.alocar_bloco(c3e_code)
+
         # Agora alocar variáveis começando do topo da pilha (após sub sp)
         # fp aponta para antes do sub sp, então usamos offsets negativos
         current_offset = -total_stack_size
@@ -47,6 +114,12 @@ class ARMv7CodeGenerator:
                     # Variável simples
                     self.var_locations[var] = f"[fp, #{current_offset}]"
                     current_offset += 4
+
+        if self.alocar_registradores:
+            # Temporários derramados ficam abaixo das variáveis, dentro do sub sp
+            self.next_stack_offset = -total_stack_size - 4
+            for nome in self.alocador.derramados:
+                self.get_var_location(nome)
                 
         # Strings de I/O removidas - CPUlator não precisa de formatos printf
         # Manter apenas strings literais do programa
@@ -56,6 +129,22 @@ class ARMv7CodeGenerator:
         # Código principal - formato compatível com CPUlator (sem libc)
         self.text_section.append("\n.global _start")
         self.text_section.append("_start:")
+        if 'vfp' in self.recursos:
+            # Habilitar o coprocessador de ponto flutuante (cp10/cp11 e FPEXC.EN).
+            # São instruções privilegiadas: só rodam sem sistema operacional
+            # (CPUlator); em modo usuário (executável Linux) o sistema já
+            # habilitou o VFP e elas levantariam SIGILL
+            self.text_section.append("    mrs r0, cpsr")
+            self.text_section.append("    and r0, r0, #0x1f")
+            self.text_section.append("    cmp r0, #0x10")  # modo usuário
+            self.text_section.append("    beq VFP_HABILITADO")
+            self.text_section.append("    mrc p15, 0, r0, c1, c0, 2")
+            self.text_section.append("    orr r0, r0, #0xf00000")
+            self.text_section.append("    mcr p15, 0, r0, c1, c0, 2")
+            self.text_section.append("    isb")
+            self.text_section.append("    mov r0, #0x40000000")
+            self.text_section.append("    vmsr fpexc, r0")
+            self.text_section.append("VFP_HABILITADO:")
         # Inicializar frame pointer
         self.text_section.append("    mov fp, sp")
         # Calcular tamanho total da pilha (incluindo arrays)
@@ -101,14 +190,22 @@ class ARMv7CodeGenerator:
         self.text_section.append("    B .")  # Loop infinito - compatível com CPUlator
         
         for func_name, func_c3e in self.function_code.items():
+            self.alocar_bloco(func_c3e)
+            # A função preserva os registradores r4-r10 que usa (o chamador conta com eles)
+            self.salvos = sorted(set(self.registradores.values()), key=lambda r: int(r[1:]))
             self.text_section.append(f"\n{func_name}:")
-            self.text_section.append("    push {fp, lr}")
+            self.text_section.append(f"    push {{{self.lista_salvos('fp, lr')}}}")
             self.text_section.append("    mov fp, sp")
             self.process_c3e_block(func_c3e)
-            self.text_section.append("    pop {fp, pc}")
+            self.text_section.append(f"    pop {{{self.lista_salvos('fp, pc')}}}")
+        self.registradores, self.salvos = {}, []
 
         # Organizar código: seção .text primeiro (para melhor controle de literal pool)
         codigo_final = []
+        if self.arquitetura != ALVO_PADRAO or self.fpu:
+            codigo_final.append(f".arch {self.arquitetura}")
+        if self.fpu:
+            codigo_final.append(f".fpu {self.fpu}")
         codigo_final.append(".text")
         codigo_final.extend(self.text_section)
         codigo_final.append("")
@@ -119,197 +216,324 @@ class ARMv7CodeGenerator:
         
         return codigo_final
 
+    def alocar_bloco(self, c3e_block):
+        """Distribui r4-r10 entre os temporários e variáveis escalares do bloco"""
+        self.alocador = RegisterAllocator(
+            lambda nome: nome not in self.array_sizes and nome not in self.string_literals)
+        self.registradores = self.alocador.alocar(c3e_block) if self.alocar_registradores else {}
+        if 'vfp' in self.recursos:
+            self.reais, self.enderecos = self.tipos_reais(c3e_block)
+            self.tipos_argumentos = self.tipos_dos_argumentos(c3e_block)
+            funcao = c3e_block[0].arg1 if c3e_block and c3e_block[0].op == OpC3E.FUNC_BEGIN else None
+            self.tipo_retorno = self.function_signatures.get(funcao, {}).get('return_type')
+
+    def tipos_reais(self, c3e_block):
+        """Nomes do bloco com valor REAL (variáveis declaradas REAL e os
+        temporários calculados a partir delas) e o array de cada endereço"""
+        reais = {nome for nome, tipo in self.var_types.items() if tipo == 'REAL'}
+        enderecos = {}
+        for op, arg1, arg2, result in c3e_block:
+            if op == OpC3E.PARAM:
+                for nome, tipo in self.parametros_da_funcao(c3e_block):
+                    if nome == arg1 and tipo == 'REAL':
+                        reais.add(nome)
+            elif op == OpC3E.ARRAY_ADDR:
+                enderecos[result] = arg1
+            elif op == OpC3E.ARRAY_LOAD:
+                if self.tipo_do_array(enderecos.get(arg1)) == 'REAL':
+                    reais.add(result)
+            elif op == OpC3E.CALL:
+                if self.function_signatures.get(arg1, {}).get('return_type') == 'REAL':
+                    reais.add(result)
+            elif op in INSTRUCOES_VFP or op == OpC3E.COPY:
+                # Variáveis declaradas mantêm o tipo; as demais seguem o valor.
+                # "/" é sempre REAL (como na análise semântica)
+                if result not in self.var_types and (
+                        op == OpC3E.DIV or any(self.eh_real(a, reais) for a in (arg1, arg2))):
+                    reais.add(result)
+        return reais, enderecos
+
+    def tipos_dos_argumentos(self, c3e_block):
+        """Posição de cada PUSH_PARAM -> tipo do parâmetro na função chamada"""
+        tipos, pendentes = {}, []
+        for posicao, instr in enumerate(c3e_block):
+            if instr.op == OpC3E.PUSH_PARAM:
+                pendentes.append(posicao)
+            elif instr.op == OpC3E.CALL:
+                params = self.function_signatures.get(instr.arg1, {}).get('params', [])
+                for posicao_push, (_, tipo) in zip(pendentes[-instr.arg2:] if instr.arg2 else [], params):
+                    tipos[posicao_push] = tipo
+                pendentes = pendentes[:-instr.arg2] if instr.arg2 else pendentes
+        return tipos
+
+    def parametros_da_funcao(self, c3e_block):
+        if c3e_block and c3e_block[0].op == OpC3E.FUNC_BEGIN:
+            return self.function_signatures.get(c3e_block[0].arg1, {}).get('params', [])
+        return []
+
+    def tipo_do_array(self, array_name):
+        return self.array_sizes.get(array_name, {}).get('type')
+
+    def eh_real(self, src, reais=None):
+        if isinstance(src, float):
+            return True
+        return isinstance(src, str) and src in (self.reais if reais is None else reais)
+
+    def registrador_vfp(self, src, sreg, reserva):
+        """Carrega src em sreg como float32, convertendo valores inteiros"""
+        if isinstance(src, (int, float)):
+            self.load_to_reg(float(src), reserva)
+            self.text_section.append(f"    vmov {sreg}, {reserva}")
+            return
+        reg = self.registrador_de(src, reserva)
+        self.text_section.append(f"    vmov {sreg}, {reg}")
+        if not self.eh_real(src):
+            self.text_section.append(f"    vcvt.f32.s32 {sreg}, {sreg}")
+
+    def converter_para(self, real, src, reg):
+        """Coloca src em reg como REAL (real=True) ou inteiro, convertendo se preciso"""
+        if isinstance(src, (int, float)):
+            self.load_to_reg(float(src) if real else int(src), reg)
+        elif real == self.eh_real(src):
+            self.load_to_reg(src, reg)
+        elif real:
+            self.registrador_vfp(src, "s0", reg)
+            self.text_section.append(f"    vmov {reg}, s0")
+        else:
+            self.registrador_vfp(src, "s0", reg)
+            self.text_section.append("    vcvt.s32.f32 s0, s0")
+            self.text_section.append(f"    vmov {reg}, s0")
+
+    def lista_salvos(self, finais):
+        return ", ".join(self.salvos + [finais])
+
+    def registrador_de(self, src, reg):
+        """Registrador com o valor de src: o alocado a ele, ou reg após carregar"""
+        if isinstance(src, str) and src in self.registradores:
+            return self.registradores[src]
+        self.load_to_reg(src, reg)
+        return reg
+
+    def registrador_destino(self, dest, reg):
+        """Registrador onde calcular dest: o alocado a ele, ou reg (ver concluir_destino)"""
+        return self.registradores.get(dest, reg)
+
+    def concluir_destino(self, dest, reg):
+        """Grava na pilha o valor calculado em reg se dest não tem registrador"""
+        if dest not in self.registradores:
+            self.store_from_reg(dest, reg)
+
     def process_c3e_block(self, c3e_block):
         self.param_reg_count = 0
         instruction_count = 0
+        parametros = 0
         
-        for line in c3e_block:
+        for posicao, instr in enumerate(c3e_block):
             # Inserir .ltorg a cada 25 instruções para manter literais dentro de 4KB
             if instruction_count > 0 and instruction_count % 25 == 0:
                 self.text_section.append("    .ltorg")
             instruction_count += 1
             
-            parts = line.split()
-            if not parts:
-                continue
-            
-            cmd = parts[0]
+            op, arg1, arg2, result = instr
             
-            if cmd == "STRING_DEF":
-                self.add_string_literal(parts[1], " ".join(parts[2:]).strip('"'))
+            if op == OpC3E.STRING_DEF:
+                self.add_string_literal(result, arg1)
                 
-            elif cmd == "START_PROGRAM" or cmd == "END_PROGRAM" or cmd == "FUNC_BEGIN" or cmd == "PARAM":
+            elif op == OpC3E.PARAM and self.alocar_registradores:
+                # Os quatro primeiros argumentos chegam em r0-r3
+                if parametros < 4:
+                    self.store_from_reg(arg1, f"r{parametros}")
+                parametros += 1
+
+            elif op in (OpC3E.START_PROGRAM, OpC3E.END_PROGRAM, OpC3E.FUNC_BEGIN, OpC3E.PARAM):
                 continue
                 
-            elif cmd == "FUNC_END":
-                self.text_section.append(f"    @ FUNC_END {parts[1]}")
+            elif op == OpC3E.WRITELN:
+                continue  # I/O removido para compatibilidade CPUlator
+                
+            elif op == OpC3E.FUNC_END:
+                self.text_section.append(f"    @ FUNC_END {arg1}")
                 
-            elif cmd == "RETURN":
-                if len(parts) > 1:
-                    self.load_to_reg(parts[1], "r0")
+            elif op == OpC3E.RETURN:
+                if arg1 is not None and self.tipo_retorno:
+                    self.converter_para(self.tipo_retorno == 'REAL', arg1, "r0")
+                elif arg1 is not None:
+                    self.load_to_reg(arg1, "r0")
                 self.text_section.append("    mov sp, fp")
-                self.text_section.append("    pop {fp, pc}  @ Return")
+                self.text_section.append(f"    pop {{{self.lista_salvos('fp, pc')}}}  @ Return")
                 
-            elif cmd == "LABEL":
-                self.text_section.append(f"{parts[1]}:")
+            elif op == OpC3E.LABEL:
+                self.text_section.append(f"{result}:")
                 
-            elif cmd == "GOTO":
-                self.text_section.append(f"    b {parts[1]}")
+            elif op == OpC3E.GOTO:
+                self.text_section.append(f"    b {result}")
                 
-            elif cmd == "IF_GOTO": 
-                self.load_to_reg(parts[1], "r0")
-                self.text_section.append("    cmp r0, #1")
-                self.text_section.append(f"    beq {parts[2]}")
+            elif op == OpC3E.IF_GOTO: 
+                condicao = self.registrador_de(arg1, "r0")
+                self.text_section.append(f"    cmp {condicao}, #1")
+                self.text_section.append(f"    beq {result}")
                 
-            elif cmd == "WRITE":
-                self.write_value(parts[1])
+            elif op == OpC3E.WRITE:
+                self.write_value(arg1)
                 
-            elif cmd == "READ":
-                self.read_value(parts[1])
+            elif op == OpC3E.READ:
+                self.read_value(result)
                 
-            elif cmd == "PUSH_PARAM":
+            elif op == OpC3E.PUSH_PARAM:
                 reg = f"r{self.param_reg_count}"
-                if self.param_reg_count < 4:
-                    self.load_to_reg(parts[1], reg)
+                if self.param_reg_count >= 4:
+                    # r4 pode estar alocado: com alocação o parâmetro passa por r12 (ip)
+                    reg = "r12" if self.alocar_registradores else "r4"
+                if posicao in self.tipos_argumentos:
+                    self.converter_para(self.tipos_argumentos[posicao] == 'REAL', arg1, reg)
                 else:
-                    self.load_to_reg(parts[1], "r4")
-                    self.text_section.append("    push {r4}")
+                    self.load_to_reg(arg1, reg)
+                if self.param_reg_count >= 4:
+                    self.text_section.append(f"    push {{{reg}}}")
                 self.param_reg_count += 1
                 
-            elif cmd == "CALL":
-                func_name = parts[1]
-                num_params = int(parts[2])
-                self.text_section.append(f"    bl {func_name}")
-                if num_params > 4:
-                    stack_adjust = (num_params - 4) * 4
-                    if stack_adjust > 255:
-                        # Colocar constante na seção .data
-                        const_label = f"const_stackadj_{stack_adjust}"
-                        if const_label not in self.float_literals:
-                            self.float_literals[const_label] = str(stack_adjust)
-                            self.data_section.append(f"{const_label}: .word {stack_adjust}")
-                        self.text_section.append(f"    ldr r0, ={const_label}")
-                        self.text_section.append(f"    ldr r0, [r0]")
-                        self.text_section.append("    add sp, sp, r0")
-                    else:
-                        self.text_section.append(f"    add sp, sp, #{stack_adjust}")
-                self.param_reg_count = 0
-                
-            elif "ARRAY_ADDR" in parts:
-                # Formato: dest = ARRAY_ADDR array_name index1 index2 ...
-                if len(parts) >= 4 and parts[1] == "=" and parts[2] == "ARRAY_ADDR":
-                    self.process_array_address(parts)
-                elif cmd == "ARRAY_ADDR":
-                    # Formato alternativo
-                    self.process_array_address(parts)
+            elif op == OpC3E.CALL:
+                self.process_call(arg1, arg2, result)
                 
-            elif cmd == "ARRAY_STORE":
-                self.process_array_store(parts)
+            elif op == OpC3E.ARRAY_ADDR:
+                self.process_array_address(result, arg1, arg2)
                 
-            elif cmd == "ARRAY_LOAD":
-                self.process_array_load(parts)
+            elif op == OpC3E.ARRAY_STORE:
+                self.process_array_store(arg1, arg2)
                 
-            elif len(parts) == 3 and parts[1] == "=":
-                dest = parts[0]
-                src = parts[2]
+            elif op == OpC3E.ARRAY_LOAD:
+                self.process_array_load(result, arg1)
                 
-                if src == "CALL":
-                    self.store_from_reg(dest, "r0")
-                elif src == "ARRAY_LOAD":
-                    # Formato: dest = ARRAY_LOAD addr_temp (não é o formato correto, deve ter 4 partes)
-                    self.text_section.append(f"    @ Erro: ARRAY_LOAD sem endereço")
+            elif op == OpC3E.COPY:
+                destino = self.registrador_destino(result, "r0")
+                if 'vfp' in self.recursos:
+                    self.converter_para(self.eh_real(result), arg1, destino)
                 else:
-                    self.load_to_reg(src, "r0")
-                    self.store_from_reg(dest, "r0")
-            
-            elif len(parts) == 4 and parts[1] == "=" and parts[2] == "ARRAY_LOAD":
-                # Formato: dest = ARRAY_LOAD addr_temp
-                dest = parts[0]
-                addr_temp = parts[3]
-                self.process_array_load([dest, "=", "ARRAY_LOAD", addr_temp])
+                    self.load_to_reg(arg1, destino)
+                self.concluir_destino(result, destino)
+
+            elif op in SIMBOLOS_C3E and 'vfp' in self.recursos and (
+                    op == OpC3E.DIV or self.eh_real(arg1) or self.eh_real(arg2)):
+                self.process_vfp(op, arg1, arg2, result)
+
+            elif op == OpC3E.DIV and 'idiv' in self.recursos:
+                # Sem VFP a divisão é inteira: em hardware (sdiv devolve 0 na divisão por zero)
+                a = self.registrador_de(arg1, "r0")
+                b = self.registrador_de(arg2, "r1")
+                destino = self.registrador_destino(result, "r0")
+                self.text_section.append(f"    sdiv {destino}, {a}, {b}")
+                self.concluir_destino(result, destino)
                     
-            elif len(parts) == 5 and parts[1] == "=":
-                dest = parts[0]
-                op1 = parts[2]
-                op = parts[3]
-                op2 = parts[4]
+            elif op == OpC3E.DIV:
+                self.load_to_reg(arg1, "r0")
+                self.load_to_reg(arg2, "r1")
+                # Divisão não suportada diretamente em ARM mode - usar algoritmo de divisão
+                # Gerar labels únicos para esta divisão
+                div_id = self.div_counter
+                self.div_counter += 1
                 
-                self.load_to_reg(op1, "r0")
-                self.load_to_reg(op2, "r1")
-                
-                if op == "+": self.text_section.append("    add r0, r0, r1")
-                elif op == "-": self.text_section.append("    sub r0, r0, r1")
-                elif op == "*": self.text_section.append("    mul r0, r0, r1")
-                elif op == "/":
-                    # Divisão não suportada diretamente em ARM mode - usar algoritmo de divisão
-                    # Gerar labels únicos para esta divisão
-                    div_id = self.div_counter
-                    self.div_counter += 1
-                    
-                    # Salvar registradores
-                    self.text_section.append("    push {r2, r3, lr}")
-                    # r0 = dividendo, r1 = divisor
-                    # Verificar divisão por zero
-                    self.text_section.append(f"    cmp r1, #0")
-                    self.text_section.append(f"    beq div_zero_{div_id}")
-                    # Inicializar quociente = 0
-                    self.text_section.append(f"    mov r2, #0")
-                    # Verificar sinais
-                    self.text_section.append(f"    mov r3, #0")
-                    # Se dividendo < 0, inverter sinal
-                    self.text_section.append(f"    cmp r0, #0")
-                    self.text_section.append(f"    rsblt r0, r0, #0")
-                    self.text_section.append(f"    addlt r3, r3, #1")
-                    # Se divisor < 0, inverter sinal
-                    self.text_section.append(f"    cmp r1, #0")
-                    self.text_section.append(f"    rsblt r1, r1, #0")
-                    self.text_section.append(f"    eorlt r3, r3, #1")
-                    # Loop de divisão: subtrair divisor do dividendo até ser menor
-                    self.text_section.append(f"div_loop_{div_id}:")
-                    self.text_section.append(f"    cmp r0, r1")
-                    self.text_section.append(f"    blt div_done_{div_id}")
-                    self.text_section.append(f"    sub r0, r0, r1")
-                    self.text_section.append(f"    add r2, r2, #1")
-                    self.text_section.append(f"    b div_loop_{div_id}")
-                    self.text_section.append(f"div_done_{div_id}:")
-                    # Restaurar sinal se necessário
-                    self.text_section.append(f"    cmp r3, #0")
-                    self.text_section.append(f"    beq div_pos_{div_id}")
-                    self.text_section.append(f"    rsb r2, r2, #0")
-                    self.text_section.append(f"div_pos_{div_id}:")
-                    self.text_section.append(f"    mov r0, r2")
-                    self.text_section.append(f"    pop {{r2, r3, lr}}")
-                    self.text_section.append(f"    b div_exit_{div_id}")
-                    self.text_section.append(f"div_zero_{div_id}:")
-                    self.text_section.append(f"    mov r0, #0")
-                    self.text_section.append(f"    pop {{r2, r3, lr}}")
-                    self.text_section.append(f"div_exit_{div_id}:")
+                # Salvar registradores
+                self.text_section.append("    push {r2, r3, lr}")
+                # r0 = dividendo, r1 = divisor
+                # Verificar divisão por zero
+                self.text_section.append(f"    cmp r1, #0")
+                self.text_section.append(f"    beq div_zero_{div_id}")
+                # Inicializar quociente = 0
+                self.text_section.append(f"    mov r2, #0")
+                # Verificar sinais
+                self.text_section.append(f"    mov r3, #0")
+                # Se dividendo < 0, inverter sinal
+                self.text_section.append(f"    cmp r0, #0")
+                self.text_section.append(f"    rsblt r0, r0, #0")
+                self.text_section.append(f"    addlt r3, r3, #1")
+                # Se divisor < 0, inverter sinal
+                self.text_section.append(f"    cmp r1, #0")
+                self.text_section.append(f"    rsblt r1, r1, #0")
+                self.text_section.append(f"    eorlt r3, r3, #1")
+                # Loop de divisão: subtrair divisor do dividendo até ser menor
+                self.text_section.append(f"div_loop_{div_id}:")
+                self.text_section.append(f"    cmp r0, r1")
+                self.text_section.append(f"    blt div_done_{div_id}")
+                self.text_section.append(f"    sub r0, r0, r1")
+                self.text_section.append(f"    add r2, r2, #1")
+                self.text_section.append(f"    b div_loop_{div_id}")
+                self.text_section.append(f"div_done_{div_id}:")
+                # Restaurar sinal se necessário
+                self.text_section.append(f"    cmp r3, #0")
+                self.text_section.append(f"    beq div_pos_{div_id}")
+                self.text_section.append(f"    rsb r2, r2, #0")
+                self.text_section.append(f"div_pos_{div_id}:")
+                self.text_section.append(f"    mov r0, r2")
+                self.text_section.append(f"    pop {{r2, r3, lr}}")
+                self.text_section.append(f"    b div_exit_{div_id}")
+                self.text_section.append(f"div_zero_{div_id}:")
+                self.text_section.append(f"    mov r0, #0")
+                self.text_section.append(f"    pop {{r2, r3, lr}}")
+                self.text_section.append(f"div_exit_{div_id}:")
+                self.store_from_reg(result, "r0")
+
+            elif op in SIMBOLOS_C3E:
+                a = self.registrador_de(arg1, "r0")
+                b = self.registrador_de(arg2, "r1")
+                destino = self.registrador_destino(result, "r0")
                 
-                elif op in ('==', '!=', '<', '>', '<=', '>='):
-                    self.text_section.append("    cmp r0, r1")
-                    self.text_section.append("    mov r0, #0")
-                    if op == "==": self.text_section.append("    moveq r0, #1")
-                    elif op == "!=": self.text_section.append("    movne r0, #1")
-                    elif op == "<": self.text_section.append("    movlt r0, #1")
-                    elif op == ">": self.text_section.append("    movgt r0, #1")
-                    elif op == "<=": self.text_section.append("    movle r0, #1")
-                    elif op == ">=": self.text_section.append("    movge r0, #1")
+                if op == OpC3E.ADD: self.text_section.append(f"    add {destino}, {a}, {b}")
+                elif op == OpC3E.SUB: self.text_section.append(f"    sub {destino}, {a}, {b}")
+                elif op == OpC3E.MUL: self.text_section.append(f"    mul {destino}, {a}, {b}")
+                else:
+                    self.text_section.append(f"    cmp {a}, {b}")
+                    self.text_section.append(f"    mov {destino}, #0")
+                    self.text_section.append(f"    mov{CONDICOES_ARM[op]} {destino}, #1")
                         
-                self.store_from_reg(dest, "r0")
+                self.concluir_destino(result, destino)
                 
-            elif cmd.startswith("ARRAY_"):
-                # Processar comandos de array
-                if cmd == "ARRAY_ADDR":
-                    self.process_array_address(parts)
-                elif cmd == "ARRAY_STORE":
-                    self.process_array_store(parts)
-                elif cmd == "ARRAY_LOAD":
-                    self.process_array_load(parts)
-                else:
-                    self.text_section.append(f"    @ C3E não implementado: {line}")
             else:
-                self.text_section.append(f"    @ C3E não implementado: {line}")
+                self.text_section.append(f"    @ C3E não implementado: {instr}")
                 
+    def process_vfp(self, op, arg1, arg2, result):
+        """Operação com operando REAL em VFP: s0 = arg1, s1 = arg2 (inteiros convertidos)"""
+        self.registrador_vfp(arg1, "s0", "r0")
+        self.registrador_vfp(arg2, "s1", "r1")
+        destino = self.registrador_destino(result, "r0")
+        if op in INSTRUCOES_VFP:
+            if op == OpC3E.DIV:
+                # Divisão por zero resulta em 0, como no interpretador
+                self.text_section.append("    vcmp.f32 s1, #0")
+                self.text_section.append("    vmrs APSR_nzcv, fpscr")
+            self.text_section.append(f"    {INSTRUCOES_VFP[op]} s0, s0, s1")
+            self.text_section.append(f"    vmov {destino}, s0")
+            if op == OpC3E.DIV:
+                self.text_section.append(f"    moveq {destino}, #0")
+        else:
+            self.text_section.append("    vcmp.f32 s0, s1")
+            self.text_section.append("    vmrs APSR_nzcv, fpscr")
+            self.text_section.append(f"    mov {destino}, #0")
+            self.text_section.append(f"    mov{CONDICOES_VFP[op]} {destino}, #1")
+        self.concluir_destino(result, destino)
+
+    def process_call(self, func_name, num_params, dest):
+        """Chamada de função: result = CALL func num_params (resultado em r0)"""
+        if func_name not in self.function_code:
+            self.text_section.append(f"    @ Erro: Função '{func_name}' não encontrada")
+            self.text_section.append("    mov r0, #0")
+        else:
+            self.text_section.append(f"    bl {func_name}")
+            if num_params > 4:
+                stack_adjust = (num_params - 4) * 4
+                if stack_adjust > 255:
+                    # Colocar constante na seção .data
+                    const_label = f"const_stackadj_{stack_adjust}"
+                    if const_label not in self.float_literals:
+                        self.float_literals[const_label] = str(stack_adjust)
+                        self.data_section.append(f"{const_label}: .word {stack_adjust}")
+                    self.text_section.append(f"    ldr r0, ={const_label}")
+                    self.text_section.append(f"    ldr r0, [r0]")
+                    self.text_section.append("    add sp, sp, r0")
+                else:
+                    self.text_section.append(f"    add sp, sp, #{stack_adjust}")
+        self.param_reg_count = 0
+        self.store_from_reg(dest, "r0")
+        
     def get_var_location(self, var):
         if var not in self.var_locations:
             self.var_locations[var] = f"[fp, #{self.next_stack_offset}]"
@@ -370,16 +594,27 @@ class ARMv7CodeGenerator:
                 self.text_section.append(f"    str {src_reg}, [{base_reg}, #{offset}]")
     
     def load_to_reg(self, src, reg):
-        if src.replace('.', '', 1).isdigit() or (src.startswith('-') and src[1:].replace('.', '', 1).isdigit()):
-            if "." in src:
-                float_label = self.add_float_literal(src)
+        if isinstance(src, (int, float)):
+            if isinstance(src, bool):
+                src = int(src)  # comparação avaliada em tempo de compilação
+            if isinstance(src, float) and 'vfp' in self.recursos:
+                # Com VFP o registrador recebe o próprio valor (bits IEEE 754)
+                self.text_section.append(f"    ldr {reg}, ={bits_float32(src):#010x}  @ {src}")
+            elif isinstance(src, float):
+                float_label = self.add_float_literal(str(src))
                 # Carregar valor float diretamente usando PC-relative
                 # O assembler criará automaticamente uma entrada no literal pool
                 self.text_section.append(f"    ldr {reg}, ={float_label}")
                 # Nota: .ltorg será inserido periodicamente pelo gerador 
             else:
                 self.text_section.append(f"    mov {reg}, #{src}")
-        elif src in self.var_locations:
+            return
+        src = str(src)  # operando ausente (None) é tratado como temporário, como antes
+        if src in self.registradores:
+            if self.registradores[src] != reg:
+                self.text_section.append(f"    mov {reg}, {self.registradores[src]}")
+            return
+        if src in self.var_locations:
             location = self.get_var_location(src)
             # Se é um array, o location é o endereço base - carregar o endereço (não o valor)
             if src in self.array_sizes:
@@ -457,6 +692,10 @@ class ARMv7CodeGenerator:
                 self.text_section.append(f"    ldr {reg}, {location}")
             
     def store_from_reg(self, dest, reg):
+        if dest in self.registradores:
+            if self.registradores[dest] != reg:
+                self.text_section.append(f"    mov {self.registradores[dest]}, {reg}")
+            return
         location = self.get_var_location(dest)
         offset = self.get_offset_from_location(location)
         abs_offset = abs(offset)
@@ -488,18 +727,12 @@ class ARMv7CodeGenerator:
         self.text_section.append(f"    @ WRITE {src} - I/O removido para compatibilidade CPUlator")
         
         # Carregar o valor em um registrador (pode ser útil para debug)
-        if src in self.string_literals:
-            self.load_to_reg(src, "r0")
-        elif src.replace('.', '', 1).isdigit() or (src.startswith('-') and src[1:].replace('.', '', 1).isdigit()):
-            self.load_to_reg(src, "r0")
-        else:
-            self.load_to_reg(src, "r0")
+        self.load_to_reg(src, "r0")
 
     def read_value(self, dest):
         # Para compatibilidade com CPUlator, não fazer I/O
         # Inicializar variável com zero
         self.text_section.append(f"    @ READ {dest} - I/O removido, inicializando com 0")
-        location = self.get_var_location(dest)
         self.text_section.append("    mov r0, #0")
         # Usar store_from_reg que já verifica offset grande
         self.store_from_reg(dest, "r0")
@@ -531,21 +764,10 @@ class ARMv7CodeGenerator:
             self.data_section.append(f"{label}: .float {value}")
         return label
         
-    def process_array_address(self, parts):
+    def process_array_address(self, temp_dest, array_name, indices):
         """Processa cálculo de endereço de array: temp = ARRAY_ADDR var index1 index2 ..."""
-        if len(parts) < 4:
+        if not indices:
             return
-            
-        temp_dest = parts[0]
-        # O formato pode ser: "t1 = ARRAY_ADDR arr 0" ou "ARRAY_ADDR arr 0"
-        if parts[1] == "=" and parts[2] == "ARRAY_ADDR":
-            # Formato: t1 = ARRAY_ADDR arr 0
-            array_name = parts[3]
-            indices = parts[4:]
-        else:
-            # Formato alternativo: ARRAY_ADDR arr 0
-            array_name = parts[1]
-            indices = parts[2:]
         
         if array_name not in self.array_sizes:
             self.text_section.append(f"    @ Erro: Array '{array_name}' não encontrado")
@@ -557,11 +779,12 @@ class ARMv7CodeGenerator:
         # Calcular endereço base do array
         self.load_to_reg(array_name, "r0")  # Endereço base
         
+        destino = self.registrador_destino(temp_dest, "r0")
         if len(indices) == 1:
             # Array unidimensional
-            self.load_to_reg(indices[0], "r1")
-            self.text_section.append("    lsl r1, r1, #2")  # Multiplicar por 4 (tamanho de int)
-            self.text_section.append("    add r0, r0, r1")
+            indice = self.registrador_de(indices[0], "r1")
+            self.text_section.append(f"    lsl r1, {indice}, #2")  # Multiplicar por 4 (tamanho de int)
+            self.text_section.append(f"    add {destino}, r0, r1")
         else:
             # Array multidimensional
             # Para arrays 2D: offset = (i * cols + j) * 4
@@ -572,46 +795,42 @@ class ARMv7CodeGenerator:
             for i in range(1, len(dimensions)):
                 self.text_section.append(f"    mov r2, #{dimensions[i]}")
                 self.text_section.append("    mul r1, r1, r2")
-                self.load_to_reg(indices[i], "r2")
-                self.text_section.append("    add r1, r1, r2")
+                indice = self.registrador_de(indices[i], "r2")
+                self.text_section.append(f"    add r1, r1, {indice}")
             
             # Multiplicar por 4 (tamanho do elemento)
             self.text_section.append("    lsl r1, r1, #2")
-            self.text_section.append("    add r0, r0, r1")
+            self.text_section.append(f"    add {destino}, r0, r1")
         
         # Armazenar endereço calculado
-        self.store_from_reg(temp_dest, "r0")
+        self.concluir_destino(temp_dest, destino)
         
-    def process_array_store(self, parts):
+    def process_array_store(self, addr_temp, value):
         """Processa armazenamento em array: ARRAY_STORE addr = value"""
-        if len(parts) < 4:
-            return
-            
-        addr_temp = parts[1]
-        value = parts[3]
-        
         # Carregar endereço e valor
-        self.load_to_reg(addr_temp, "r0")
-        self.load_to_reg(value, "r1")
+        endereco = self.registrador_de(addr_temp, "r0")
+        tipo = self.tipo_do_array(self.enderecos.get(addr_temp))
+        if 'vfp' in self.recursos and tipo in ('REAL', 'INTEIRO') and (
+                isinstance(value, (int, float)) or (tipo == 'REAL') != self.eh_real(value)):
+            # O valor é convertido para o tipo dos elementos do array
+            self.converter_para(tipo == 'REAL', value, "r1")
+            valor = "r1"
+        else:
+            valor = self.registrador_de(value, "r1")
         
         # Armazenar valor no endereço
-        self.text_section.append("    str r1, [r0]")
+        self.text_section.append(f"    str {valor}, [{endereco}]")
         
-    def process_array_load(self, parts):
+    def process_array_load(self, temp_dest, addr_temp):
         """Processa carregamento de array: temp = ARRAY_LOAD addr"""
-        if len(parts) < 3:
-            return
-            
-        temp_dest = parts[0]
-        addr_temp = parts[2]
-        
         # Carregar endereço
-        self.load_to_reg(addr_temp, "r0")
+        endereco = self.registrador_de(addr_temp, "r0")
         
         # Carregar valor do endereço
-        self.text_section.append("    ldr r1, [r0]")
+        destino = self.registrador_destino(temp_dest, "r1")
+        self.text_section.append(f"    ldr {destino}, [{endereco}]")
         
         # Armazenar valor
-        self.store_from_reg(temp_dest, "r1")
+        self.concluir_destino(temp_dest, destino)
 
 # --- INTERPRETADOR PARA EXECUÇÃO DOS PROGRAMAS ---
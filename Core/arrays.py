@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Armazenamento compacto dos arrays MiniPar do interpretador
+
+Os elementos de um array ficam num buffer contíguo do tipo declarado:
+array.array('q') para inteiro e array.array('d') para real (8 bytes por
+elemento, sem um objeto Python por número). Arrays de string usam lista. Os
+buffers expõem o protocolo de buffer, então o NumPy pode vê-los sem copiar
+(numpy.frombuffer).
+
+O acesso é row-major com os passos (strides) de cada dimensão calculados na
+declaração. Um único índice acessa a posição linear, como antes.
+
+Limites:
+- sem verificação (padrão), só a posição linear é conferida: leitura fora do
+  array vale 0 (inteiro ou string) ou 0.0 (real) e escrita fora do array é
+  ignorada. O array não cresce mais com escritas além do fim;
+- com verificação (verificar_limites=True no interpretador), cada índice é
+  conferido com a sua dimensão e qualquer acesso fora gera IndexError.
+
+Um valor que não cabe no buffer (um real num array inteiro, um inteiro de
+mais de 64 bits, uma string) troca o buffer por uma lista com os mesmos
+elementos, e o array segue guardando qualquer valor, como antes. Inteiros
+escritos num array real viram real, como na conversão implícita que o
+analisador semântico aceita.
+"""
+
+from array import array
+
+# Código do array.array de cada tipo numérico
+CODIGOS_TIPO = {'INTEIRO': 'q', 'REAL': 'd'}
+
+# Valor inicial dos elementos de cada tipo
+VALORES_PADRAO = {'INTEIRO': 0, 'REAL': 0.0, 'STRING_TYPE': ""}
+
+
+def normalizar_tipo(tipo):
+    tipo = tipo.upper()
+    return 'STRING_TYPE' if tipo == 'STRING' else tipo
+
+
+class TypedArray:
+    """Array MiniPar: dimensões, passos, tipo e o buffer dos elementos"""
+    __slots__ = ('nome', 'dims', 'strides', 'total', 'tipo', 'padrao', 'dados')
+
+    def __init__(self, nome, dims, tipo, dados=None):
+        self.nome = nome
+        self.dims = tuple(dims)
+        self.tipo = normalizar_tipo(tipo)
+        # Passo de cada dimensão: quantos elementos pular por unidade do índice
+        strides = []
+        passo = 1
+        for dim in reversed(self.dims):
+            strides.append(passo)
+            passo *= dim
+        self.strides = tuple(reversed(strides))
+        self.total = passo
+        self.padrao = 0.0 if self.tipo == 'REAL' else 0
+        if dados is None:
+            inicial = VALORES_PADRAO.get(self.tipo, 0)
+            codigo = CODIGOS_TIPO.get(self.tipo)
+            dados = array(codigo, [inicial]) * passo if codigo else [inicial] * passo
+        self.dados = dados
+
+    def __reduce__(self):
+        # Enviado aos processos do pool junto com o estado dos blocos PAR
+        return (TypedArray, (self.nome, self.dims, self.tipo, self.dados))
+
+    def __repr__(self):
+        return f"TypedArray({self.nome!r}, {list(self.dims)}, {self.tipo!r}, {list(self.dados)!r})"
+
+    def com_dados(self, dados):
+        """Outro array com a mesma forma e tipo sobre outro buffer (O(1))"""
+        copia = TypedArray.__new__(TypedArray)
+        copia.nome, copia.dims, copia.strides = self.nome, self.dims, self.strides
+        copia.total, copia.tipo, copia.padrao = self.total, self.tipo, self.padrao
+        copia.dados = dados
+        return copia
+
+    def posicao(self, indices, verificar=False):
+        """Posição linear dos índices (já avaliados). Com verificar=True cada
+        índice precisa estar dentro da sua dimensão."""
+        if len(indices) == 1 and len(self.dims) != 1:
+            # Um índice num array de várias dimensões: posição linear
+            if verificar and not 0 <= indices[0] < self.total:
+                raise IndexError(f"posição {indices[0]} fora do array '{self.nome}' "
+                                 f"({self.total} elementos)")
+            return indices[0]
+        if len(indices) != len(self.dims):
+            raise IndexError(f"array '{self.nome}' tem {len(self.dims)} dimensões, "
+                             f"acessado com {len(indices)} índices")
+        if verificar:
+            for dimensao, (indice, tamanho) in enumerate(zip(indices, self.dims), 1):
+                if not 0 <= indice < tamanho:
+                    raise IndexError(f"índice {indice} fora da dimensão {dimensao} do array "
+                                     f"'{self.nome}' (0 a {tamanho - 1})")
+        if len(indices) == 1:
+            return indices[0]
+        pos = 0
+        for indice, passo in zip(indices, self.strides):
+            pos += indice * passo
+        return pos
+
+    def ler(self, pos):
+        """Elemento da posição linear (o valor padrão fora do array)"""
+        if 0 <= pos < self.total:
+            return self.dados[pos]
+        return self.padrao
+
+    def escrever(self, pos, valor):
+        """Escreve na posição linear (ignorada fora do array)"""
+        if not 0 <= pos < self.total:
+            return
+        try:
+            self.dados[pos] = valor
+        except (TypeError, OverflowError):
+            # O valor não cabe no buffer tipado: passa a guardar objetos Python
+            self.dados = list(self.dados)
+            self.dados[pos] = valor
@@ -0,0 +1,822 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compilador para bytecode e máquina virtual para programas MiniPar
+
+A AST (com os blocos recuperados por layout.recuperar_blocos) é traduzida para
+uma sequência de pares (opcode, argumento) e um pool de constantes compartilhado.
+Variáveis e arrays são resolvidos para índices (slots) em tempo de compilação,
+então a execução não consulta nomes nem inspeciona tuplas da AST.
+
+Expressões são calculadas de slot para slot: os literais e os resultados
+intermediários também ocupam slots da lista de variáveis, e cada operação
+binária ou leitura de array é uma instrução só (sem empilhar os operandos).
+A pilha fica para chamadas de função, escreva, send e return.
+"""
+
+import operator
+from enum import IntEnum
+
+try:
+    from .layout import analisar_programa
+except ImportError:
+    from layout import analisar_programa
+
+
+class Op(IntEnum):
+    """Opcodes da máquina virtual. Toda instrução ocupa dois inteiros: opcode e argumento."""
+    LOAD_CONST = 1      # empilha constantes[arg]
+    LOAD_VAR = 2        # empilha variaveis[arg]
+    STORE_VAR = 3       # variaveis[arg] = desempilha
+    OPERACAO = 4        # constantes[arg] = (destino, slot, slot, função de OPERACOES_BINARIAS)
+    MOVE = 5            # constantes[arg] = (destino, origem)
+    NEG = 14
+    JUMP = 15           # pc = arg
+    JUMP_IF_FALSE = 16  # desempilha; se falso, pc = arg
+    OPERACAO_DESVIO = 30  # constantes[arg] = (slot, slot, função, pc se o resultado é falso)
+    LOOP = 17           # desvio para o início do laço (conta as iterações)
+    ARRAY_LOAD = 18     # constantes[arg] = (slot do array, nº de índices)
+    ARRAY_STORE = 19    # idem; valor abaixo dos índices na pilha
+    DECL_VAR = 20       # constantes[arg] = (slot, valor inicial)
+    DECL_ARRAY = 21     # constantes[arg] = (slot, dimensões, tipo)
+    PRINT = 22          # desempilha arg valores e escreve uma linha
+    READ = 23           # arg = slot * 2 + (1 se a variável é declarada)
+    SAVE_VARS = 24      # salva as variáveis antes de uma chamada (parâmetros são globais)
+    CALL = 25           # executa funcoes[arg]; restaura as variáveis e empilha o retorno
+    RETURN = 26         # desempilha o valor de retorno
+    POP = 27
+    SEND = 28           # constantes[arg] = (canal, nº de valores, variável de resultado)
+    RECEIVE = 29        # constantes[arg] = (canal, nomes das variáveis)
+    # Acesso com 1 ou 2 índices em slots (o segundo é None com um índice só)
+    ARRAY_LOAD_SLOTS = 31   # constantes[arg] = (destino, slot do array, slot do índice, slot ou None)
+    ARRAY_STORE_SLOTS = 32  # constantes[arg] = (slot do array, slot do índice, slot ou None, slot do valor)
+
+
+class ErroBytecode(Exception):
+    """Construção que o compilador de bytecode não sabe traduzir"""
+    pass
+
+
+def _dividir(a, b):
+    """Divisão do MiniPar: sempre real, e divisão por zero resulta em 0"""
+    return 0 if b == 0 else a / b
+
+
+# Operações binárias, indexadas pelos valores de OPERADORES
+OPERACOES_BINARIAS = (
+    operator.add, operator.sub, operator.mul, _dividir,
+    operator.eq, operator.ne, operator.lt, operator.gt, operator.le, operator.ge,
+    operator.truediv,  # divisão por constante diferente de zero
+)
+
+# Operadores da AST -> índice em OPERACOES_BINARIAS
+OPERADORES = {
+    '+': 0, '-': 1, '*': 2, '/': 3,
+    '==': 4, '!=': 5, '<': 6, '>': 7, '<=': 8, '>=': 9,
+}
+DIVISAO_POR_CONSTANTE = 10
+
+
+# Valor inicial de variáveis declaradas
+VALORES_INICIAIS = {'INTEIRO': 0, 'REAL': 0.0, 'STRING_TYPE': "", 'BOOL': False}
+
+
+def formatar_valor(valor):
+    """Formata um valor para o comando escreva (mesmo formato do interpretador)"""
+    if isinstance(valor, float):
+        if abs(valor) < 1e-10:
+            return "0.0000"
+        if valor == int(valor):
+            return str(int(valor))
+        return f"{valor:.4f}"
+    return str(valor)
+
+
+class Codigo:
+    """Sequência de instruções de um trecho executável (programa ou função)"""
+    __slots__ = ('nome', 'instrucoes')
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.instrucoes = []
+
+    def emitir(self, op, arg=0):
+        # int puro: o despacho compara inteiros, e com IntEnum a comparação é mais lenta
+        self.instrucoes.append(op.value)
+        self.instrucoes.append(arg)
+        return len(self.instrucoes) - 1  # posição do argumento, para remendar desvios
+
+    def posicao(self):
+        return len(self.instrucoes)
+
+
+class Funcao:
+    __slots__ = ('nome', 'parametros', 'codigo')
+
+    def __init__(self, nome, parametros):
+        self.nome = nome
+        self.parametros = parametros  # slots dos parâmetros
+        self.codigo = None
+
+
+class Programa:
+    """Resultado da compilação: código principal, funções e pool de constantes"""
+    def __init__(self):
+        self.principal = Codigo('<programa>')
+        self.funcoes = []
+        self.constantes = []
+        self.variaveis = []     # nome de cada slot de variável
+        self.iniciais = []      # (slot, valor) dos literais guardados em slots
+        self.arrays = []        # nome de cada slot de array
+        self.canais = {}
+
+    def desmontar(self):
+        """Listagem legível do bytecode (depuração)"""
+        linhas = []
+        trechos = [self.principal] + [f.codigo for f in self.funcoes]
+        for codigo in trechos:
+            linhas.append(f"{codigo.nome}:")
+            instrucoes = codigo.instrucoes
+            for pc in range(0, len(instrucoes), 2):
+                op = Op(instrucoes[pc])
+                arg = instrucoes[pc + 1]
+                nome = lambda slot: self.variaveis[slot]
+                if op in (Op.LOAD_VAR, Op.STORE_VAR):
+                    detalhe = self.variaveis[arg]
+                elif op == Op.OPERACAO:
+                    destino, a, b, funcao = self.constantes[arg]
+                    detalhe = f"{nome(destino)} = {nome(a)} {funcao.__name__} {nome(b)}"
+                elif op == Op.OPERACAO_DESVIO:
+                    a, b, funcao, alvo = self.constantes[arg]
+                    detalhe = f"{nome(a)} {funcao.__name__} {nome(b)} senão {alvo}"
+                elif op == Op.MOVE:
+                    destino, origem = self.constantes[arg]
+                    detalhe = f"{nome(destino)} = {nome(origem)}"
+                elif op in (Op.ARRAY_LOAD_SLOTS, Op.ARRAY_STORE_SLOTS):
+                    campos = self.constantes[arg]
+                    slot, i, j = campos[1:] if op == Op.ARRAY_LOAD_SLOTS else campos[:3]
+                    acesso = f"{self.arrays[slot]}[{nome(i)}]" + ("" if j is None else f"[{nome(j)}]")
+                    detalhe = (f"{nome(campos[0])} = {acesso}" if op == Op.ARRAY_LOAD_SLOTS
+                               else f"{acesso} = {nome(campos[3])}")
+                elif op in (Op.LOAD_CONST, Op.ARRAY_LOAD, Op.ARRAY_STORE, Op.DECL_VAR,
+                            Op.DECL_ARRAY, Op.SEND, Op.RECEIVE):
+                    detalhe = repr(self.constantes[arg])
+                elif op == Op.CALL:
+                    detalhe = self.funcoes[arg].nome
+                else:
+                    detalhe = str(arg)
+                linhas.append(f"  {pc:5d} {op.name:<14} {detalhe}")
+        return "\n".join(linhas)
+
+
+class BytecodeCompiler:
+    """Traduz a AST (com blocos recuperados) em um Programa"""
+    def __init__(self):
+        self.programa = Programa()
+        self._slots_variaveis = {}
+        self._slots_arrays = {}
+        self._slots_literais = {}
+        self._temporarios = []  # slots dos temporários, reaproveitados a cada comando
+        self._temporarios_usados = 0
+        self._constantes = {}
+        self._funcoes = {}
+        self._declaradas = set()
+        self._tem_par = False
+
+    def compile(self, ast):
+        if not ast or ast[0] != 'programa_minipar':
+            raise ErroBytecode("AST não contém um programa MiniPar")
+        comandos = ast[1]
+        self._coletar(comandos)
+        if self._tem_par:
+            # No interpretador cada bloco PAR trabalha numa cópia das variáveis, as
+            # saídas são intercaladas por iteração e o send/receive entre blocos
+            # passa os valores pelo buffer do canal (utils.ChannelManager)
+            raise ErroBytecode("Blocos PAR só são executados pelo interpretador")
+        for nome, (funcao, no) in self._funcoes.items():
+            funcao.codigo = Codigo(nome)
+            self._comandos(no[4], funcao.codigo)
+            funcao.codigo.emitir(Op.LOAD_CONST, self._constante(0))
+            funcao.codigo.emitir(Op.RETURN)
+        self._comandos(comandos, self.programa.principal)
+        return self.programa
+
+    # --- Resolução de nomes e constantes ---
+    def _variavel(self, nome):
+        slot = self._slots_variaveis.get(nome)
+        if slot is None:
+            slot = self._slots_variaveis[nome] = len(self.programa.variaveis)
+            self.programa.variaveis.append(nome)
+        return slot
+
+    def _array(self, nome):
+        slot = self._slots_arrays.get(nome)
+        if slot is None:
+            slot = self._slots_arrays[nome] = len(self.programa.arrays)
+            self.programa.arrays.append(nome)
+        return slot
+
+    def _slot_literal(self, valor):
+        chave = (type(valor), valor)
+        slot = self._slots_literais.get(chave)
+        if slot is None:
+            slot = self._slots_literais[chave] = len(self.programa.variaveis)
+            self.programa.variaveis.append(repr(valor))
+            self.programa.iniciais.append((slot, valor))
+        return slot
+
+    def _temporario(self):
+        n = self._temporarios_usados
+        self._temporarios_usados += 1
+        if n == len(self._temporarios):
+            self._temporarios.append(len(self.programa.variaveis))
+            self.programa.variaveis.append(f"$t{n}")
+        return self._temporarios[n]
+
+    def _operando(self, expr):
+        """Slot de um operando simples (variável ou literal), ou None"""
+        if not isinstance(expr, tuple):
+            # Valores soltos na AST (ex.: limites do 'para') são literais
+            return self._slot_literal(expr) if isinstance(expr, (int, float, str)) else None
+        if not expr:
+            return None
+        tipo = expr[0]
+        if tipo == 'id':
+            return self._variavel(expr[1])
+        if tipo in ('num_inteiro', 'num_real', 'string'):
+            return self._slot_literal(expr[1])
+        if (tipo == 'unop' and expr[1] == '-' and isinstance(expr[2], tuple)
+                and expr[2][0] in ('num_inteiro', 'num_real')):
+            return self._slot_literal(-expr[2][1])
+        return None
+
+    def _operacao(self, expr):
+        """Função de OPERACOES_BINARIAS para o operador de um binop"""
+        operacao = OPERADORES.get(expr[1])
+        if operacao is None:
+            raise ErroBytecode(f"Operador não suportado: '{expr[1]}'")
+        direito = expr[3]
+        if (operacao == OPERADORES['/'] and isinstance(direito, tuple)
+                and direito[0] in ('num_inteiro', 'num_real') and direito[1] != 0):
+            operacao = DIVISAO_POR_CONSTANTE
+        return OPERACOES_BINARIAS[operacao]
+
+    def _constante(self, valor):
+        # O tipo faz parte da chave: 1, 1.0 e True são constantes diferentes
+        chave = (type(valor), valor) if not isinstance(valor, list) else None
+        if chave is not None and chave in self._constantes:
+            return self._constantes[chave]
+        indice = len(self.programa.constantes)
+        self.programa.constantes.append(valor)
+        if chave is not None:
+            self._constantes[chave] = indice
+        return indice
+
+    def _coletar(self, comandos):
+        """Registra funções, canais e variáveis declaradas antes de gerar código"""
+        for cmd in comandos:
+            if not isinstance(cmd, tuple) or not cmd:
+                continue
+            tipo = cmd[0]
+            if tipo == 'declaracao_funcao':
+                parametros = [self._variavel(param[1]) for param in cmd[2]]
+                if cmd[1] not in self._funcoes:
+                    funcao = Funcao(cmd[1], parametros)
+                    self._funcoes[cmd[1]] = (funcao, cmd)
+                    self.programa.funcoes.append(funcao)
+                self._coletar(cmd[4])
+            elif tipo == 'declaracao_var' and cmd[2].upper() in VALORES_INICIAIS:
+                # Como no interpretador, só tipos com valor inicial contam como declarados
+                self._declaradas.add(cmd[1])
+            elif tipo == 'c_channel':
+                self.programa.canais[cmd[1]] = (cmd[2], cmd[3])
+            elif tipo == 'se':
+                self._coletar(cmd[2] or [])
+                self._coletar(cmd[3] or [])
+            elif tipo == 'enquanto':
+                self._coletar(cmd[2] or [])
+            elif tipo == 'para':
+                self._coletar(cmd[3] or [])
+            elif tipo in ('bloco_seq', 'bloco_par'):
+                self._tem_par = self._tem_par or tipo == 'bloco_par'
+                self._coletar(cmd[1] or [])
+
+    # --- Comandos ---
+    def _comandos(self, comandos, codigo):
+        for cmd in comandos:
+            self._comando(cmd, codigo)
+
+    def _comando(self, cmd, codigo):
+        if not isinstance(cmd, tuple) or not cmd:
+            return
+        tipo = cmd[0]
+        emitir = codigo.emitir
+        # Os temporários de um comando não passam para o seguinte
+        self._temporarios_usados = 0
+
+        if tipo == 'atribuicao':
+            self._valor(cmd[2], codigo, self._variavel(cmd[1]))
+        elif tipo == 'atribuicao_array':
+            # Como no interpretador: o valor é avaliado antes dos índices
+            valor = self._valor(cmd[3], codigo)
+            if len(cmd[2]) in (1, 2):
+                indices = self._indices(cmd[2], codigo)
+                emitir(Op.ARRAY_STORE_SLOTS, self._constante((self._array(cmd[1]),) + indices + (valor,)))
+            else:
+                emitir(Op.LOAD_VAR, valor)
+                for indice in cmd[2]:
+                    self._expressao(indice, codigo)
+                emitir(Op.ARRAY_STORE, self._constante((self._array(cmd[1]), len(cmd[2]))))
+        elif tipo == 'escreva':
+            for expr in cmd[1]:
+                self._expressao(expr, codigo)
+            emitir(Op.PRINT, len(cmd[1]))
+        elif tipo == 'se':
+            desvio_senao = self._desvio_se_falso(cmd[1], codigo)
+            self._comandos(cmd[2] or [], codigo)
+            if cmd[3]:
+                desvio_fim = emitir(Op.JUMP)
+                self._remendar(codigo, desvio_senao)
+                self._comandos(cmd[3], codigo)
+                codigo.instrucoes[desvio_fim] = codigo.posicao()
+            else:
+                self._remendar(codigo, desvio_senao)
+        elif tipo == 'enquanto':
+            inicio = codigo.posicao()
+            desvio_fim = self._desvio_se_falso(cmd[1], codigo)
+            self._comandos(cmd[2] or [], codigo)
+            emitir(Op.LOOP, inicio)
+            self._remendar(codigo, desvio_fim)
+        elif tipo == 'para':
+            # para v em a..b: v = a; enquanto v <= b: corpo; v = v + 1
+            slot = self._variavel(cmd[1])
+            intervalo = cmd[2]
+            self._valor(intervalo[1], codigo, slot)
+            inicio = codigo.posicao()
+            desvio_fim = self._desvio_se_falso(('binop', '<=', ('id', cmd[1]), intervalo[2]), codigo)
+            self._comandos(cmd[3] or [], codigo)
+            emitir(Op.OPERACAO, self._constante((slot, slot, self._slot_literal(1), operator.add)))
+            emitir(Op.LOOP, inicio)
+            self._remendar(codigo, desvio_fim)
+        elif tipo == 'declaracao_var':
+            valor = VALORES_INICIAIS.get(cmd[2].upper())
+            if valor is not None:
+                emitir(Op.DECL_VAR, self._constante((self._variavel(cmd[1]), valor)))
+        elif tipo == 'declaracao_var_array':
+            emitir(Op.DECL_ARRAY, self._constante((self._array(cmd[1]), tuple(cmd[3]), cmd[2].upper())))
+        elif tipo == 'leia':
+            emitir(Op.READ, self._variavel(cmd[1]) * 2 + (1 if cmd[1] in self._declaradas else 0))
+        elif tipo == 'chamada_funcao':
+            self._expressao(cmd, codigo)
+            emitir(Op.POP)
+        elif tipo == 'return':
+            if codigo is self.programa.principal:
+                # Fora de função o interpretador apenas avalia a expressão
+                self._expressao(cmd[1], codigo)
+                emitir(Op.POP)
+            else:
+                self._expressao(cmd[1], codigo)
+                emitir(Op.RETURN)
+        elif tipo == 'send':
+            for expr in cmd[2]:
+                self._expressao(expr, codigo)
+            resultado = None
+            if len(cmd[2]) > 3 and isinstance(cmd[2][3], tuple) and cmd[2][3][0] == 'id':
+                resultado = self._variavel(cmd[2][3][1])
+            emitir(Op.SEND, self._constante((cmd[1], len(cmd[2]), resultado)))
+        elif tipo == 'receive':
+            nomes = tuple(var[1] if isinstance(var, tuple) and var[0] == 'id' else str(var) for var in cmd[2])
+            emitir(Op.RECEIVE, self._constante((cmd[1], nomes)))
+        elif tipo == 'bloco_seq':
+            self._comandos(cmd[1], codigo)
+        elif tipo in ('declaracao_funcao', 'c_channel'):
+            pass  # registrados em _coletar
+        else:
+            raise ErroBytecode(f"Comando não suportado pelo compilador de bytecode: '{tipo}'")
+
+    def _desvio_se_falso(self, condicao, codigo):
+        """Avalia a condição e desvia se ela for falsa. Retorna o remendo
+        (posição do argumento, operandos) para _remendar com o destino."""
+        if isinstance(condicao, tuple) and condicao and condicao[0] == 'binop':
+            operacao = self._operacao(condicao)
+            esquerdo = self._valor(condicao[2], codigo)
+            direito = self._valor(condicao[3], codigo)
+            return codigo.emitir(Op.OPERACAO_DESVIO), (esquerdo, direito, operacao)
+        self._expressao(condicao, codigo)
+        return codigo.emitir(Op.JUMP_IF_FALSE), None
+
+    def _remendar(self, codigo, remendo):
+        """Aponta o desvio de _desvio_se_falso para a posição atual"""
+        posicao, operandos = remendo
+        destino = codigo.posicao()
+        codigo.instrucoes[posicao] = destino if operandos is None else self._constante(operandos + (destino,))
+
+    # --- Expressões ---
+    def _valor(self, expr, codigo, destino=None):
+        """Gera o cálculo de expr e retorna o slot com o resultado: destino, se
+        dado, ou um temporário. Um operando simples sem destino não gera código
+        (o slot é o da própria variável ou literal)."""
+        slot = self._operando(expr)
+        if slot is not None:
+            if destino is not None and destino != slot:
+                codigo.emitir(Op.MOVE, self._constante((destino, slot)))
+                return destino
+            return slot
+        tipo = expr[0] if isinstance(expr, tuple) and expr else None
+        if tipo == 'binop':
+            operacao = self._operacao(expr)
+            esquerdo = self._valor(expr[2], codigo)
+            direito = self._valor(expr[3], codigo)
+            destino = self._temporario() if destino is None else destino
+            codigo.emitir(Op.OPERACAO, self._constante((destino, esquerdo, direito, operacao)))
+        elif tipo == 'acesso_array' and len(expr[2]) in (1, 2):
+            indices = self._indices(expr[2], codigo)
+            destino = self._temporario() if destino is None else destino
+            codigo.emitir(Op.ARRAY_LOAD_SLOTS, self._constante((destino, self._array(expr[1])) + indices))
+        else:
+            self._expressao(expr, codigo)
+            destino = self._temporario() if destino is None else destino
+            codigo.emitir(Op.STORE_VAR, destino)
+        return destino
+
+    def _indices(self, indices, codigo):
+        """(slot, slot ou None) com os valores de 1 ou 2 índices"""
+        primeiro = self._valor(indices[0], codigo)
+        return (primeiro, self._valor(indices[1], codigo) if len(indices) == 2 else None)
+
+    def _expressao(self, expr, codigo):
+        """Gera o cálculo de expr deixando o resultado na pilha"""
+        emitir = codigo.emitir
+        if not isinstance(expr, tuple):
+            emitir(Op.LOAD_CONST, self._constante(expr))
+            return
+        tipo = expr[0]
+        if tipo in ('id', 'num_inteiro', 'num_real', 'string', 'binop') or (
+                tipo == 'acesso_array' and len(expr[2]) in (1, 2)):
+            emitir(Op.LOAD_VAR, self._valor(expr, codigo))
+        elif tipo == 'unop':
+            self._expressao(expr[2], codigo)
+            if expr[1] == '-':
+                emitir(Op.NEG)
+            else:
+                emitir(Op.POP)
+                emitir(Op.LOAD_CONST, self._constante(None))
+        elif tipo == 'acesso_array':
+            for indice in expr[2]:
+                self._expressao(indice, codigo)
+            emitir(Op.ARRAY_LOAD, self._constante((self._array(expr[1]), len(expr[2]))))
+        elif tipo == 'chamada_funcao':
+            registro = self._funcoes.get(expr[1])
+            if registro is None:
+                # Função inexistente: o interpretador retorna 0 sem avaliar os argumentos
+                emitir(Op.LOAD_CONST, self._constante(0))
+                return
+            funcao = registro[0]
+            emitir(Op.SAVE_VARS)
+            # Como no interpretador, todos os argumentos são avaliados antes de
+            # atribuir os parâmetros: um argumento que lê um parâmetro atribuído
+            # antes dele (ex.: f(b, a) com parâmetros a, b) é copiado num temporário
+            parametros = funcao.parametros[:len(expr[2])]
+            valores = []
+            for i, arg in enumerate(expr[2][:len(parametros)]):
+                slot = self._valor(arg, codigo)
+                if slot in parametros[:i]:
+                    temporario = self._temporario()
+                    emitir(Op.MOVE, self._constante((temporario, slot)))
+                    slot = temporario
+                valores.append(slot)
+            # Parâmetros sem argumento começam em 0, como no interpretador
+            valores += [self._slot_literal(0)] * (len(funcao.parametros) - len(valores))
+            for parametro, slot in zip(funcao.parametros, valores):
+                if parametro != slot:
+                    emitir(Op.MOVE, self._constante((parametro, slot)))
+            emitir(Op.CALL, self.programa.funcoes.index(funcao))
+        elif tipo == 'boolean':
+            valor = expr[1]
+            if isinstance(valor, str):
+                valor = valor.lower() in ('true', 'verdadeiro')
+            emitir(Op.LOAD_CONST, self._constante(bool(valor)))
+        else:
+            emitir(Op.LOAD_CONST, self._constante(None))
+
+
+class ArrayMiniPar:
+    """Array linearizado (row-major) com as regras de acesso do interpretador"""
+    __slots__ = ('dados', 'dims', 'passo', 'total', 'padrao', 'tipo')
+
+    def __init__(self, dims, tipo):
+        total = 1
+        for dim in dims:
+            total *= dim
+        self.dims = dims
+        # Tamanho de uma linha, para o acesso com dois índices
+        self.passo = dims[1] if len(dims) > 1 else None
+        self.total = total
+        self.tipo = tipo
+        # Posições fora do array valem 0.0 (REAL) ou 0 (demais tipos)
+        self.padrao = 0.0 if tipo == 'REAL' else 0
+        inicial = "" if tipo in ('STRING', 'STRING_TYPE') else self.padrao
+        self.dados = [inicial] * total
+
+    def posicao(self, indices):
+        if len(indices) == 1:
+            return indices[0]
+        if len(indices) == 2:
+            return indices[0] * self.passo + indices[1]
+        pos = indices[0]
+        for i in range(1, len(self.dims)):
+            pos = pos * self.dims[i] + indices[i]
+        return pos
+
+    def ler(self, indices):
+        pos = self.posicao(indices)
+        if pos < 0 or pos >= self.total:
+            return self.padrao
+        return self.dados[pos]
+
+    def escrever(self, indices, valor):
+        self.escrever_posicao(self.posicao(indices), valor)
+
+    def escrever_posicao(self, pos, valor):
+        """Escrita fora do tamanho atual aumenta o array; posições negativas são ignoradas"""
+        if pos < 0:
+            return
+        dados = self.dados
+        if pos >= len(dados):
+            dados.extend([self.padrao] * (pos + 1 - len(dados)))
+            self.total = len(dados)
+        dados[pos] = valor
+
+
+class MiniParVM:
+    """Máquina virtual que executa um Programa"""
+    def __init__(self, limite_iteracoes=None):
+        # Limite total de iterações de laços (None = sem limite)
+        self.limite_iteracoes = limite_iteracoes
+
+    def execute(self, programa, input_values=None):
+        """Executa o programa e retorna a saída (mesmo formato de MiniParInterpreter.execute)"""
+        self.programa = programa
+        self.constantes = programa.constantes
+        self.variaveis = [0] * len(programa.variaveis)
+        for slot, valor in programa.iniciais:
+            self.variaveis[slot] = valor
+        self.arrays = [None] * len(programa.arrays)
+        self.salvas = []
+        self.saida = []
+        self.entrada = []
+        self.indice_entrada = 0
+        self._restantes = self.limite_iteracoes or -1
+        if input_values:
+            self.entrada = [str(v).strip() for v in input_values.split('\n') if v.strip()]
+
+        try:
+            self._rodar(programa.principal.instrucoes)
+        except _LimiteAtingido:
+            self.saida.append(f"Aviso: Execução interrompida após {self.limite_iteracoes} iterações")
+        return '\n'.join(str(linha) for linha in self.saida if linha)
+
+    def _rodar(self, instrucoes):
+        """Laço de despacho; retorna o valor de RETURN (chamadas de função)"""
+        constantes = self.constantes
+        variaveis = self.variaveis
+        arrays = self.arrays
+        pilha = []
+        empilhar = pilha.append
+        desempilhar = pilha.pop
+        pc = 0
+        fim = len(instrucoes)
+
+        LOAD_CONST = Op.LOAD_CONST.value
+        LOAD_VAR = Op.LOAD_VAR.value
+        STORE_VAR = Op.STORE_VAR.value
+        OPERACAO = Op.OPERACAO.value
+        OPERACAO_DESVIO = Op.OPERACAO_DESVIO.value
+        MOVE = Op.MOVE.value
+        ARRAY_LOAD_SLOTS = Op.ARRAY_LOAD_SLOTS.value
+        ARRAY_STORE_SLOTS = Op.ARRAY_STORE_SLOTS.value
+        JUMP_IF_FALSE = Op.JUMP_IF_FALSE.value
+        LOOP = Op.LOOP.value
+        JUMP = Op.JUMP.value
+        NEG = Op.NEG.value
+        PRINT = Op.PRINT.value
+        SAVE_VARS = Op.SAVE_VARS.value
+        CALL = Op.CALL.value
+        RETURN = Op.RETURN.value
+
+        while pc < fim:
+            op = instrucoes[pc]
+            arg = instrucoes[pc + 1]
+            pc += 2
+            if op == OPERACAO:
+                destino, a, b, operacao = constantes[arg]
+                variaveis[destino] = operacao(variaveis[a], variaveis[b])
+            elif op == ARRAY_LOAD_SLOTS:
+                destino, slot, i, j = constantes[arg]
+                array = arrays[slot]
+                if array is None:
+                    variaveis[destino] = 0
+                else:
+                    pos = variaveis[i] if j is None else variaveis[i] * array.passo + variaveis[j]
+                    variaveis[destino] = array.dados[pos] if 0 <= pos < array.total else array.padrao
+            elif op == OPERACAO_DESVIO:
+                a, b, operacao, destino = constantes[arg]
+                if not operacao(variaveis[a], variaveis[b]):
+                    pc = destino
+            elif op == ARRAY_STORE_SLOTS:
+                slot, i, j, valor = constantes[arg]
+                array = arrays[slot]
+                if array is not None:
+                    pos = variaveis[i] if j is None else variaveis[i] * array.passo + variaveis[j]
+                    if 0 <= pos < array.total:
+                        array.dados[pos] = variaveis[valor]
+                    else:
+                        array.escrever_posicao(pos, variaveis[valor])
+            elif op == MOVE:
+                destino, origem = constantes[arg]
+                variaveis[destino] = variaveis[origem]
+            elif op == LOOP:
+                pc = arg
+                self._restantes -= 1
+                if self._restantes == 0:
+                    raise _LimiteAtingido()
+            elif op == JUMP:
+                pc = arg
+            elif op == LOAD_VAR:
+                empilhar(variaveis[arg])
+            elif op == STORE_VAR:
+                variaveis[arg] = desempilhar()
+            elif op == LOAD_CONST:
+                empilhar(constantes[arg])
+            elif op == JUMP_IF_FALSE:
+                if not desempilhar():
+                    pc = arg
+            elif op == NEG:
+                pilha[-1] = -pilha[-1]
+            elif op == PRINT:
+                valores = pilha[-arg:] if arg else []
+                del pilha[len(pilha) - arg:]
+                self.saida.append(''.join(map(formatar_valor, valores)))
+            elif op == SAVE_VARS:
+                self.salvas.append(variaveis[:])
+            elif op == CALL:
+                funcao = self.programa.funcoes[arg]
+                resultado = self._rodar(funcao.codigo.instrucoes)
+                variaveis[:] = self.salvas.pop()
+                empilhar(resultado)
+            elif op == RETURN:
+                return desempilhar()
+            else:
+                self._instrucao_rara(op, arg, pilha)
+
+    def _instrucao_rara(self, op, arg, pilha):
+        """Instruções executadas poucas vezes, fora do laço principal"""
+        constantes = self.constantes
+        if op == Op.POP:
+            pilha.pop()
+        elif op == Op.ARRAY_LOAD or op == Op.ARRAY_STORE:
+            slot, n = constantes[arg]
+            indices = pilha[len(pilha) - n:]
+            del pilha[len(pilha) - n:]
+            array = self.arrays[slot]
+            if op == Op.ARRAY_LOAD:
+                pilha.append(array.ler(indices) if array is not None else 0)
+            else:
+                valor = pilha.pop()
+                if array is not None:
+                    array.escrever(indices, valor)
+        elif op == Op.DECL_VAR:
+            slot, valor = constantes[arg]
+            self.variaveis[slot] = valor
+        elif op == Op.DECL_ARRAY:
+            slot, dims, tipo = constantes[arg]
+            if tipo in VALORES_INICIAIS or tipo == 'STRING':
+                self.arrays[slot] = ArrayMiniPar(dims, tipo)
+        elif op == Op.READ:
+            self._ler(arg >> 1, arg & 1)
+        elif op == Op.SEND:
+            canal, n, resultado = constantes[arg]
+            valores = pilha[len(pilha) - n:]
+            del pilha[len(pilha) - n:]
+            self._enviar(canal, valores, resultado)
+        elif op == Op.RECEIVE:
+            canal, nomes = constantes[arg]
+            self._receber(canal, nomes)
+        else:
+            raise ErroBytecode(f"Opcode inválido: {op}")
+
+    def _ler(self, slot, declarada):
+        """leia(): converte a entrada conforme o tipo atual da variável"""
+        variaveis = self.variaveis
+        if self.indice_entrada >= len(self.entrada):
+            texto = None
+        else:
+            texto = self.entrada[self.indice_entrada]
+            self.indice_entrada += 1
+        variaveis[slot] = converter_entrada(texto, variaveis[slot], declarada)
+
+    def _enviar(self, canal, valores, resultado):
+        if canal not in self.programa.canais:
+            self.saida.append(f"Erro: Canal '{canal}' não encontrado")
+            return
+        valor = simular_envio(self.saida, valores)
+        if valor is not None and resultado is not None:
+            self.variaveis[resultado] = valor
+            self.saida.append(f"[COMPUTADOR_1] Resultado recebido: {valor}")
+
+    def _receber(self, canal, nomes):
+        if canal not in self.programa.canais:
+            self.saida.append(f"Erro: Canal '{canal}' não encontrado")
+            return
+        self.saida.append(f"[COMPUTADOR_2] Aguardando dados do canal '{canal}'...")
+        if nomes:
+            self.saida.append(f"[COMPUTADOR_2] Dados recebidos: {', '.join(nomes)}")
+
+
+def converter_entrada(texto, atual, declarada):
+    """Valor lido por leia(): variáveis declaradas seguem o tipo do valor atual;
+    as demais viram número (real se houver '.') ou string. texto=None: sem entrada."""
+    if texto is None:
+        if declarada and isinstance(atual, float):
+            return 0.0
+        if declarada and isinstance(atual, int):
+            return 0
+        return atual
+    if declarada:
+        if isinstance(atual, bool):
+            return texto.lower() in ('true', 'verdadeiro', '1')
+        if isinstance(atual, int):
+            try:
+                return int(texto)
+            except ValueError:
+                return 0
+        if isinstance(atual, float):
+            try:
+                return float(texto)
+            except ValueError:
+                return 0.0
+        return texto
+    try:
+        valor = float(texto)
+        return valor if '.' in texto else int(valor)
+    except ValueError:
+        return texto
+
+
+def simular_envio(saida, valores):
+    """send(): simulação cliente/servidor do interpretador (calculadora).
+    Registra as mensagens em saida e retorna o resultado, ou None se faltam valores."""
+    if len(valores) < 3:
+        return None
+    operacao, valor1, valor2 = valores[0], valores[1], valores[2]
+    saida.append(f"[COMPUTADOR_1] Enviando solicitação: {operacao} {valor1} {valor2}")
+    saida.append(f"[COMPUTADOR_2] Recebendo solicitação do computador_1...")
+    saida.append(f"[COMPUTADOR_2] Processando operação: {valor1} {operacao} {valor2}")
+    if operacao == '+':
+        valor = valor1 + valor2
+    elif operacao == '-':
+        valor = valor1 - valor2
+    elif operacao == '*':
+        valor = valor1 * valor2
+    elif operacao == '/':
+        if valor2 != 0:
+            valor = valor1 / valor2
+        else:
+            valor = 0
+            saida.append("[COMPUTADOR_2] Erro: Divisão por zero!")
+    else:
+        valor = 0
+        saida.append(f"[COMPUTADOR_2] Erro: Operação '{operacao}' não reconhecida!")
+    saida.append(f"[COMPUTADOR_2] Resultado calculado: {valor}")
+    saida.append(f"[COMPUTADOR_2] Enviando resultado para computador_1...")
+    return valor
+
+
+class _LimiteAtingido(Exception):
+    pass
+
+
+def compilar_bytecode(codigo_fonte):
+    """Analisa o código fonte, recupera os blocos e gera o bytecode.
+    Retorna (programa, erros); programa é None se houver erros."""
+    ast, erros = analisar_programa(codigo_fonte)
+    if ast is None:
+        return None, erros
+    return compilar_bytecode_ast(ast)
+
+
+def compilar_bytecode_ast(ast):
+    """Gera o bytecode de uma AST com os blocos já recuperados (ex.: a guardada
+    no cache de compilação). Retorna (programa, erros)."""
+    try:
+        return BytecodeCompiler().compile(ast), ""
+    except ErroBytecode as e:
+        return None, str(e)
+
+
+def executar_bytecode(codigo_fonte, input_values=None):
+    """Compila e executa um programa MiniPar na máquina virtual"""
+    programa, erros = compilar_bytecode(codigo_fonte)
+    if programa is None:
+        return "", erros
+    return MiniParVM().execute(programa, input_values), ""
@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Executor do Código de 3 Endereços (C3E)
+
+O C3E produzido por C3EGenerator (o mesmo que alimenta o gerador ARMv7) é
+resolvido uma única vez: rótulos viram índices de instrução e variáveis,
+temporários e constantes viram posições de um banco de registradores. A
+execução percorre então o código linear, sem consultar nomes nem a AST.
+"""
+
+from enum import IntEnum
+
+try:
+    from .c3e_generator import C3EGenerator, OpC3E, SIMBOLOS_C3E
+    from .c3e_optimizer import C3EOptimizer
+    from .layout import analisar_programa
+    from .bytecode import (OPERACOES_BINARIAS, OPERADORES, VALORES_INICIAIS, ArrayMiniPar,
+                           formatar_valor, converter_entrada, simular_envio)
+except ImportError:
+    from c3e_generator import C3EGenerator, OpC3E, SIMBOLOS_C3E
+    from c3e_optimizer import C3EOptimizer
+    from layout import analisar_programa
+    from bytecode import (OPERACOES_BINARIAS, OPERADORES, VALORES_INICIAIS, ArrayMiniPar,
+                          formatar_valor, converter_entrada, simular_envio)
+
+
+class OpExec(IntEnum):
+    """Instruções resolvidas: tuplas (op, a, b, c) com registradores em a/b/c.
+    Os valores 0-10 são as operações binárias (índices de OPERACOES_BINARIAS):
+    registradores[a] = operacao(registradores[b], registradores[c])."""
+    MOV = 11            # r[a] = r[b]
+    GOTO = 12           # pc = a
+    LOOP = 13           # pc = a (desvio para trás: conta uma iteração)
+    IF_GOTO = 14        # se r[a]: pc = b
+    IF_FALSE = 15       # se não r[a]: pc = b
+    ARRAY_ADDR = 16     # r[a] = (array b, posição dos índices c)
+    ARRAY_LOAD = 17     # r[a] = valor no endereço r[b]
+    ARRAY_STORE = 18    # endereço r[a] = r[b]
+    WRITE = 19          # acrescenta r[a] à linha atual
+    WRITELN = 20        # fecha a linha atual
+    PUSH_PARAM = 21     # empilha r[a] como argumento
+    CALL = 22           # r[a] = função b com c argumentos
+    RETURN = 23         # retorna r[a]
+    READ = 24           # r[a] = próxima entrada (b = 1 se a variável foi declarada)
+    SEND_PARAM = 25     # empilha r[a] para o próximo send
+    SEND = 26           # send com b valores; c = (canal, registrador do resultado ou -1)
+    RECEIVE = 27        # receive no canal b das variáveis c
+
+
+ULTIMA_OPERACAO = len(OPERACOES_BINARIAS) - 1
+
+# Instruções do C3E sem efeito na execução (marcadores de estrutura)
+MARCADORES = frozenset((OpC3E.START_PROGRAM, OpC3E.END_PROGRAM, OpC3E.PARALLEL_START,
+                        OpC3E.PARALLEL_END, OpC3E.FUNC_BEGIN, OpC3E.FUNC_END))
+
+# Operações binárias do C3E -> índice em OPERACOES_BINARIAS
+OPERACOES_EXEC = {op: OPERADORES[simbolo] for op, simbolo in SIMBOLOS_C3E.items()}
+
+
+class ErroC3E(Exception):
+    """Instrução C3E que o executor não reconhece"""
+    pass
+
+
+class ProgramaC3E:
+    """C3E resolvido: código principal, funções e banco de registradores inicial"""
+    __slots__ = ('principal', 'funcoes', 'registradores', 'nomes', 'arrays', 'canais')
+
+    def __init__(self):
+        self.principal = []
+        self.funcoes = []           # (nome, código, registradores dos parâmetros)
+        self.registradores = []     # valores iniciais (constantes já carregadas)
+        self.nomes = []             # nome de cada registrador, para depuração
+        self.arrays = []            # (nome, dimensões, tipo)
+        self.canais = set()
+
+
+class ResolvedorC3E:
+    """Converte as instruções do C3E em tuplas com registradores e desvios resolvidos"""
+    def __init__(self):
+        self.programa = ProgramaC3E()
+        self._registradores = {}    # nome -> registrador
+        self._constantes = {}       # (tipo, valor) -> registrador
+        self._strings = {}          # rótulo de STRING_DEF -> texto
+        self._arrays = {}           # nome -> índice em programa.arrays
+        self._funcoes = {}          # nome -> índice em programa.funcoes
+        self._declaradas = set()
+
+    def resolver(self, codigo, function_code=None, array_sizes=None, var_types=None):
+        programa = self.programa
+        function_code = function_code or {}
+        # Variáveis declaradas começam com o valor inicial do tipo, como no interpretador
+        for nome, tipo in (var_types or {}).items():
+            if tipo in VALORES_INICIAIS:
+                self._declaradas.add(nome)
+                programa.registradores[self._registrador(nome)] = VALORES_INICIAIS[tipo]
+        for nome, info in (array_sizes or {}).items():
+            self._arrays[nome] = len(programa.arrays)
+            programa.arrays.append((nome, list(info['dimensions']), info['type']))
+
+        blocos = [codigo]
+        for nome, instrucoes in function_code.items():
+            self._funcoes[nome] = len(programa.funcoes)
+            programa.funcoes.append(None)
+            blocos.append(instrucoes)
+        # Strings podem ser usadas em qualquer bloco; o texto vira constante
+        for bloco in blocos:
+            for instr in bloco:
+                if instr.op == OpC3E.STRING_DEF:
+                    self._strings[instr.result] = instr.arg1
+                elif instr.op == OpC3E.PARALLEL_START:
+                    # O C3E não registra a intercalação dos blocos PAR nem a cópia
+                    # das variáveis de cada bloco, e o send/receive entre eles passa
+                    # os valores pelo buffer do canal (utils.ChannelManager)
+                    raise ErroC3E("Blocos PAR só são executados pelo interpretador")
+
+        programa.principal = self._bloco(blocos[0])[0]
+        for nome, indice in self._funcoes.items():
+            codigo_funcao, parametros = self._bloco(blocos[indice + 1])
+            programa.funcoes[indice] = (nome, codigo_funcao, parametros)
+        return programa
+
+    def _registrador(self, nome):
+        registrador = self._registradores.get(nome)
+        if registrador is None:
+            registrador = self._novo(nome, 0)
+            self._registradores[nome] = registrador
+        return registrador
+
+    def _novo(self, nome, valor):
+        self.programa.registradores.append(valor)
+        self.programa.nomes.append(nome)
+        return len(self.programa.registradores) - 1
+
+    def _constante(self, valor):
+        chave = (type(valor), valor)
+        registrador = self._constantes.get(chave)
+        if registrador is None:
+            registrador = self._novo(repr(valor), valor)
+            self._constantes[chave] = registrador
+        return registrador
+
+    def _operando(self, operando):
+        """Registrador de um operando: constante, rótulo de string, ou variável/temporário"""
+        if operando is None:
+            return self._constante(0)
+        if not isinstance(operando, str):
+            return self._constante(operando)
+        if operando in self._strings:
+            return self._constante(self._strings[operando])
+        return self._registrador(operando)
+
+    def _bloco(self, instrucoes):
+        """Resolve um bloco (programa ou função). Retorna (código, parâmetros)."""
+        codigo = []
+        parametros = []
+        rotulos = {}
+        envio = []
+        operando = self._operando
+        i = 0
+        while i < len(instrucoes):
+            op, arg1, arg2, result = instrucoes[i]
+            i += 1
+
+            if op in MARCADORES or op == OpC3E.STRING_DEF:
+                continue
+            elif op in OPERACOES_EXEC:
+                codigo.append((OPERACOES_EXEC[op], self._registrador(result), operando(arg1), operando(arg2)))
+            elif op == OpC3E.COPY:
+                codigo.append((OpExec.MOV, self._registrador(result), operando(arg1), 0))
+            elif op == OpC3E.ARRAY_ADDR:
+                indices = tuple(operando(indice) for indice in arg2)
+                codigo.append((OpExec.ARRAY_ADDR, self._registrador(result), self._arrays.get(arg1, -1), indices))
+            elif op == OpC3E.ARRAY_LOAD:
+                codigo.append((OpExec.ARRAY_LOAD, self._registrador(result), operando(arg1), 0))
+            elif op == OpC3E.ARRAY_STORE:
+                codigo.append((OpExec.ARRAY_STORE, operando(arg1), operando(arg2), 0))
+            elif op == OpC3E.PARAM:
+                parametros.append(self._registrador(arg1))
+            elif op == OpC3E.CHANNEL_DEF:
+                self.programa.canais.add(arg1)
+            elif op == OpC3E.LABEL:
+                rotulos[result] = len(codigo)
+            elif op == OpC3E.GOTO:
+                codigo.append((OpExec.GOTO, result, 0, 0))
+            elif op == OpC3E.IF_GOTO:
+                # "IF_GOTO c A; GOTO B; LABEL A" vira "IF_FALSE c B"
+                if (i + 1 < len(instrucoes) and instrucoes[i].op == OpC3E.GOTO
+                        and instrucoes[i + 1].op == OpC3E.LABEL and instrucoes[i + 1].result == result):
+                    codigo.append((OpExec.IF_FALSE, operando(arg1), instrucoes[i].result, 0))
+                    i += 1
+                else:
+                    codigo.append((OpExec.IF_GOTO, operando(arg1), result, 0))
+            elif op == OpC3E.WRITE:
+                codigo.append((OpExec.WRITE, operando(arg1), 0, 0))
+            elif op == OpC3E.WRITELN:
+                codigo.append((OpExec.WRITELN, 0, 0, 0))
+            elif op == OpC3E.READ:
+                declarada = 1 if result in self._declaradas else 0
+                codigo.append((OpExec.READ, self._registrador(result), declarada, 0))
+            elif op == OpC3E.RETURN:
+                codigo.append((OpExec.RETURN, operando(arg1), 0, 0))
+            elif op == OpC3E.PUSH_PARAM:
+                codigo.append((OpExec.PUSH_PARAM, operando(arg1), 0, 0))
+            elif op == OpC3E.CALL:
+                codigo.append((OpExec.CALL, self._registrador(result), self._funcoes.get(arg1, -1), arg2))
+            elif op == OpC3E.SEND_PARAM:
+                envio.append(arg1)
+                codigo.append((OpExec.SEND_PARAM, operando(arg1), 0, 0))
+            elif op == OpC3E.SEND:
+                # O quarto valor, se for uma variável, recebe o resultado da operação
+                enviados = envio[len(envio) - arg2:] if arg2 else []
+                del envio[:]
+                resultado = -1
+                if len(enviados) > 3 and isinstance(enviados[3], str) and enviados[3] in self._registradores:
+                    resultado = self._registradores[enviados[3]]
+                codigo.append((OpExec.SEND, 0, arg2, (arg1, resultado)))
+            elif op == OpC3E.RECEIVE:
+                # As variáveis recebidas vêm em seguida: "GET_RECV_PARAM t i" e "var = t"
+                nomes = []
+                while i + 1 < len(instrucoes) and instrucoes[i].op == OpC3E.GET_RECV_PARAM:
+                    copia = instrucoes[i + 1]
+                    if copia.op == OpC3E.COPY and copia.arg1 == instrucoes[i].result:
+                        nomes.append(copia.result)
+                    i += 2
+                codigo.append((OpExec.RECEIVE, 0, arg1, tuple(nomes)))
+            else:
+                raise ErroC3E(f"Instrução C3E não reconhecida: {instrucoes[i - 1]}")
+
+        # Resolve os rótulos; desvios para trás contam como iteração de laço
+        fim = len(codigo)
+        for pc, (op, a, b, c) in enumerate(codigo):
+            if op == OpExec.GOTO:
+                destino = rotulos.get(a, fim)
+                codigo[pc] = (OpExec.LOOP if destino <= pc else OpExec.GOTO, destino, 0, 0)
+            elif op == OpExec.IF_GOTO or op == OpExec.IF_FALSE:
+                codigo[pc] = (op, a, rotulos.get(b, fim), 0)
+        return codigo, parametros
+
+
+def carregar_c3e(codigo, function_code=None, array_sizes=None, var_types=None):
+    """Resolve o C3E (saída de C3EGenerator.generate e seus atributos
+    function_code, array_sizes e var_types) para execução"""
+    return ResolvedorC3E().resolver(codigo, function_code, array_sizes, var_types)
+
+
+class C3EExecutor:
+    """Executa um ProgramaC3E com a mesma saída de MiniParInterpreter.execute.
+
+    Programas com blocos PAR não chegam aqui: carregar_c3e os recusa.
+    """
+    def __init__(self, limite_iteracoes=None):
+        # Limite total de iterações de laços (None = sem limite)
+        self.limite_iteracoes = limite_iteracoes
+
+    def execute(self, programa, input_values=None):
+        self.programa = programa
+        self.registradores = list(programa.registradores)
+        self.arrays = [ArrayMiniPar(dims, tipo) if tipo in VALORES_INICIAIS or tipo == 'STRING' else None
+                       for _, dims, tipo in programa.arrays]
+        self.parametros = []
+        self.envio = []
+        self.saida = []
+        self.entrada = []
+        self.indice_entrada = 0
+        self._restantes = self.limite_iteracoes or -1
+        if input_values:
+            self.entrada = [str(v).strip() for v in input_values.split('\n') if v.strip()]
+
+        try:
+            self._rodar(programa.principal)
+        except _LimiteAtingido:
+            self.saida.append(f"Aviso: Execução interrompida após {self.limite_iteracoes} iterações")
+        return '\n'.join(str(linha) for linha in self.saida if linha)
+
+    def _rodar(self, codigo):
+        """Laço de despacho de um bloco; retorna o valor de RETURN (0 ao chegar ao fim)"""
+        r = self.registradores
+        arrays = self.arrays
+        operacoes = OPERACOES_BINARIAS
+        linha = []
+        fim = len(codigo)
+        pc = 0
+
+        ULTIMA = ULTIMA_OPERACAO
+        MOV = OpExec.MOV.value
+        GOTO = OpExec.GOTO.value
+        LOOP = OpExec.LOOP.value
+        IF_GOTO = OpExec.IF_GOTO.value
+        IF_FALSE = OpExec.IF_FALSE.value
+        ARRAY_ADDR = OpExec.ARRAY_ADDR.value
+        ARRAY_LOAD = OpExec.ARRAY_LOAD.value
+        ARRAY_STORE = OpExec.ARRAY_STORE.value
+        WRITE = OpExec.WRITE.value
+        WRITELN = OpExec.WRITELN.value
+        PUSH_PARAM = OpExec.PUSH_PARAM.value
+        CALL = OpExec.CALL.value
+        RETURN = OpExec.RETURN.value
+
+        while pc < fim:
+            op, a, b, c = codigo[pc]
+            pc += 1
+            if op <= ULTIMA:
+                r[a] = operacoes[op](r[b], r[c])
+            elif op == MOV:
+                r[a] = r[b]
+            elif op == IF_FALSE:
+                if not r[a]:
+                    pc = b
+            elif op == ARRAY_ADDR:
+                array = arrays[b] if b >= 0 else None
+                if array is None:
+                    r[a] = (None, 0)
+                elif len(c) == 1:
+                    r[a] = (array, r[c[0]])
+                elif len(c) == 2:
+                    r[a] = (array, r[c[0]] * array.passo + r[c[1]])
+                else:
+                    r[a] = (array, array.posicao([r[i] for i in c]))
+            elif op == ARRAY_LOAD:
+                array, pos = r[b]
+                if array is None:
+                    r[a] = 0
+                else:
+                    r[a] = array.dados[pos] if 0 <= pos < array.total else array.padrao
+            elif op == ARRAY_STORE:
+                array, pos = r[a]
+                if array is not None:
+                    if 0 <= pos < array.total:
+                        array.dados[pos] = r[b]
+                    else:
+                        array.escrever_posicao(pos, r[b])
+            elif op == LOOP:
+                pc = a
+                self._restantes -= 1
+                if self._restantes == 0:
+                    raise _LimiteAtingido()
+            elif op == GOTO:
+                pc = a
+            elif op == IF_GOTO:
+                if r[a]:
+                    pc = b
+            elif op == WRITE:
+                linha.append(formatar_valor(r[a]))
+            elif op == WRITELN:
+                self.saida.append(''.join(linha))
+                linha = []
+            elif op == PUSH_PARAM:
+                self.parametros.append(r[a])
+            elif op == CALL:
+                r[a] = self._chamar(b, c)
+            elif op == RETURN:
+                return r[a]
+            else:
+                self._instrucao_rara(op, a, b, c)
+
+        if linha:
+            self.saida.append(''.join(linha))
+        return 0
+
+    def _chamar(self, indice, n):
+        """Chamada de função: os argumentos vão para os parâmetros e todas as
+        variáveis são restauradas no retorno (mesma regra do interpretador)"""
+        parametros = self.parametros
+        argumentos = parametros[len(parametros) - n:] if n else []
+        del parametros[len(parametros) - n:]
+        if indice < 0:
+            return 0  # função não encontrada
+        _, codigo, registradores_parametros = self.programa.funcoes[indice]
+        r = self.registradores
+        salvos = r[:]
+        for registrador, valor in zip(registradores_parametros, argumentos):
+            r[registrador] = valor
+        try:
+            return self._rodar(codigo)
+        finally:
+            r[:] = salvos
+
+    def _instrucao_rara(self, op, a, b, c):
+        """Instruções executadas poucas vezes, fora do laço principal"""
+        r = self.registradores
+        if op == OpExec.READ:
+            if self.indice_entrada >= len(self.entrada):
+                texto = None
+            else:
+                texto = self.entrada[self.indice_entrada]
+                self.indice_entrada += 1
+            r[a] = converter_entrada(texto, r[a], b)
+        elif op == OpExec.SEND_PARAM:
+            self.envio.append(r[a])
+        elif op == OpExec.SEND:
+            valores = self.envio[len(self.envio) - b:] if b else []
+            del self.envio[len(self.envio) - b:]
+            canal, resultado = c
+            if canal not in self.programa.canais:
+                self.saida.append(f"Erro: Canal '{canal}' não encontrado")
+                return
+            valor = simular_envio(self.saida, valores)
+            if valor is not None and resultado >= 0:
+                r[resultado] = valor
+                self.saida.append(f"[COMPUTADOR_1] Resultado recebido: {valor}")
+        elif op == OpExec.RECEIVE:
+            if b not in self.programa.canais:
+                self.saida.append(f"Erro: Canal '{b}' não encontrado")
+                return
+            self.saida.append(f"[COMPUTADOR_2] Aguardando dados do canal '{b}'...")
+            if c:
+                self.saida.append(f"[COMPUTADOR_2] Dados recebidos: {', '.join(c)}")
+        else:
+            raise ErroC3E(f"Instrução inválida: {op}")
+
+
+class _LimiteAtingido(Exception):
+    pass
+
+
+def gerar_c3e(codigo_fonte, nivel_otimizacao=0):
+    """Analisa o código fonte e gera o C3E (o mesmo enviado ao gerador ARMv7).
+    nivel_otimizacao=1 aplica os passes do C3EOptimizer.
+    Retorna (gerador, erros); gerador é None se houver erros."""
+    ast, erros = analisar_programa(codigo_fonte)
+    if ast is None:
+        return None, erros
+    return gerar_c3e_ast(ast, nivel_otimizacao), ""
+
+
+def gerar_c3e_ast(ast, nivel_otimizacao=0):
+    """Gera o C3E de uma AST com os blocos já recuperados. Retorna o gerador."""
+    gerador = C3EGenerator()
+    gerador.generate(ast)
+    if nivel_otimizacao:
+        C3EOptimizer(nivel_otimizacao).otimizar_gerador(gerador)
+    return gerador
+
+
+def executar_c3e(codigo_fonte, input_values=None, nivel_otimizacao=0):
+    """Gera, resolve e executa o C3E de um programa MiniPar. Retorna (saida, erros)."""
+    ast, erros = analisar_programa(codigo_fonte)
+    if ast is None:
+        return "", erros
+    return executar_c3e_ast(ast, input_values, nivel_otimizacao)
+
+
+def carregar_c3e_ast(ast, nivel_otimizacao=0):
+    """Gera e resolve o C3E de uma AST com os blocos já recuperados.
+    Retorna (programa, erros); programa é None se o executor não o suporta."""
+    gerador = gerar_c3e_ast(ast, nivel_otimizacao)
+    return carregar_c3e_compilado(gerador.code, (gerador.function_code, gerador.array_sizes,
+                                                 gerador.var_types))
+
+
+def carregar_c3e_compilado(codigo, dados_c3e):
+    """Resolve o C3E produzido pelo compilador (saida_c3e e dados_c3e de
+    compiler.compilar_codigo_completo, já otimizados se houve -O1): o executor
+    roda o mesmo código enviado ao gerador ARMv7.
+    Retorna (programa, erros); programa é None se o executor não o suporta."""
+    try:
+        return carregar_c3e(codigo, *dados_c3e), ""
+    except ErroC3E as e:
+        return None, str(e)
+
+
+def executar_c3e_ast(ast, input_values=None, nivel_otimizacao=0):
+    """Como executar_c3e, a partir de uma AST com os blocos já recuperados
+    (ex.: a guardada no cache de compilação). Retorna (saida, erros)."""
+    programa, erros = carregar_c3e_ast(ast, nivel_otimizacao)
+    if programa is None:
+        return "", erros
+    return C3EExecutor().execute(programa, input_values), ""
@@ -2,9 +2,107 @@
 # -*- coding: utf-8 -*-
 """
 Gerador de Código de 3 Endereços (C3E)
+
+Cada instrução é uma quádrupla InstrucaoC3E(op, arg1, arg2, result) com o
+opcode em OpC3E. Operandos são nomes (variáveis, temporários, rótulos de
+strings) ou constantes numéricas; o texto só é montado para exibição (str).
 """
 
-class C3EGenerator:
+from collections import namedtuple
+from enum import IntEnum
+
+try:
+    from .visitante import NodeVisitor
+except ImportError:
+    from visitante import NodeVisitor
+
+
+class OpC3E(IntEnum):
+    """Opcodes do C3E (campos usados por cada um no comentário)"""
+    START_PROGRAM = 1
+    END_PROGRAM = 2
+    PARALLEL_START = 3
+    PARALLEL_END = 4
+    CHANNEL_DEF = 5     # arg1 = canal, arg2 = (computador_1, computador_2)
+    FUNC_BEGIN = 6      # arg1 = função
+    PARAM = 7           # arg1 = parâmetro
+    FUNC_END = 8        # arg1 = função
+    RETURN = 9          # arg1 = valor
+    COPY = 10           # result = arg1
+    ADD = 11            # result = arg1 + arg2 (idem para as demais operações)
+    SUB = 12
+    MUL = 13
+    DIV = 14
+    EQ = 15
+    NE = 16
+    LT = 17
+    GT = 18
+    LE = 19
+    GE = 20
+    ARRAY_ADDR = 21     # result = endereço de arg1[arg2...] (arg2 = tupla de índices)
+    ARRAY_LOAD = 22     # result = valor no endereço arg1
+    ARRAY_STORE = 23    # endereço arg1 = arg2
+    PUSH_PARAM = 24     # arg1 = argumento da próxima chamada
+    CALL = 25           # result = arg1(...) com arg2 argumentos
+    SEND_PARAM = 26     # arg1 = valor do próximo send
+    SEND = 27           # arg1 = canal, arg2 = quantidade de valores
+    RECEIVE = 28        # arg1 = canal, arg2 = quantidade de variáveis
+    GET_RECV_PARAM = 29 # result = valor recebido de índice arg1
+    READ = 30           # result = entrada
+    WRITE = 31          # arg1 = valor
+    WRITELN = 32        # fim da linha do escreva
+    IF_GOTO = 33        # se arg1: desvia para result
+    GOTO = 34           # desvia para result
+    LABEL = 35          # result = rótulo
+    STRING_DEF = 36     # result = rótulo, arg1 = texto
+
+
+# Operadores da AST <-> opcodes das operações binárias
+OPERACOES_C3E = {
+    '+': OpC3E.ADD, '-': OpC3E.SUB, '*': OpC3E.MUL, '/': OpC3E.DIV,
+    '==': OpC3E.EQ, '!=': OpC3E.NE, '<': OpC3E.LT, '>': OpC3E.GT,
+    '<=': OpC3E.LE, '>=': OpC3E.GE,
+}
+SIMBOLOS_C3E = {op: simbolo for simbolo, op in OPERACOES_C3E.items()}
+
+
+class InstrucaoC3E(namedtuple('InstrucaoC3E', 'op arg1 arg2 result', defaults=(None, None, None))):
+    """Instrução do C3E como quádrupla (op, arg1, arg2, result)"""
+    __slots__ = ()
+
+    def __str__(self):
+        op, arg1, arg2, result = self
+        if op in SIMBOLOS_C3E:
+            return f"{result} = {arg1} {SIMBOLOS_C3E[op]} {arg2}"
+        if op == OpC3E.COPY:
+            return f"{result} = {arg1}"
+        if op == OpC3E.ARRAY_ADDR:
+            return " ".join(map(str, (result, "=", "ARRAY_ADDR", arg1) + tuple(arg2)))
+        if op == OpC3E.ARRAY_LOAD:
+            return f"{result} = ARRAY_LOAD {arg1}"
+        if op == OpC3E.ARRAY_STORE:
+            return f"ARRAY_STORE {arg1} = {arg2}"
+        if op == OpC3E.CALL:
+            return f"{result} = CALL {arg1} {arg2}"
+        if op == OpC3E.CHANNEL_DEF:
+            return f"CHANNEL_DEF {arg1} {arg2[0]} {arg2[1]}"
+        if op in (OpC3E.SEND, OpC3E.RECEIVE):
+            return f"{op.name} {arg1} {arg2}"
+        if op == OpC3E.GET_RECV_PARAM:
+            return f"GET_RECV_PARAM {result} {arg1}"
+        if op in (OpC3E.READ, OpC3E.GOTO, OpC3E.LABEL):
+            return f"{op.name} {result}"
+        if op == OpC3E.IF_GOTO:
+            return f"IF_GOTO {arg1} {result}"
+        if op == OpC3E.STRING_DEF:
+            return f'STRING_DEF {result} "{arg1}"'
+        if op in (OpC3E.FUNC_BEGIN, OpC3E.PARAM, OpC3E.FUNC_END, OpC3E.RETURN,
+                  OpC3E.PUSH_PARAM, OpC3E.SEND_PARAM, OpC3E.WRITE):
+            return f"{op.name} {arg1}"
+        return op.name
+
+
+class C3EGenerator(NodeVisitor):
     def __init__(self):
         self.code = []
         self.temp_count = 0
@@ -13,6 +111,8 @@ class C3EGenerator:
         self.function_code = {}
         self.current_function = None
         self.array_sizes = {} 
+        self.var_types = {}
+        self.function_signatures = {}  # função -> {'params': [(nome, TIPO)], 'return_type': TIPO}
 
     def new_temp(self):
         self.temp_count += 1
@@ -22,12 +122,12 @@ class C3EGenerator:
         self.label_count += 1
         return f"L{self.label_count}"
         
-    def add_code(self, *args):
-        line = " ".join(map(str, args))
+    def add_code(self, op, arg1=None, arg2=None, result=None):
+        instrucao = InstrucaoC3E(op, arg1, arg2, result)
         if self.current_function:
-            self.function_code[self.current_function].append(line)
+            self.function_code[self.current_function].append(instrucao)
         else:
-            self.code.append(line)
+            self.code.append(instrucao)
 
     def generate(self, node):
         self.code = []
@@ -37,19 +137,11 @@ class C3EGenerator:
         self.function_code = {}
         self.current_function = None
         self.array_sizes = {}
+        self.var_types = {}
+        self.function_signatures = {}
         self.visit(node)
         return self.code
         
-    def visit(self, node):
-        if node is None:
-            return
-        
-        method_name = f'visit_{node[0]}'
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(node)
-        else:
-            return self.generic_visit(node)
-
     def generic_visit(self, node):
         for child in node[1:]:
             if isinstance(child, tuple):
@@ -60,27 +152,28 @@ class C3EGenerator:
                         self.visit(item)
                         
     def visit_programa_minipar(self, node):
-        self.add_code("START_PROGRAM")
+        self.add_code(OpC3E.START_PROGRAM)
         
         for no_filho in node[1]:
             self.visit(no_filho)
             
-        self.add_code("END_PROGRAM")
+        self.add_code(OpC3E.END_PROGRAM)
 
     def visit_bloco_seq(self, node):
         for cmd in node[1]:
             self.visit(cmd)
             
     def visit_bloco_par(self, node):
-        self.add_code("PARALLEL_START")
+        self.add_code(OpC3E.PARALLEL_START)
         for cmd in node[1]:
             self.visit(cmd)
-        self.add_code("PARALLEL_END")
+        self.add_code(OpC3E.PARALLEL_END)
 
     def visit_declaracao_var(self, node):
         var_name = node[1]
         var_type = node[2].upper()  # Normalizar para maiúsculas
         self.declared_vars.add(var_name)
+        self.var_types[var_name] = var_type
         return (node[0], var_name, var_type)
         
     def visit_declaracao_var_array(self, node):
@@ -106,7 +199,7 @@ class C3EGenerator:
     def visit_c_channel(self, node):
         channel_name = node[1]
         self.declared_vars.add(channel_name)
-        self.add_code("CHANNEL_DEF", channel_name, node[2], node[3])
+        self.add_code(OpC3E.CHANNEL_DEF, channel_name, (node[2], node[3]))
         
     def visit_declaracao_funcao(self, node):
         func_name = node[1]
@@ -114,21 +207,25 @@ class C3EGenerator:
         
         self.current_function = func_name
         self.function_code[func_name] = []
+        self.function_signatures[func_name] = {
+            'params': [(p[1], p[2].upper()) for p in params],
+            'return_type': node[3].upper(),
+        }
         
-        self.add_code(f"FUNC_BEGIN {func_name}")
+        self.add_code(OpC3E.FUNC_BEGIN, func_name)
         for p_name, p_type in [(p[1], p[2]) for p in params]:
-            self.add_code(f"PARAM {p_name}")
+            self.add_code(OpC3E.PARAM, p_name)
             self.declared_vars.add(p_name) 
             
         for stmt in node[4]:
             self.visit(stmt)
             
-        self.add_code(f"FUNC_END {func_name}")
+        self.add_code(OpC3E.FUNC_END, func_name)
         self.current_function = None
         
     def visit_return(self, node):
         expr_result = self.visit(node[1])
-        self.add_code("RETURN", expr_result)
+        self.add_code(OpC3E.RETURN, expr_result)
         
     def visit_atribuicao(self, node):
         var_name = node[1]
@@ -138,7 +235,7 @@ class C3EGenerator:
         if var_name not in self.declared_vars:
             self.declared_vars.add(var_name)
         
-        self.add_code(var_name, "=", expr_result)
+        self.add_code(OpC3E.COPY, expr_result, result=var_name)
         
     def visit_atribuicao_array(self, node):
         var_name = node[1]
@@ -153,10 +250,10 @@ class C3EGenerator:
         
         # Gerar código para calcular endereço do array
         temp_addr = self.new_temp()
-        self.add_code(temp_addr, "=", "ARRAY_ADDR", var_name, *index_results)
+        self.add_code(OpC3E.ARRAY_ADDR, var_name, tuple(index_results), temp_addr)
         
         # Atribuir valor ao array
-        self.add_code("ARRAY_STORE", temp_addr, "=", expr_result)
+        self.add_code(OpC3E.ARRAY_STORE, temp_addr, expr_result)
         
         return (node[0], var_name, index_results, expr_result)
         
@@ -173,8 +270,8 @@ class C3EGenerator:
         # Gerar código para calcular endereço e carregar valor
         temp_addr = self.new_temp()
         temp_value = self.new_temp()
-        self.add_code(temp_addr, "=", "ARRAY_ADDR", var_name, *index_results)
-        self.add_code(temp_value, "=", "ARRAY_LOAD", temp_addr)
+        self.add_code(OpC3E.ARRAY_ADDR, var_name, tuple(index_results), temp_addr)
+        self.add_code(OpC3E.ARRAY_LOAD, temp_addr, result=temp_value)
         
         return temp_value
 
@@ -185,27 +282,28 @@ class C3EGenerator:
             results.append(self.visit(expr))
         
         for r in results:
-            self.add_code("SEND_PARAM", r)
-        self.add_code("SEND", channel_name, len(results))
+            self.add_code(OpC3E.SEND_PARAM, r)
+        self.add_code(OpC3E.SEND, channel_name, len(results))
 
     def visit_receive(self, node):
         channel_name = node[1]
         var_list = node[2]
         
-        self.add_code("RECEIVE", channel_name, len(var_list))
+        self.add_code(OpC3E.RECEIVE, channel_name, len(var_list))
         for i, var_name in enumerate(var_list):
             temp_result = self.new_temp()
-            self.add_code("GET_RECV_PARAM", temp_result, i)
-            self.add_code(var_name, "=", temp_result)
+            self.add_code(OpC3E.GET_RECV_PARAM, i, result=temp_result)
+            self.add_code(OpC3E.COPY, temp_result, result=var_name)
             
     def visit_leia(self, node):
         var_name = node[1]
-        self.add_code("READ", var_name)
+        self.add_code(OpC3E.READ, result=var_name)
         
     def visit_escreva(self, node):
         expr_results = [self.visit(expr) for expr in node[1]]
         for result in expr_results:
-            self.add_code("WRITE", result)
+            self.add_code(OpC3E.WRITE, result)
+        self.add_code(OpC3E.WRITELN)  # fim da linha do escreva
             
     def visit_se(self, node):
         cond_expr = node[1]
@@ -218,23 +316,23 @@ class C3EGenerator:
         label_else = self.new_label()
         label_end = self.new_label()
         
-        self.add_code("IF_GOTO", cond_result, label_then)
+        self.add_code(OpC3E.IF_GOTO, cond_result, result=label_then)
         if bloco_else:
-            self.add_code("GOTO", label_else)
+            self.add_code(OpC3E.GOTO, result=label_else)
         else:
-            self.add_code("GOTO", label_end) 
+            self.add_code(OpC3E.GOTO, result=label_end) 
             
-        self.add_code("LABEL", label_then)
+        self.add_code(OpC3E.LABEL, result=label_then)
         for cmd in bloco_then:
             self.visit(cmd)
-        self.add_code("GOTO", label_end)
+        self.add_code(OpC3E.GOTO, result=label_end)
             
         if bloco_else:
-            self.add_code("LABEL", label_else)
+            self.add_code(OpC3E.LABEL, result=label_else)
             for cmd in bloco_else:
                 self.visit(cmd)
                 
-        self.add_code("LABEL", label_end)
+        self.add_code(OpC3E.LABEL, result=label_end)
 
     def visit_enquanto(self, node):
         cond_expr = node[1]
@@ -244,18 +342,18 @@ class C3EGenerator:
         label_body = self.new_label()
         label_end = self.new_label()
         
-        self.add_code("LABEL", label_start)
+        self.add_code(OpC3E.LABEL, result=label_start)
         cond_result = self.visit(cond_expr)
         
-        self.add_code("IF_GOTO", cond_result, label_body)
-        self.add_code("GOTO", label_end)
+        self.add_code(OpC3E.IF_GOTO, cond_result, result=label_body)
+        self.add_code(OpC3E.GOTO, result=label_end)
         
-        self.add_code("LABEL", label_body)
+        self.add_code(OpC3E.LABEL, result=label_body)
         for cmd in bloco_faca:
             self.visit(cmd)
             
-        self.add_code("GOTO", label_start)
-        self.add_code("LABEL", label_end)
+        self.add_code(OpC3E.GOTO, result=label_start)
+        self.add_code(OpC3E.LABEL, result=label_end)
         
     def visit_para(self, node):
         var_name = node[1]
@@ -269,23 +367,23 @@ class C3EGenerator:
         label_body = self.new_label()
         label_end = self.new_label()
 
-        self.add_code(var_name, "=", start_val)
-        self.add_code("LABEL", label_start)
+        self.add_code(OpC3E.COPY, start_val, result=var_name)
+        self.add_code(OpC3E.LABEL, result=label_start)
         
         temp_cond = self.new_temp()
-        self.add_code(temp_cond, "=", var_name, "<=", end_val)
+        self.add_code(OpC3E.LE, var_name, end_val, temp_cond)
         
-        self.add_code("IF_GOTO", temp_cond, label_body)
-        self.add_code("GOTO", label_end)
+        self.add_code(OpC3E.IF_GOTO, temp_cond, result=label_body)
+        self.add_code(OpC3E.GOTO, result=label_end)
         
-        self.add_code("LABEL", label_body)
+        self.add_code(OpC3E.LABEL, result=label_body)
         for cmd in bloco:
             self.visit(cmd)
             
-        self.add_code(var_name, "=", var_name, "+", 1)
-        self.add_code("GOTO", label_start) 
+        self.add_code(OpC3E.ADD, var_name, 1, var_name)
+        self.add_code(OpC3E.GOTO, result=label_start) 
         
-        self.add_code("LABEL", label_end)
+        self.add_code(OpC3E.LABEL, result=label_end)
         
     def visit_binop(self, node):
         op = node[1]
@@ -293,7 +391,7 @@ class C3EGenerator:
         right_result = self.visit(node[3])
         
         temp = self.new_temp()
-        self.add_code(temp, "=", left_result, op, right_result)
+        self.add_code(OPERACOES_C3E[op], left_result, right_result, temp)
         return temp
 
     def visit_unop(self, node):
@@ -302,7 +400,7 @@ class C3EGenerator:
         
         temp = self.new_temp()
         if op == '-':
-             self.add_code(temp, "=", 0, "-", expr_result)
+             self.add_code(OpC3E.SUB, 0, expr_result, temp)
         
         return temp
         
@@ -315,10 +413,10 @@ class C3EGenerator:
             arg_results.append(self.visit(arg))
             
         for arg_r in arg_results:
-            self.add_code("PUSH_PARAM", arg_r)
+            self.add_code(OpC3E.PUSH_PARAM, arg_r)
             
         temp_return = self.new_temp()
-        self.add_code(temp_return, "=", "CALL", func_name, len(args))
+        self.add_code(OpC3E.CALL, func_name, len(args), temp_return)
         return temp_return
 
     def visit_num_inteiro(self, node):
@@ -329,7 +427,7 @@ class C3EGenerator:
         
     def visit_string(self, node):
         label = self.new_label()
-        self.add_code("STRING_DEF", label, f'"{node[1]}"')
+        self.add_code(OpC3E.STRING_DEF, node[1], result=label)
         return label
         
     def visit_boolean(self, node):
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Otimizador do Código de 3 Endereços (C3E), nível -O1
+
+Passes locais sobre a lista de InstrucaoC3E, executados entre
+C3EGenerator.generate e ARMv7CodeGenerator.generate até não haver mudança.
+Cada passe pode ser desligado e registra a contagem de instruções antes/depois.
+"""
+
+import operator
+import re
+from collections import Counter, OrderedDict
+
+try:
+    from .c3e_generator import InstrucaoC3E, OpC3E, SIMBOLOS_C3E
+except ImportError:
+    from c3e_generator import InstrucaoC3E, OpC3E, SIMBOLOS_C3E
+
+
+# Operações que podem ser avaliadas em tempo de compilação. A divisão fica de
+# fora: é real no interpretador e inteira no ARMv7.
+DOBRAVEIS = {
+    OpC3E.ADD: operator.add, OpC3E.SUB: operator.sub, OpC3E.MUL: operator.mul,
+    OpC3E.EQ: operator.eq, OpC3E.NE: operator.ne, OpC3E.LT: operator.lt,
+    OpC3E.GT: operator.gt, OpC3E.LE: operator.le, OpC3E.GE: operator.ge,
+}
+
+BINARIAS = frozenset(SIMBOLOS_C3E)
+
+# Instruções cujo campo result é uma variável/temporário definido por elas
+DEFINEM = BINARIAS | {OpC3E.COPY, OpC3E.ARRAY_ADDR, OpC3E.ARRAY_LOAD, OpC3E.CALL,
+                      OpC3E.GET_RECV_PARAM, OpC3E.READ}
+
+# Instruções sem efeito além de definir result (removíveis se result não é usado)
+SEM_EFEITO = BINARIAS | {OpC3E.COPY, OpC3E.ARRAY_ADDR, OpC3E.ARRAY_LOAD}
+
+# Instruções que podem escrever direto na variável de uma cópia seguinte
+COALESCIVEIS = SEM_EFEITO | {OpC3E.CALL}
+
+# Instruções cujo arg1 / arg2 é um operando (valor lido)
+USAM_ARG1 = BINARIAS | {OpC3E.COPY, OpC3E.ARRAY_LOAD, OpC3E.ARRAY_STORE, OpC3E.IF_GOTO,
+                        OpC3E.WRITE, OpC3E.PUSH_PARAM, OpC3E.RETURN}
+USAM_ARG2 = BINARIAS | {OpC3E.ARRAY_STORE}
+
+# Instruções que encerram um bloco básico (as cópias conhecidas deixam de valer)
+FIM_BLOCO = frozenset((OpC3E.LABEL, OpC3E.GOTO, OpC3E.IF_GOTO, OpC3E.RETURN,
+                       OpC3E.START_PROGRAM, OpC3E.END_PROGRAM, OpC3E.FUNC_BEGIN, OpC3E.FUNC_END,
+                       OpC3E.PARALLEL_START, OpC3E.PARALLEL_END))
+
+# Após um desvio incondicional, estas instruções continuam necessárias
+# mesmo sem caminho de execução até elas
+ESTRUTURAIS = frozenset((OpC3E.LABEL, OpC3E.STRING_DEF, OpC3E.END_PROGRAM, OpC3E.FUNC_END,
+                         OpC3E.PARALLEL_START, OpC3E.PARALLEL_END, OpC3E.CHANNEL_DEF))
+
+TEMPORARIO = re.compile(r't\d+$')
+
+
+def _constante(valor):
+    return valor is not None and not isinstance(valor, str)
+
+
+def operandos(instr):
+    """Nomes e constantes lidos por uma instrução"""
+    op = instr.op
+    if op in USAM_ARG1:
+        yield instr.arg1
+    if op in USAM_ARG2:
+        yield instr.arg2
+    if op == OpC3E.ARRAY_ADDR:
+        yield from instr.arg2
+    elif op == OpC3E.SEND_PARAM:
+        yield instr.arg1
+
+
+def _substituir(instr, valores):
+    """Troca os operandos de instr pelos valores conhecidos em `valores`"""
+    op, arg1, arg2, result = instr
+    if op in USAM_ARG1 and isinstance(arg1, str):
+        arg1 = valores.get(arg1, arg1)
+    if op in USAM_ARG2 and isinstance(arg2, str):
+        arg2 = valores.get(arg2, arg2)
+    if op == OpC3E.ARRAY_ADDR:
+        arg2 = tuple(valores.get(i, i) if isinstance(i, str) else i for i in arg2)
+    if arg1 is instr.arg1 and arg2 is instr.arg2:
+        return instr
+    return InstrucaoC3E(op, arg1, arg2, result)
+
+
+# --- PASSES ---
+
+def dobrar_constantes(codigo, eh_temporario):
+    """Avalia operações com operandos constantes e desvios com condição constante"""
+    novo = []
+    for instr in codigo:
+        op = instr.op
+        if op in DOBRAVEIS and _constante(instr.arg1) and _constante(instr.arg2):
+            valor = DOBRAVEIS[op](instr.arg1, instr.arg2)
+            instr = InstrucaoC3E(OpC3E.COPY, valor, None, instr.result)
+        elif op == OpC3E.IF_GOTO and type(instr.arg1) in (int, bool) and instr.arg1 in (0, 1):
+            # Só 0/1: o ARMv7 desvia apenas quando a condição vale exatamente 1
+            if not instr.arg1:
+                continue
+            instr = InstrucaoC3E(OpC3E.GOTO, result=instr.result)
+        novo.append(instr)
+    return novo
+
+
+def propagar_copias(codigo, eh_temporario):
+    """Dentro de cada bloco básico, usa diretamente a origem de "x = y" nos usos
+    de x; e "t = a op b; x = t" (t lido só ali) vira "x = a op b"."""
+    novo = []
+    copias = {}
+    # "GET_RECV_PARAM t i; x = t" é lido pelo receive como um todo: t não é propagado
+    recebidos = {instr.result for instr in codigo if instr.op == OpC3E.GET_RECV_PARAM}
+    for instr in codigo:
+        op = instr.op
+        if op == OpC3E.LABEL or op == OpC3E.FUNC_BEGIN:
+            copias.clear()
+        if copias:
+            instr = _substituir(instr, copias)
+        if op in (OpC3E.CALL, OpC3E.SEND, OpC3E.RECEIVE):
+            copias.clear()  # podem alterar variáveis (ex.: resultado de send)
+        if op in DEFINEM:
+            nome = instr.result
+            copias.pop(nome, None)
+            for destino in [d for d, origem in copias.items() if origem == nome]:
+                del copias[destino]
+            if op == OpC3E.COPY:
+                if instr.arg1 == nome:
+                    continue  # "x = x"
+                if instr.arg1 not in recebidos:
+                    copias[nome] = instr.arg1
+        elif op == OpC3E.PARAM:
+            copias.pop(instr.arg1, None)
+        novo.append(instr)
+        if op in FIM_BLOCO:
+            copias.clear()
+
+    usos = Counter()
+    for instr in novo:
+        usos.update(nome for nome in operandos(instr) if isinstance(nome, str))
+    resultado = []
+    for instr in novo:
+        anterior = resultado[-1] if resultado else None
+        if (instr.op == OpC3E.COPY and anterior is not None and anterior.result == instr.arg1
+                and anterior.op in COALESCIVEIS and eh_temporario(instr.arg1) and usos[instr.arg1] == 1):
+            resultado[-1] = anterior._replace(result=instr.result)
+            continue
+        resultado.append(instr)
+    return resultado
+
+
+def _rotulos(codigo):
+    """Rótulo -> posição da instrução LABEL"""
+    return {instr.result: i for i, instr in enumerate(codigo) if instr.op == OpC3E.LABEL}
+
+
+def encadear_desvios(codigo, eh_temporario):
+    """Desvio para um rótulo seguido de "GOTO M" passa a desviar direto para M.
+
+    Um IF_GOTO (e o GOTO logo após ele, que o executor funde em IF_FALSE) só é
+    redirecionado para frente: desvios para trás continuam sendo GOTO, que é
+    onde os laços são contados (limite de iterações)."""
+    posicoes = _rotulos(codigo)
+
+    def destino_final(rotulo):
+        vistos = set()
+        while rotulo in posicoes and rotulo not in vistos:
+            vistos.add(rotulo)
+            i = posicoes[rotulo] + 1
+            while i < len(codigo) and codigo[i].op == OpC3E.LABEL:
+                i += 1
+            if i >= len(codigo) or codigo[i].op != OpC3E.GOTO:
+                break
+            rotulo = codigo[i].result
+        return rotulo
+
+    novo = []
+    for i, instr in enumerate(codigo):
+        if instr.op in (OpC3E.GOTO, OpC3E.IF_GOTO):
+            destino = destino_final(instr.result)
+            condicional = instr.op == OpC3E.IF_GOTO or (i > 0 and codigo[i - 1].op == OpC3E.IF_GOTO)
+            if destino != instr.result and (not condicional or posicoes.get(destino, i) > i):
+                instr = instr._replace(result=destino)
+        novo.append(instr)
+    return novo
+
+
+def remover_desvios_redundantes(codigo, eh_temporario):
+    """Remove desvios para o rótulo seguinte e rótulos que nenhum desvio usa"""
+    novo = []
+    for i, instr in enumerate(codigo):
+        if instr.op in (OpC3E.GOTO, OpC3E.IF_GOTO):
+            j = i + 1
+            while j < len(codigo) and codigo[j].op == OpC3E.LABEL:
+                if codigo[j].result == instr.result:
+                    break
+                j += 1
+            if j < len(codigo) and codigo[j].op == OpC3E.LABEL:
+                continue  # cai no próprio rótulo de destino
+        novo.append(instr)
+    usados = {instr.result for instr in novo if instr.op in (OpC3E.GOTO, OpC3E.IF_GOTO)}
+    return [instr for instr in novo if instr.op != OpC3E.LABEL or instr.result in usados]
+
+
+def remover_codigo_inalcancavel(codigo, eh_temporario):
+    """Remove instruções entre um GOTO/RETURN e o próximo rótulo"""
+    novo = []
+    alcancavel = True
+    for instr in codigo:
+        if instr.op == OpC3E.LABEL:
+            alcancavel = True
+        if alcancavel or instr.op in ESTRUTURAIS:
+            novo.append(instr)
+        if instr.op in (OpC3E.GOTO, OpC3E.RETURN):
+            alcancavel = False
+    return novo
+
+
+def eliminar_temporarios_mortos(codigo, eh_temporario):
+    """Remove instruções sem efeito que definem temporários nunca lidos"""
+    usos = Counter()
+    for instr in codigo:
+        usos.update(nome for nome in operandos(instr) if isinstance(nome, str))
+    removidas = set()
+    mudou = True
+    while mudou:
+        mudou = False
+        for i, instr in enumerate(codigo):
+            if (i not in removidas and instr.op in SEM_EFEITO
+                    and eh_temporario(instr.result) and not usos[instr.result]):
+                removidas.add(i)
+                usos.subtract(nome for nome in operandos(instr) if isinstance(nome, str))
+                mudou = True
+    return [instr for i, instr in enumerate(codigo) if i not in removidas]
+
+
+# Passes do -O1, na ordem de execução
+PASSES = OrderedDict((
+    ('dobrar_constantes', dobrar_constantes),
+    ('propagar_copias', propagar_copias),
+    ('encadear_desvios', encadear_desvios),
+    ('remover_desvios_redundantes', remover_desvios_redundantes),
+    ('remover_codigo_inalcancavel', remover_codigo_inalcancavel),
+    ('eliminar_temporarios_mortos', eliminar_temporarios_mortos),
+))
+
+NIVEIS = {0: (), 1: tuple(PASSES)}
+
+
+class C3EOptimizer:
+    """Gerenciador de passes do C3E.
+
+    nivel: 0 (nenhum passe) ou 1; desabilitar: nomes de passes a não executar.
+    relatorio guarda, por passe, as instruções antes da primeira rodada e o que
+    sobraria descontando tudo o que ele removeu nas rodadas (somado sobre as
+    funções); total guarda o programa inteiro.
+    """
+    def __init__(self, nivel=1, desabilitar=(), max_rodadas=10):
+        desconhecidos = set(desabilitar) - set(PASSES)
+        if desconhecidos:
+            raise ValueError(f"Passe(s) desconhecido(s): {', '.join(sorted(desconhecidos))}")
+        self.passes = [nome for nome in NIVEIS[nivel] if nome not in desabilitar]
+        self.max_rodadas = max_rodadas
+        self.relatorio = OrderedDict((nome, {'antes': 0, 'depois': 0}) for nome in self.passes)
+        self.total = {'antes': 0, 'depois': 0}
+
+    def otimizar(self, codigo, variaveis=()):
+        """Otimiza uma lista de instruções. Nomes em `variaveis` nunca são
+        tratados como temporários, mesmo que tenham a forma tN."""
+        def eh_temporario(nome):
+            return isinstance(nome, str) and TEMPORARIO.match(nome) is not None and nome not in variaveis
+
+        self.total['antes'] += len(codigo)
+        for rodada in range(self.max_rodadas):
+            anterior = codigo
+            for nome in self.passes:
+                antes = len(codigo)
+                codigo = PASSES[nome](codigo, eh_temporario)
+                if rodada == 0:
+                    self.relatorio[nome]['antes'] += antes
+                    self.relatorio[nome]['depois'] += antes
+                self.relatorio[nome]['depois'] -= antes - len(codigo)
+            if codigo == anterior:
+                break
+        self.total['depois'] += len(codigo)
+        return codigo
+
+    def otimizar_gerador(self, gerador):
+        """Otimiza o programa e as funções de um C3EGenerator já executado;
+        function_code é atualizado e o código principal é retornado."""
+        variaveis = gerador.declared_vars
+        for nome, instrucoes in gerador.function_code.items():
+            gerador.function_code[nome] = self.otimizar(instrucoes, variaveis)
+        gerador.code = self.otimizar(gerador.code, variaveis)
+        return gerador.code
+
+    def formatar_relatorio(self):
+        linhas = [f"C3E: {self.total['antes']} -> {self.total['depois']} instruções"]
+        for nome, contagem in self.relatorio.items():
+            removidas = contagem['antes'] - contagem['depois']
+            linhas.append(f"  {nome}: {contagem['antes']} -> {contagem['depois']} (-{removidas})")
+        return "\n".join(linhas)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache de resultados de compilação endereçado por conteúdo
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+
+def estimar_tamanho(obj):
+    """Estima o tamanho em bytes de um resultado de compilação
+    (tuplas, listas, dicionários e valores simples), contando cada objeto uma vez."""
+    vistos = set()
+    pendentes = [obj]
+    total = 0
+    while pendentes:
+        atual = pendentes.pop()
+        if id(atual) in vistos:
+            continue
+        vistos.add(id(atual))
+        total += sys.getsizeof(atual)
+        if isinstance(atual, (tuple, list)):
+            pendentes.extend(atual)
+        elif isinstance(atual, dict):
+            pendentes.extend(atual.keys())
+            pendentes.extend(atual.values())
+    return total
+
+
+class CompilationCache:
+    """Cache LRU de compilações, com limite de memória configurável.
+
+    A chave é o SHA-256 do código fonte combinado com a versão do compilador,
+    de modo que uma mudança no compilador invalida as entradas antigas.
+    """
+    def __init__(self, limite_bytes=64 * 1024 * 1024, versao=''):
+        self.limite_bytes = limite_bytes
+        self.versao = versao
+        self._entradas = OrderedDict()  # chave -> (resultado, tamanho)
+        self._lock = threading.Lock()
+        self.bytes_usados = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def chave(self, codigo_fonte):
+        h = hashlib.sha256()
+        h.update(self.versao.encode('utf-8'))
+        h.update(b'\0')
+        h.update(codigo_fonte.encode('utf-8'))
+        return h.hexdigest()
+
+    def obter(self, codigo_fonte):
+        """Retorna o resultado armazenado para o código ou None"""
+        chave = self.chave(codigo_fonte)
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.hits += 1
+            return entrada[0]
+
+    def armazenar(self, codigo_fonte, resultado):
+        """Armazena um resultado, removendo os menos usados se o limite for excedido"""
+        chave = self.chave(codigo_fonte)
+        tamanho = estimar_tamanho(resultado)
+        if tamanho > self.limite_bytes:
+            return False
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior[1]
+            self._entradas[chave] = (resultado, tamanho)
+            self.bytes_usados += tamanho
+            while self.bytes_usados > self.limite_bytes:
+                _, (_, tamanho_removido) = self._entradas.popitem(last=False)
+                self.bytes_usados -= tamanho_removido
+                self.evictions += 1
+        return True
+
+    def obter_ou_compilar(self, codigo_fonte, compilar):
+        """Retorna o resultado do cache ou chama compilar(codigo_fonte) e armazena"""
+        resultado = self.obter(codigo_fonte)
+        if resultado is None:
+            resultado = compilar(codigo_fonte)
+            self.armazenar(codigo_fonte, resultado)
+        return resultado
+
+    def limpar(self):
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_usados = 0
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entradas': len(self._entradas),
+                'bytes_usados': self.bytes_usados,
+                'limite_bytes': self.limite_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'taxa_acerto': (self.hits / total) if total else 0.0,
+                'versao': self.versao,
+            }
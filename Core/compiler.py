@@ -4,6 +4,7 @@
 Funções principais de compilação
 """
 
+import hashlib
 import os
 import subprocess
 import platform
@@ -11,19 +12,64 @@ import platform
 try:
     from .lexer import MiniParLexer
     from .parser import MiniParParser
+    from .layout import recuperar_blocos, registrar_marcadores, ErroLayout
     from .semantic import SemanticAnalyzer
     from .c3e_generator import C3EGenerator
-    from .armv7_generator import ARMv7CodeGenerator
-    from .utils import formatar_ast
+    from .c3e_optimizer import C3EOptimizer
+    from .armv7_generator import ARMv7CodeGenerator, ALVO_PADRAO, recursos_do_alvo
+    from .utils import formatar_ast, formatar_tokens
 except ImportError:
     from lexer import MiniParLexer
     from parser import MiniParParser
+    from layout import recuperar_blocos, registrar_marcadores, ErroLayout
     from semantic import SemanticAnalyzer
     from c3e_generator import C3EGenerator
-    from armv7_generator import ARMv7CodeGenerator
-    from utils import formatar_ast
+    from c3e_optimizer import C3EOptimizer
+    from armv7_generator import ARMv7CodeGenerator, ALVO_PADRAO, recursos_do_alvo
+    from utils import formatar_ast, formatar_tokens
 
-def compilar_codigo(codigo_fonte):
+# Módulos que determinam o resultado de uma compilação (compilar_codigo e o
+# que ele importa, direta ou indiretamente)
+MODULOS_COMPILADOR = (
+    'lexer.py', 'parser.py', 'normalizacao.py', 'layout.py', 'visitante.py',
+    'semantic.py', 'c3e_generator.py', 'c3e_optimizer.py', 'register_allocator.py',
+    'armv7_generator.py', 'utils.py', 'compiler.py',
+)
+
+
+def versao_compilador():
+    """SHA-256 do código dos módulos do compilador (a gramática está em parser.py)"""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for nome in MODULOS_COMPILADOR:
+        with open(os.path.join(diretorio, nome), 'rb') as f:
+            h.update(nome.encode('utf-8'))
+            h.update(b'\0')
+            h.update(f.read())
+    return f"1.0+{h.hexdigest()[:12]}"
+
+
+# Versão do compilador: faz parte da chave do cache de compilação, para que
+# mudanças em qualquer etapa do compilador invalidem resultados antigos
+VERSAO_COMPILADOR = versao_compilador()
+
+
+def compilar_codigo(codigo_fonte, listar_tokens=False, otimizador=None, alvo=ALVO_PADRAO):
+    """Compila o código fonte e retorna (saida_lexer, saida_ast, saida_c3e, saida_asm, erros).
+    saida_lexer (listagem legível dos tokens) só é preenchida com listar_tokens=True.
+    Com um C3EOptimizer, o C3E é otimizado antes da geração do ARMv7 (o relatório
+    fica no próprio otimizador). alvo seleciona as extensões ARM usadas, ex.
+    "armv7ve+vfpv3" (sdiv e ponto flutuante VFP)."""
+    return compilar_codigo_completo(codigo_fonte, listar_tokens, otimizador, alvo)[1:6]
+
+def compilar_codigo_completo(codigo_fonte, listar_tokens=False, otimizador=None, alvo=ALVO_PADRAO):
+    """Como compilar_codigo, mas retorna também a AST compilada (com os blocos
+    recuperados) e o restante do C3E gerado:
+    (ast, saida_lexer, saida_ast, saida_c3e, saida_asm, erros, dados_c3e).
+    ast é None se o programa não passar da análise sintática; dados_c3e é
+    (function_code, array_sizes, var_types) do C3EGenerator, com as funções
+    já otimizadas como saida_c3e (ver c3e_executor.carregar_c3e_compilado),
+    ou None se o C3E não foi gerado."""
     lexer = MiniParLexer()
     parser = MiniParParser()
     semantic_analyzer = SemanticAnalyzer()
@@ -31,77 +77,82 @@ def compilar_codigo(codigo_fonte):
     
     erros = ""
     saida_lexer = []
+    erros_lexicos = []
+    ast_blocos = None
+
+    try:
+        recursos_do_alvo(alvo)
+    except ValueError as e:
+        return None, saida_lexer, "", [], [], f"Erro de Alvo: {e}", None
     
     try:
-        tokens = list(lexer.tokenize(codigo_fonte))
-        tokens_validos = []
-        for tok in tokens:
-            saida_lexer.append(f"Tipo: {tok.type}, Valor: '{tok.value}', Linha: {tok.lineno}")
-            if tok.type == 'ERROR':
-                erros += f"Erro Léxico: Caractere inesperado '{tok.value}' na linha {tok.lineno}\n"
-            else:
-                tokens_validos.append(tok)
-        
-        if erros: 
-            return saida_lexer, "", [], [], erros
+        # A listagem legível dos tokens só é gerada quando solicitada
+        if listar_tokens:
+            saida_lexer = formatar_tokens(lexer.tokenize(codigo_fonte))
+
+        # Os tokens vão direto do lexer para o parser, sem materializar a lista;
+        # erros léxicos são acumulados à parte durante a análise, e os tokens
+        # que fecham blocos são guardados para recuperar_blocos
+        marcadores = []
+        tokens_validos = registrar_marcadores(lexer.tokens_validos(codigo_fonte, erros_lexicos), marcadores)
+
+        # Uma única passada: o parser se recupera dos erros de sintaxe e
+        # devolve uma AST parcial junto com todos os diagnósticos
+        ast = parser.parse(tokens_validos)
+
+        if erros_lexicos:
+            erros += "".join(f"{erro}\n" for erro in erros_lexicos)
+            return None, saida_lexer, "", [], [], erros, None
 
-        # Tentar parsing múltiplas vezes para garantir que tudo seja parseado
-        # Isso ajuda com conflitos shift/reduce que podem fazer o parser parar cedo
-        ast = None
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            try:
-                parser.syntax_errors = []  # Limpar erros anteriores
-                ast = parser.parse(iter(tokens_validos))
-                # Verificar se parseou tudo - se não há erros críticos, aceitar
-                if ast and len(parser.syntax_errors) == 0:
-                    break
-                # Se há erros mas AST foi gerada parcialmente, verificar se é suficiente
-                if ast and attempt < max_attempts - 1:
-                    # Tentar novamente com tokens validos
-                    tokens_validos = [t for t in tokens if t.type != 'ERROR']
-            except Exception:
-                if attempt < max_attempts - 1:
-                    tokens_validos = [t for t in tokens if t.type != 'ERROR']
-                    continue
-                break
-        
         if parser.syntax_errors:
-            # Apenas reportar erros se não tivermos uma AST válida
+            erros += "\n".join(parser.syntax_errors)
             if not ast:
-                erros += "\n".join(parser.syntax_errors)
-                return saida_lexer, "Erro na Análise Sintática.", [], [], erros
-        
+                return None, saida_lexer, "Erro na Análise Sintática.", [], [], erros, None
+            saida_ast = formatar_ast(ast)
+            return None, saida_lexer, saida_ast, [], [], erros, None
+
         if not ast:
             erros += "Erro de Sintaxe: Falha desconhecida. Verifique a estrutura geral."
-            return saida_lexer, "Erro na Análise Sintática.", [], [], erros
-        
-        saida_ast = formatar_ast(ast)
+            return None, saida_lexer, "Erro na Análise Sintática.", [], [], erros, None
+
+        # Blocos pela indentação: a mesma AST que os executores usam
+        try:
+            ast_blocos = recuperar_blocos(ast, parser, codigo_fonte, marcadores)
+        except ErroLayout as e:
+            erros += str(e)
+            return None, saida_lexer, formatar_ast(ast), [], [], erros, None
+
+        saida_ast = formatar_ast(ast_blocos)
         
-        semantic_analyzer.visit(ast)
+        semantic_analyzer.visit(ast_blocos)
         if semantic_analyzer.errors:
             erros += "\n".join(semantic_analyzer.errors)
-            return saida_lexer, saida_ast, [], [], erros
+            return ast_blocos, saida_lexer, saida_ast, [], [], erros, None
 
-        saida_c3e = c3e_generator.generate(ast)
+        saida_c3e = c3e_generator.generate(ast_blocos)
+        if otimizador is not None:
+            saida_c3e = otimizador.otimizar_gerador(c3e_generator)
         
         all_vars = (c3e_generator.declared_vars | 
                    set(semantic_analyzer.symbol_table.keys()) |
                    set(semantic_analyzer.channel_table.keys()))
         
-        asm_generator = ARMv7CodeGenerator(all_vars, c3e_generator.function_code, c3e_generator.array_sizes)
+        asm_generator = ARMv7CodeGenerator(all_vars, c3e_generator.function_code, c3e_generator.array_sizes,
+                                           alvo=alvo, var_types=c3e_generator.var_types,
+                                           function_signatures=c3e_generator.function_signatures)
         saida_asm = asm_generator.generate(saida_c3e)
+        dados_c3e = (c3e_generator.function_code, c3e_generator.array_sizes, c3e_generator.var_types)
         
-        return saida_lexer, saida_ast, saida_c3e, saida_asm, erros
+        return ast_blocos, saida_lexer, saida_ast, saida_c3e, saida_asm, erros, dados_c3e
 
     except Exception as e:
         erros += f"Erro inesperado no compilador: {str(e)}\n"
         import traceback
         erros += traceback.format_exc()
-        return saida_lexer, (saida_ast if 'saida_ast' in locals() else ""), \
+        return ast_blocos, saida_lexer, (saida_ast if 'saida_ast' in locals() else ""), \
                (saida_c3e if 'saida_c3e' in locals() else []), \
                (saida_asm if 'saida_asm' in locals() else []), \
-               erros
+               erros, None
 
 # --- FUNÇÕES PARA GERAR EXECUTÁVEIS ---
 def salvar_assembly(codigo_asm, nome_arquivo="output.s"):
@@ -202,7 +253,8 @@ def compilar_executavel(arquivo_asm, nome_executavel=None, target_arch="arm"):
     except Exception as e:
         return False, f"Erro inesperado: {str(e)}"
 
-def compilar_programa_minipar(codigo_fonte, nome_arquivo_saida=None, gerar_asm=True, gerar_executavel=True):
+def compilar_programa_minipar(codigo_fonte, nome_arquivo_saida=None, gerar_asm=True, gerar_executavel=True,
+                              nivel_otimizacao=0, alvo=ALVO_PADRAO):
     """
     Compila um programa MiniPar e gera arquivos assembly e executável.
     
@@ -211,6 +263,8 @@ def compilar_programa_minipar(codigo_fonte, nome_arquivo_saida=None, gerar_asm=T
         nome_arquivo_saida: Nome base para os arquivos de saída (sem extensão)
         gerar_asm: Se True, salva arquivo .s
         gerar_executavel: Se True, tenta compilar executável
+        nivel_otimizacao: 0 (C3E sem otimização) ou 1 (-O1, ver c3e_optimizer)
+        alvo: arquitetura ARM e extensões (--target), ex. "armv7ve+vfpv3"
     
     Returns:
         Dicionário com resultados da compilação
@@ -219,7 +273,8 @@ def compilar_programa_minipar(codigo_fonte, nome_arquivo_saida=None, gerar_asm=T
         nome_arquivo_saida = "programa_compilado"
     
     # Compilar o código
-    tokens, ast, c3e, asm, erros = compilar_codigo(codigo_fonte)
+    otimizador = C3EOptimizer(nivel_otimizacao) if nivel_otimizacao else None
+    tokens, ast, c3e, asm, erros = compilar_codigo(codigo_fonte, otimizador=otimizador, alvo=alvo)
     
     resultado = {
         'sucesso': len(erros) == 0,
@@ -227,7 +282,8 @@ def compilar_programa_minipar(codigo_fonte, nome_arquivo_saida=None, gerar_asm=T
         'tokens': tokens,
         'ast': ast,
         'c3e': c3e,
-        'asm': asm
+        'asm': asm,
+        'otimizacao': otimizador.formatar_relatorio() if otimizador else None
     }
     
     if len(erros) > 0:
@@ -4,11 +4,235 @@
 Interpretador para execução dos programas MiniPar
 """
 
+import asyncio
+import os
+import queue
+import sys
 import threading
+from concurrent.futures import ProcessPoolExecutor
 
-class MiniParInterpreter:
-    def __init__(self):
-        self.variables = {}
+try:
+    from .ambiente import (CowEnvironment, CowArrayEnvironment, CowSlots, juntar_quadro,
+                           juntar_arrays)
+    from .utils import ChannelManager, CAPACIDADE_CANAL_PADRAO, TIMEOUT_CANAL_PADRAO
+    from .layout import analisar_programa
+    from .resolucao import resolver_variaveis
+    from .bytecode import VALORES_INICIAIS, converter_entrada
+    from .arrays import TypedArray, VALORES_PADRAO, normalizar_tipo
+    from .vetorizacao import LoopVectorizer, np
+    from .visitante import NodeVisitor
+except ImportError:
+    from ambiente import (CowEnvironment, CowArrayEnvironment, CowSlots, juntar_quadro,
+                          juntar_arrays)
+    from utils import ChannelManager, CAPACIDADE_CANAL_PADRAO, TIMEOUT_CANAL_PADRAO
+    from layout import analisar_programa
+    from resolucao import resolver_variaveis
+    from bytecode import VALORES_INICIAIS, converter_entrada
+    from arrays import TypedArray, VALORES_PADRAO, normalizar_tipo
+    from vetorizacao import LoopVectorizer, np
+    from visitante import NodeVisitor
+
+# Backends de execução dos blocos PAR: uma thread por bloco, um pool de
+# processos (paralelismo real, fora do GIL), uma corrotina por bloco num
+# laço asyncio ou em sequência na thread atual
+EXECUTORES_PAR = ('threads', 'processos', 'asyncio', 'inline')
+
+# Comandos que podem esperar por outro bloco no modo asyncio
+COMANDOS_ASSINCRONOS = frozenset(('send', 'receive', 'bloco_par', 'grupo_par'))
+EXECUTOR_PAR_PADRAO = 'threads'
+
+# Iterações de cada laço antes de interrompê-lo com um aviso (laço infinito)
+LIMITE_ITERACOES_PADRAO = 100000
+
+# Chamadas de função aninhadas antes de interromper a execução (recursão sem fim)
+LIMITE_RECURSAO_PADRAO = 1000
+
+# Quadros de Python usados por nível de chamada MiniPar (visit, executar_comandos,
+# evaluate_expression...): o limite de recursão do Python acompanha limite_recursao
+QUADROS_PYTHON_POR_CHAMADA = 16
+
+# Sinal devolvido pelos comandos quando um return encerra a função em andamento
+RETORNO = object()
+
+_pool_processos = None
+_pool_lock = threading.Lock()
+
+# Limite de recursão do Python pedido por cada execução em andamento (o limite
+# é global ao processo: fica no maior pedido e volta ao original no fim da última)
+_limites_python = []
+_limite_python_original = None
+_limite_lock = threading.Lock()
+
+
+def elevar_limite_python(necessario):
+    """Eleva o limite de recursão do Python para ao menos `necessario` enquanto
+    a execução que o pediu não chamar restaurar_limite_python"""
+    global _limite_python_original
+    with _limite_lock:
+        if not _limites_python:
+            _limite_python_original = sys.getrecursionlimit()
+        _limites_python.append(necessario)
+        if sys.getrecursionlimit() < necessario:
+            sys.setrecursionlimit(necessario)
+
+
+def restaurar_limite_python(necessario):
+    """Desfaz um elevar_limite_python: o limite volta ao maior pedido das
+    execuções ainda em andamento, ou ao original"""
+    with _limite_lock:
+        _limites_python.remove(necessario)
+        limite = max(_limites_python, default=0)
+        sys.setrecursionlimit(max(limite, _limite_python_original))
+
+
+def obter_pool_processos(blocos):
+    """Pool de processos compartilhado, com ao menos um processo por bloco PAR
+    (blocos que se comunicam precisam rodar ao mesmo tempo). É recriado só
+    quando um PAR tem mais blocos que o pool atual."""
+    global _pool_processos
+    with _pool_lock:
+        tamanho = max(os.cpu_count() or 1, blocos)
+        if _pool_processos is None or _pool_processos._max_workers < tamanho:
+            if _pool_processos is not None:
+                _pool_processos.shutdown(wait=False)
+            _pool_processos = ProcessPoolExecutor(max_workers=tamanho)
+        return _pool_processos
+
+
+def executar_bloco_par(estado, comandos, opcoes):
+    """Executa os comandos de um bloco PAR num interpretador novo, a partir do
+    estado (quadros de variáveis do bloco pai, camadas de arrays, funções e
+    canais sobre o pai, e a entrada) criado por MiniParInterpreter.estado_par. opcoes
+    são os argumentos do MiniParInterpreter do bloco (backend e canais).
+
+    Retorna (saida, cortes, variaveis, arrays): a saída com os fins de
+    iteração de laço (ver juntar_blocos_par) e só o que o bloco escreveu nas
+    variáveis e arrays (ver ambiente.py). É uma função de módulo para poder ser enviada aos processos
+    do pool junto com a AST do bloco."""
+    interpretador = _interpretador_do_bloco(estado, opcoes)
+    # No backend 'processos' o bloco roda fora da execução que elevou o limite
+    necessario = interpretador.limite_python()
+    elevar_limite_python(necessario)
+    try:
+        for cmd in comandos:
+            try:
+                interpretador.visit(cmd)
+            except Exception as e:
+                interpretador.output.append(f"Erro ao executar comando: {type(e).__name__}: {e}")
+                break
+    finally:
+        restaurar_limite_python(necessario)
+    return _resultado_do_bloco(interpretador)
+
+
+async def executar_bloco_async(estado, comandos, opcoes, memo_async):
+    """executar_bloco_par como corrotina (backend 'asyncio'): os comandos com
+    send/receive/PAR são aguardados e os demais rodam no visitante comum"""
+    interpretador = _interpretador_do_bloco(estado, opcoes)
+    interpretador._memo_async = memo_async
+    for cmd in comandos:
+        try:
+            if interpretador.precisa_async(cmd):
+                await interpretador.visit_async(cmd)
+            else:
+                interpretador.visit(cmd)
+        except Exception as e:
+            interpretador.output.append(f"Erro ao executar comando: {type(e).__name__}: {e}")
+            break
+    return _resultado_do_bloco(interpretador)
+
+
+def _interpretador_do_bloco(estado, opcoes):
+    interpretador = MiniParInterpreter(**opcoes)
+    interpretador.em_bloco_par = True
+    interpretador._cortes = []
+    (quadros, interpretador.array_variables, interpretador.functions,
+     interpretador.channels, interpretador.input_queue, interpretador.input_index) = estado
+    # O bloco lê os quadros do pai (que espera os blocos terminarem) e
+    # escreve só nas visões CowSlots, sem copiar as variáveis
+    interpretador.quadros = [None if quadro is None else CowSlots(quadro) for quadro in quadros]
+    return interpretador
+
+
+def _resultado_do_bloco(interpretador):
+    variaveis = [{} if quadro is None else quadro.alteracoes() for quadro in interpretador.quadros]
+    return (interpretador.output, interpretador._cortes, variaveis,
+            interpretador.array_variables.alteracoes())
+
+
+def _varrer_comandos(node, chamadas):
+    """Contém send, receive ou PAR diretamente? Junta em chamadas os nomes
+    das funções chamadas em qualquer nível"""
+    encontrado = False
+    if isinstance(node, tuple):
+        if not node:
+            return False
+        if node[0] in COMANDOS_ASSINCRONOS:
+            encontrado = True
+        elif node[0] == 'chamada_funcao':
+            chamadas.add(node[1])
+        filhos = node[1:]
+    else:
+        filhos = node
+    for filho in filhos:
+        if isinstance(filho, (tuple, list)) and _varrer_comandos(filho, chamadas):
+            encontrado = True
+    return encontrado
+
+
+def _trechos(saida, cortes):
+    """Trechos da saída de um bloco PAR entre fins de iteração de laço,
+    incluindo os vazios (iterações que não escreveram nada)"""
+    inicio = 0
+    for posicao, repeticoes in cortes:
+        yield saida[inicio:posicao]
+        for _ in range(repeticoes - 1):
+            yield []
+        inicio = posicao
+    yield saida[inicio:]
+
+
+class Frame:
+    """Chamada de função em andamento: nome da função, slots das variáveis
+    locais (ver resolucao.FrameLayout) e o valor do return"""
+    __slots__ = ('funcao', 'variaveis', 'retorno')
+
+    def __init__(self, funcao, variaveis):
+        self.funcao = funcao
+        self.variaveis = variaveis
+        self.retorno = None
+
+
+class MiniParInterpreter(NodeVisitor):
+    def __init__(self, executor_par=EXECUTOR_PAR_PADRAO, capacidade_canais=CAPACIDADE_CANAL_PADRAO,
+                 timeout_canais=TIMEOUT_CANAL_PADRAO, transporte=None,
+                 limite_iteracoes=LIMITE_ITERACOES_PADRAO, limite_recursao=LIMITE_RECURSAO_PADRAO,
+                 verificar_limites=False, vetorizar=True):
+        if executor_par not in EXECUTORES_PAR:
+            raise ValueError(f"Executor PAR desconhecido: '{executor_par}' "
+                             f"(use {', '.join(EXECUTORES_PAR)})")
+        self.executor_par = executor_par
+        self.capacidade_canais = capacidade_canais  # mensagens no buffer de cada canal
+        self.timeout_canais = timeout_canais  # espera máxima de send/receive (segundos)
+        self.limite_iteracoes = limite_iteracoes  # iterações de cada laço (None = sem limite)
+        self.limite_recursao = limite_recursao  # chamadas de função aninhadas
+        # Índices de array conferidos com cada dimensão (IndexError fora delas)
+        self.verificar_limites = verificar_limites
+        # Laços simples sobre arrays executados com NumPy (vetorizacao.py); o
+        # perfil fica em self.vetorizador.perfil
+        self.vetorizar = vetorizar and np is not None
+        self.vetorizador = LoopVectorizer(self) if self.vetorizar else None
+        self.em_bloco_par = False  # send/receive só movem dados entre blocos PAR
+        # SocketTransport (transporte.py) quando este programa é um dos computadores
+        # e o outro lado do canal roda em outro processo
+        self.transporte = transporte
+        self._laco = None  # laço de eventos do backend 'asyncio'
+        self._memo_async = {}  # id(nó) -> (nó, contém send/receive/PAR ou chama função que contém)
+        # Variáveis simples por slot (resolucao.py): [globais, quadro da função em
+        # andamento ou None]; nomes_globais dá o nome de cada slot global
+        self.quadros = [[], None]
+        self.nomes_globais = []
+        self.pilha_chamadas = []  # Frame de cada chamada de função em andamento
         self.array_variables = {}
         self.functions = {}  # Armazenar funções definidas
         self.channels = {}  # Armazenar canais de comunicação
@@ -17,7 +241,12 @@ class MiniParInterpreter:
         self.input_index = 0
         self.current_computer = None  # Para rastrear qual computador está executando
         self.server_queue = {}  # Fila de mensagens para simular comunicação
-        self._escrevas_executados_global = set()  # Rastrear globalmente para evitar execuções múltiplas
+        self._cortes = None  # fins de iteração de laço na saída (só em bloco PAR)
+        
+    @property
+    def variables(self):
+        """Variáveis globais por nome (cópia, para inspeção)"""
+        return dict(zip(self.nomes_globais, self.quadros[0]))
         
     def set_input(self, input_values):
         """Define os valores de entrada do programa"""
@@ -31,43 +260,40 @@ class MiniParInterpreter:
         return '\n'.join(str(line) for line in self.output if line)
     
     def execute(self, ast, input_values=None):
-        """Executa a AST do programa"""
-        self.variables = {}
+        """Executa a AST do programa, com os blocos já recuperados pela
+        indentação (layout.recuperar_blocos; ver analisar_programa). As
+        variáveis são resolvidas em slots antes (resolucao.py)."""
         self.array_variables = {}
         self.functions = {}  # Inicializar funções
+        self.channels = {}
         self.output = []
-        self._escrevas_executados_se = set()  # Rastrear escreva executados para evitar duplicação
-        self._escrevas_executados_global = set()  # Rastrear globalmente para evitar execuções múltiplas
+        self.pilha_chamadas = []
+        if self.vetorizador is not None:
+            self.vetorizador.reiniciar_perfil()
         
         if input_values:
             self.set_input(input_values)
         
-        if ast and ast[0] == 'programa_minipar':
-            # Primeiro, processar declarações de funções
-            for cmd in ast[1]:
-                if isinstance(cmd, tuple) and cmd[0] == 'declaracao_funcao':
-                    self.visit_declaracao_funcao(cmd)
-            
-            # Chamar visit_programa_minipar para executar o programa
-            # Isso permite que o teste2.mp seja tratado especialmente
-            self.visit_programa_minipar(ast)
+        # O limite do Python é elevado só durante a execução e restaurado no fim
+        necessario = self.limite_python()
+        elevar_limite_python(necessario)
+        try:
+            if ast and ast[0] == 'programa_minipar':
+                ast, self.nomes_globais = resolver_variaveis(ast)
+                self.quadros = [[0] * len(self.nomes_globais), None]
+                self.visit_programa_minipar(ast)
+        finally:
+            restaurar_limite_python(necessario)
+            if self._laco is not None:
+                self._laco.close()
+                self._laco = None
         
         return self.get_output()
     
-    def visit(self, node):
-        """Visita um nó da AST"""
-        if node is None:
-            return None
-        
-        if not isinstance(node, tuple):
-            return node
-        
-        
-        method_name = f'visit_{node[0]}'
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(node)
-        else:
-            return self.generic_visit(node)
+    def limite_python(self):
+        """Limite de recursão do Python que cabe limite_recursao chamadas
+        MiniPar aninhadas"""
+        return self.limite_recursao * QUADROS_PYTHON_POR_CHAMADA + 1000
     
     def generic_visit(self, node):
         """Visita genérica para nós não tratados"""
@@ -81,488 +307,126 @@ class MiniParInterpreter:
         return None
     
     def visit_programa_minipar(self, node):
-        """Executa o programa principal"""
-        # Primeiro, processar declarações de canais
-        for cmd in node[1]:
-            if isinstance(cmd, tuple) and cmd[0] == 'c_channel':
-                self.visit_c_channel(cmd)
-        
-        # Verificar se é o teste2.mp e implementar execução paralela específica
-        if self.is_teste2_structure(node):
-            self.execute_teste2_parallel(node)
-        else:
-            # Executar normalmente para outros programas
-            # Primeiro, processar todas as declarações de arrays
-            for cmd in node[1]:
-                if isinstance(cmd, tuple) and cmd[0] == 'declaracao_var_array':
-                    self.visit_declaracao_var_array(cmd)
-                elif isinstance(cmd, tuple) and cmd[0] == 'bloco_seq':
-                    # Se for um bloco SEQ, processar os arrays dentro dele primeiro
-                    self.process_arrays_in_bloco_seq(cmd)
-            
-            # Depois, executar o resto
-            for cmd in node[1]:
-                if not (isinstance(cmd, tuple) and cmd[0] in ['c_channel', 'declaracao_var_array']):
-                    # Se for bloco_seq, já processamos arrays, agora executar o bloco completo
-                    if isinstance(cmd, tuple) and cmd[0] == 'bloco_seq':
-                        # CORREÇÃO PARA TESTE4: Garantir que todos os comandos do bloco_seq sejam executados
-                        # Mesmo que o parser não tenha parseado tudo, executar o que foi parseado
-                        self.visit_bloco_seq(cmd)
-                    else:
-                        self.visit(cmd)
+        """Executa o programa principal. Funções e canais são registrados antes
+        (podem ser usados antes da declaração); os comandos rodam em ordem."""
+        self.registrar_declaracoes(node[1])
+        self.executar_comandos(node[1])
     
-    def process_arrays_in_bloco_seq(self, node):
-        """Processa arrays dentro de um bloco SEQ"""
-        if isinstance(node, tuple) and len(node) > 1:
-            comandos = node[1]
-            for cmd in comandos:
-                if isinstance(cmd, tuple) and cmd[0] == 'declaracao_var_array':
-                    self.visit_declaracao_var_array(cmd)
+    def registrar_declaracoes(self, comandos):
+        """Registra as funções e canais declarados em qualquer nível dos comandos"""
+        for cmd in comandos:
+            if not isinstance(cmd, tuple) or not cmd:
+                continue
+            tipo = cmd[0]
+            if tipo == 'declaracao_funcao':
+                self.visit_declaracao_funcao(cmd)
+                self.registrar_declaracoes(cmd[4])
+            elif tipo == 'c_channel':
+                self.visit_c_channel(cmd)
+            elif tipo == 'se':
+                self.registrar_declaracoes(cmd[2] or [])
+                self.registrar_declaracoes(cmd[3] or [])
+            elif tipo == 'enquanto':
+                self.registrar_declaracoes(cmd[2] or [])
+            elif tipo == 'para':
+                self.registrar_declaracoes(cmd[3] or [])
+            elif tipo in ('bloco_seq', 'bloco_par'):
+                self.registrar_declaracoes(cmd[1] or [])
+            elif tipo == 'grupo_par':
+                for bloco in cmd[1]:
+                    self.registrar_declaracoes(bloco)
     
-    def is_teste2_structure(self, node):
-        """Verifica se é a estrutura do teste2.mp"""
-        if len(node[1]) == 1 and isinstance(node[1][0], tuple) and node[1][0][0] == 'bloco_par':
-            bloco_par = node[1][0]
-            comandos = bloco_par[1] if len(bloco_par) > 1 else []
-            
-            # Verificar se há um bloco_par aninhado (fibonacci)
-            # Pode estar diretamente nos comandos ou dentro de um enquanto
+    def executar_comandos(self, comandos, capturar_erros=False):
+        """Executa uma lista de comandos em ordem (blocos PAR consecutivos já
+        vêm juntos num nó grupo_par, ver resolucao.py). Com capturar_erros=True
+        um erro num comando vai para a saída e a execução segue no próximo
+        comando. Retorna RETORNO se um return encerrou a função em andamento."""
+        if not capturar_erros:
             for cmd in comandos:
-                if isinstance(cmd, tuple):
-                    if cmd[0] == 'bloco_par':
-                        return True
-                    elif cmd[0] == 'enquanto' and len(cmd) > 2:
-                        # Verificar dentro do bloco do enquanto
-                        bloco_enquanto = cmd[2]
-                        for sub_cmd in bloco_enquanto:
-                            if isinstance(sub_cmd, tuple) and sub_cmd[0] == 'bloco_par':
-                                return True
-        return False
+                if self.visit(cmd) is RETORNO:
+                    return RETORNO
+            return None
+        for cmd in comandos:
+            try:
+                if self.visit(cmd) is RETORNO:
+                    return RETORNO
+            except Exception as e:
+                self.output.append(f"Erro ao executar comando: {type(e).__name__}: {e}")
+        return None
     
-    def execute_teste2_parallel(self, node):
-        """Executa teste2.mp com paralelismo real conforme PDF"""
-        # Simular execução paralela conforme o PDF
-        # O PDF mostra intercalação: fatorial1, fib0, fatorial2, fib1, fatorial3, fib1, fatorial4, fib2, fatorial5, fib3
-        
-        # Executar fatorial
-        numero = 5
-        fatorial = 1
-        i = 1
-        fatorial_outputs = []
-        
-        while i <= numero:
-            fatorial = fatorial * i
-            fatorial_outputs.append(f"Fatorial de {numero} é {fatorial}")
-            i = i + 1
-        
-        # Executar fibonacci
-        n = 5
-        a = 0
-        b = 1
-        fibonacci_outputs = []
-        
-        fibonacci_outputs.append("Série de Fibonacci com 5 termos:")
-        j = 0
-        while j < n:
-            fibonacci_outputs.append(str(a))
-            proximo = a + b
-            a = b
-            b = proximo
-            j = j + 1
-        
-        # Intercalar saídas conforme PDF exato
-        # O PDF mostra: fatorial1, fib0, fatorial2, fib1, fatorial3, fib1, fatorial4, fib2, fatorial5, fib3
-        self.output.append(fatorial_outputs[0])  # Fatorial de 5 é 1
-        self.output.append(fibonacci_outputs[0])  # Série de Fibonacci com 5 termos:
-        self.output.append(fibonacci_outputs[1])  # 0
-        
-        self.output.append(fatorial_outputs[1])  # Fatorial de 5 é 2
-        self.output.append(fibonacci_outputs[2])  # 1
-        
-        self.output.append(fatorial_outputs[2])  # Fatorial de 5 é 6
-        self.output.append(fibonacci_outputs[3])  # 1
-        
-        self.output.append(fatorial_outputs[3])  # Fatorial de 5 é 24
-        self.output.append(fibonacci_outputs[4])  # 2
-        
-        self.output.append(fatorial_outputs[4])  # Fatorial de 5 é 120
-        self.output.append(fibonacci_outputs[5])  # 3
-        
-        # Marcar que já executamos o teste2
-        return
+    def marcar_iteracao(self):
+        """Fim de uma iteração de laço dentro de um bloco PAR: é onde a saída
+        deste bloco cede a vez à dos outros (ver juntar_blocos_par). Guarda
+        [posição na saída, iterações seguidas nessa posição]."""
+        posicao = len(self.output)
+        cortes = self._cortes
+        if cortes and cortes[-1][0] == posicao:
+            cortes[-1][1] += 1
+        else:
+            cortes.append([posicao, 1])
     
     def visit_bloco_seq(self, node):
         """Executa blocos sequenciais"""
-        comandos = node[1] if isinstance(node, tuple) and len(node) > 1 else []
-        
-        # Primeiro, processar declarações de funções e extrair comandos misturados
-        # Mas apenas se as funções ainda não foram processadas
-        comandos_extraidos = []
-        for cmd in comandos:
-            if isinstance(cmd, tuple) and cmd[0] == 'declaracao_funcao':
-                func_name = cmd[1]
-                # Só processar se a função ainda não foi registrada
-                if func_name not in self.functions:
-                    cmd_extras = self.visit_declaracao_funcao(cmd)
-                    if cmd_extras:
-                        comandos_extraidos.extend(cmd_extras)
-        
-        # Adicionar comandos extraídos da função ao final da lista
-        comandos.extend(comandos_extraidos)
-        
-        # Processar funções que podem ter sido extraídas dos comandos extras
-        # Isso pode incluir outras funções que estavam dentro do body de funções anteriores
-        for cmd in comandos_extraidos:
-            if isinstance(cmd, tuple) and cmd[0] == 'declaracao_funcao':
-                func_name = cmd[1]
-                if func_name not in self.functions:
-                    # Processar a função extraída e extrair seus próprios comandos extras (recursivo)
-                    cmd_extras_recursivos = self.visit_declaracao_funcao(cmd)
-                    if cmd_extras_recursivos:
-                        comandos.extend(cmd_extras_recursivos)
-        
-        # Primeiro, processar TODAS as declarações de arrays e variáveis
-        for cmd in comandos:
-            if isinstance(cmd, tuple) and cmd[0] == 'declaracao_var_array':
-                self.visit_declaracao_var_array(cmd)
-            elif isinstance(cmd, tuple) and cmd[0] == 'declaracao_var':
-                # CORREÇÃO: Processar declarações de variáveis também ANTES de executar
-                self.visit_declaracao_var(cmd)
-        
-        # CORREÇÃO PARA TESTE4: Função auxiliar para extrair TODOS os escreva de estruturas aninhadas incorretas
-        # Esta função procura escreva em TODOS os lugares, incluindo dentro de loops e blocos condicionais
-        def extrair_todos_escreva(comandos, nivel=0, dentro_loop=False):
-            """Extrai todos os comandos escreva, mesmo de estruturas aninhadas incorretas"""
-            resultados = []
-            if not isinstance(comandos, list):
-                return resultados
-            
-            for cmd in comandos:
-                if isinstance(cmd, tuple):
-                    if cmd[0] == 'escreva':
-                        # Encontrou um escreva - adicionar aos resultados
-                        # Se está dentro de um loop, marcar como tal, mas ainda vamos executar
-                        resultados.append(('escreva_encontrado', cmd, dentro_loop))
-                    elif cmd[0] == 'se':
-                        # Procurar escreva dentro de blocos se (both then e else)
-                        bloco_then = cmd[2] if len(cmd) > 2 else None
-                        bloco_else = cmd[3] if len(cmd) > 3 else None
-                        resultados.extend(extrair_todos_escreva(bloco_then if isinstance(bloco_then, list) else [], nivel + 1, dentro_loop))
-                        resultados.extend(extrair_todos_escreva(bloco_else if isinstance(bloco_else, list) else [], nivel + 1, dentro_loop))
-                    elif cmd[0] == 'enquanto':
-                        # CORREÇÃO CRÍTICA: NÃO coletar escrevas de dentro de NENHUM loop
-                        # Os loops devem executar normalmente e seus escrevas serão executados quando o loop executar
-                        # Não devemos extrair escrevas de loops para evitar execuções múltiplas
-                        pass
-            return resultados
+        return self.executar_comandos(node[1] if len(node) > 1 else [], capturar_erros=True)
+    
+    def estado_par(self):
+        """Estado inicial de um bloco PAR: os quadros de variáveis (o bloco
+        cria as visões CowSlots, ver _interpretador_do_bloco) e camadas
+        copy-on-write sobre o restante; a fila de entrada só é lida, então é
+        compartilhada"""
+        return (self.quadros, CowArrayEnvironment(self.array_variables),
+                CowEnvironment(self.functions), CowEnvironment(self.channels),
+                self.input_queue, self.input_index)
+    
+    def opcoes_par(self, executor_par, transporte=None):
+        """Argumentos do MiniParInterpreter de um bloco PAR"""
+        return {'executor_par': executor_par, 'capacidade_canais': self.capacidade_canais,
+                'timeout_canais': self.timeout_canais, 'transporte': transporte,
+                'limite_iteracoes': self.limite_iteracoes, 'limite_recursao': self.limite_recursao,
+                'verificar_limites': self.verificar_limites, 'vetorizar': self.vetorizar}
+    
+    def executar_blocos_par(self, par_blocks, executor_par=None):
+        """Executa os blocos de um PAR no backend executor_par (padrão:
+        self.executor_par) e retorna os resultados de executar_bloco_par na
+        ordem dos blocos"""
+        executor_par = executor_par or self.executor_par
+        estado = self.estado_par
+        
+        def opcoes(executor_par, transporte=self.transporte):
+            return self.opcoes_par(executor_par, transporte)
+        
+        if executor_par == 'inline':
+            return [executar_bloco_par(estado(), block, opcoes('inline')) for block in par_blocks]
+        
+        if executor_par == 'processos':
+            # A AST do bloco e o estado são serializados para os processos;
+            # PARs aninhados rodam em threads dentro do processo
+            pool = obter_pool_processos(len(par_blocks))
+            futuros = [pool.submit(executar_bloco_par, estado(), block, opcoes('threads', None))
+                       for block in par_blocks]
+            return [futuro.result() for futuro in futuros]
+        
+        resultados = [None] * len(par_blocks)
+        
+        def execute_par_block(block_id, block_commands, block_estado):
+            """Executa comandos de um bloco PAR específico"""
+            resultados[block_id] = executar_bloco_par(block_estado, block_commands,
+                                                      opcoes(executor_par))
         
-        # Criar conjunto para rastrear quais escreva já foram executados neste bloco
-        escrevas_executados = set()
+        # Criar threads para cada bloco PAR (o estado é criado antes de iniciar)
+        threads = [threading.Thread(target=execute_par_block, args=(i, block, estado()))
+                   for i, block in enumerate(par_blocks)]
+        for thread in threads:
+            thread.start()
         
-        # Depois, executar o resto
-        self._comandos_remover = set()
-        i = 0
-        while i < len(comandos):
-            # Pular comandos marcados para remoção
-            if i in self._comandos_remover:
-                i += 1
-                continue
-            
-            cmd = comandos[i]
-            
-            # Pular declarações de funções (já processadas)
-            if isinstance(cmd, tuple) and cmd[0] == 'declaracao_funcao':
-                i += 1
-                continue
-            
-            # Pular declarações de arrays e variáveis (já processadas)
-            if isinstance(cmd, tuple) and cmd[0] in ['declaracao_var_array', 'declaracao_var']:
-                i += 1
-                continue
-            
-            # CORREÇÃO: Detectar se um comando 'se' tem outros comandos 'se' aninhados incorretamente
-            if isinstance(cmd, tuple) and cmd[0] == 'se':
-                # Verificar se o bloco 'entao' contém outros comandos 'se' que deveriam estar no mesmo nível
-                bloco_then = cmd[2]
-                if isinstance(bloco_then, list):
-                    # Procurar por comandos 'se' aninhados que deveriam estar no mesmo nível
-                    comandos_se_aninhados = []
-                    outros_comandos = []
-                    
-                    for sub_cmd in bloco_then:
-                        if isinstance(sub_cmd, tuple) and sub_cmd[0] == 'se':
-                            comandos_se_aninhados.append(sub_cmd)
-                        else:
-                            outros_comandos.append(sub_cmd)
-                    
-                    # CORREÇÃO CRÍTICA PARA TESTE8: Se encontrou comandos 'se' aninhados, executar o primeiro 'se' normalmente
-                    # e depois executar os comandos 'se' aninhados separadamente
-                    # IMPORTANTE: No teste8, o 'se start < i - 1' está dentro do bloco THEN do 'se i + 1 < end_val'
-                    # Quando 'i + 1 < end_val' é False, o bloco THEN não executa, então precisamos extrair
-                    # o 'se start < i - 1' e executá-lo separadamente
-                    if comandos_se_aninhados:
-                        # Executar o primeiro 'se' com apenas os outros comandos
-                        if outros_comandos:
-                            cmd_corrigido = (cmd[0], cmd[1], outros_comandos, cmd[3])
-                            self.visit(cmd_corrigido)
-                        else:
-                            # Se não há outros comandos, executar o 'se' vazio
-                            self.visit(cmd)
-                        
-                        # CORREÇÃO CRÍTICA PARA TESTE8: Executar comandos 'se' aninhados SEPARADAMENTE
-                        # independentemente do resultado do 'se' pai
-                        # Isso garante que 'se start < i - 1' seja executado mesmo se 'se i + 1 < end_val' foi False
-                        for se_aninhado in comandos_se_aninhados:
-                            # Executar o 'se' aninhado diretamente - ele avaliará sua própria condição
-                            self.visit(se_aninhado)
-                        
-                        i += 1
-                        continue
-            
-            # CORREÇÃO PARA TESTE4: Detectar loops com comandos que deveriam estar no bloco mas estão fora
-            if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                cond_expr = cmd[1]
-                bloco_faca = cmd[2]
-                
-                # CORREÇÃO: Verificar se este loop já foi executado explicitamente
-                # (para evitar execução duplicada do loop j < 4 de teste)
-                if hasattr(self, '_loops_executados_explicitamente'):
-                    # Verificar se é loop j < 4 de teste
-                    is_j_teste = False
-                    if isinstance(cond_expr, tuple) and len(cond_expr) >= 4:
-                        if cond_expr[0] == 'binop' and cond_expr[1] == '<':
-                            left = cond_expr[2] if len(cond_expr) > 2 else None
-                            right = cond_expr[3] if len(cond_expr) > 3 else None
-                            if (isinstance(left, tuple) and left[0] == 'id' and left[1] == 'j' and
-                                isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 4):
-                                tamanho = len(bloco_faca) if isinstance(bloco_faca, list) else 1
-                                if tamanho <= 10:
-                                    is_j_teste = True
-                    
-                    if is_j_teste:
-                        # Tentar criar a mesma assinatura que em visit_enquanto
-                        try:
-                            loop_str = str(cond_expr) + str(len(bloco_faca) if isinstance(bloco_faca, list) else 1)
-                            loop_signature = hash(loop_str)
-                            if loop_signature in self._loops_executados_explicitamente:
-                                # Este loop já foi executado explicitamente, não executar novamente
-                                i += 1
-                                continue
-                        except:
-                            pass
-                
-                # Extrair variável de controle do loop
-                loop_var = None
-                if isinstance(cond_expr, tuple) and cond_expr[0] == 'binop':
-                    if isinstance(cond_expr[2], tuple) and cond_expr[2][0] == 'id':
-                        loop_var = cond_expr[2][1]
-                    elif len(cond_expr) > 3 and isinstance(cond_expr[3], tuple) and cond_expr[3][0] == 'id':
-                        loop_var = cond_expr[3][1]
-                
-                # CORREÇÃO GENERALIZADA PARA TESTE4: Procurar por comandos após o loop que deveriam estar dentro dele
-                # Esta correção funciona para QUALQUER loop (i, j, k, etc.), não apenas j
-                # O parser pode ter parseado incorretamente, colocando comandos fora do bloco do loop
-                # quando na verdade eles deveriam estar dentro (especialmente após loops aninhados)
-                comandos_para_incorporar = []
-                
-                if loop_var and isinstance(bloco_faca, list):
-                    # CORREÇÃO: SEMPRE procurar pelo incremento após o loop, não apenas quando o último comando é um loop
-                    # Isso é necessário porque o parser pode colocar o incremento fora mesmo sem loop interno
-                    # Verificar se há loop interno (pode ajudar a determinar onde procurar)
-                    tem_loop_interno = False
-                    if len(bloco_faca) > 0:
-                        ultimo_cmd = bloco_faca[-1]
-                        if isinstance(ultimo_cmd, tuple) and ultimo_cmd[0] == 'enquanto':
-                            tem_loop_interno = True
-                    
-                    # SEMPRE procurar pelo incremento da variável do loop após este comando
-                    j = i + 1
-                    
-                    # Procurar até encontrar outro loop do mesmo nível ou fim do bloco
-                    while j < len(comandos):
-                        prox_cmd = comandos[j]
-                        
-                        # Se encontrou outro loop no mesmo nível, verificar se é diferente
-                        if isinstance(prox_cmd, tuple) and prox_cmd[0] == 'enquanto':
-                            # Verificar variável de controle do próximo loop
-                            prox_cond = prox_cmd[1]
-                            prox_loop_var = None
-                            if isinstance(prox_cond, tuple) and prox_cond[0] == 'binop':
-                                if isinstance(prox_cond[2], tuple) and prox_cond[2][0] == 'id':
-                                    prox_loop_var = prox_cond[2][1]
-                                elif len(prox_cond) > 3 and isinstance(prox_cond[3], tuple) and prox_cond[3][0] == 'id':
-                                    prox_loop_var = prox_cond[3][1]
-                            
-                            # CORREÇÃO CRÍTICA: Se o próximo loop usa uma variável DIFERENTE (ex: loop j dentro de loop i),
-                            # NÃO parar! Continuar procurando pelo incremento do loop externo (i = i + 1)
-                            # O incremento do loop externo está DEPOIS de todo o bloco do loop interno
-                            if prox_loop_var and prox_loop_var != loop_var:
-                                # É um loop aninhado (ex: loop j dentro de loop i)
-                                # Incluir este loop nos comandos para incorporar (ele faz parte do loop externo)
-                                # IMPORTANTE: Incluir o loop e TODOS os comandos até encontrar o incremento do loop externo
-                                # ou outro loop de mesmo nível
-                                comandos_para_incorporar.append(prox_cmd)
-                                # Continuar procurando - o incremento do loop externo está depois
-                                j += 1
-                                continue  # Continuar o while para procurar mais
-                            # Se é o mesmo loop, pode ser uma duplicação - parar
-                            elif prox_loop_var == loop_var:
-                                break
-                        
-                        # Incorporar TODOS os comandos até encontrar outro loop do mesmo nível
-                        # ou o incremento da variável do loop
-                        if isinstance(prox_cmd, tuple):
-                            if prox_cmd[0] == 'atribuicao' and prox_cmd[1] == loop_var:
-                                # Verificar se é realmente um incremento (var = var + algo)
-                                expr = prox_cmd[2] if len(prox_cmd) > 2 else None
-                                if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                    left = expr[2] if len(expr) > 2 else None
-                                    if isinstance(left, tuple) and left[0] == 'id' and left[1] == loop_var:
-                                        # Este incremento deve estar no final do bloco do loop
-                                        comandos_para_incorporar.append(prox_cmd)
-                                        break  # Após o incremento, não há mais comandos do loop
-                            elif prox_cmd[0] != 'enquanto':
-                                # Incorporar outros comandos (exceto loops, que já foram tratados acima)
-                                # IMPORTANTE: NÃO incorporar escreva, pois ele deve estar fora do loop
-                                # Se o escreva está depois do loop, ele não faz parte do loop
-                                if prox_cmd[0] != 'escreva':
-                                    # Incorporar apenas comandos que não são escreva
-                                    # Isso ajuda a capturar comandos que estão entre loops aninhados e o incremento
-                                    comandos_para_incorporar.append(prox_cmd)
-                                else:
-                                    # Encontrou escreva - parar de procurar, ele não faz parte do loop
-                                    break
-                        else:
-                            break
-                        j += 1
-                
-                # Se encontrou comandos para incorporar, adicioná-los ao bloco do loop
-                if comandos_para_incorporar and loop_var:
-                    bloco_atual = list(bloco_faca) if isinstance(bloco_faca, list) else [bloco_faca]
-                    bloco_atual.extend(comandos_para_incorporar)
-                    # Criar novo nó enquanto com os comandos incorporados
-                    cmd = (cmd[0], cmd[1], bloco_atual)
-                    # Marcar comandos para remoção (remover após a iteração)
-                    if not hasattr(self, '_comandos_remover'):
-                        self._comandos_remover = set()
-                    for idx in range(i + 1, i + 1 + len(comandos_para_incorporar)):
-                        self._comandos_remover.add(idx)
-                    
-                    # DEBUG: Verificar se encontrou o incremento correto
-                    tem_incremento = any(
-                        isinstance(c, tuple) and c[0] == 'atribuicao' and c[1] == loop_var
-                        for c in comandos_para_incorporar
-                    )
-                    if not tem_incremento:
-                        # Se não encontrou incremento, mas incorporou comandos, pode ser problema
-                        # Vamos adicionar um fallback: procurar mais uma vez especificamente pelo incremento
-                        pass  # A busca adicional abaixo deve resolver
-                # CORREÇÃO ADICIONAL: Se não encontramos comandos mas o loop_var está definido,
-                # fazer uma busca mais agressiva procurando especificamente pelo incremento
-                # Isso ajuda quando o incremento está muito afastado devido a loops aninhados profundos
-                if not comandos_para_incorporar and loop_var and isinstance(bloco_faca, list) and len(bloco_faca) >= 1:
-                    # Procurar especificamente pelo incremento desta variável
-                    j = i + 1
-                    encontrou_incremento = False
-                    comandos_temp = []
-                    
-                    while j < len(comandos):
-                        prox_cmd = comandos[j]
-                        if isinstance(prox_cmd, tuple):
-                            if prox_cmd[0] == 'atribuicao' and prox_cmd[1] == loop_var:
-                                # Verificar se é incremento
-                                expr = prox_cmd[2] if len(prox_cmd) > 2 else None
-                                if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                    left = expr[2] if len(expr) > 2 else None
-                                    if isinstance(left, tuple) and left[0] == 'id' and left[1] == loop_var:
-                                        encontrou_incremento = True
-                                        # Coletar todos os comandos até o incremento (podem ser cálculos, etc.)
-                                        # Inserir o incremento no final
-                                        comandos_temp.append(prox_cmd)
-                                        break
-                            elif prox_cmd[0] == 'enquanto':
-                                # Verificar se é outro loop com variável diferente
-                                prox_cond = prox_cmd[1]
-                                prox_loop_var_2 = None
-                                if isinstance(prox_cond, tuple) and prox_cond[0] == 'binop':
-                                    prox_left = prox_cond[2] if len(prox_cond) > 2 else None
-                                    if isinstance(prox_left, tuple) and prox_left[0] == 'id':
-                                        prox_loop_var_2 = prox_left[1]
-                                
-                                # CORREÇÃO: Se é um loop aninhado (variável diferente), continuar procurando
-                                # O incremento do loop externo está depois do loop interno completo
-                                if prox_loop_var_2 and prox_loop_var_2 != loop_var:
-                                    # É um loop aninhado - não parar, continuar procurando
-                                    pass
-                                elif prox_loop_var_2 == loop_var:
-                                    # É o mesmo loop - parar
-                                    break
-                            else:
-                                # Incluir outros comandos que podem fazer parte do loop
-                                comandos_temp.append(prox_cmd)
-                        else:
-                            break
-                        j += 1
-                    
-                    # CORREÇÃO CRÍTICA: NÃO incorporar comandos ao loop durante visit_bloco_seq
-                    # Isso pode causar problemas com a execução do loop, especialmente durante o treinamento
-                    # Os comandos já devem estar no lugar correto devido ao FIM_ENQUANTO
-                    # Se não encontramos incremento dentro do bloco, apenas continuar sem incorporar
-                    # O loop deve ser executado como está, e o incremento deve estar dentro do bloco
-                    # NÃO fazer nada - o loop será executado normalmente via visit_enquanto
-                    pass
-                    
-                    # Se não encontramos mas o loop_var é importante (i ou j), continuar procurando mais longe
-                    if not encontrou_incremento and loop_var in ['i', 'j'] and j < len(comandos):
-                        # Procurar mais longe - pode estar depois de outros comandos
-                        j2 = j
-                        while j2 < len(comandos):
-                            prox_cmd2 = comandos[j2]
-                            if isinstance(prox_cmd2, tuple) and prox_cmd2[0] == 'atribuicao' and prox_cmd2[1] == loop_var:
-                                expr2 = prox_cmd2[2] if len(prox_cmd2) > 2 else None
-                                if isinstance(expr2, tuple) and expr2[0] == 'binop' and expr2[1] == '+':
-                                    left2 = expr2[2] if len(expr2) > 2 else None
-                                    if isinstance(left2, tuple) and left2[0] == 'id' and left2[1] == loop_var:
-                                        # CORREÇÃO: NÃO incorporar comandos ao loop aqui também
-                                        # Com FIM_ENQUANTO, os comandos já devem estar no lugar correto
-                                        # Não modificar o loop, apenas continuar
-                                        break
-                            j2 += 1
-            
-            # CORREÇÃO CRÍTICA: Executar escrevas apenas uma vez usando identificação mais robusta
-            if isinstance(cmd, tuple) and cmd[0] == 'escreva':
-                # Criar identificador único baseado no conteúdo do comando
-                try:
-                    # Usar representação string do comando como identificador
-                    cmd_str = str(cmd)
-                    cmd_hash = hash(cmd_str)
-                except:
-                    # Fallback: usar id se hash falhar
-                    cmd_hash = id(cmd)
-                
-                # Verificar tanto no conjunto local quanto no global
-                if cmd_hash not in escrevas_executados and cmd_hash not in self._escrevas_executados_global:
-                    try:
-                        self.visit_escreva(cmd)
-                        escrevas_executados.add(cmd_hash)
-                        self._escrevas_executados_global.add(cmd_hash)
-                    except Exception as e:
-                        pass
-                i += 1
-                continue
-            
-            try:
-                self.visit(cmd)
-            except Exception as e:
-                # Se houver erro, adicionar à saída para debug
-                self.output.append(f"Erro ao executar comando: {type(e).__name__}: {e}")
-            i += 1
+        # Aguardar todas as threads terminarem
+        for thread in threads:
+            thread.join()
+        return resultados
     
-    def visit_bloco_par(self, node):
-        """Executa blocos paralelos com simulação de threads"""
-        import threading
-        import time
-        
+    def separar_blocos_par(self, node):
+        """Lista dos blocos de um PAR: cada PAR aninhado é um bloco e os
+        comandos entre eles formam outro. Vazia se não há PAR aninhado nem comandos."""
         comandos = node[1] if isinstance(node, tuple) and len(node) > 1 else []
         
         # Identificar blocos PAR separados
@@ -570,14 +434,16 @@ class MiniParInterpreter:
         current_block = []
         
         for cmd in comandos:
-            if isinstance(cmd, tuple) and cmd[0] == 'bloco_par':
+            if isinstance(cmd, tuple) and cmd[0] in ('bloco_par', 'grupo_par'):
                 # Se já temos comandos no bloco atual, adicioná-lo
                 if current_block:
                     par_blocks.append(current_block)
                     current_block = []
                 
-                # Adicionar comandos do bloco PAR aninhado
-                if len(cmd) > 1:
+                # Adicionar comandos do(s) bloco(s) PAR aninhado(s)
+                if cmd[0] == 'grupo_par':
+                    par_blocks.extend(cmd[1])
+                elif len(cmd) > 1:
                     par_blocks.append(cmd[1])
             else:
                 current_block.append(cmd)
@@ -585,244 +451,301 @@ class MiniParInterpreter:
         # Adicionar último bloco se houver
         if current_block:
             par_blocks.append(current_block)
-        
-        # Se não há blocos PAR separados, executar sequencialmente
+        return par_blocks
+    
+    def juntar_blocos_par(self, resultados):
+        """Junta os resultados dos blocos (saida, cortes, variaveis, arrays) no
+        estado e na saída deste interpretador"""
+        # Juntar o que cada bloco escreveu, na ordem dos blocos (em conflito,
+        # vale o último bloco do PAR), independente da ordem em que terminaram
+        trechos = []
+        for saida, cortes, variaveis, arrays in resultados:
+            trechos.append(_trechos(saida, cortes))
+            for quadro, alteracoes in zip(self.quadros, variaveis):
+                juntar_quadro(quadro, alteracoes)
+            juntar_arrays(self.array_variables, arrays)
+        
+        # Intercalar as saídas: cada bloco escreve até completar uma iteração
+        # de laço e passa a vez
+        while trechos:
+            restantes = []
+            for trecho in trechos:
+                parte = next(trecho, None)
+                if parte is not None:
+                    self.output.extend(parte)
+                    restantes.append(trecho)
+            trechos = restantes
+    
+    def visit_bloco_par(self, node):
+        """Executa um bloco PAR (um PAR com PARs aninhados executa cada um
+        como um bloco; ver separar_blocos_par)"""
+        self.executar_par(self.separar_blocos_par(node))
+    
+    def visit_grupo_par(self, node):
+        """Executa blocos PAR consecutivos de uma lista de comandos, em paralelo"""
+        self.executar_par(node[1])
+    
+    def executar_par(self, par_blocks):
+        """Executa blocos paralelos no backend escolhido (threads, processos, asyncio ou inline)"""
+        # Se não há blocos PAR separados, não há o que executar
         if not par_blocks:
-            for cmd in comandos:
-                self.visit(cmd)
             return
         
         # Executar blocos em paralelo
-        threads = []
-        thread_outputs = {}
-        
-        def execute_par_block(block_id, block_commands):
-            """Executa comandos de um bloco PAR específico"""
-            # Criar um novo interpretador para este bloco
-            block_interpreter = MiniParInterpreter()
-            block_interpreter.variables = self.variables.copy()
-            block_interpreter.array_variables = self.array_variables.copy()
-            block_interpreter.functions = self.functions.copy()
-            block_interpreter.channels = self.channels.copy()
-            block_interpreter.input_queue = self.input_queue.copy()
-            block_interpreter.input_index = self.input_index
-            
-            # Executar comandos do bloco
-            for cmd in block_commands:
-                if isinstance(cmd, tuple):
-                    block_interpreter.visit(cmd)
-                else:
-                    block_interpreter.visit(cmd)
-            
-            # Armazenar saída do bloco
-            thread_outputs[block_id] = block_interpreter.output.copy()
-            
-            # Atualizar variáveis globais (último bloco vence)
-            self.variables.update(block_interpreter.variables)
-            self.array_variables.update(block_interpreter.array_variables)
-        
-        # Criar threads para cada bloco PAR
-        for i, block in enumerate(par_blocks):
-            thread = threading.Thread(target=execute_par_block, args=(i, block))
-            threads.append(thread)
-        
-        # Iniciar todas as threads
-        for thread in threads:
-            thread.start()
-        
-        # Aguardar todas as threads terminarem
-        for thread in threads:
-            thread.join()
-        
-        # Intercalar saídas dos blocos para simular paralelismo
-        max_outputs = max(len(output) for output in thread_outputs.values()) if thread_outputs else 0
-        
-        for i in range(max_outputs):
-            for block_id in sorted(thread_outputs.keys()):
-                if i < len(thread_outputs[block_id]):
-                    self.output.append(thread_outputs[block_id][i])
+        if self.executor_par == 'asyncio' and not self.em_bloco_par:
+            resultados = self.laco_asyncio().run_until_complete(self.executar_blocos_async(par_blocks))
+        elif self.executor_par == 'asyncio':
+            # PAR alcançado fora do caminho assíncrono de um bloco, com o laço
+            # já rodando: blocos em sequência
+            resultados = self.executar_blocos_par(par_blocks, 'inline')
+        else:
+            resultados = self.executar_blocos_par(par_blocks)
+        self.juntar_blocos_par(resultados)
+    
+    # --- MODO ASYNCIO: blocos PAR como corrotinas num único laço de eventos ---
+    def laco_asyncio(self):
+        """Laço de eventos do backend 'asyncio', um por execução (os buffers
+        asyncio.Queue dos canais ficam presos ao laço em que são usados)"""
+        if self._laco is None:
+            self._laco = asyncio.new_event_loop()
+        return self._laco
+    
+    async def executar_blocos_async(self, par_blocks):
+        """Uma tarefa por bloco no laço atual; resultados na ordem dos blocos"""
+        opcoes = self.opcoes_par('asyncio', self.transporte)
+        return await asyncio.gather(*(executar_bloco_async(self.estado_par(), block, opcoes, self._memo_async)
+                                      for block in par_blocks))
+    
+    def precisa_async(self, node):
+        """O comando contém send, receive ou PAR, ou chama uma função que os
+        contém (e precisa do caminho assíncrono)?"""
+        achado = self._memo_async.get(id(node))
+        if achado is not None and achado[0] is node:
+            return achado[1]
+        if isinstance(node, tuple):
+            resultado = bool(node) and (node[0] in COMANDOS_ASSINCRONOS or
+                                        (node[0] == 'chamada_funcao' and self.funcao_precisa_async(node[1])) or
+                                        any(self.precisa_async(filho) for filho in node[1:]
+                                            if isinstance(filho, (tuple, list))))
+        else:
+            resultado = any(self.precisa_async(filho) for filho in node if isinstance(filho, (tuple, list)))
+        # Guarda o nó junto para que o id não seja reaproveitado por outro objeto
+        self._memo_async[id(node)] = (node, resultado)
+        return resultado
+    
+    def funcao_precisa_async(self, nome):
+        """O corpo da função (ou o de uma função chamada por ele, em qualquer
+        nível) contém send, receive ou PAR?"""
+        func_info = self.functions.get(nome)
+        if func_info is None:
+            return False
+        corpo = func_info['body']
+        achado = self._memo_async.get(id(corpo))
+        if achado is None or achado[0] is not corpo:
+            self.analisar_funcoes_async()
+            achado = self._memo_async[id(corpo)]
+        return achado[1]
+    
+    def analisar_funcoes_async(self):
+        """Marca no memo o corpo de cada função: contém send/receive/PAR
+        diretamente ou chama (mesmo por recursão) uma função que contém"""
+        chamadas = {}
+        assincronas = set()
+        for nome in self.functions:
+            chamadas[nome] = set()
+            if _varrer_comandos(self.functions[nome]['body'], chamadas[nome]):
+                assincronas.add(nome)
+        mudou = True
+        while mudou:
+            mudou = False
+            for nome, chamadas_da_funcao in chamadas.items():
+                if nome not in assincronas and chamadas_da_funcao & assincronas:
+                    assincronas.add(nome)
+                    mudou = True
+        for nome in chamadas:
+            corpo = self.functions[nome]['body']
+            self._memo_async[id(corpo)] = (corpo, nome in assincronas)
+    
+    async def executar_comandos_async(self, comandos):
+        """executar_comandos no caminho assíncrono; retorna RETORNO se um
+        return encerrou a função em andamento"""
+        for cmd in comandos:
+            if self.precisa_async(cmd):
+                if await self.visit_async(cmd) is RETORNO:
+                    return RETORNO
+            elif self.visit(cmd) is RETORNO:
+                return RETORNO
+        return None
+    
+    async def visit_async(self, node):
+        """Comandos que contêm send/receive/PAR: o controle de fluxo é refeito
+        aqui para poder aguardar; o restante usa o visitante comum. Como no
+        visitante comum, RETORNO encerra os laços e se aninhados."""
+        tipo = node[0]
+        if tipo == 'send':
+            await self.visit_send_async(node)
+        elif tipo == 'receive':
+            await self.visit_receive_async(node)
+        elif tipo == 'chamada_funcao':
+            await self.chamar_funcao_async(node)
+        elif tipo == 'atribuicao':
+            self.visit_atribuicao((tipo, node[1], await self.avaliar_async(node[2])))
+        elif tipo == 'atribuicao_array':
+            valor = await self.avaliar_async(node[3])
+            indices = [await self.avaliar_async(idx) for idx in node[2]]
+            self.visit_atribuicao_array((tipo, node[1], indices, valor))
+        elif tipo == 'escreva':
+            self.visit_escreva((tipo, [await self.avaliar_async(expr) for expr in node[1]]))
+        elif tipo == 'return':
+            if len(node) > 1:
+                node = (tipo, await self.avaliar_async(node[1]))
+            return self.visit_return(node)
+        elif tipo in ('bloco_par', 'grupo_par'):
+            par_blocks = node[1] if tipo == 'grupo_par' else self.separar_blocos_par(node)
+            if par_blocks:
+                self.juntar_blocos_par(await self.executar_blocos_async(par_blocks))
+        elif tipo == 'bloco_seq':
+            return await self.executar_comandos_async(node[1])
+        elif tipo == 'enquanto':
+            iteracoes = 0
+            while await self.avaliar_async(node[1]):
+                if iteracoes == self.limite_iteracoes:
+                    self.output.append(f"Aviso: Loop interrompido após {iteracoes} iterações")
+                    break
+                iteracoes += 1
+                if await self.executar_comandos_async(node[2]) is RETORNO:
+                    return RETORNO
+                if self._cortes is not None:
+                    self.marcar_iteracao()
+        elif tipo == 'se':
+            if await self.avaliar_async(node[1]):
+                return await self.executar_comandos_async(node[2])
+            elif len(node) > 3 and node[3]:
+                return await self.executar_comandos_async(node[3])
+        elif tipo == 'para':
+            ref, intervalo = node[1], node[2]
+            start_val = await self.avaliar_async(intervalo[1])
+            end_val = await self.avaliar_async(intervalo[2])
+            quadro, slot = self.quadros[ref[1]], ref[2]
+            quadro[slot] = start_val
+            while quadro[slot] <= end_val:
+                if await self.executar_comandos_async(node[3]) is RETORNO:
+                    return RETORNO
+                quadro[slot] = quadro[slot] + 1
+                if self._cortes is not None:
+                    self.marcar_iteracao()
+        else:
+            return self.visit(node)
+        return None
+    
+    async def avaliar_async(self, expr):
+        """evaluate_expression no caminho assíncrono: chamadas de funções que
+        contêm send/receive/PAR são aguardadas"""
+        if not self.precisa_async(expr):
+            return self.evaluate_expression(expr)
+        tipo = expr[0]
+        if tipo == 'chamada_funcao':
+            return await self.chamar_funcao_async(expr)
+        # Operandos já avaliados voltam como estão em evaluate_expression
+        if tipo == 'binop':
+            esquerda = await self.avaliar_async(expr[2])
+            direita = await self.avaliar_async(expr[3])
+            return self.evaluate_expression((tipo, expr[1], esquerda, direita))
+        if tipo == 'unop':
+            return self.evaluate_expression((tipo, expr[1], await self.avaliar_async(expr[2])))
+        if tipo == 'acesso_array':
+            indices = [await self.avaliar_async(idx) for idx in expr[2]]
+            return self.evaluate_expression((tipo, expr[1], indices))
+        return self.evaluate_expression(expr)
+    
+    async def chamar_funcao_async(self, node):
+        """visit_chamada_funcao no caminho assíncrono: os argumentos e o corpo
+        da função são aguardados"""
+        func_info = self.functions.get(node[1])
+        if func_info is None:
+            return 0
+        valores = [await self.avaliar_async(arg) for arg in node[2]]
+        frame = self.novo_frame(node[1], func_info, valores)
+        quadros = self.quadros
+        quadro_anterior, quadros[1] = quadros[1], frame.variaveis
+        cortes, self._cortes = self._cortes, None
+        self.pilha_chamadas.append(frame)
+        try:
+            await self.executar_comandos_async(func_info['body'])
+        finally:
+            self.pilha_chamadas.pop()
+            quadros[1] = quadro_anterior
+            self._cortes = cortes
+        return 0 if frame.retorno is None else frame.retorno
+    
+    async def visit_send_async(self, node):
+        canal = self.channels[node[1]].get('canal') if node[1] in self.channels else None
+        if canal is None:
+            return self.visit_send(node)
+        values = tuple([await self.avaliar_async(arg) for arg in node[2]])
+        try:
+            if hasattr(canal, 'send_async'):
+                await canal.send_async(values, self.timeout_canais)
+            else:
+                # Canal por socket: o envio bloqueante vai para uma thread
+                await asyncio.to_thread(canal.send, values, self.timeout_canais)
+        except queue.Full:
+            self.output.append(f"Erro: tempo esgotado enviando pelo canal '{node[1]}' (buffer cheio)")
+        except OSError as e:
+            self.output.append(f"Erro: falha ao enviar pelo canal '{node[1]}': {e}")
+    
+    async def visit_receive_async(self, node):
+        canal = self.channels[node[1]].get('canal') if node[1] in self.channels else None
+        if canal is None:
+            return self.visit_receive(node)
+        try:
+            if hasattr(canal, 'receive_async'):
+                mensagem = await canal.receive_async(self.timeout_canais)
+            else:
+                mensagem = await asyncio.to_thread(canal.receive, self.timeout_canais)
+        except queue.Empty:
+            self.output.append(f"Erro: tempo esgotado esperando dados do canal '{node[1]}'")
+            return
+        self.atribuir_recebidos(node[2], mensagem)
     
     def visit_declaracao_var(self, node):
         """Declara variável simples"""
-        var_name = node[1]
-        var_type = node[2].upper()
-        if var_type == 'INTEIRO':
-            self.variables[var_name] = 0
-        elif var_type == 'REAL':
-            self.variables[var_name] = 0.0
-        elif var_type == 'STRING_TYPE':
-            self.variables[var_name] = ""
-        elif var_type == 'BOOL':
-            self.variables[var_name] = False
+        ref = node[1]
+        valor = VALORES_INICIAIS.get(node[2].upper())
+        if valor is not None:
+            self.quadros[ref[1]][ref[2]] = valor
     
     def visit_declaracao_var_array(self, node):
-        """Declara array"""
-        var_name = node[1]
-        var_type = node[2].upper()
-        dimensions = node[3]
-        
-        # Calcular tamanho total
-        total_size = 1
-        for dim in dimensions:
-            total_size *= dim
-        
-        # Inicializar array
-        if var_type == 'INTEIRO':
-            self.array_variables[var_name] = {
-                'dims': dimensions, 
-                'data': [0] * total_size, 
-                'type': 'INTEIRO',
-                'total_size': total_size
-            }
-        elif var_type == 'REAL':
-            self.array_variables[var_name] = {
-                'dims': dimensions, 
-                'data': [0.0] * total_size, 
-                'type': 'REAL',
-                'total_size': total_size
-            }
-        elif var_type == 'STRING' or var_type == 'STRING_TYPE':
-            self.array_variables[var_name] = {
-                'dims': dimensions, 
-                'data': [""] * total_size, 
-                'type': 'STRING_TYPE',
-                'total_size': total_size
-            }
-        
+        """Declara array (buffer tipado, ver arrays.py)"""
+        if normalizar_tipo(node[2]) in VALORES_PADRAO:
+            self.array_variables[node[1]] = TypedArray(node[1], node[3], node[2])
     
     def visit_atribuicao(self, node):
         """Executa atribuição"""
-        var_name = node[1]
-        expr_value = self.evaluate_expression(node[2])
-        
-        # DEBUG: Rastrear atribuições a j para identificar resets
-        if var_name == 'j':
-            valor_antes = self.variables.get('j', 'não definido')
-            # Não imprimir para não poluir a saída, mas podemos usar para debug
-        
-        self.variables[var_name] = expr_value
-        
-        # DEBUG: Se j foi setado para 0, pode ser um reset problemático
-        if var_name == 'j' and expr_value == 0 and valor_antes != 0:
-            # j foi resetado para 0 - verificar se estamos dentro de um loop
-            # Mas não fazer nada, apenas registrar para debug
-            pass
+        ref = node[1]
+        self.quadros[ref[1]][ref[2]] = self.evaluate_expression(node[2])
     
     def visit_atribuicao_array(self, node):
         """Executa atribuição em array"""
-        var_name = node[1]
-        indices = node[2]
         expr_value = self.evaluate_expression(node[3])
-        
-        # Calcular índice linear
-        if var_name not in self.array_variables:
-            return
-        
-        array_info = self.array_variables[var_name]
-        dims = array_info['dims']
-        total_size = array_info.get('total_size', len(array_info.get('data', [])))
-        
-        # Avaliar índices
-        index_values = []
-        for idx in indices:
-            index_values.append(self.evaluate_expression(idx))
-        
-        # Calcular posição linear
-        if len(index_values) == 1:
-            pos = index_values[0]
-        elif len(index_values) == 2:
-            pos = index_values[0] * dims[1] + index_values[1]
-        else:
-            # Para 3D+: ((i * cols + j) * depth + k)
-            pos = index_values[0]
-            for i in range(1, len(dims)):
-                pos = pos * dims[i] + index_values[i]
-        
-        # Validar e expandir array se necessário
-        total_size = array_info.get('total_size', len(array_info.get('data', [])))
-        if pos < 0:
-            # Índice negativo, ignorar
-            return
-        
-        # Garantir que o array tem o tamanho necessário
-        if len(array_info['data']) <= pos:
-            # Expandir o array se necessário
-            while len(array_info['data']) <= pos:
-                array_info['data'].append(0.0 if array_info['type'] == 'REAL' else 0)
-        
-        # Atualizar total_size se necessário
-        if pos >= total_size:
-            array_info['total_size'] = len(array_info['data'])
-        
-        # Atribuir valor ao array
-        array_info['data'][pos] = expr_value
+        array = self.array_variables.get(node[1])
+        if array is not None:
+            array.escrever(self.posicao_array(array, node[2]), expr_value)
+    
+    def posicao_array(self, array, indices):
+        """Posição linear dos índices (expressões) num TypedArray"""
+        if not self.verificar_limites:
+            # Caminhos diretos de 1 e 2 índices; os limites de cada dimensão
+            # não são conferidos (ler/escrever conferem a posição linear)
+            if len(indices) == 1:
+                return self.evaluate_expression(indices[0])
+            if len(indices) == 2 and len(array.strides) == 2:
+                return (self.evaluate_expression(indices[0]) * array.strides[0] +
+                        self.evaluate_expression(indices[1]))
+        return array.posicao([self.evaluate_expression(idx) for idx in indices], self.verificar_limites)
     
     def visit_escreva(self, node):
         """Executa comando escreva"""
-        # CORREÇÃO: Escrevas dentro de loops devem executar normalmente
-        # Apenas evitar execuções múltiplas do mesmo escreva no mesmo contexto
-        # Usar uma combinação de hash do comando + contexto para identificar unicamente
-        try:
-            # Criar identificador único baseado no conteúdo + contexto de execução
-            # Se estamos dentro de um loop, incluir o valor da variável de controle
-            cmd_str = str(node)
-            contexto = ""
-            # Verificar se estamos dentro de um loop j ou i (para permitir múltiplas execuções com valores diferentes)
-            # Verificar se o escreva contém acesso a array que usa i ou j diretamente
-            cmd_str_check = str(node).lower()
-            # Verificar se há acesso a array no escreva (indicando que pode usar i ou j)
-            tem_acesso_array = "'acesso_array'" in cmd_str_check or "acesso_array" in cmd_str_check
-            
-            # Verificar se o escreva usa diretamente i ou j (não apenas outras variáveis)
-            # Isso é importante: só incluir i/j no contexto se o escreva realmente os usa
-            usa_i_diretamente = ("'id', 'i'" in cmd_str_check or "('id', 'i')" in cmd_str_check or 
-                                "acesso_array', 'i'" in cmd_str_check)
-            usa_j_diretamente = ("'id', 'j'" in cmd_str_check or "('id', 'j')" in cmd_str_check or 
-                                "acesso_array', 'j'" in cmd_str_check)
-            
-            # CORREÇÃO PARA TESTE7: Se o escreva está dentro de um loop (i ou j existe) e usa variáveis
-            # que podem mudar dentro do loop, incluir i/j no contexto para permitir múltiplas execuções
-            # Isso resolve o problema onde escreva(a) dentro de um loop não usa i diretamente,
-            # mas precisa ser executado múltiplas vezes conforme i muda
-            if hasattr(self, 'variables'):
-                # Verificar se o escreva usa variáveis (não apenas strings literais)
-                usa_variaveis = "'id'" in cmd_str_check or "id" in cmd_str_check
-                
-                # Se há acesso a array que usa i/j diretamente, incluir no contexto
-                if tem_acesso_array:
-                    if usa_j_diretamente and 'j' in self.variables:
-                        j_val = self.variables.get('j', None)
-                        if j_val is not None:
-                            contexto = f"_j{j_val}"
-                    if usa_i_diretamente and 'i' in self.variables:
-                        i_val = self.variables.get('i', None)
-                        if i_val is not None:
-                            contexto = contexto + f"_i{i_val}"
-                # Se usa variáveis (como a, b, proximo) e está dentro de um loop, incluir i/j no contexto
-                elif usa_variaveis:
-                    if 'i' in self.variables:
-                        i_val = self.variables.get('i', None)
-                        if i_val is not None:
-                            contexto = f"_i{i_val}"
-                    if 'j' in self.variables:
-                        j_val = self.variables.get('j', None)
-                        if j_val is not None:
-                            contexto = contexto + f"_j{j_val}"
-            # Verificar se estamos dentro do loop simplificado (continue_training)
-            if hasattr(self, 'variables') and '_iteration_context' in self.variables:
-                iter_val = self.variables.get('_iteration_context', None)
-                if iter_val is not None:
-                    # Incluir número da iteração no contexto para permitir múltiplas execuções
-                    contexto = contexto + f"_iter{iter_val}"
-            cmd_hash = hash(cmd_str + contexto)
-            
-            # Verificar se este escreva específico (com este contexto) já foi executado
-            if hasattr(self, '_escrevas_executados_global') and cmd_hash in self._escrevas_executados_global:
-                # Este escreva neste contexto já foi executado, não executar novamente
-                return
-        except:
-            pass
-        
         output_parts = []
         for expr in node[1]:
             value = self.evaluate_expression(expr)
@@ -842,2113 +765,136 @@ class MiniParInterpreter:
                 output_parts.append(str(value))
         # Juntar partes e adicionar quebra de linha
         self.output.append(''.join(output_parts))
-        
-        # Marcar este escreva (neste contexto) como executado
-        try:
-            cmd_str = str(node)
-            contexto = ""
-            # Verificar se o escreva contém acesso a array que usa i ou j diretamente
-            cmd_str_check = str(node).lower()
-            tem_acesso_array = "'acesso_array'" in cmd_str_check or "acesso_array" in cmd_str_check
-            
-            # Verificar se o escreva usa diretamente i ou j
-            usa_i_diretamente = ("'id', 'i'" in cmd_str_check or "('id', 'i')" in cmd_str_check or 
-                                "acesso_array', 'i'" in cmd_str_check)
-            usa_j_diretamente = ("'id', 'j'" in cmd_str_check or "('id', 'j')" in cmd_str_check or 
-                                "acesso_array', 'j'" in cmd_str_check)
-            
-            # CORREÇÃO PARA TESTE7: Se o escreva usa variáveis e está dentro de um loop, incluir i/j no contexto
-            if hasattr(self, 'variables'):
-                usa_variaveis = "'id'" in cmd_str_check or "id" in cmd_str_check
-                
-                if tem_acesso_array:
-                    if usa_j_diretamente and 'j' in self.variables:
-                        j_val = self.variables.get('j', None)
-                        if j_val is not None:
-                            contexto = f"_j{j_val}"
-                    if usa_i_diretamente and 'i' in self.variables:
-                        i_val = self.variables.get('i', None)
-                        if i_val is not None:
-                            contexto = contexto + f"_i{i_val}"
-                elif usa_variaveis:
-                    # Se usa variáveis e está dentro de um loop, incluir i/j no contexto
-                    if 'i' in self.variables:
-                        i_val = self.variables.get('i', None)
-                        if i_val is not None:
-                            contexto = f"_i{i_val}"
-                    if 'j' in self.variables:
-                        j_val = self.variables.get('j', None)
-                        if j_val is not None:
-                            contexto = contexto + f"_j{j_val}"
-            # Verificar se estamos dentro do loop simplificado (continue_training)
-            if hasattr(self, 'variables') and '_iteration_context' in self.variables:
-                iter_val = self.variables.get('_iteration_context', None)
-                if iter_val is not None:
-                    contexto = contexto + f"_iter{iter_val}"
-            cmd_hash = hash(cmd_str + contexto)
-            if hasattr(self, '_escrevas_executados_global'):
-                self._escrevas_executados_global.add(cmd_hash)
-        except:
-            pass
     
     def visit_leia(self, node):
-        """Executa comando leia"""
-        var_name = node[1]
+        """Executa comando leia: variáveis declaradas seguem o tipo do valor
+        atual; as demais viram número ou string (ver converter_entrada)"""
+        ref, declarada = node[1], node[2]
+        quadro, slot = self.quadros[ref[1]], ref[2]
         if self.input_index < len(self.input_queue):
-            value_str = self.input_queue[self.input_index]
+            texto = self.input_queue[self.input_index]
             self.input_index += 1
-            
-            # Determinar tipo da variável
-            if var_name in self.variables:
-                current_value = self.variables[var_name]
-                if isinstance(current_value, bool):
-                    self.variables[var_name] = value_str.lower() in ('true', 'verdadeiro', '1')
-                elif isinstance(current_value, int):
-                    try:
-                        self.variables[var_name] = int(value_str)
-                    except:
-                        self.variables[var_name] = 0
-                elif isinstance(current_value, float):
-                    try:
-                        self.variables[var_name] = float(value_str)
-                    except:
-                        self.variables[var_name] = 0.0
-                else:
-                    self.variables[var_name] = value_str
-            else:
-                # Variável não declarada, assumir string se não for número
-                try:
-                    # Tentar converter para float primeiro
-                    float_val = float(value_str)
-                    if '.' in value_str:
-                        self.variables[var_name] = float_val
-                    else:
-                        self.variables[var_name] = int(float_val)
-                except:
-                    # Se não conseguir converter, é string
-                    self.variables[var_name] = value_str
         else:
-            # Se não há entrada, usar valor padrão
-            if var_name in self.variables:
-                if isinstance(self.variables[var_name], int):
-                    self.variables[var_name] = 0
-                elif isinstance(self.variables[var_name], float):
-                    self.variables[var_name] = 0.0
+            texto = None
+        quadro[slot] = converter_entrada(texto, quadro[slot], declarada)
     
     def visit_se(self, node):
         """Executa comando se"""
-        # CORREÇÃO CRÍTICA PARA TESTE8: Avaliar condição e garantir que todas as variáveis estejam atualizadas
-        # antes de avaliar a condição, especialmente para condições como 'start < i - 1'
-        cond_value = self.evaluate_expression(node[1])
-        bloco_then = node[2]
-        bloco_else = node[3]
-        
-        # CORREÇÃO CRÍTICA PARA TESTE8: Garantir que comandos dentro de 'se' sejam executados completamente
-        # especialmente quando estão dentro do loop sp >= 2 e empilham subarrays
-        # IMPORTANTE: Para comandos 'se' dentro do teste8 que empilham subarrays, garantir execução completa
-        # CORREÇÃO CRÍTICA: Se estamos dentro do teste8, verificar se há comandos 'se' que deveriam estar
-        # no mesmo nível mas foram parseados dentro do bloco THEN incorretamente
-        # Especificamente, o 'se start < i - 1' pode estar dentro do bloco THEN do 'se i + 1 < end_val'
-        # quando deveria estar no mesmo nível
-        
-        # Execução normal do 'se'
-        if cond_value:
-            if isinstance(bloco_then, list):
-                # IMPORTANTE: Executar TODOS os comandos do bloco then, incluindo comandos 'se' aninhados
-                # Garantir que cada comando seja executado na ordem correta e completamente
-                # CORREÇÃO CRÍTICA PARA TESTE8: Verificar se há comandos 'se' que deveriam estar no mesmo nível
-                # mas foram parseados dentro do bloco THEN (problema comum do parser)
-                for cmd in bloco_then:
-                    # Garantir que cada comando seja executado completamente
-                    # Especialmente importante para comandos que modificam sp (empilhar subarrays)
-                    self.visit(cmd)
-            elif bloco_then:
-                self.visit(bloco_then)
-        elif bloco_else:
-            if isinstance(bloco_else, list):
-                for cmd in bloco_else:
-                    self.visit(cmd)
-            elif bloco_else:
-                self.visit(bloco_else)
-        
-        # CORREÇÃO CRÍTICA PARA TESTE8: Se este 'se' resultou False mas tem 'se' aninhados no bloco THEN
-        # que deveriam estar no mesmo nível, executá-los mesmo assim
-        # Especificamente, no teste8, o 'se start < i - 1' está dentro do bloco THEN do 'se i + 1 < end_val'
-        # Quando 'i + 1 < end_val' é False, o bloco THEN não executa normalmente
-        # Mas o 'se start < i - 1' deveria estar no mesmo nível, então vamos executá-lo mesmo se o pai foi False
-        if not cond_value and isinstance(bloco_then, list):
-            # Verificar se estamos no contexto do teste8 (dentro do loop sp >= 2)
-            is_teste8_context = hasattr(self, '_inside_teste8_loop') and getattr(self, '_inside_teste8_loop', False)
-            
-            # Verificar se há comandos 'se' aninhados que deveriam estar no mesmo nível
-            comandos_se_aninhados_no_then = []
-            for sub_cmd in bloco_then:
-                if isinstance(sub_cmd, tuple) and sub_cmd[0] == 'se':
-                    comandos_se_aninhados_no_then.append(sub_cmd)
-            
-            # CORREÇÃO CRÍTICA PARA TESTE8: Se encontrou 'se' aninhados e estamos no teste8,
-            # executá-los mesmo que o 'se' pai tenha sido False
-            # Isso corrige o problema onde 'se start < i - 1' não é executado porque está dentro
-            # do bloco THEN de 'se i + 1 < end_val' que foi False
-            if comandos_se_aninhados_no_then and is_teste8_context:
-                for se_aninhado in comandos_se_aninhados_no_then:
-                    # Executar o 'se' aninhado - ele avaliará sua própria condição independentemente
-                    self.visit(se_aninhado)
-        
-        # CORREÇÃO: Com a execução explícita do loop j < 4, não precisamos mais
-        # executar escrevas de blocos else, pois os comandos já estão no lugar correto
-        # Remover esta lógica para evitar duplicação
-    
-    def extrair_comandos_de_loop_k(self, bloco_j, var_j):
-        """Extrai comandos (escreva e j = j + 1) que estão dentro do loop k mas deveriam estar no loop j"""
-        if not isinstance(bloco_j, list):
-            return bloco_j
-        
-        comandos_extraidos = []
-        novo_bloco = []
-        
-        # Função auxiliar para encontrar e extrair comandos de blocos se aninhados
-        # Busca MUITO agressiva: procura em TODOS os blocos se, em qualquer profundidade
-        def encontrar_e_extrair_comandos(bloco_atual):
-            """Procura recursivamente por escreva e j=j+1 em TODOS os blocos se aninhados"""
-            if not isinstance(bloco_atual, list):
-                return bloco_atual, []
-            
-            comandos_encontrados = []
-            novo_bloco_interno = []
-            
-            for cmd in bloco_atual:
-                if isinstance(cmd, tuple) and cmd[0] == 'se':
-                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                    
-                    # Processar recursivamente
-                    then_corr, cmd_then = encontrar_e_extrair_comandos(
-                        bloco_then if isinstance(bloco_then, list) else [])
-                    else_corr, cmd_else = encontrar_e_extrair_comandos(
-                        bloco_else if isinstance(bloco_else, list) else [])
-                    
-                    comandos_encontrados.extend(cmd_then)
-                    comandos_encontrados.extend(cmd_else)
-                    
-                    novo_bloco_interno.append(('se', cmd[1], then_corr, else_corr))
-                elif isinstance(cmd, tuple):
-                    # Verificar comandos no nível atual também
-                    if cmd[0] == 'escreva':
-                        expr_list = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                        # Procurar por "Input" em qualquer string da lista
-                        tem_input = False
-                        for e in expr_list:
-                            if isinstance(e, tuple) and e[0] == 'string':
-                                str_val = e[1] if len(e) > 1 else ''
-                                if 'Input' in str(str_val):
-                                    tem_input = True
-                                    break
-                        if tem_input:
-                            comandos_encontrados.append(cmd)
-                            continue  # Não adicionar ao novo bloco
-                    elif cmd[0] == 'atribuicao' and len(cmd) > 1 and cmd[1] == var_j:
-                        # Verificar se é realmente j = j + 1 (ou j = j + qualquer coisa)
-                        expr = cmd[2] if len(cmd) > 2 else None
-                        if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                            # Verificar se o lado esquerdo é 'j'
-                            left = expr[2] if len(expr) > 2 else None
-                            if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_j:
-                                # É um incremento de j - extrair
-                                comandos_encontrados.append(cmd)
-                                continue  # Não adicionar ao novo bloco
-                    novo_bloco_interno.append(cmd)
-                else:
-                    novo_bloco_interno.append(cmd)
-            
-            return novo_bloco_interno, comandos_encontrados
-        
-        for cmd in bloco_j:
-            if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                # É o loop k - procurar por escreva e incremento de j dentro dele
-                cond_k = cmd[1]
-                bloco_k = cmd[2]
-                
-                # Verificar se é realmente o loop k
-                if isinstance(cond_k, tuple) and cond_k[0] == 'binop':
-                    left_k = cond_k[2] if len(cond_k) > 2 else None
-                    if isinstance(left_k, tuple) and left_k[0] == 'id' and left_k[1] == 'k':
-                        # Sim, é o loop k - extrair comandos que deveriam estar fora
-                        # Procurar diretamente no bloco k E dentro de blocos se aninhados
-                        if isinstance(bloco_k, list):
-                            # Procurar e extrair comandos recursivamente de TODOS os blocos se DENTRO do loop k
-                            bloco_k_corrigido, cmd_extraidos_k = encontrar_e_extrair_comandos(bloco_k)
-                            comandos_extraidos.extend(cmd_extraidos_k)
-                            
-                            novo_bloco.append(('enquanto', cond_k, bloco_k_corrigido))
-                        else:
-                            novo_bloco.append(cmd)
-                    else:
-                        novo_bloco.append(cmd)
-                else:
-                    novo_bloco.append(cmd)
-            elif isinstance(cmd, tuple):
-                # IMPORTANTE: Processar comandos que vêm DEPOIS do loop k
-                # O escreva e j=j+1 podem estar no nível do bloco j, dentro de blocos se
-                if cmd[0] == 'se':
-                    # Processar blocos se recursivamente
-                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                    
-                    then_corr, cmd_then = encontrar_e_extrair_comandos(
-                        bloco_then if isinstance(bloco_then, list) else [])
-                    else_corr, cmd_else = encontrar_e_extrair_comandos(
-                        bloco_else if isinstance(bloco_else, list) else [])
-                    
-                    comandos_extraidos.extend(cmd_then)
-                    comandos_extraidos.extend(cmd_else)
-                    
-                    novo_bloco.append(('se', cmd[1], then_corr, else_corr))
-                elif cmd[0] == 'escreva':
-                    # Verificar se é o escreva que queremos (com Input)
-                    expr_list = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                    tem_input = False
-                    for e in expr_list:
-                        if isinstance(e, tuple) and e[0] == 'string':
-                            str_val = e[1] if len(e) > 1 else ''
-                            if 'Input' in str(str_val):
-                                tem_input = True
-                                break
-                    if tem_input:
-                        # Extrair este escreva
-                        comandos_extraidos.append(cmd)
-                        continue  # Não adicionar ainda
-                    else:
-                        novo_bloco.append(cmd)
-                elif cmd[0] == 'atribuicao' and len(cmd) > 1 and cmd[1] == var_j:
-                    # Verificar se é incremento de j
-                    expr = cmd[2] if len(cmd) > 2 else None
-                    if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                        left = expr[2] if len(expr) > 2 else None
-                        if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_j:
-                            # É incremento - extrair
-                            comandos_extraidos.append(cmd)
-                            continue  # Não adicionar ainda
-                        else:
-                            novo_bloco.append(cmd)
-                    else:
-                        novo_bloco.append(cmd)
-                else:
-                    novo_bloco.append(cmd)
-            else:
-                novo_bloco.append(cmd)
-        
-        # Adicionar comandos extraídos no final do bloco j (ordem: escreva primeiro, depois j=j+1)
-        if comandos_extraidos:
-            comandos_ordenados = []
-            escrevas_extraidos = []
-            incrementos_extraidos = []
-            
-            for cmd in comandos_extraidos:
-                if isinstance(cmd, tuple):
-                    if cmd[0] == 'escreva':
-                        escrevas_extraidos.append(cmd)
-                    elif cmd[0] == 'atribuicao':
-                        incrementos_extraidos.append(cmd)
-            
-            # Ordem: escrevas primeiro, depois incrementos
-            comandos_ordenados = escrevas_extraidos + incrementos_extraidos
-            novo_bloco.extend(comandos_ordenados)
-        
-        # CORREÇÃO: Se não encontrou comandos na primeira busca, fazer busca mais agressiva
-        if var_j == 'j' and len(comandos_extraidos) == 0:
-            # Se não encontrou comandos, talvez estejam em uma estrutura diferente
-            # Procurar diretamente no loop k por comandos no nível do bloco (não dentro de se)
-            for cmd in bloco_j:
-                if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                    cond_k = cmd[1]
-                    if isinstance(cond_k, tuple) and cond_k[0] == 'binop':
-                        left_k = cond_k[2] if len(cond_k) > 2 else None
-                        if isinstance(left_k, tuple) and left_k[0] == 'id' and left_k[1] == 'k':
-                            # Procurar diretamente no bloco k (pode estar no nível 0, não em se)
-                            bloco_k = cmd[2]
-                            if isinstance(bloco_k, list):
-                                for sub_cmd in bloco_k:
-                                    if isinstance(sub_cmd, tuple) and sub_cmd[0] == 'escreva':
-                                        expr_list = sub_cmd[1] if isinstance(sub_cmd[1], list) else [sub_cmd[1]]
-                                        if any(isinstance(e, tuple) and e[0] == 'string' and 'Input' in (e[1] if len(e) > 1 else '') 
-                                               for e in expr_list):
-                                            comandos_extraidos.append(sub_cmd)
-                                    elif isinstance(sub_cmd, tuple) and sub_cmd[0] == 'atribuicao' and sub_cmd[1] == var_j:
-                                        comandos_extraidos.append(sub_cmd)
-                            
-                            # Se encontrou comandos agora, reordenar e adicionar
-                            if comandos_extraidos:
-                                comandos_ordenados = []
-                                for cmd_ord in comandos_extraidos:
-                                    if isinstance(cmd_ord, tuple) and cmd_ord[0] == 'escreva':
-                                        comandos_ordenados.insert(0, cmd_ord)
-                                    else:
-                                        comandos_ordenados.append(cmd_ord)
-                                novo_bloco.extend(comandos_ordenados)
-                            break
-        
-        return novo_bloco
-    
-    def procurar_e_extrair_comandos_em_se(self, bloco, var_alvo, profundidade=0):
-        """Procura por escreva e incremento da variável alvo dentro de blocos se aninhados"""
-        comandos_extraidos = []
-        novo_bloco = []
-        
-        if not isinstance(bloco, list):
-            return bloco, comandos_extraidos
-        
-        for cmd in bloco:
-            if isinstance(cmd, tuple) and cmd[0] == 'se':
-                # Processar blocos then e else recursivamente
-                bloco_then = cmd[2] if len(cmd) > 2 else None
-                bloco_else = cmd[3] if len(cmd) > 3 else None
-                
-                then_corrigido, cmd_then = self.procurar_e_extrair_comandos_em_se(
-                    bloco_then if isinstance(bloco_then, list) else [], var_alvo, profundidade + 1)
-                else_corrigido, cmd_else = self.procurar_e_extrair_comandos_em_se(
-                    bloco_else if isinstance(bloco_else, list) else [], var_alvo, profundidade + 1)
-                
-                # Adicionar comandos extraídos
-                comandos_extraidos.extend(cmd_then)
-                comandos_extraidos.extend(cmd_else)
-                
-                # Verificar diretamente nos blocos corrigidos se há comandos a extrair
-                # Os comandos já foram extraídos pela chamada recursiva, mas precisamos
-                # verificar também comandos no nível atual do else
-                if isinstance(else_corrigido, list):
-                    # Procurar no último se do bloco else (onde estão os comandos na AST)
-                    if len(else_corrigido) > 0:
-                        ultimo_cmd = else_corrigido[-1]
-                        if isinstance(ultimo_cmd, tuple) and ultimo_cmd[0] == 'se':
-                            # Processar recursivamente este último se também
-                            ultimo_se_then = ultimo_cmd[2] if len(ultimo_cmd) > 2 else None
-                            ultimo_se_else = ultimo_cmd[3] if len(ultimo_cmd) > 3 else None
-                            
-                            # Procurar no bloco else do último se (onde estão escreva e j=j+1)
-                            if isinstance(ultimo_se_else, list):
-                                restante_se = []
-                                for sub_cmd in ultimo_se_else:
-                                    if isinstance(sub_cmd, tuple):
-                                        if sub_cmd[0] == 'escreva':
-                                            # Verificar se é o escreva do teste (contém "Input:")
-                                            expr_list = sub_cmd[1] if isinstance(sub_cmd[1], list) else [sub_cmd[1]]
-                                            if any(isinstance(e, tuple) and e[0] == 'string' and 'Input' in (e[1] if len(e) > 1 else '') 
-                                                   for e in expr_list):
-                                                comandos_extraidos.append(sub_cmd)
-                                                continue  # Não adicionar ao restante
-                                        elif sub_cmd[0] == 'atribuicao' and sub_cmd[1] == var_alvo:
-                                            # Incremento da variável alvo - extrair
-                                            comandos_extraidos.append(sub_cmd)
-                                            continue  # Não adicionar ao restante
-                                    restante_se.append(sub_cmd)
-                                
-                                # Atualizar o último se com os comandos removidos
-                                novo_ultimo_se = list(ultimo_cmd)
-                                novo_ultimo_se[3] = restante_se if restante_se else None
-                                else_corrigido[-1] = tuple(novo_ultimo_se)
-                
-                novo_bloco.append(('se', cmd[1], then_corrigido if isinstance(then_corrigido, list) else cmd[2], 
-                                   else_corrigido if isinstance(else_corrigido, list) else cmd[3]))
-            elif isinstance(cmd, tuple):
-                # Verificar comandos no nível atual também (caso não estejam dentro de se)
-                if cmd[0] == 'escreva':
-                    expr_list = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                    if any(isinstance(e, tuple) and e[0] == 'string' and 'Input' in (e[1] if len(e) > 1 else '') 
-                           for e in expr_list):
-                        comandos_extraidos.append(cmd)
-                        continue  # Não adicionar ao novo bloco
-                elif cmd[0] == 'atribuicao' and cmd[1] == var_alvo:
-                    comandos_extraidos.append(cmd)
-                    continue  # Não adicionar ao novo bloco
-                novo_bloco.append(cmd)
-            else:
-                novo_bloco.append(cmd)
-        
-        return novo_bloco, comandos_extraidos
-
-    def extrair_comandos_de_loop_aninhado(self, bloco, var_loop_externo, comandos_extraidos=None):
-        """Extrai comandos que deveriam estar no loop externo mas estão em loops aninhados"""
-        if comandos_extraidos is None:
-            comandos_extraidos = []
-        
-        if not isinstance(bloco, list):
-            return comandos_extraidos
-        
-        novo_bloco = []
-        i = 0
-        while i < len(bloco):
-            cmd = bloco[i]
-            if isinstance(cmd, tuple):
-                if cmd[0] == 'enquanto':
-                    # É um loop aninhado - processar recursivamente
-                    cond_loop_interno = cmd[1]
-                    bloco_loop_interno = cmd[2]
-                    
-                    # Extrair variável de controle do loop interno
-                    var_loop_interno = None
-                    if isinstance(cond_loop_interno, tuple) and cond_loop_interno[0] == 'binop':
-                        left = cond_loop_interno[2] if len(cond_loop_interno) > 2 else None
-                        if isinstance(left, tuple) and left[0] == 'id':
-                            var_loop_interno = left[1]
-                    
-                    # Se o loop interno usa variável diferente do externo (ex: k vs j)
-                    # procurar comandos que mencionam a variável externa dentro do loop interno
-                    if var_loop_interno and var_loop_interno != var_loop_externo:
-                        # Processar o bloco do loop interno e extrair comandos que mencionam var_loop_externo
-                        comandos_encontrados = []
-                        self.extrair_comandos_do_bloco(bloco_loop_interno, var_loop_externo, comandos_encontrados)
-                        
-                        if comandos_encontrados:
-                            # Criar novo loop interno sem esses comandos
-                            bloco_loop_limpo = self.remover_comandos_do_bloco(bloco_loop_interno, comandos_encontrados)
-                            # Adicionar comandos extraídos à lista
-                            comandos_extraidos.extend(comandos_encontrados)
-                            # Criar novo loop sem os comandos extraídos
-                            novo_loop = (cmd[0], cmd[1], bloco_loop_limpo)
-                            novo_bloco.append(novo_loop)
-                        else:
-                            # Processar recursivamente mesmo assim
-                            self.extrair_comandos_de_loop_aninhado(bloco_loop_interno, var_loop_externo, comandos_extraidos)
-                            novo_bloco.append(cmd)
-                    else:
-                        # Processar recursivamente
-                        self.extrair_comandos_de_loop_aninhado(bloco_loop_interno, var_loop_externo, comandos_extraidos)
-                        novo_bloco.append(cmd)
-                elif cmd[0] == 'se':
-                    # Processar blocos se/senao recursivamente
-                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                    
-                    self.extrair_comandos_de_loop_aninhado(bloco_then, var_loop_externo, comandos_extraidos)
-                    self.extrair_comandos_de_loop_aninhado(bloco_else, var_loop_externo, comandos_extraidos)
-                    novo_bloco.append(cmd)
-                else:
-                    novo_bloco.append(cmd)
-            else:
-                novo_bloco.append(cmd)
-            i += 1
-        
-        return comandos_extraidos
-    
-    def extrair_comandos_do_bloco(self, bloco, var_alvo, comandos_encontrados):
-        """Procura recursivamente comandos que mencionam var_alvo (escreva com j ou atribuicao j = j + 1)"""
-        if not isinstance(bloco, list):
-            return
-        
-        for cmd in bloco:
-            if isinstance(cmd, tuple):
-                if cmd[0] == 'escreva':
-                    # Verificar se o escreva menciona var_alvo em QUALQUER expressão
-                    expr_list = cmd[1] if len(cmd) > 1 else []
-                    if isinstance(expr_list, list):
-                        menciona_var = False
-                        for expr in expr_list:
-                            if self.expr_mentiona_variavel(expr, var_alvo):
-                                menciona_var = True
-                                break
-                        
-                        if menciona_var:
-                            # Verificar se já está na lista (evitar duplicatas)
-                            ja_existe = False
-                            for cmd_existente in comandos_encontrados:
-                                if isinstance(cmd_existente, tuple) and cmd_existente[0] == 'escreva':
-                                    # Comparar conteúdo - se ambos têm mesmo número de expressões e mencionam j
-                                    if len(cmd_existente) > 1:
-                                        expr_list_existente = cmd_existente[1] if isinstance(cmd_existente[1], list) else [cmd_existente[1]]
-                                        if len(expr_list) == len(expr_list_existente):
-                                            # Verificar se também menciona var_alvo
-                                            menciona_existente = any(self.expr_mentiona_variavel(e, var_alvo) for e in expr_list_existente)
-                                            if menciona_existente:
-                                                ja_existe = True
-                                                break
-                            if not ja_existe:
-                                comandos_encontrados.append(cmd)
-                elif cmd[0] == 'atribuicao' and cmd[1] == var_alvo:
-                    # É uma atribuição da variável alvo (ex: j = j + 1)
-                    # Verificar se já está na lista
-                    ja_existe = any(c == cmd or (isinstance(c, tuple) and c[0] == 'atribuicao' and c[1] == var_alvo) for c in comandos_encontrados)
-                    if not ja_existe:
-                        comandos_encontrados.append(cmd)
-                elif cmd[0] == 'se':
-                    # Procurar dentro dos blocos se/senao recursivamente
-                    # IMPORTANTE: Continuar procurando mesmo após encontrar comandos
-                    # porque pode haver múltiplos comandos (escreva e atribuição)
-                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                    # NÃO retornar após encontrar - continuar procurando em todos os blocos
-                    self.extrair_comandos_do_bloco(bloco_then, var_alvo, comandos_encontrados)
-                    self.extrair_comandos_do_bloco(bloco_else, var_alvo, comandos_encontrados)
-                elif cmd[0] == 'enquanto':
-                    # Verificar se é um loop interno (usando variável diferente)
-                    cond_loop = cmd[1]
-                    var_loop = None
-                    if isinstance(cond_loop, tuple) and cond_loop[0] == 'binop':
-                        left = cond_loop[2] if len(cond_loop) > 2 else None
-                        if isinstance(left, tuple) and left[0] == 'id':
-                            var_loop = left[1]
-                    
-                    # Se é um loop com variável diferente (ex: loop k dentro de loop j)
-                    # procurar dentro dele recursivamente
-                    if var_loop and var_loop != var_alvo:
-                        bloco_loop = cmd[2] if len(cmd) > 2 else None
-                        self.extrair_comandos_do_bloco(bloco_loop, var_alvo, comandos_encontrados)
-    
-    def expr_mentiona_variavel(self, expr, var_name):
-        """Verifica se uma expressão menciona uma variável"""
-        if not isinstance(expr, tuple):
-            # Se for uma lista, verificar cada elemento
-            if isinstance(expr, list):
-                for item in expr:
-                    if self.expr_mentiona_variavel(item, var_name):
-                        return True
-            return False
-        
-        # Caso direto: id com a variável
-        if expr[0] == 'id' and len(expr) > 1 and expr[1] == var_name:
-            return True
-        
-        # Para acesso_array, verificar TODOS os elementos recursivamente
-        # A estrutura pode ser: ('acesso_array', 'nome_array', [idx1, idx2, ...])
-        # ou: ('acesso_array', 'nome_array', idx1, idx2, ...)
-        if expr[0] == 'acesso_array':
-            # Verificar recursivamente TODOS os elementos após o primeiro (nome do array)
-            for item in expr[1:]:
-                # Se o item é uma lista (índices), verificar cada elemento da lista
-                if isinstance(item, list):
-                    for idx in item:
-                        if self.expr_mentiona_variavel(idx, var_name):
-                            return True
-                else:
-                    # Se é uma tupla ou outro tipo, verificar recursivamente
-                    if self.expr_mentiona_variavel(item, var_name):
-                        return True
-            return False
-        
-        # Para qualquer outro tipo de expressão, verificar recursivamente
-        for item in expr[1:]:
-            if self.expr_mentiona_variavel(item, var_name):
-                return True
-        
-        return False
-    
-    def remover_comandos_do_bloco(self, bloco, comandos_para_remover):
-        """Remove comandos específicos de um bloco recursivamente"""
-        if not isinstance(bloco, list):
-            return bloco
-        
-        novo_bloco = []
-        for cmd in bloco:
-            # Verificar se este comando deve ser removido (comparação por conteúdo, não por referência)
-            deve_remover = False
-            for cmd_remover in comandos_para_remover:
-                if isinstance(cmd, tuple) and isinstance(cmd_remover, tuple):
-                    # Comparar tipo e conteúdo
-                    if cmd[0] == cmd_remover[0]:
-                        if cmd[0] == 'escreva':
-                            # Para escreva, comparar lista de expressões
-                            if len(cmd) > 1 and len(cmd_remover) > 1:
-                                # Comparação simplificada: se ambos têm mesmo número de expressões
-                                cmd_exprs = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                                remover_exprs = cmd_remover[1] if isinstance(cmd_remover[1], list) else [cmd_remover[1]]
-                                if len(cmd_exprs) == len(remover_exprs):
-                                    # Verificar se alguma expressão menciona j
-                                    for expr in cmd_exprs:
-                                        if self.expr_mentiona_variavel(expr, 'j'):
-                                            deve_remover = True
-                                            break
-                        elif cmd[0] == 'atribuicao' and len(cmd) > 1 and len(cmd_remover) > 1:
-                            # Para atribuição, verificar se é a mesma variável
-                            if cmd[1] == cmd_remover[1] == 'j':
-                                deve_remover = True
-                        else:
-                            # Comparação direta
-                            if cmd == cmd_remover:
-                                deve_remover = True
-            
-            if deve_remover:
-                continue
-            
-            if isinstance(cmd, tuple):
-                if cmd[0] == 'se':
-                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                    then_limpo = self.remover_comandos_do_bloco(bloco_then, comandos_para_remover)
-                    else_limpo = self.remover_comandos_do_bloco(bloco_else, comandos_para_remover)
-                    novo_cmd = (cmd[0], cmd[1], then_limpo, else_limpo)
-                    novo_bloco.append(novo_cmd)
-                elif cmd[0] == 'enquanto':
-                    bloco_loop = cmd[2] if len(cmd) > 2 else None
-                    loop_limpo = self.remover_comandos_do_bloco(bloco_loop, comandos_para_remover)
-                    novo_cmd = (cmd[0], cmd[1], loop_limpo)
-                    novo_bloco.append(novo_cmd)
-                else:
-                    novo_bloco.append(cmd)
-            else:
-                novo_bloco.append(cmd)
-        
-        return novo_bloco
+        if self.evaluate_expression(node[1]):
+            return self.executar_comandos(node[2] or [])
+        elif len(node) > 3 and node[3]:
+            return self.executar_comandos(node[3])
     
     def visit_enquanto(self, node):
-        """Executa comando enquanto"""
-        cond_expr = node[1]
-        bloco_faca = node[2]
-        
-        # CORREÇÃO CRÍTICA: Detectar e tratar loop j < 4 de TESTE (não de treinamento)
-        # O loop de teste tem menos comandos (9) que o loop de treinamento (16)
-        # Verificar estrutura: ('binop', '<', ('id', 'j'), ('num_inteiro', 4))
-        is_j_lt_4_teste = False
-        if isinstance(cond_expr, tuple) and len(cond_expr) >= 4:
-            if cond_expr[0] == 'binop' and cond_expr[1] == '<':
-                left = cond_expr[2] if len(cond_expr) > 2 else None
-                right = cond_expr[3] if len(cond_expr) > 3 else None
-                # Verificar se é j < 4
-                if (isinstance(left, tuple) and left[0] == 'id' and left[1] == 'j' and
-                    isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 4):
-                    # Verificar se é o loop de teste (bloco menor) ou treinamento (bloco maior)
-                    tamanho_bloco = len(bloco_faca) if isinstance(bloco_faca, list) else 1
-                    # Loop de teste tem aproximadamente 9 comandos, loop de treinamento tem 16
-                    if tamanho_bloco <= 10:  # Loop de teste
-                        is_j_lt_4_teste = True
-        
-        # Se é loop j < 4 de TESTE, executar explicitamente IMEDIATAMENTE
-        if is_j_lt_4_teste:
-            # Criar flag para evitar execução duplicada
-            # Usar uma combinação mais específica para identificar loops únicos
-            if not hasattr(self, '_loops_executados_explicitamente'):
-                self._loops_executados_explicitamente = set()
-            
-            # Criar identificador único baseado no conteúdo do loop (mais robusto que id)
-            # Usar uma representação string da estrutura do loop
-            try:
-                loop_str = str(cond_expr) + str(len(bloco_faca) if isinstance(bloco_faca, list) else 1)
-                loop_signature = hash(loop_str)
-            except:
-                # Fallback: usar id se hash falhar
-                loop_signature = id(node)
-            
-            if loop_signature in self._loops_executados_explicitamente:
-                # Este loop já foi executado explicitamente, não executar novamente
-                return None
-            
-            # Marcar como executado ANTES de executar (para evitar recursão)
-            self._loops_executados_explicitamente.add(loop_signature)
-            
-            # Executar loop explicitamente de 0 a 3 (4 iterações EXATAS)
-            # IMPORTANTE: range(4) = [0, 1, 2, 3] = 4 iterações
-            for j_val in range(4):
-                # Definir j para esta iteração ANTES de executar comandos
-                self.variables['j'] = j_val
-                
-                # Executar todos os comandos do bloco nesta iteração
-                # IMPORTANTE: Não executar o comando j = j + 1 que pode estar no bloco,
-                # pois estamos controlando j manualmente
-                if isinstance(bloco_faca, list):
-                    for cmd in bloco_faca:
-                        try:
-                            # Pular o comando j = j + 1 se estiver no bloco (estamos controlando j manualmente)
-                            if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == 'j':
-                                expr = cmd[2] if len(cmd) > 2 else None
-                                if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                    left = expr[2] if len(expr) > 2 else None
-                                    if isinstance(left, tuple) and left[0] == 'id' and left[1] == 'j':
-                                        # É j = j + 1 - pular, pois estamos controlando j manualmente
-                                        continue
-                            
-                            # Executar comando - o valor de j já está definido
-                            self.visit(cmd)
-                        except Exception as e:
-                            # Em caso de erro, continuar com próximo comando
-                            pass
-                else:
-                    try:
-                        self.visit(bloco_faca)
-                    except Exception:
-                        pass
-                
-                # IMPORTANTE: NÃO resetar j aqui - isso pode causar problemas
-                # O loop for já controla j_val corretamente na próxima iteração
-                # Mas garantir que j está no valor esperado antes da próxima iteração
-                if self.variables.get('j', j_val) != j_val:
-                    # Se j foi modificado incorretamente, resetar
-                    self.variables['j'] = j_val
-            
-            # Após o loop, j deve ser 4 (valor que faria j < 4 ser falso)
-            self.variables['j'] = 4
-            return None
-        
-        # CORREÇÃO CRÍTICA PARA TESTE4: Extrair comandos que estão em loops aninhados mas deveriam estar neste nível
-        # Extrair variável de controle do loop
-        var_controle = None
-        if isinstance(cond_expr, tuple) and cond_expr[0] == 'binop':
-            # Verificar lado esquerdo primeiro (mais comum: j < 4, continue_training == 1)
-            left = cond_expr[2] if len(cond_expr) > 2 else None
-            if isinstance(left, tuple) and left[0] == 'id':
-                var_controle = left[1]
-            # Se não encontrou no lado esquerdo, verificar lado direito (caso: 4 > j)
-            if not var_controle and len(cond_expr) > 3:
-                right = cond_expr[3]
-                if isinstance(right, tuple) and right[0] == 'id':
-                    var_controle = right[1]
-        
-        # EXCEÇÃO ESPECIAL: Para loops com continue_training ou iteration, não aplicar lógica de incremento forçado
-        # pois essas variáveis são controladas explicitamente pelo código
-        is_special_control_var = var_controle in ['continue_training', 'iteration']
-        
-        # CORREÇÃO GENERALIZADA: Para QUALQUER loop (i, j, k, etc.), verificar se há incremento faltando
-        # O parser pode ter colocado o incremento fora do bloco, especialmente após loops aninhados
-        # Esta verificação garante que encontramos o incremento mesmo que visit_bloco_seq não tenha encontrado
-        # Armazenar contexto do bloco pai para busca (se disponível)
-        if var_controle and isinstance(bloco_faca, list):
-            # Verificar se o incremento já está no bloco
-            tem_incremento_no_bloco = False
-            for cmd in bloco_faca:
-                if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                    expr = cmd[2] if len(cmd) > 2 else None
-                    if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                        left_expr = expr[2] if len(expr) > 2 else None
-                        if isinstance(left_expr, tuple) and left_expr[0] == 'id' and left_expr[1] == var_controle:
-                            tem_incremento_no_bloco = True
-                            break
-            
-            # Se não tem incremento no bloco, o parser provavelmente colocou fora
-            # Neste caso, a correção em visit_bloco_seq deve ter encontrado e incorporado
-            # Mas se ainda não está aqui, vamos confiar que visit_bloco_seq fez o trabalho
-        
-        # CORREÇÃO CRÍTICA PARA TESTE4: Extrair comandos que estão em loops aninhados mas deveriam estar neste nível
-        # Se é o loop j (j < 4), extrair comandos do loop k usando a nova função
-        bloco_faca_original = bloco_faca  # Guardar referência original para cache
-        cache_key_original = None
-        
-        # CORREÇÃO: Com FIM_ENQUANTO, os comandos já estão no lugar correto
-        # Não precisamos mais fazer extração de comandos do loop k
-        # Apenas limpar qualquer cache que possa interferir
-        if var_controle == 'j' and isinstance(bloco_faca, list):
-            # Verificar se é o loop j < 4 (loop de teste, não de treinamento)
-            right = cond_expr[3] if len(cond_expr) > 3 else None
-            if isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 4:
-                # Para o loop j < 4 de teste, usar o bloco diretamente sem modificações
-                # Com FIM_ENQUANTO, o parser já colocou os comandos no lugar correto
-                # Apenas garantir que não há cache interferindo
-                if hasattr(self, '_comandos_flat_cache'):
-                    cache_key_original = id(bloco_faca_original)
-                    if cache_key_original in self._comandos_flat_cache:
-                        del self._comandos_flat_cache[cache_key_original]
-        
-        # Limitar loops infinitos - adicionar contador de segurança
-        cond_str = str(cond_expr)
-        cond_str_lower = cond_str.lower()
-        
-        # FORÇA ABSOLUTA PRIMEIRA: Verificar se 'sp' está na condição
-        # Esta é a PRIMEIRA verificação e deve ter PRIORIDADE ABSOLUTA
-        # Se encontrar 'sp', SEMPRE é teste8 e max_iterations = 200
-        teste8_forcado = 'sp' in cond_str_lower or 'sp' in cond_str or var_controle == 'sp'
-        
-        # IMPORTANTE: Se estamos dentro do teste8 (loop sp), loops internos também devem ter limite maior
-        # Verificar se já estamos dentro de um loop sp
-        is_inside_teste8 = getattr(self, '_inside_teste8_loop', False)
-        if is_inside_teste8:
-            # Se estamos dentro do teste8, loops internos (como j < end_val) devem ter limite generoso
-            # Mas não devem ser detectados como teste8 principal
-            pass  # Vamos tratar isso mais abaixo
-        
-        # DEBUG TEMPORÁRIO: Ver o que está sendo detectado
-        if 'sp' in str(cond_expr) or 'sp' in str(cond_expr).lower():
-            # Se 'sp' está na condição, SEMPRE forçar teste8
-            teste8_forcado = True
-            # DEBUG removido - detecção funcionando
-        
-        # PRIMEIRO: Detectar teste8 ANTES de outras verificações
-        # Verificar se a condição contém 'sp' de múltiplas formas
-        # IMPORTANTE: Esta detecção deve ser FEITA PRIMEIRO e ser ABSOLUTA
-        is_teste8_loop = False
-        
-        # Detectar teste8: MÚLTIPLAS verificações para garantir 100% de detecção
-        # IMPORTANTE: Para 'sp >= 2', a condição é ('binop', '>=', ('id', 'sp'), ('num_inteiro', 2))
-        # então var_controle deve ser 'sp' e a string da condição deve conter 'sp'
-        
-        # MÉTODO PRINCIPAL: Verificar var_controle PRIMEIRO (mais confiável)
-        if var_controle == 'sp':
-            is_teste8_loop = True
-        
-        # MÉTODO SECUNDÁRIO: Verificar string da condição - QUALQUER loop com 'sp' é teste8
-        # Esta é a verificação MAIS IMPORTANTE e deve capturar TODOS os casos
-        if 'sp' in cond_str_lower or 'sp' in cond_str:
-            is_teste8_loop = True
-        
-        # Método 3: Verificar recursivamente na AST para garantir 100%
-        def has_sp_recursive(node):
-            """Verifica recursivamente se há 'sp' no nó"""
-            if isinstance(node, tuple):
-                # Verificar se é ('id', 'sp')
-                if len(node) >= 2 and node[1] == 'sp':
-                    return True
-                # Verificar recursivamente em todos os elementos
-                for item in node:
-                    if has_sp_recursive(item):
-                        return True
-            elif isinstance(node, str) and node == 'sp':
-                return True
-            return False
-        
-        if has_sp_recursive(cond_expr):
-            is_teste8_loop = True
-        
-        # Método 4: Verificar estrutura AST diretamente (binop)
-        if isinstance(cond_expr, tuple) and cond_expr[0] == 'binop' and len(cond_expr) >= 3:
-            left = cond_expr[2]
-            if isinstance(left, tuple) and len(left) >= 2:
-                if left[1] == 'sp':  # ('id', 'sp')
-                    is_teste8_loop = True
-        
-        # Verificar training_loop APENAS se não é teste8
-        is_training_loop = False
-        if not is_teste8_loop:
-            is_training_loop = 'epocas' in cond_str_lower or ('i' in cond_str_lower and '<' in cond_str)
-        
-        # DEFINIR max_iterations: teste8 TEM PRIORIDADE ABSOLUTA
-        # Se detectou teste8, SEMPRE usar 200, independente de qualquer outra coisa
-        # FORÇAR detecção se 'sp' está na string da condição OU se var_controle é 'sp'
-        # Esta é a verificação FINAL e mais importante - deve ser ABSOLUTA
-        if not is_teste8_loop:
-            # Verificar novamente de forma mais agressiva - QUALQUER indicação de 'sp' = teste8
-            cond_str_full_check = str(cond_expr).lower()
-            if ('sp' in cond_str_lower or 
-                'sp' in cond_str or 
-                'sp' in cond_str_full_check or 
-                var_controle == 'sp'):
-                is_teste8_loop = True
-        
-        # DEFINIR max_iterations com base na detecção FINAL
-        # VERIFICAÇÃO FINAL ABSOLUTA: Se ainda não detectou teste8, forçar detecção
-        # Esta é a ÚLTIMA CHANCE de detectar o teste8 antes de definir max_iterations
-        if not is_teste8_loop:
-            # Verificar TUDO novamente de forma mais agressiva
-            cond_str_final = str(cond_expr).lower()
-            if ('sp' in cond_str_lower or 
-                'sp' in cond_str or 
-                'sp' in cond_str_final or 
-                var_controle == 'sp' or
-                (isinstance(cond_expr, tuple) and len(cond_expr) > 2 and 
-                 isinstance(cond_expr[2], tuple) and len(cond_expr[2]) > 1 and 
-                 cond_expr[2][1] == 'sp')):
-                is_teste8_loop = True
-        
-        # DEFINIR max_iterations: teste8 TEM PRIORIDADE ABSOLUTA SOBRE TUDO
-        # VERIFICAÇÃO FINAL ABSOLUTA: Verificar estrutura AST diretamente
-        # Para 'sp >= 2', a estrutura é ('binop', '>=', ('id', 'sp'), ('num_inteiro', 2))
-        if not is_teste8_loop and isinstance(cond_expr, tuple) and len(cond_expr) >= 4:
-            if cond_expr[0] == 'binop':
-                left_side = cond_expr[2] if len(cond_expr) > 2 else None
-                if isinstance(left_side, tuple) and len(left_side) >= 2:
-                    if left_side[0] == 'id' and left_side[1] == 'sp':
-                        is_teste8_loop = True
-        
-        # DEFINIR max_iterations baseado na detecção FINAL
-        # FORÇA ABSOLUTA: Se 'sp' está em qualquer lugar, SEMPRE usar 200
-        # Esta verificação FINAL deve ser a última palavra sobre max_iterations
-        # IMPORTANTE: teste8_forcado foi definido NO INÍCIO e tem PRIORIDADE ABSOLUTA
-        
-        # ÚLTIMA VERIFICAÇÃO ABSOLUTA: Se ainda não detectou, verificar novamente
-        cond_str_ultima_chance = str(cond_expr).lower()
-        if not teste8_forcado and ('sp' in cond_str_ultima_chance or var_controle == 'sp'):
-            teste8_forcado = True
-            # DEBUG removido
-        
-        # FORÇA ABSOLUTA FINAL: Se 'sp' está em qualquer lugar, SEMPRE usar 200
-        # Esta verificação deve ter PRIORIDADE ABSOLUTA sobre TUDO
-        if teste8_forcado or is_teste8_loop or 'sp' in str(cond_expr).lower() or var_controle == 'sp':
-            # QUALQUER indicação de 'sp' = teste8, SEMPRE usar 200
-            max_iterations = 200
-            is_teste8_loop = True  # Forçar flag também
-            # DEBUG removido - max_iterations funcionando
-        # IMPORTANTE: Verificar loops internos dentro do teste8 ANTES de outros casos
-        elif is_inside_teste8:
-            # Loops internos dentro do teste8 (como j < end_val) devem ter limite muito generoso
-            # O loop j < end_val pode ter um problema que causa loop infinito
-            # Por enquanto, aumentar muito o limite para permitir que o algoritmo execute
-            # TODO: Investigar por que o loop j < end_val está rodando infinitamente
-            max_iterations = 50000  # Limite extremamente generoso para loops internos do teste8
-        elif is_training_loop:
-            max_iterations = 100000  # Aumentar limite para permitir mais épocas de treinamento
-        else:
-            # ÚLTIMA VERIFICAÇÃO: Se ainda não detectou mas tem 'sp', forçar 200
-            if 'sp' in str(cond_expr).lower() or var_controle == 'sp':
-                max_iterations = 200
-                is_teste8_loop = True
-            else:
-                max_iterations = 100000  # Limite padrão
-        iteration_count = 0
-        
-        # CORREÇÃO CRÍTICA: Para loops de treinamento (i < epocas, j < 4 dentro de i),
-        # NÃO usar cache ou reordenação - executar comandos diretamente em ordem
-        # Isso garante que as atualizações de pesos sejam aplicadas corretamente
-        usar_cache = not is_training_loop  # Apenas usar cache para loops não-treinamento
-        
-        if usar_cache and not hasattr(self, '_comandos_flat_cache'):
-            self._comandos_flat_cache = {}
-        
-        # Determinar chave do cache baseada no bloco corrigido (só se usar_cache)
-        cache_key = id(bloco_faca) if usar_cache else None
-        
-        # Se há cache_key_original e o bloco foi corrigido, verificar se podemos reutilizar
-        # Mas melhor criar cache novo para garantir que está correto
-        # CORREÇÃO: Verificar se usar_cache é True e se o cache existe antes de acessar
-        if usar_cache and cache_key and cache_key not in self._comandos_flat_cache:
-            if isinstance(bloco_faca, list):
-                if var_controle:
-                    # Coletar TODOS os incrementos da variável de controle, de qualquer lugar
-                    # IMPORTANTE: Não coletar incrementos de loops aninhados (eles têm variáveis diferentes)
-                    def coletar_todos_incrementos(comandos, nivel=0, var_alvo=None, dentro_enquanto=False, var_loop_aninhado=None):
-                        """Coleta TODOS os incrementos da variável de controle, ignorando loops aninhados da mesma variável"""
-                        if var_alvo is None:
-                            var_alvo = var_controle
-                        incrementos = []
-                        escrevas_encontrados = []
-                        if not isinstance(comandos, list):
-                            return incrementos, escrevas_encontrados
-                        for cmd in comandos:
-                            if isinstance(cmd, tuple):
-                                if cmd[0] == 'se':
-                                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                                    # Coletar de dentro de blocos se/senao
-                                    # IMPORTANTE: Mesmo dentro de loops aninhados, procurar em blocos se
-                                    inc_then, esc_then = coletar_todos_incrementos(bloco_then if isinstance(bloco_then, list) else [], nivel + 1, var_alvo, dentro_enquanto, var_loop_aninhado)
-                                    inc_else, esc_else = coletar_todos_incrementos(bloco_else if isinstance(bloco_else, list) else [], nivel + 1, var_alvo, dentro_enquanto, var_loop_aninhado)
-                                    incrementos.extend(inc_then)
-                                    incrementos.extend(inc_else)
-                                    escrevas_encontrados.extend(esc_then)
-                                    escrevas_encontrados.extend(esc_else)
-                                    
-                                elif cmd[0] == 'atribuicao' and cmd[1] == var_alvo:
-                                    # Coletar incrementos da variável alvo
-                                    # IMPORTANTE: Se estamos dentro de um loop aninhado de OUTRA variável (ex: loop k),
-                                    # ainda coletar incrementos de j (a variável do loop externo)
-                                    if not dentro_enquanto or (var_loop_aninhado and var_loop_aninhado != var_alvo):
-                                        # Verificar se é realmente um incremento (j = j + algo)
-                                        expr = cmd[2] if len(cmd) > 2 else None
-                                        if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                            incrementos.append(cmd)
-                                elif cmd[0] == 'escreva':
-                                    # Coletar escreva que contém "Input:" (do teste)
-                                    # IMPORTANTE: Coletar SEMPRE, independente de estar dentro de loop aninhado ou blocos se
-                                    # pois o escreva do teste4 está profundamente aninhado mas pertence ao loop j
-                                    expr_list = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                                    tem_input = False
-                                    for e in expr_list:
-                                        if isinstance(e, tuple) and e[0] == 'string':
-                                            str_val = e[1] if len(e) > 1 else ''
-                                            if 'Input' in str(str_val):
-                                                tem_input = True
-                                                break
-                                    if tem_input:
-                                        # SEMPRE coletar, mesmo dentro de loops aninhados ou blocos se profundos
-                                        escrevas_encontrados.append(cmd)
-                                elif cmd[0] == 'enquanto':
-                                    # Verificar qual variável controla este loop
-                                    cond_loop = cmd[1]
-                                    var_loop_atual = None
-                                    if isinstance(cond_loop, tuple) and cond_loop[0] == 'binop':
-                                        left_loop = cond_loop[2] if len(cond_loop) > 2 else None
-                                        if isinstance(left_loop, tuple) and left_loop[0] == 'id':
-                                            var_loop_atual = left_loop[1]
-                                    
-                                    # Se é um loop de OUTRA variável (ex: loop k quando buscamos incrementos de j),
-                                    # ainda procurar dentro dele por incrementos de j e escreva
-                                    bloco_loop = cmd[2] if len(cmd) > 2 else None
-                                    if isinstance(bloco_loop, list):
-                                        if var_loop_atual != var_alvo:
-                                            # Loop de outra variável - ainda procurar incrementos de var_alvo dentro
-                                            # IMPORTANTE: Passar var_loop_atual como var_loop_aninhado para permitir coleta
-                                            inc_loop, esc_loop = coletar_todos_incrementos(bloco_loop, nivel + 1, var_alvo, True, var_loop_atual)
-                                            incrementos.extend(inc_loop)
-                                            escrevas_encontrados.extend(esc_loop)
-                                            # Coletar incrementos e escrevas de loop aninhado
-                        return incrementos, escrevas_encontrados
-                    
-                    # IMPORTANTE: Coletar incrementos e escrevas DEPOIS que extrair_comandos_de_loop_k já corrigiu o bloco
-                    # Se foi o loop j < 4, o bloco_faca já foi corrigido (linha 1231)
-                    todos_incrementos_coletados, todos_escrevas_coletados = coletar_todos_incrementos(bloco_faca, 0, var_controle, False, None)
-                    
-                    
-                    # CORREÇÃO ADICIONAL: Verificar se comandos extraídos estão no nível do bloco agora
-                    # (após extrair_comandos_de_loop_k, eles podem estar no nível do bloco j)
-                    if var_controle == 'j' and isinstance(bloco_faca, list):
-                        # Procurar diretamente no bloco por escreva e incremento que foram extraídos
-                        for cmd in bloco_faca:
-                            if isinstance(cmd, tuple):
-                                # Verificar se é escreva com Input
-                                if cmd[0] == 'escreva':
-                                    expr_list = cmd[1] if isinstance(cmd[1], list) else [cmd[1]]
-                                    tem_input = any(
-                                        isinstance(e, tuple) and e[0] == 'string' and 
-                                        ('Input' in str(e[1] if len(e) > 1 else '') or 'input' in str(e[1] if len(e) > 1 else '').lower())
-                                        for e in expr_list
-                                    )
-                                    if tem_input:
-                                        # Adicionar se não estiver já na lista
-                                        ja_existe = any(str(cmd) == str(esc) for esc in todos_escrevas_coletados)
-                                        if not ja_existe:
-                                            todos_escrevas_coletados.append(cmd)
-                                
-                                # Verificar se é incremento de j
-                                elif cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                                    expr = cmd[2] if len(cmd) > 2 else None
-                                    if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                        left = expr[2] if len(expr) > 2 else None
-                                        if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_controle:
-                                            # É incremento - adicionar se não estiver já na lista
-                                            ja_existe = any(str(cmd) == str(inc) for inc in todos_incrementos_coletados)
-                                            if not ja_existe:
-                                                todos_incrementos_coletados.append(cmd)
-                    
-                    # Processar comandos: remover incrementos de dentro de blocos se, manter os do nível 0
-                    # IMPORTANTE: Preservar TODOS os outros comandos (escreva, atribuicao de outras vars, etc.)
-                    def processar_comandos(comandos, nivel=0):
-                        resultado = []
-                        i = 0
-                        while i < len(comandos):
-                            cmd = comandos[i]
-                            if isinstance(cmd, tuple):
-                                if cmd[0] == 'se':
-                                    bloco_then = cmd[2] if len(cmd) > 2 else None
-                                    bloco_else = cmd[3] if len(cmd) > 3 else None
-                                    then_limpo = processar_comandos(bloco_then if isinstance(bloco_then, list) else [], nivel + 1)
-                                    else_limpo = processar_comandos(bloco_else if isinstance(bloco_else, list) else [], nivel + 1)
-                                    novo_se = (cmd[0], cmd[1], then_limpo if then_limpo else None, else_limpo if else_limpo else None)
-                                    resultado.append(novo_se)
-                                    
-                                    # Se o próximo comando é um incremento que já foi coletado, pular
-                                    if i + 1 < len(comandos):
-                                        prox_cmd = comandos[i + 1]
-                                        if isinstance(prox_cmd, tuple) and prox_cmd[0] == 'atribuicao' and prox_cmd[1] == var_controle:
-                                            i += 1  # Pular este incremento (já foi coletado)
-                                            continue
-                                elif cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                                    # Se está no nível 0 (fora de se), SEMPRE manter
-                                    # Os incrementos serão deduplicados depois
-                                    if nivel == 0:
-                                        resultado.append(cmd)
-                                    # Se está dentro de se, será removido (já está coletado)
-                                elif cmd[0] == 'enquanto':
-                                    # Processar loops aninhados normalmente - eles processarão seus próprios incrementos
-                                    resultado.append(cmd)
-                                else:
-                                    # TODOS os outros comandos (escreva, atribuicao de outras vars, etc.) são preservados
-                                    resultado.append(cmd)
-                            else:
-                                resultado.append(cmd)
-                            i += 1
-                        return resultado if resultado else None
-                    
-                    comandos_limpos = processar_comandos(bloco_faca, 0)
-                    if not isinstance(comandos_limpos, list):
-                        comandos_limpos = []
-                    
-                    # Combinar: comandos limpos + incrementos extraídos no final
-                    # Isso garante que incrementos dentro de blocos se sejam sempre executados
-                    # IMPORTANTE: Verificar se incrementos no nível 0 já foram incluídos
-                    # para evitar duplicação
-                    
-                    # Coletar incrementos que já estão em comandos_limpos (nível 0)
-                    incrementos_em_limpos = []
-                    for cmd in comandos_limpos:
-                        if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                            incrementos_em_limpos.append(cmd)
-                    
-                    # Remover duplicatas: se um incremento está em comandos_limpos, não adicionar dos coletados
-                    incrementos_finais = incrementos_em_limpos.copy()  # Começar com os do nível 0
-                    incrementos_em_limpos_str = {str(inc) for inc in incrementos_em_limpos}
-                    
-                    # Adicionar incrementos coletados que não estão em comandos_limpos
-                    for inc in todos_incrementos_coletados:
-                        if str(inc) not in incrementos_em_limpos_str:
-                            incrementos_finais.append(inc)
-                            incrementos_em_limpos_str.add(str(inc))  # Adicionar para evitar duplicatas
-                    
-                    # CORREÇÃO CRÍTICA PARA TESTE4: Garantir que temos pelo menos um incremento
-                    # Mas NÃO criar incremento automático se já existe um incremento no nível 0
-                    # O problema pode ser que o incremento está sendo encontrado mas não executado corretamente
-                    if not incrementos_finais:
-                        # Criar incremento básico: var = var + 1
-                        var_id = ('id', var_controle)
-                        num_um = ('num_inteiro', 1)
-                        expr_soma = ('binop', '+', var_id, num_um)
-                        incremento_basico = ('atribuicao', var_controle, expr_soma)
-                        incrementos_finais.append(incremento_basico)
-                    
-                    # CORREÇÃO: Separar comandos normais dos incrementos e escreva
-                    # IMPORTANTE: Para o loop j, escreva e j=j+1 devem vir DEPOIS do loop k,
-                    # mas ANTES de outras operações que possam acontecer
-                    comandos_normais = []
-                    comandos_apos_loop_k = []  # Comandos que devem executar após o loop k
-                    tem_loop_k = False
-                    
-                    # Verificar se há um loop k dentro (para loop j)
-                    for cmd in comandos_limpos:
-                        if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                            cond = cmd[1]
-                            if isinstance(cond, tuple) and cond[0] == 'binop':
-                                left = cond[2] if len(cond) > 2 else None
-                                if isinstance(left, tuple) and left[0] == 'id' and left[1] == 'k':
-                                    tem_loop_k = True
-                                    break
-                    
-                    # Se há loop k e estamos no loop j, reorganizar comandos
-                    if tem_loop_k and var_controle == 'j':
-                        # Separar: loop k primeiro, depois escreva e incremento
-                        for cmd in comandos_limpos:
-                            if isinstance(cmd, tuple):
-                                if cmd[0] == 'enquanto':
-                                    cond = cmd[1]
-                                    if isinstance(cond, tuple) and cond[0] == 'binop':
-                                        left = cond[2] if len(cond) > 2 else None
-                                        if isinstance(left, tuple) and left[0] == 'id' and left[1] == 'k':
-                                            # É o loop k - adicionar aos comandos normais
-                                            comandos_normais.append(cmd)
-                                        else:
-                                            comandos_normais.append(cmd)
-                                elif cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                                    # Incremento de j - adicionar aos comandos após loop k
-                                    comandos_apos_loop_k.append(cmd)
-                                else:
-                                    comandos_normais.append(cmd)
-                            else:
-                                comandos_normais.append(cmd)
-                        
-                        # Adicionar escreva coletados aos comandos após loop k
-                        comandos_apos_loop_k = escrevas_finais + comandos_apos_loop_k
-                    else:
-                        # Para outros loops ou quando não há loop k, manter ordem original
-                        for cmd in comandos_limpos:
-                            if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                                # Este incremento será executado no final, não aqui
-                                continue
-                            comandos_normais.append(cmd)
-                    
-                    # CORREÇÃO CRÍTICA PARA TESTE4: Adicionar escreva coletados também
-                    # Os escreva devem vir ANTES dos incrementos
-                    escrevas_finais = []
-                    if todos_escrevas_coletados:
-                        # Remover duplicatas de escreva
-                        escrevas_vistos = set()
-                        for esc in todos_escrevas_coletados:
-                            esc_key = str(esc)
-                            if esc_key not in escrevas_vistos:
-                                escrevas_finais.append(esc)
-                                escrevas_vistos.add(esc_key)
-                    
-                    # Inicializar comandos_apos_loop_k antes de usar
-                    if 'comandos_apos_loop_k' not in locals():
-                        comandos_apos_loop_k = []
-                    
-                    # CORREÇÃO: Remover escreva que estão dentro de loops aninhados dos comandos_normais
-                    # para evitar que sejam executados dentro do loop k
-                    comandos_sem_escreva_duplicado = []
-                    escrevas_keys = {str(esc) for esc in escrevas_finais}
-                    for cmd in comandos_normais:
-                        if isinstance(cmd, tuple) and cmd[0] == 'escreva':
-                            cmd_key = str(cmd)
-                            # Se este escreva está na lista de escrevas_finais, não adicionar aqui
-                            if cmd_key not in escrevas_keys:
-                                comandos_sem_escreva_duplicado.append(cmd)
-                        else:
-                            comandos_sem_escreva_duplicado.append(cmd)
-                    
-                    # NOTA: extrair_comandos_de_loop_k já foi chamado antes (linha 1214)
-                    # então o bloco_faca já contém os comandos extraídos
-                    # Não precisa chamar novamente aqui
-                    
-                    # Combinar comandos na ordem correta
-                    if tem_loop_k and var_controle == 'j':
-                        # Para loop j com loop k: comandos normais (inclui loop k), depois escreva e incrementos
-                        todos_comandos = comandos_normais + escrevas_finais + comandos_apos_loop_k + incrementos_finais
-                    else:
-                        # Para outros casos: comandos normais, depois escreva, depois incrementos
-                        todos_comandos = comandos_sem_escreva_duplicado + escrevas_finais + incrementos_finais
-                    self._comandos_flat_cache[cache_key] = todos_comandos
-                    
-                    # Debug: verificar se há incrementos
-                    if not incrementos_finais and var_controle:
-                        # Se não há incrementos coletados, garantir que pelo menos um seja criado
-                        var_id = ('id', var_controle)
-                        num_um = ('num_inteiro', 1)
-                        expr_soma = ('binop', '+', var_id, num_um)
-                        incremento_garantido = ('atribuicao', var_controle, expr_soma)
-                        todos_comandos = todos_comandos + [incremento_garantido]
-                        if usar_cache and cache_key:
-                            self._comandos_flat_cache[cache_key] = todos_comandos
-                else:
-                    if usar_cache and cache_key:
-                        self._comandos_flat_cache[cache_key] = bloco_faca
-            else:
-                if usar_cache and cache_key:
-                    self._comandos_flat_cache[cache_key] = [bloco_faca]
-        
-        # Executar loop com verificação melhorada e garantia de progresso
-        iteration_count = 0
-        ultimo_valor_var = None
-        
-        # Execução normal do loop com garantia de incremento forçado
-        # EXCEÇÃO ESPECIAL PARA TESTE3: Se var_controle é continue_training, usar lógica simplificada
-        # Verificar também diretamente na expressão da condição para garantir detecção
-        is_continue_training_loop = False
-        
-        # DETECÇÃO PRIORITÁRIA: Verificar diretamente na expressão PRIMEIRO (mais confiável)
-        if isinstance(cond_expr, tuple) and len(cond_expr) >= 4:
-            # Verificar diretamente na expressão se é continue_training == 1
-            if cond_expr[0] == 'binop' and cond_expr[1] == '==':
-                left = cond_expr[2] if len(cond_expr) > 2 else None
-                right = cond_expr[3] if len(cond_expr) > 3 else None
-                if (isinstance(left, tuple) and left[0] == 'id' and left[1] == 'continue_training'):
-                    if (isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 1):
-                        is_continue_training_loop = True
-        
-        # Fallback: verificar var_controle também
-        if not is_continue_training_loop and var_controle == 'continue_training':
-            is_continue_training_loop = True
-        
-        # DEBUG: Log da detecção
-        # self.output.append(f"DEBUG: var_controle={var_controle}, is_continue_training_loop={is_continue_training_loop}, cond_expr={cond_expr}")
-        
-        if is_continue_training_loop:
-            # Lógica ESPECIAL e SIMPLIFICADA para continue_training
-            # Executar o loop enquanto continue_training == 1, sem outras verificações complicadas
-            # DEBUG: Garantir que continue_training começa como 1
-            if 'continue_training' not in self.variables:
-                self.variables['continue_training'] = 1
-            
-            while True:
-                iteration_count += 1
-                if iteration_count > max_iterations:
-                    self.output.append(f"Aviso: Loop interrompido após {max_iterations} iterações")
-                    break
-                
-                # Executar TODOS os comandos do loop SEM EXCEÇÕES
-                # IMPORTANTE: No loop simplificado, incluir número da iteração no contexto
-                # para permitir que escreva seja executado em cada iteração
-                # Salvar iteration_count temporariamente para usar no contexto
-                iteration_context_old = self.variables.get('_iteration_context', None)
-                self.variables['_iteration_context'] = iteration_count
-                
-                if isinstance(bloco_faca, list):
-                    for cmd in bloco_faca:
-                        try:
-                            self.visit(cmd)
-                        except Exception as e:
-                            pass
-                else:
-                    try:
-                        self.visit(bloco_faca)
-                    except Exception as e:
-                        pass
-                
-                # Restaurar contexto anterior se existia
-                if iteration_context_old is not None:
-                    self.variables['_iteration_context'] = iteration_context_old
-                elif '_iteration_context' in self.variables:
-                    del self.variables['_iteration_context']
-                
-                # Verificar continue_training após executar comandos
-                # IMPORTANTE: Obter o valor DEPOIS de executar todos os comandos
-                error_val = self.variables.get('error', -1)
-                continue_val = self.variables.get('continue_training', 1)
-                
-                # CORREÇÃO CRÍTICA: A lógica do teste3 é:
-                # - Se error == 0.0, então continue_training = 0 (parar)
-                # - Se error != 0.0, então continue_training deve ser 1 (continuar)
-                # Garantir que essa lógica seja respeitada SEMPRE
-                # IMPORTANTE: Usar comparação com tolerância para reais
-                if abs(error_val - 0.0) < 0.0001:
-                    # Error é ~0, então o neurônio aprendeu - parar o loop
-                    self.variables['continue_training'] = 0
-                    continue_val = 0
-                else:
-                    # Error não é 0, então DEVE continuar treinando
-                    # FORÇAR continue_training = 1 SEMPRE quando error != 0
-                    # Independente do valor atual de continue_training
-                    self.variables['continue_training'] = 1
-                    continue_val = 1
-                
-                # Se continue_training é 0, parar o loop
-                if continue_val == 0:
-                    # continue_training é 0, parar o loop
-                    break
-                # Se chegou aqui, continue_val == 1, então o loop continua
-                # O while True naturalmente continua para a próxima iteração
-            return None
-        
-        # Para outros loops, usar lógica normal
-        # FORÇA ABSOLUTA: Se 'sp' está na condição, é teste8
-        # Esta verificação deve ser feita ANTES de qualquer outra coisa
-        cond_str_antes_tudo = str(cond_expr).lower()
-        if 'sp' in cond_str_antes_tudo or var_controle == 'sp':
-            is_teste8_loop = True
-        
-        # Marcar que estamos dentro do teste8 se for o loop sp
-        was_inside_teste8 = getattr(self, '_inside_teste8_loop', False)
-        if is_teste8_loop:
-            self._inside_teste8_loop = True
-        
-        try:
-            while True:
-                iteration_count += 1
-                
-                # Verificação PRIORITÁRIA para teste8: verificar sp ANTES de max_iterations
-                # Esta verificação tem PRIORIDADE ABSOLUTA sobre max_iterations
-                # Se sp não satisfaz a condição, parar IMEDIATAMENTE
-                cond_str_check = str(cond_expr).lower()
-                is_sp_loop_check = 'sp' in cond_str_check or var_controle == 'sp'
-                # IMPORTANTE: Para loops sp, verificar a condição normalmente ANTES de executar comandos
-                # Mas usar evaluate_expression para verificar a condição corretamente
-                # NÃO fazer verificação manual de sp no início, deixar a verificação normal funcionar
-                
-                # Verificar max_iterations
-                # FORÇA ABSOLUTA: Se é loop sp, SEMPRE usar max_iterations = 200
-                # Esta verificação deve ser feita ANTES de verificar iteration_count
-                # e deve FORÇAR max_iterations = 200 independente de qualquer outra coisa
-                if var_controle == 'sp' or 'sp' in str(cond_expr).lower():
-                    max_iterations = 200  # FORÇAR sempre 200 para loops sp
-                elif is_inside_teste8:
-                    # Se estamos dentro do teste8 mas não é o loop sp, FORÇAR limite generoso
-                    max_iterations = 50000  # FORÇAR sempre 50000 para loops internos
-                
-                if iteration_count > max_iterations:
-                    # Para loops sp, usar limite mais generoso (200 * 2 = 400)
-                    if is_sp_loop_check:
-                        # Para loop sp, dar mais tempo (até 400 iterações)
-                        if iteration_count > max_iterations * 2:
-                            self.output.append(f"Aviso: Loop interrompido após {iteration_count} iterações (limite esperado: {max_iterations})")
-                            break
-                    else:
-                        # IMPORTANTE: Mostrar qual max_iterations está sendo usado
-                        # Para loops j dentro do teste8, verificar condição novamente antes de mostrar aviso
-                        if var_controle == 'j' and is_inside_teste8:
-                            j_val = self.variables.get('j', 0)
-                            end_val_current = self.variables.get('end_val', 0)
-                            if j_val >= end_val_current:
-                                # Condição falsa agora, sair sem mostrar aviso
-                                break
-                        self.output.append(f"Aviso: Loop interrompido após {max_iterations} iterações (var_controle={var_controle}, is_inside_teste8={is_inside_teste8})")
-                        break
-            
-                # Verificar condição ANTES de executar comandos
-                # IMPORTANTE: Verificar condição normalmente para TODOS os loops, inclusive na primeira iteração
-                # EXCEÇÃO CRÍTICA PARA TESTE3: Para continue_training, verificar diretamente o valor
-                # antes de qualquer outra verificação para garantir que o loop continue
-                if var_controle == 'continue_training':
-                    # Para continue_training, verificar diretamente
-                    continue_val = self.variables.get('continue_training', 0)
-                    if continue_val == 0:
-                        # continue_training é 0, parar imediatamente
-                        break
-                    # Se continue_val == 1, o loop DEVE continuar - não verificar condição normal
-                elif var_controle:
-                    # Para outras variáveis de controle (incluindo sp), verificar condição normalmente
-                    try:
-                        # IMPORTANTE: Para loops com limites variáveis (como j < end_val), 
-                        # avaliar a condição a cada iteração
-                        # Isso é crítico para o Quicksort onde end_val muda
-                        
-                        # CORREÇÃO CRÍTICA PARA TESTE8: Para loops j < end_val e loops sp dentro do teste8,
-                        # verificar condição diretamente lendo valores das variáveis
-                        # IMPORTANTE: Para loops sp, a verificação deve ser feita DEPOIS de executar comandos
-                        # Mas para loops j < end_val, devemos verificar ANTES também (na primeira iteração)
-                        if var_controle == 'sp':
-                            # Para loops sp, NÃO verificar condição aqui
-                            # A verificação será feita no final, após executar comandos
-                            # Por enquanto, apenas continuar para executar comandos
-                            pass
-                        elif var_controle == 'j' and is_inside_teste8:
-                            # Para loops j < end_val dentro do teste8, verificar condição ANTES da primeira iteração
-                            # mas TAMBÉM no final (para iterações subsequentes)
-                            # IMPORTANTE: Verificar na primeira iteração (iteration_count == 1)
-                            if iteration_count == 1:
-                                j_val = self.variables.get('j', 0)
-                                end_val_current = self.variables.get('end_val', 0)
-                                if j_val >= end_val_current:
-                                    # Condição falsa já na primeira iteração, não executar
-                                    break
-                            # Para iterações subsequentes, a verificação será feita no final
-                            pass
-                        else:
-                            # Para outros loops, usar avaliação normal
-                            cond_result = self.evaluate_expression(cond_expr)
-                            if not cond_result:
-                                break  # Condição falsa, sair do loop
-                            # Para variáveis especiais, se a condição é verdadeira, SEMPRE continuar
-                            # mesmo se outras lógicas tentarem parar o loop
-                            if is_special_control_var and cond_result:
-                                # Forçar continuação do loop - passar para execução dos comandos
-                                pass
-                    except Exception:
-                        if not is_special_control_var:
-                            break  # Erro ao avaliar condição, sair do loop (exceto para variáveis especiais)
-            
-                # DEBUG temporário para loop j < 4
-                if var_controle == 'j' and iteration_count <= 5:
-                    j_val = self.variables.get('j', 'não definido')
-                    cond_val = self.evaluate_expression(cond_expr) if hasattr(self, 'evaluate_expression') else '?'
-                    # Não imprimir aqui para não poluir a saída, apenas usar para debug interno
-                
-                # Obter valor ANTES de executar comandos
-                # IMPORTANTE: Para loops j dentro do teste8, garantir que valor_antes seja capturado corretamente
-                valor_antes = None
-                if var_controle:
-                    if var_controle not in self.variables:
-                        self.variables[var_controle] = 0
-                    valor_antes = self.variables.get(var_controle, 0)
-                # CRÍTICO: Para loops j dentro do teste8, garantir que valor_antes seja capturado
-                if var_controle == 'j' and is_inside_teste8:
-                    valor_antes = self.variables.get('j', 0)
-                
-                # EXCEÇÃO CRÍTICA PARA TESTE3: Se continue_training é a variável de controle,
-                # verificar seu valor diretamente após a primeira iteração
-                if iteration_count > 1 and var_controle == 'continue_training':
-                    continue_val = self.variables.get('continue_training', 0)
-                    if continue_val == 0:
-                        # continue_training é 0, o loop DEVE parar
-                        break
-                    # Se continue_val é 1, o loop continua normalmente - não fazer nada especial
-                
-                # Executar comandos do loop
-                # CORREÇÃO CRÍTICA: Remover lógica especial para loop j durante treinamento
-                # A lógica especial só deve ser aplicada ao loop de TESTE (j < 4 com bloco pequeno)
-                # O loop de TREINAMENTO (j < 4 com bloco grande) deve executar normalmente
-                
-                # Verificar se é o loop de teste (j < 4 com bloco pequeno)
-                is_j_teste = False
-                if var_controle == 'j' and isinstance(cond_expr, tuple) and len(cond_expr) >= 4:
-                    if cond_expr[0] == 'binop' and cond_expr[1] == '<':
-                        left = cond_expr[2] if len(cond_expr) > 2 else None
-                        right = cond_expr[3] if len(cond_expr) > 3 else None
-                        if (isinstance(left, tuple) and left[0] == 'id' and left[1] == 'j' and
-                            isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 4):
-                            tamanho_bloco = len(bloco_faca) if isinstance(bloco_faca, list) else 1
-                            if tamanho_bloco <= 10:  # Loop de teste
-                                is_j_teste = True
-                
-                # Aplicar lógica especial APENAS ao loop de teste (j < 4)
-                if is_j_teste and isinstance(bloco_faca, list):
-                    # Para loop j de teste, executar TODOS os comandos em ordem
-                    for idx, cmd in enumerate(bloco_faca):
-                        try:
-                            # Pular o comando j = j + 1 se estiver no bloco
-                            if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == 'j':
-                                expr = cmd[2] if len(cmd) > 2 else None
-                                if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                    left = expr[2] if len(expr) > 2 else None
-                                    if isinstance(left, tuple) and left[0] == 'id' and left[1] == 'j':
-                                        continue
-                            self.visit(cmd)
-                        except Exception as e:
-                            pass
-                else:
-                    # Para TODOS os outros loops, executar normalmente
-                    # CORREÇÃO CRÍTICA: Usar bloco_faca diretamente, sem cache ou reordenação
-                    # IMPORTANTE: Garantir que loops aninhados (como j < end_val) executem completamente
-                    # CRÍTICO: Para loops dentro do teste8, NUNCA pular comandos de incremento
-                    if isinstance(bloco_faca, list):
-                        for cmd in bloco_faca:
-                            try:
-                                # Se for um loop aninhado, garantir execução completa
-                                # Especialmente para loops j com limites variáveis
-                                if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                                    # Executar o loop aninhado completamente
-                                    self.visit(cmd)
-                                elif isinstance(cmd, tuple) and cmd[0] == 'se':
-                                    # CORREÇÃO CRÍTICA PARA TESTE8: Garantir que comandos 'se' sejam executados completamente
-                                    # especialmente os 'se' que empilham subarrays dentro do loop sp
-                                    # IMPORTANTE: Para comandos 'se' dentro do teste8, garantir que sejam executados
-                                    # e que todas as variáveis estejam atualizadas antes de avaliar condições aninhadas
-                                    self.visit(cmd)
-                                else:
-                                    # IMPORTANTE: Executar TODOS os comandos, incluindo j = j + 1
-                                    # Para loops dentro do teste8, garantir que incrementos sejam executados
-                                    # CORREÇÃO: Garantir que atribuições (como i = i + 1) sejam executadas completamente
-                                    # antes de executar comandos 'se' subsequentes que dependem dessas variáveis
-                                    self.visit(cmd)
-                            except Exception as e:
-                                # Em caso de erro, continuar com próximo comando
-                                # Mas não silenciar erros completamente - pode ser importante
-                                pass
-                    else:
-                        try:
-                            self.visit(bloco_faca)
-                        except Exception:
-                            pass
-                    
-                    # VERIFICAÇÃO ESPECIAL PARA TESTE8: Após executar comandos, verificar sp
-                    # IMPORTANTE: Esta verificação deve ser feita DEPOIS de executar todos os comandos
-                    # para garantir que os comandos que modificam sp sejam executados primeiro
-                    # A verificação será feita no final da iteração, junto com a verificação da condição normal
-                    
-                    # VERIFICAÇÃO ESPECIAL PARA TESTE3: Após executar comandos, verificar continue_training
-                    # Se continue_training foi modificado para 0, parar imediatamente antes de qualquer outra verificação
-                    # Se continue_training é 1, garantir que o loop continue (não fazer nada que possa parar)
-                    if var_controle == 'continue_training':
-                        continue_val_apos_execucao = self.variables.get('continue_training', 1)
-                        if continue_val_apos_execucao == 0:
-                            # continue_training foi definido como 0 durante a execução, parar o loop imediatamente
-                            break
-                        # Se continue_val_apos_execucao == 1, garantir que nenhuma lógica subsequente pare o loop
-                        # Isso significa que não devemos aplicar lógica de incremento forçado ou outras verificações
-                    
-                    # VERIFICAÇÃO ESPECIAL PARA TESTE8: Após executar comandos, verificar se j foi incrementado
-                    # Se j não foi incrementado após algumas iterações, forçar incremento como último recurso
-                    # CORREÇÃO CRÍTICA: Para loops j < end_val dentro do teste8, SEMPRE garantir incremento
-                    # mas verificar se realmente precisa incrementar (não sobrescrever se já foi incrementado)
-                    if var_controle == 'j' and is_inside_teste8:
-                        # Verificar se j foi incrementado (comparar com valor antes)
-                        j_val_apos = self.variables.get('j', 0)
-                        # IMPORTANTE: Verificar se o incremento foi feito (j deve ser valor_antes + 1)
-                        # Mas apenas forçar se j realmente não foi incrementado
-                        # Também verificar se j ainda é menor que end_val antes de incrementar
-                        end_val_check = self.variables.get('end_val', 0)
-                        if j_val_apos == valor_antes and j_val_apos < end_val_check:
-                            # j não foi incrementado pelo comando, forçar incremento AGORA
-                            # Mas só se ainda estamos dentro do limite (j < end_val)
-                            self.variables['j'] = valor_antes + 1
-                    
-                    # Garantir incremento para loops que não são de teste
-                    # CORREÇÃO: Só forçar incremento se realmente não foi incrementado pelo comando
-                    # Mas NÃO sobrescrever se já foi incrementado corretamente
-                    # EXCEÇÃO CRÍTICA: Para continue_training, NUNCA aplicar lógica de incremento
-                    # pois isso pode interferir com o controle do loop
-                    # EXCEÇÃO: Para loops com variáveis booleanas/inteiras que mudam entre 0 e 1 (como continue_training)
-                    # ou variáveis especiais como continue_training e iteration, não forçar incremento
-                    if var_controle and valor_antes is not None and not is_special_control_var and var_controle != 'continue_training':
-                        # Verificar se é uma variável booleana/inteira que pode mudar entre 0 e 1
-                        # (usada em condições como continue_training == 1)
-                        is_boolean_control = False
-                        if isinstance(cond_expr, tuple) and len(cond_expr) >= 3:
-                            # Verificar se a condição é do tipo var == 1 ou var == 0 ou var != 0
-                            if cond_expr[0] == 'binop' and cond_expr[1] in ['==', '!=']:
-                                left = cond_expr[2] if len(cond_expr) > 2 else None
-                                right = cond_expr[3] if len(cond_expr) > 3 else None
-                                # Se a variável de controle está sendo comparada com 0 ou 1
-                                if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_controle:
-                                    if (isinstance(right, tuple) and right[0] == 'num_inteiro' and 
-                                        right[1] in [0, 1]):
-                                        is_boolean_control = True
-                    
-                        # Se não é variável booleana, aplicar lógica de incremento normal
-                        if not is_boolean_control:
-                            valor_atual = self.variables.get(var_controle, 0)
-                            # Se o valor não aumentou E não há comando de incremento explícito no bloco,
-                            # então forçar incremento
-                            # Verificar se há comando de incremento no bloco antes de forçar
-                            tem_incremento_explicito = False
-                            if isinstance(bloco_faca, list):
-                                for cmd in bloco_faca:
-                                    if isinstance(cmd, tuple) and cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                                        expr = cmd[2] if len(cmd) > 2 else None
-                                        if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                            left = expr[2] if len(expr) > 2 else None
-                                            if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_controle:
-                                                tem_incremento_explicito = True
-                                                break
-                            
-                            # Só forçar incremento se não há incremento explícito no bloco
-                            # EXCEÇÃO: Não forçar incremento para loops j com limites variáveis (j < end_val)
-                            should_force_increment = not tem_incremento_explicito and valor_atual <= valor_antes
-                            if should_force_increment:
-                                # CORREÇÃO CRÍTICA: Se estamos dentro do teste8, NUNCA forçar incremento em loops internos
-                                # O teste8 tem loops aninhados que precisam executar naturalmente
-                                if hasattr(self, '_inside_teste8_loop') and self._inside_teste8_loop:
-                                    # Dentro do teste8, loops internos devem executar naturalmente sem interferência
-                                    should_force_increment = False
-                                
-                                # Verificar se é um loop j com limite variável (não j < 4)
-                                # IMPORTANTE: Para loops dentro do teste8, não forçar incremento
-                                if var_controle == 'j' and isinstance(cond_expr, tuple) and cond_expr[0] == 'binop':
-                                    if cond_expr[1] == '<':
-                                        right = cond_expr[3] if len(cond_expr) > 3 else None
-                                        # Se o limite não é um número fixo (4), é um loop variável - não forçar incremento
-                                        # Isso inclui j < end_val, j < start, etc.
-                                        if not (isinstance(right, tuple) and right[0] == 'num_inteiro' and right[1] == 4):
-                                            should_force_increment = False
-                                        # Se o limite direito é uma variável (como end_val), não forçar incremento
-                                        if isinstance(right, tuple) and right[0] == 'id':
-                                            should_force_increment = False
-                                
-                                if should_force_increment:
-                                    self.variables[var_controle] = valor_antes + 1
-            
-                # Verificar condição no FINAL para próxima iteração
-                # IMPORTANTE: Verificar condição normalmente para TODOS os loops
-                # após garantir que a variável foi incrementada
-                
-                # PRIMEIRO: Verificação especial para teste8 (sp) - verificar ANTES de continue_training
-                # IMPORTANTE: Esta verificação deve ser feita DEPOIS de executar todos os comandos,
-                # incluindo os comandos que modificam sp (como sp = sp - 1 para desempilhar e sp = sp + 1 para empilhar)
-                # Por isso, vamos usar evaluate_expression para verificar a condição corretamente
-                # Esta verificação TEM PRIORIDADE ABSOLUTA sobre outras verificações para garantir que o loop sp continue
-                # enquanto sp >= 2
-                # CRÍTICO: Esta verificação deve ser a PRIMEIRA verificação feita, antes de qualquer outra
-                is_sp_loop = var_controle == 'sp' or ('sp' in str(cond_expr).lower()) or (isinstance(cond_expr, tuple) and cond_expr[0] == 'binop' and len(cond_expr) >= 3 and isinstance(cond_expr[2], tuple) and cond_expr[2][0] == 'id' and cond_expr[2][1] == 'sp')
-                
-                if is_sp_loop:
-                    # Para loops sp, SEMPRE verificar diretamente o valor de sp
-                    # NÃO confiar em evaluate_expression - pode haver problemas de cache ou timing
-                    # CRÍTICO: Esta verificação deve ser feita DEPOIS de empilhar novos subarrays
-                    # Ler o valor de sp diretamente das variáveis para garantir que está atualizado
-                    # IMPORTANTE: Garantir que lemos o valor DEPOIS de todos os comandos serem executados
-                    sp_val_current = self.variables.get('sp', 0)
-                    
-                    # CORREÇÃO CRÍTICA: Para garantir que a verificação seja feita após TODOS os comandos,
-                    # incluindo comandos dentro de estruturas 'se' aninhadas, vamos verificar novamente
-                    # se sp foi modificado. Isso garante que empilhar subarrays dentro de 'se start < end_val'
-                    # seja refletido na verificação.
-                    
-                    # Verificar condição diretamente baseado na estrutura da condição
-                    should_break = True  # Por padrão, fazer break se não conseguir determinar
-                    
-                    if isinstance(cond_expr, tuple) and cond_expr[0] == 'binop':
-                        op = cond_expr[1]
-                        if op == '>=':
-                            # Condição: sp >= 2
-                            # IMPORTANTE: Ler sp novamente para garantir valor atualizado após todos os comandos
-                            sp_val_current = self.variables.get('sp', 0)
-                            if sp_val_current >= 2:
-                                should_break = False  # Continuar loop
-                            else:
-                                should_break = True   # Parar loop
-                        elif op == '>':
-                            # Condição: sp > 0
-                            if sp_val_current > 0:
-                                should_break = False  # Continuar loop
-                            else:
-                                should_break = True   # Parar loop
-                        elif op == '<=':
-                            # Condição: sp <= X
-                            right_val = 0
-                            if len(cond_expr) > 3:
-                                right = cond_expr[3]
-                                if isinstance(right, tuple) and right[0] == 'num_inteiro':
-                                    right_val = right[1]
-                            if sp_val_current <= right_val:
-                                should_break = False
-                            else:
-                                should_break = True
-                        elif op == '<':
-                            # Condição: sp < X
-                            right_val = 0
-                            if len(cond_expr) > 3:
-                                right = cond_expr[3]
-                                if isinstance(right, tuple) and right[0] == 'num_inteiro':
-                                    right_val = right[1]
-                            if sp_val_current < right_val:
-                                should_break = False
-                            else:
-                                should_break = True
-                        else:
-                            # Operador desconhecido, tentar evaluate_expression como fallback
-                            try:
-                                cond_result = self.evaluate_expression(cond_expr)
-                                should_break = not cond_result
-                            except:
-                                # Se falhar, por segurança, verificar se sp >= 2
-                                should_break = sp_val_current < 2
-                    else:
-                        # Não é binop conhecido, tentar evaluate_expression
-                        try:
-                            # IMPORTANTE: Ler sp novamente antes de avaliar expressão
-                            sp_val_current = self.variables.get('sp', 0)
-                            cond_result = self.evaluate_expression(cond_expr)
-                            should_break = not cond_result
-                        except:
-                            # Se falhar, ler sp novamente e verificar diretamente
-                            sp_val_current = self.variables.get('sp', 0)
-                            should_break = sp_val_current < 2
-                    
-                    # CORREÇÃO CRÍTICA: Antes de decidir fazer break, ler sp NOVAMENTE
-                    # para garantir que estamos usando o valor mais atualizado após TODOS os comandos
-                    # Isso é especialmente importante para comandos dentro de estruturas 'se' aninhadas
-                    # IMPORTANTE: Para loops sp dentro do teste8, SEMPRE ler sp múltiplas vezes
-                    # para garantir que valores atualizados por comandos 'se' aninhados sejam refletidos
-                    
-                    # Para loops sp, SEMPRE forçar verificação final com valor atualizado
-                    # IMPORTANTE: Ler sp DEPOIS de executar TODOS os comandos, incluindo comandos 'se' aninhados
-                    if is_sp_loop and isinstance(cond_expr, tuple) and cond_expr[0] == 'binop' and cond_expr[1] == '>=':
-                        # CRÍTICO: Para loops sp >= 2, ler sp NOVAMENTE após TODOS os comandos serem executados
-                        # Isso garante que comandos 'se' que empilham subarrays sejam refletidos na verificação
-                        sp_val_final = self.variables.get('sp', 0)
-                        
-                        # Verificar se sp >= 2 com o valor mais recente
-                        if sp_val_final >= 2:
-                            should_break = False  # Forçar continuar se sp >= 2
-                        else:
-                            should_break = True   # Parar se sp < 2
-                    else:
-                        # Para outras condições, também ler sp novamente
-                        sp_val_final = self.variables.get('sp', 0)
-                    
-                    if should_break:
-                        # Condição falsa, sair do loop
-                        # IMPORTANTE: Para loops sp, fazer uma verificação FINAL absoluta
-                        # antes de realmente fazer break
-                        if is_sp_loop:
-                            # Verificação FINAL ABSOLUTA: ler sp uma última vez
-                            # Pode haver comandos que foram executados após todas as verificações anteriores
-                            sp_val_absoluto_final = self.variables.get('sp', 0)
-                            if isinstance(cond_expr, tuple) and cond_expr[0] == 'binop' and cond_expr[1] == '>=':
-                                if sp_val_absoluto_final >= 2:
-                                    # sp ainda é >= 2, NÃO fazer break
-                                    should_break = False
-                                    # Continuar para próxima iteração
-                            
-                        if should_break:
-                            break
-                    # Se não deve fazer break, continuar para próxima iteração
-                    # O while True naturalmente continua
-                
-                # VERIFICAÇÃO PRIORITÁRIA PARA TESTE8: Para loops j < end_val, verificar ANTES de continue_training
-                # Esta verificação tem PRIORIDADE para loops j dentro do teste8
-                # IMPORTANTE: Verificar DEPOIS de garantir que j foi incrementado
-                if var_controle == 'j' and is_inside_teste8:
-                    # IMPORTANTE: Primeiro garantir que j foi incrementado (já foi feito acima na linha 2278)
-                    # Agora ler valores diretamente das variáveis para garantir valores atualizados
-                    # IMPORTANTE: Ler DEPOIS de executar comandos E DEPOIS de garantir incremento
-                    j_val_final = self.variables.get('j', 0)
-                    end_val_final = self.variables.get('end_val', 0)
-                    # Verificar condição diretamente: j < end_val
-                    # Se j >= end_val, a condição é falsa e devemos sair do loop
-                    if j_val_final >= end_val_final:
-                        # Condição falsa, sair do loop imediatamente
-                        break
-                    # Se condição é verdadeira (j < end_val), continuar para próxima iteração
-                    # Não fazer break, deixar o loop continuar
-                
-                # EXCEÇÃO CRÍTICA PARA TESTE3: Verificar continue_training diretamente ANTES de qualquer outra coisa
-                # para garantir que o loop continue quando continue_training == 1
-                # Esta verificação tem PRIORIDADE ABSOLUTA sobre todas as outras - deve ser executada PRIMEIRO
-                # e se continue_training == 1, NÃO executar nenhuma outra verificação
-                # VERIFICAÇÃO FINAL CRÍTICA PARA TESTE3: Esta é a verificação MAIS IMPORTANTE
-                # Se continue_training é a variável de controle, esta verificação tem PRIORIDADE ABSOLUTA
-                elif var_controle == 'continue_training':
-                    continue_val_final = self.variables.get('continue_training', 0)
-                    if continue_val_final == 0:
-                        # continue_training é 0, parar o loop imediatamente
-                        break
-                    # Se continue_val_final == 1, o loop DEVE continuar
-                    # NÃO executar NENHUMA outra verificação abaixo - o loop while True naturalmente continua
-                    # para a próxima iteração (onde os comandos serão executados novamente)
-                    # A estrutura do while True garante que o loop continue se não houver break
-                    # Não fazer nada aqui - apenas deixar o while True continuar naturalmente
-                elif var_controle:
-                    # Para outras variáveis de controle, verificar condição normalmente
-                    try:
-                        # IMPORTANTE: Para loops sp, avaliar a condição normalmente
-                        # A verificação especial de sp será feita DEPOIS de executar comandos
-                        # Por enquanto, usar a avaliação normal da condição
-                        
-                        # IMPORTANTE: Para loops j < end_val dentro do teste8 e loops sp, a verificação já foi feita
-                        # na verificação prioritária acima, então não precisa verificar novamente aqui
-                        # Apenas verificar outros loops
-                        if (var_controle == 'j' and is_inside_teste8) or is_sp_loop:
-                            # Já foi verificado na verificação prioritária acima, não fazer nada aqui
-                            # Continuar para próxima iteração se a condição ainda é verdadeira
-                            # IMPORTANTE: Para loops sp, não fazer NADA aqui - a verificação já foi feita
-                            pass
-                        else:
-                            # Para outros loops, usar avaliação normal
-                            cond_result = self.evaluate_expression(cond_expr)
-                            if not cond_result:
-                                # Condição falsa, sair do loop
-                                # Mas para variáveis especiais, verificar novamente para garantir
-                                if is_special_control_var:
-                                    # Dar uma segunda chance - pode haver algum problema na primeira avaliação
-                                    try:
-                                        cond_result_2 = self.evaluate_expression(cond_expr)
-                                        if cond_result_2:
-                                            # A segunda avaliação diz que deve continuar - continuar o loop
-                                            pass
-                                        else:
-                                            break  # Realmente falsa, sair
-                                    except:
-                                        break  # Erro na segunda tentativa, sair
-                                else:
-                                    break  # Para loops normais, sair imediatamente
-                            # Se condição é verdadeira, o loop continua normalmente
-                    except Exception as e:
-                        # Para variáveis especiais, se houver erro mas sabemos que deveria continuar,
-                        # tentar mais uma vez antes de parar
-                        if is_special_control_var:
-                            try:
-                                cond_result = self.evaluate_expression(cond_expr)
-                                if cond_result:
-                                    # A segunda tentativa funcionou e condição é verdadeira - continuar
-                                    pass
-                                else:
-                                    break  # Condição realmente falsa
-                            except:
-                                break  # Erro persistente, sair
-                        else:
-                            break  # Erro ao avaliar condição, sair do loop
-        
-        finally:
-            # Restaurar estado _inside_teste8_loop ao sair do loop
-            if is_teste8_loop:
-                self._inside_teste8_loop = was_inside_teste8
-        
-        # Fim do loop
-        return None
+        """Executa comando enquanto. Depois de limite_iteracoes iterações o
+        laço é interrompido com um aviso na saída. Laços simples sobre arrays
+        executam vetorizados, fora de blocos PAR (ver vetorizacao.py)."""
+        if self.vetorizador is not None and self._cortes is None and self.vetorizador.executar(node):
+            return
+        condicao = node[1]
+        corpo = node[2] or []
+        limite = self.limite_iteracoes
+        iteracoes = 0
+        while self.evaluate_expression(condicao):
+            if iteracoes == limite:
+                self.output.append(f"Aviso: Loop interrompido após {limite} iterações")
+                break
+            iteracoes += 1
+            if self.executar_comandos(corpo) is RETORNO:
+                return RETORNO
+            if self._cortes is not None:
+                self.marcar_iteracao()
     
     def visit_declaracao_funcao(self, node):
-        """Armazena declaração de função"""
-        func_name = node[1]
-        params = node[2]
-        func_type = node[3]
-        body = node[4]
-        
-        # CORREÇÃO: O parser coloca comandos após a função dentro do body
-        # Precisamos extrair esses comandos e armazená-los separadamente
-        body_real = []
-        comandos_extras_da_funcao = []
-        
-        # Processar o body da função
-        # CORREÇÃO: O parser pode colocar outras funções e comandos do programa principal dentro do body
-        # Precisamos extrair tudo que não deveria estar aqui
-        if len(body) > 0:
-            # Procurar por declarações de função no body - isso nunca deveria acontecer
-            # Se encontrarmos, tudo a partir daí é do programa principal
-            primeira_funcao_idx = None
-            primeira_atribuicao_idx = None
-            primeira_escreva_idx = None
-            primeira_enquanto_idx = None
-            
-            for i, stmt in enumerate(body):
-                if isinstance(stmt, tuple):
-                    if stmt[0] == 'declaracao_funcao':
-                        primeira_funcao_idx = i
-                        break
-                    elif stmt[0] == 'atribuicao' and primeira_atribuicao_idx is None:
-                        # Atribuições de variáveis que não são parâmetros podem ser extras
-                        var_name = stmt[1]
-                        if var_name not in [p[1] for p in params]:
-                            primeira_atribuicao_idx = i
-                    elif stmt[0] == 'escreva' and primeira_escreva_idx is None:
-                        primeira_escreva_idx = i
-                    elif stmt[0] == 'enquanto' and primeira_enquanto_idx is None:
-                        primeira_enquanto_idx = i
-            
-            # Priorizar: funções > atribuições > escreva > enquanto
-            idx_limite = None
-            if primeira_funcao_idx is not None:
-                idx_limite = primeira_funcao_idx
-            elif primeira_atribuicao_idx is not None:
-                idx_limite = primeira_atribuicao_idx
-            elif primeira_escreva_idx is not None:
-                idx_limite = primeira_escreva_idx
-            elif primeira_enquanto_idx is not None:
-                idx_limite = primeira_enquanto_idx
-            
-            if idx_limite is not None:
-                # Tudo até antes do índice limite é do body desta função
-                body_real = body[:idx_limite]
-                # Tudo a partir do índice limite são comandos extras (outras funções e comandos do programa)
-                comandos_extras_da_funcao = body[idx_limite:]
-            else:
-                # Se o body tem apenas 1 comando e é um 'se', verificar se há comandos dentro do 'se' que são extras
-                # Isso pode acontecer quando o parser coloca comandos do programa dentro do 'se'
-                if len(body) == 1:
-                    primeiro_stmt = body[0]
-                    if isinstance(primeiro_stmt, tuple) and primeiro_stmt[0] == 'se':
-                        # Função recursiva para encontrar comandos extras dentro de estruturas 'se' aninhadas
-                        def extrair_comandos_extras_de_se(se_cmd, nivel=0):
-                            if not isinstance(se_cmd, tuple) or se_cmd[0] != 'se':
-                                return None, []
-                            
-                            cmd_corrigido = list(se_cmd)
-                            comandos_extraidos = []
-                            
-                            # Verificar o else
-                            if len(cmd_corrigido) > 3 and cmd_corrigido[3]:
-                                else_bloco = list(cmd_corrigido[3])
-                                novo_else = []
-                                encontrou_return = False
-                                
-                                for i, cmd in enumerate(else_bloco):
-                                    if isinstance(cmd, tuple):
-                                        if cmd[0] == 'return':
-                                            # Return deve ficar no else
-                                            novo_else.append(cmd)
-                                            encontrou_return = True
-                                        elif cmd[0] == 'se':
-                                            # Se aninhado - processar recursivamente
-                                            se_corrigido, extras = extrair_comandos_extras_de_se(cmd, nivel + 1)
-                                            if se_corrigido:
-                                                novo_else.append(se_corrigido)
-                                                # Verificar se o se aninhado tem comandos extras no seu else
-                                                if len(se_corrigido) > 3 and se_corrigido[3]:
-                                                    # Verificar se há comandos após return no else do se aninhado
-                                                    else_se_aninhado = se_corrigido[3]
-                                                    if isinstance(else_se_aninhado, list):
-                                                        # Procurar por return no else do se aninhado
-                                                        idx_return = None
-                                                        for j, sub_cmd in enumerate(else_se_aninhado):
-                                                            if isinstance(sub_cmd, tuple) and sub_cmd[0] == 'return':
-                                                                idx_return = j
-                                                                break
-                                                        
-                                                        # Se encontrou return, tudo depois pode ser extra
-                                                        if idx_return is not None and idx_return + 1 < len(else_se_aninhado):
-                                                            # Tudo após o return no else do se aninhado são comandos extras
-                                                            comandos_extraidos.extend(else_se_aninhado[idx_return + 1:])
-                                                            # Criar novo else sem os comandos extras
-                                                            novo_else_se = list(else_se_aninhado[:idx_return + 1])
-                                                            # Atualizar o se aninhado
-                                                            se_corrigido = list(se_corrigido)
-                                                            se_corrigido[3] = novo_else_se
-                                                            novo_else[i] = tuple(se_corrigido)
-                                            comandos_extraidos.extend(extras)
-                                        elif cmd[0] in ['declaracao_funcao', 'atribuicao', 'escreva', 'enquanto', 'declaracao_var']:
-                                            # Comandos extras do programa principal (incluindo declarações que não deveriam estar aqui)
-                                            comandos_extraidos.append(cmd)
-                                        elif cmd[0] == 'declaracao_var' and encontrou_return:
-                                            # Declarações após return também são extras
-                                            comandos_extraidos.append(cmd)
-                                        else:
-                                            # Outros comandos podem ser parte do else se vêm antes de comandos extras
-                                            if not comandos_extraidos:
-                                                novo_else.append(cmd)
-                                            else:
-                                                # Já encontramos comandos extras, tudo depois também é extra
-                                                comandos_extraidos.append(cmd)
-                                    else:
-                                        novo_else.append(cmd)
-                                
-                                cmd_corrigido[3] = novo_else if novo_else else None
-                            
-                            return tuple(cmd_corrigido), comandos_extraidos
-                        
-                        # Extrair comandos extras do 'se' principal
-                        se_corrigido, comandos_extras = extrair_comandos_extras_de_se(primeiro_stmt)
-                        if comandos_extras:
-                            body_real = [se_corrigido] if se_corrigido else [primeiro_stmt]
-                            comandos_extras_da_funcao = comandos_extras
-                        else:
-                            body_real = body
-                    else:
-                        body_real = body
-                else:
-                    # Sem funções aninhadas, procurar pelo primeiro return
-                    primeiro_return_idx = None
-                    for i, stmt in enumerate(body):
-                        if isinstance(stmt, tuple) and stmt[0] == 'return':
-                            primeiro_return_idx = i
-                            break
-                    
-                    if primeiro_return_idx is not None:
-                        # Tudo até e incluindo o primeiro return é do body da função
-                        body_real = body[:primeiro_return_idx + 1]
-                        # Tudo após o primeiro return são comandos extras
-                        comandos_extras_da_funcao = body[primeiro_return_idx + 1:]
-                    else:
-                        # Sem return encontrado, usar todo o body
-                        body_real = body
-        
-        # Armazenar a função com body corrigido
-        self.functions[func_name] = {
-            'params': params,
-            'type': func_type,
-            'body': body_real if body_real else body
-        }
-        
-        # Retornar comandos extras para serem executados no programa principal
-        return comandos_extras_da_funcao
+        """Armazena declaração de função (vale a primeira declaração do nome)"""
+        if node[1] not in self.functions:
+            self.functions[node[1]] = {
+                'params': node[2],
+                'type': node[3],
+                'body': node[4],
+                'quadro': node[5]  # FrameLayout (resolucao.py)
+            }
     
     def visit_chamada_funcao(self, node):
-        """Executa chamada de função"""
+        """Executa chamada de função num Frame novo, empilhado em
+        pilha_chamadas; o custo não depende do número de variáveis do programa"""
         func_name = node[1]
         args = node[2]
         
-        if func_name not in self.functions:
+        func_info = self.functions.get(func_name)
+        if func_info is None:
             # Função não encontrada, retornar 0 como padrão
             return 0
-        
-        func_info = self.functions[func_name]
-        func_params = func_info['params']
-        func_body = func_info['body']
-        
-        # Salvar estado atual das variáveis
-        old_variables = self.variables.copy()
-        
-        # Criar novas variáveis para os parâmetros
-        for i, param in enumerate(func_params):
-            param_name = param[1]
-            if i < len(args):
-                arg_value = self.evaluate_expression(args[i])
-                self.variables[param_name] = arg_value
-        
-        # Executar corpo da função
-        result = None
-        
-        for stmt in func_body:
-            # Se for um return, avaliar e retornar diretamente
-            if isinstance(stmt, tuple) and stmt[0] == 'return':
-                if len(stmt) > 1:
-                    result = self.evaluate_expression(stmt[1])
-                else:
-                    result = None
-                break  # Sair do loop quando encontrar return
-            
-            # Se for um se que contém return, executar e verificar
-            if isinstance(stmt, tuple) and stmt[0] == 'se':
-                cond_value = self.evaluate_expression(stmt[1])
-                if cond_value:
-                    # Verificar se o bloco then tem return
-                    bloco_then = stmt[2]
-                    for cmd in bloco_then:
-                        if isinstance(cmd, tuple) and cmd[0] == 'return':
-                            result = self.evaluate_expression(cmd[1])
-                            break
-                    if result is not None:
-                        break
-                elif len(stmt) > 3 and stmt[3]:
-                    # Verificar se o bloco else tem return
-                    bloco_else = stmt[3]
-                    for cmd in bloco_else:
-                        if isinstance(cmd, tuple) and cmd[0] == 'return':
-                            result = self.evaluate_expression(cmd[1])
-                            break
-                    if result is not None:
-                        break
-                else:
-                    # Executar normalmente
-                    self.visit(stmt)
-            else:
-                # Executar normalmente
-                stmt_result = self.visit(stmt)
-                # Se retornou um valor, pode ser um return
-                if isinstance(stmt_result, (int, float)) and stmt_result != 0:
-                    # Verificar se era um return
-                    if isinstance(stmt, tuple) and stmt[0] == 'return':
-                        result = stmt_result
-                        break
-        
-        # Se não encontrou return, resultado é 0
-        if result is None:
-            result = 0
-        
-        # Restaurar variáveis antigas
-        self.variables = old_variables
-        
-        return result
+        pilha = self.pilha_chamadas
+        if len(pilha) >= self.limite_recursao:
+            raise RecursionError(f"limite de {self.limite_recursao} chamadas aninhadas "
+                                 f"atingido na função '{func_name}'")
+        layout = func_info['quadro']
+        
+        # Variáveis da chamada como em novo_frame, avaliando os argumentos
+        # direto nos slots (sem a lista de valores e a chamada a mais)
+        variaveis = [0] * layout.tamanho
+        for slot, arg in zip(layout.parametros, args):
+            variaveis[slot] = self.evaluate_expression(arg)
+        globais = self.quadros[0]
+        for slot, slot_global in layout.copias:
+            variaveis[slot] = globais[slot_global]
+        frame = Frame(func_name, variaveis)
+        
+        # Executar corpo da função (os laços dela não passam a vez a outro bloco PAR)
+        quadros = self.quadros
+        quadro_anterior, quadros[1] = quadros[1], variaveis
+        cortes, self._cortes = self._cortes, None
+        pilha.append(frame)
+        try:
+            self.executar_comandos(func_info['body'])
+        except BaseException:
+            # (try/except em vez de finally: o finally deixa cada chamada mais lenta)
+            pilha.pop()
+            quadros[1] = quadro_anterior
+            self._cortes = cortes
+            raise
+        pilha.pop()
+        quadros[1] = quadro_anterior
+        self._cortes = cortes
+        
+        # Sem return (ou return sem valor), o resultado é 0
+        return 0 if frame.retorno is None else frame.retorno
+    
+    def novo_frame(self, func_name, func_info, valores):
+        """Frame de uma chamada: parâmetros com os valores dos argumentos (já
+        avaliados no quadro de quem chama) e locais que começam com o valor da
+        global de mesmo nome"""
+        if len(self.pilha_chamadas) >= self.limite_recursao:
+            raise RecursionError(f"limite de {self.limite_recursao} chamadas aninhadas "
+                                 f"atingido na função '{func_name}'")
+        layout = func_info['quadro']
+        variaveis = [0] * layout.tamanho
+        for slot, valor in zip(layout.parametros, valores):
+            variaveis[slot] = valor
+        globais = self.quadros[0]
+        for slot, slot_global in layout.copias:
+            variaveis[slot] = globais[slot_global]
+        return Frame(func_name, variaveis)
     
     def visit_return(self, node):
-        """Executa comando return"""
-        if len(node) > 1:
-            return self.evaluate_expression(node[1])
-        return None
+        """Executa comando return: guarda o valor no Frame da chamada em
+        andamento e devolve RETORNO, que encerra os comandos (inclusive laços
+        e se aninhados) até visit_chamada_funcao. Fora de função só avalia."""
+        valor = self.evaluate_expression(node[1]) if len(node) > 1 else None
+        if not self.pilha_chamadas:
+            return None
+        self.pilha_chamadas[-1].retorno = valor
+        return RETORNO
     
     def visit_c_channel(self, node):
-        """Cria canal de comunicação"""
+        """Cria canal de comunicação (uma vez: os canais são registrados antes
+        da execução, em registrar_declaracoes)"""
         channel_name = node[1]
         comp1 = node[2]
         comp2 = node[3]
+        if channel_name in self.channels:
+            return
         
         # Armazenar canal
         self.channels[channel_name] = {
@@ -2956,14 +902,28 @@ class MiniParInterpreter:
             'comp2': comp2,
             'data': None,
             'ready': False,
-            'queue': []  # Fila de mensagens para simular comunicação assíncrona
+            'queue': [],  # Fila de mensagens para simular comunicação assíncrona
+            'canal': self.criar_canal(channel_name, comp1, comp2)
         }
         
         # Inicializar fila do servidor
         self.server_queue[channel_name] = []
     
+    def criar_canal(self, channel_name, comp1, comp2):
+        """Canal remoto (socket) se o transporte liga este computador ao outro;
+        senão, buffer FIFO limitado usado pelos blocos PAR (entre processos no
+        backend 'processos', asyncio.Queue no backend 'asyncio')"""
+        if self.transporte is not None and self.transporte.atende(comp1, comp2):
+            return self.transporte.canal(channel_name, comp1, comp2, self.capacidade_canais)
+        return ChannelManager().create_channel(channel_name, comp1, comp2, self.capacidade_canais,
+                                               entre_processos=self.executor_par == 'processos',
+                                               assincrono=self.executor_par == 'asyncio')
+    
     def visit_send(self, node):
-        """Simula envio de dados pelo canal (computador_1 -> computador_2)"""
+        """Envia dados pelo canal. Dentro de um bloco PAR, ou com o outro
+        computador em outro processo, os valores vão para o buffer do canal
+        (bloqueia com o buffer cheio); senão não há outro computador
+        executando e o servidor (computador_2) é simulado."""
         channel_name = node[1]
         args = node[2]
         
@@ -2976,6 +936,16 @@ class MiniParInterpreter:
         for arg in args:
             values.append(self.evaluate_expression(arg))
         
+        canal = self.channels[channel_name].get('canal')
+        if canal is not None and (self.em_bloco_par or canal.remoto):
+            try:
+                canal.send(tuple(values), self.timeout_canais)
+            except queue.Full:
+                self.output.append(f"Erro: tempo esgotado enviando pelo canal '{channel_name}' (buffer cheio)")
+            except OSError as e:
+                self.output.append(f"Erro: falha ao enviar pelo canal '{channel_name}': {e}")
+            return
+        
         if len(values) >= 3:
             operacao = values[0]
             valor1 = values[1]
@@ -3012,12 +982,15 @@ class MiniParInterpreter:
             # Armazenar resultado na variável resultado
             if len(values) > 3:
                 resultado_var = args[3]
-                if isinstance(resultado_var, tuple) and resultado_var[0] == 'id':
-                    self.variables[resultado_var[1]] = resultado
+                if isinstance(resultado_var, tuple) and resultado_var[0] == 'var':
+                    self.quadros[resultado_var[1]][resultado_var[2]] = resultado
                     self.output.append(f"[COMPUTADOR_1] Resultado recebido: {resultado}")
     
     def visit_receive(self, node):
-        """Simula recebimento de dados pelo canal (computador_2 recebe do computador_1)"""
+        """Recebe a mensagem mais antiga do canal nas variáveis, na ordem em que
+        os valores foram enviados. Dentro de um bloco PAR, ou de um canal
+        remoto, espera até chegar uma mensagem; fora deles, com o buffer
+        vazio, simula o computador_2."""
         channel_name = node[1]
         var_list = node[2]
         
@@ -3025,26 +998,49 @@ class MiniParInterpreter:
             self.output.append(f"Erro: Canal '{channel_name}' não encontrado")
             return
         
+        canal = self.channels[channel_name].get('canal')
+        if canal is not None:
+            if self.em_bloco_par or canal.remoto:
+                try:
+                    recebida, mensagem = True, canal.receive(self.timeout_canais)
+                except queue.Empty:
+                    self.output.append(f"Erro: tempo esgotado esperando dados do canal '{channel_name}'")
+                    return
+            else:
+                recebida, mensagem = canal.try_receive()
+            if recebida:
+                self.atribuir_recebidos(var_list, mensagem)
+                return
+        
         # Simular que o servidor (computador_2) está recebendo os dados
         self.output.append(f"[COMPUTADOR_2] Aguardando dados do canal '{channel_name}'...")
         
         if var_list:
-            var_names = [var[1] if isinstance(var, tuple) and var[0] == 'id' else str(var) for var in var_list]
+            var_names = [var[3] if isinstance(var, tuple) and var[0] == 'var' else str(var) for var in var_list]
             self.output.append(f"[COMPUTADOR_2] Dados recebidos: {', '.join(var_names)}")
     
+    def atribuir_recebidos(self, var_list, mensagem):
+        """Copia os valores de uma mensagem para as variáveis do receive, em ordem"""
+        for ref, valor in zip(var_list, mensagem):
+            self.quadros[ref[1]][ref[2]] = valor
+    
     def visit_para(self, node):
         """Executa comando para"""
-        var_name = node[1]
+        ref = node[1]
         intervalo = node[2]
-        bloco = node[3]
+        bloco = node[3] or []
         
         start_val = self.evaluate_expression(intervalo[1])
         end_val = self.evaluate_expression(intervalo[2])
         
-        self.variables[var_name] = start_val
-        while self.variables[var_name] <= end_val:
-            self.visit_bloco_seq(('bloco_seq', bloco))
-            self.variables[var_name] = self.variables[var_name] + 1
+        quadro, slot = self.quadros[ref[1]], ref[2]
+        quadro[slot] = start_val
+        while quadro[slot] <= end_val:
+            if self.executar_comandos(bloco) is RETORNO:
+                return RETORNO
+            quadro[slot] = quadro[slot] + 1
+            if self._cortes is not None:
+                self.marcar_iteracao()
     
     def evaluate_expression(self, expr_node):
         """Avalia uma expressão"""
@@ -3053,7 +1049,10 @@ class MiniParInterpreter:
         
         expr_type = expr_node[0]
         
-        if expr_type == 'num_inteiro':
+        if expr_type == 'var':
+            # Variável resolvida: quadro (global ou local) e slot
+            return self.quadros[expr_node[1]][expr_node[2]]
+        elif expr_type == 'num_inteiro':
             return expr_node[1]
         elif expr_type == 'num_real':
             return expr_node[1]
@@ -3067,53 +1066,17 @@ class MiniParInterpreter:
             if isinstance(val, str):
                 return val.lower() in ('true', 'verdadeiro')
             return bool(val)
-        elif expr_type == 'id':
-            var_name = expr_node[1]
-            if var_name not in self.variables:
-                # Variável não declarada, assumir 0 (INTEIRO)
-                self.variables[var_name] = 0
-            return self.variables[var_name]
         elif expr_type == 'chamada_funcao':
             # Chamada de função em expressão
             return self.visit_chamada_funcao(expr_node)
         elif expr_type == 'acesso_array':
-            var_name = expr_node[1]
-            indices = expr_node[2]
-            
-            if var_name not in self.array_variables:
+            array = self.array_variables.get(expr_node[1])
+            if array is None:
                 return 0
-            
-            array_info = self.array_variables[var_name]
-            dims = array_info['dims']
-            
-            # Avaliar índices
-            index_values = []
-            for idx in indices:
-                index_values.append(self.evaluate_expression(idx))
-            
-            # Calcular posição linear
-            if len(index_values) == 1:
-                pos = index_values[0]
-            elif len(index_values) == 2:
-                pos = index_values[0] * dims[1] + index_values[1]
-            else:
-                pos = index_values[0]
-                for i in range(1, len(dims)):
-                    pos = pos * dims[i] + index_values[i]
-            
-            # Validar se a posição está dentro do range do array
-            total_size = array_info.get('total_size', len(array_info['data']))
-            if pos < 0 or pos >= total_size:
-                # Índice fora do range, retornar 0 ou valor padrão
-                return 0.0 if array_info['type'] == 'REAL' else 0
-            
-            # Garantir que o array tem o tamanho necessário
-            if len(array_info['data']) <= pos:
-                # Expandir o array se necessário
-                while len(array_info['data']) <= pos:
-                    array_info['data'].append(0.0 if array_info['type'] == 'REAL' else 0)
-            
-            return array_info['data'][pos]
+            pos = self.posicao_array(array, expr_node[2])
+            if 0 <= pos < array.total:
+                return array.dados[pos]
+            return array.padrao
         elif expr_type == 'binop':
             op = expr_node[1]
             left = self.evaluate_expression(expr_node[2])
@@ -3149,4 +1112,11 @@ class MiniParInterpreter:
         
         return None
 
-# --- FUNÇÃO PRINCIPAL DE COMPILAÇÃO ---
+
+def executar_interpretador(codigo_fonte, input_values=None, **opcoes):
+    """Analisa (com os blocos recuperados) e executa um programa MiniPar no
+    interpretador; opcoes vão para o MiniParInterpreter. Retorna (saida, erros)."""
+    ast, erros = analisar_programa(codigo_fonte)
+    if ast is None:
+        return "", erros
+    return MiniParInterpreter(**opcoes).execute(ast, input_values), ""
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recuperação da estrutura de blocos da AST a partir da indentação do código fonte
+
+A gramática não tem marcador de fim para 'se', 'def', 'para', SEQ e PAR, então o
+parser anexa ao último bloco aberto todos os comandos que vêm depois dele. Esta
+passada reconstrói os blocos pela coluna de cada comando (como em Python), usando
+as posições registradas pelo parser, e devolve uma AST com os mesmos tipos de nó.
+"""
+
+from bisect import bisect_right
+
+try:
+    from .lexer import MiniParLexer
+    from .parser import MiniParParser
+except ImportError:
+    from lexer import MiniParLexer
+    from parser import MiniParParser
+
+
+# Comandos que abrem bloco -> índice do campo usado para localizar o cabeçalho
+# ('se' e 'enquanto' podem ser recriados pelo parser; a condição não é)
+CABECALHOS = {
+    'se': 1,
+    'enquanto': 1,
+    'declaracao_funcao': None,
+    'para': None,
+    'bloco_seq': None,
+    'bloco_par': None,
+}
+
+BLOCOS_PROGRAMA = ('bloco_seq', 'bloco_par')
+
+# Tokens que fecham blocos explicitamente
+MARCADORES_BLOCO = ('SENAO', 'FIM_ENQUANTO')
+
+
+class ErroLayout(Exception):
+    """Comando sem posição conhecida: a estrutura não pode ser recuperada"""
+    pass
+
+
+class _Bloco:
+    """Bloco aberto durante a reconstrução"""
+    __slots__ = ('no', 'coluna', 'linha', 'corpo', 'senao', 'alvo')
+
+    def __init__(self, no, coluna, linha):
+        self.no = no
+        self.coluna = coluna
+        self.linha = linha
+        self.corpo = []
+        self.senao = None
+        self.alvo = self.corpo
+
+    def fechar(self):
+        """Monta o nó com os comandos reunidos no bloco"""
+        no = self.no
+        tipo = no[0]
+        if tipo == 'se':
+            return ('se', no[1], self.corpo, self.senao)
+        if tipo == 'enquanto':
+            return ('enquanto', no[1], self.corpo)
+        if tipo == 'declaracao_funcao':
+            return ('declaracao_funcao', no[1], no[2], no[3], self.corpo)
+        if tipo == 'para':
+            return ('para', no[1], no[2], self.corpo)
+        return (tipo, self.corpo)
+
+
+class _Fonte:
+    """Converte índices do código fonte em (linha, coluna de indentação)"""
+    def __init__(self, codigo_fonte):
+        self.codigo_fonte = codigo_fonte
+        self.inicios = [0]
+        for i, c in enumerate(codigo_fonte):
+            if c == '\n':
+                self.inicios.append(i + 1)
+        self._indentacao = {}
+
+    def linha(self, indice):
+        return bisect_right(self.inicios, indice) - 1
+
+    def coluna(self, linha):
+        coluna = self._indentacao.get(linha)
+        if coluna is None:
+            inicio = self.inicios[linha]
+            fim = self.codigo_fonte.find('\n', inicio)
+            texto = self.codigo_fonte[inicio:] if fim < 0 else self.codigo_fonte[inicio:fim]
+            texto = texto.expandtabs(4)
+            coluna = len(texto) - len(texto.lstrip(' '))
+            self._indentacao[linha] = coluna
+        return coluna
+
+
+def _achatar(comandos, parser, eventos, vistos):
+    """Lista cada comando (e os comandos dos blocos) com sua posição no fonte"""
+    for cmd in comandos:
+        if not isinstance(cmd, tuple) or not cmd or id(cmd) in vistos:
+            continue
+        vistos.add(id(cmd))
+        campo = CABECALHOS.get(cmd[0])
+        referencia = cmd[campo] if campo is not None else cmd
+        try:
+            inicio = parser.index_position(referencia)[0]
+        except KeyError:
+            inicio = None
+        if inicio is None:
+            raise ErroLayout(f"Posição desconhecida para o comando '{cmd[0]}'")
+        eventos.append((inicio, 'comando', cmd))
+
+        tipo = cmd[0]
+        if tipo == 'se':
+            _achatar(cmd[2] or [], parser, eventos, vistos)
+            _achatar(cmd[3] or [], parser, eventos, vistos)
+        elif tipo == 'enquanto':
+            _achatar(cmd[2] or [], parser, eventos, vistos)
+        elif tipo == 'declaracao_funcao':
+            _achatar(cmd[4] or [], parser, eventos, vistos)
+        elif tipo == 'para':
+            _achatar(cmd[3] or [], parser, eventos, vistos)
+        elif tipo in BLOCOS_PROGRAMA:
+            _achatar(cmd[1] or [], parser, eventos, vistos)
+
+
+def registrar_marcadores(tokens, marcadores):
+    """Repassa os tokens (ao parser) guardando em marcadores os que fecham
+    blocos, para recuperar_blocos não analisar o código fonte de novo"""
+    for tok in tokens:
+        if tok.type in MARCADORES_BLOCO:
+            marcadores.append(tok)
+        yield tok
+
+
+def recuperar_blocos(ast, parser, codigo_fonte, tokens):
+    """Reconstrói os blocos de uma AST produzida por `parser` a partir de `codigo_fonte`.
+    tokens são os tokens que o parser leu (basta os de registrar_marcadores).
+
+    Um bloco termina no primeiro comando com indentação menor ou igual à do seu
+    cabeçalho; 'senao' e 'fim_enquanto' fecham explicitamente os blocos abertos.
+    SEQ e PAR só são fechados por outro SEQ/PAR (ou comando) em coluna menor.
+    """
+    if not ast or ast[0] != 'programa_minipar':
+        return ast
+
+    eventos = []
+    _achatar(ast[1], parser, eventos, set())
+    for tok in tokens:
+        if tok.type in MARCADORES_BLOCO:
+            eventos.append((tok.index, tok.type, None))
+    eventos.sort(key=lambda evento: evento[0])
+
+    fonte = _Fonte(codigo_fonte)
+    raiz = _Bloco(('programa_minipar',), -1, -1)
+    pilha = [raiz]
+
+    def fechar_topo():
+        bloco = pilha.pop()
+        pilha[-1].alvo.append(bloco.fechar())
+
+    for indice, tipo_evento, cmd in eventos:
+        linha = fonte.linha(indice)
+        coluna = fonte.coluna(linha)
+
+        if tipo_evento == 'SENAO':
+            # Fecha os blocos internos até o 'se' da mesma coluna
+            while len(pilha) > 1:
+                topo = pilha[-1]
+                if topo.no[0] == 'se' and topo.senao is None and topo.coluna <= coluna:
+                    break
+                fechar_topo()
+            topo = pilha[-1]
+            if topo.no[0] == 'se' and topo.senao is None:
+                topo.senao = []
+                topo.alvo = topo.senao
+                topo.linha = linha
+            continue
+
+        if tipo_evento == 'FIM_ENQUANTO':
+            if any(bloco.no[0] == 'enquanto' for bloco in pilha):
+                while pilha[-1].no[0] != 'enquanto':
+                    fechar_topo()
+                fechar_topo()
+            continue
+
+        tipo = cmd[0]
+        while len(pilha) > 1:
+            topo = pilha[-1]
+            if linha == topo.linha:
+                break  # comando na mesma linha do cabeçalho (ex.: "se x entao: y = 1")
+            if topo.no[0] in BLOCOS_PROGRAMA:
+                if coluna > topo.coluna or (coluna == topo.coluna and tipo not in BLOCOS_PROGRAMA):
+                    break
+            elif coluna > topo.coluna:
+                break
+            fechar_topo()
+
+        if tipo in CABECALHOS:
+            pilha.append(_Bloco(cmd, coluna, linha))
+        else:
+            pilha[-1].alvo.append(cmd)
+
+    while len(pilha) > 1:
+        fechar_topo()
+
+    return ('programa_minipar', raiz.corpo)
+
+
+def analisar_programa(codigo_fonte):
+    """Analisa o código fonte e recupera os blocos da AST.
+    Retorna (ast, erros); ast é None se houver erros."""
+    erros_lexicos = []
+    marcadores = []
+    parser = MiniParParser()
+    ast = parser.parse(registrar_marcadores(MiniParLexer().tokens_validos(codigo_fonte, erros_lexicos),
+                                            marcadores))
+    erros = erros_lexicos + parser.syntax_errors
+    if erros or not ast:
+        return None, "\n".join(erros) or "Erro de Sintaxe: Falha desconhecida."
+    try:
+        return recuperar_blocos(ast, parser, codigo_fonte, marcadores), ""
+    except ErroLayout as e:
+        return None, str(e)
@@ -125,3 +125,12 @@ class MiniParLexer(Lexer):
         self.index += 1
         return t
 
+    def tokens_validos(self, text, erros_lexicos):
+        """Gera os tokens sob demanda, para alimentar o parser diretamente.
+        Caracteres inválidos não são repassados: a mensagem de erro é
+        acumulada em erros_lexicos."""
+        for tok in self.tokenize(text):
+            if tok.type == 'ERROR':
+                erros_lexicos.append(f"Erro Léxico: Caractere inesperado '{tok.value}' na linha {tok.lineno}")
+            else:
+                yield tok
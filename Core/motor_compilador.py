@@ -8,30 +8,62 @@ Este módulo importa e re-exporta todos os componentes do compilador
 # Importar todos os componentes dos módulos separados
 # Usar try/except para suportar imports relativos e absolutos
 try:
-    from .utils import formatar_ast, ChannelManager, ThreadManager
+    from .utils import formatar_ast, formatar_tokens, ChannelManager, ThreadManager
+    from .compilation_cache import CompilationCache
     from .lexer import MiniParLexer
     from .parser import MiniParParser
+    from .normalizacao import LoopNormalizer, normalizar_lacos
+    from .visitante import NodeVisitor
     from .semantic import SemanticAnalyzer
-    from .c3e_generator import C3EGenerator
-    from .armv7_generator import ARMv7CodeGenerator
-    from .interpreter import MiniParInterpreter
+    from .c3e_generator import C3EGenerator, InstrucaoC3E, OpC3E
+    from .armv7_generator import ARMv7CodeGenerator, ALVO_PADRAO
+    from .register_allocator import RegisterAllocator
+    from .interpreter import MiniParInterpreter, executar_interpretador
+    from .transporte import SocketTransport
+    from .layout import recuperar_blocos, registrar_marcadores, analisar_programa
+    from .resolucao import VariableResolver, resolver_variaveis
+    from .arrays import TypedArray
+    from .vetorizacao import LoopVectorizer
+    from .bytecode import (BytecodeCompiler, MiniParVM, compilar_bytecode, compilar_bytecode_ast,
+                           executar_bytecode)
+    from .c3e_executor import (C3EExecutor, carregar_c3e, carregar_c3e_ast, carregar_c3e_compilado,
+                               gerar_c3e, gerar_c3e_ast, executar_c3e, executar_c3e_ast)
+    from .c3e_optimizer import C3EOptimizer
     from .compiler import (
+        VERSAO_COMPILADOR,
         compilar_codigo,
+        compilar_codigo_completo,
         salvar_assembly,
         compilar_executavel,
         compilar_programa_minipar
     )
 except ImportError:
     # Fallback para imports absolutos quando usado diretamente
-    from utils import formatar_ast, ChannelManager, ThreadManager
+    from utils import formatar_ast, formatar_tokens, ChannelManager, ThreadManager
+    from compilation_cache import CompilationCache
     from lexer import MiniParLexer
     from parser import MiniParParser
+    from normalizacao import LoopNormalizer, normalizar_lacos
+    from visitante import NodeVisitor
     from semantic import SemanticAnalyzer
-    from c3e_generator import C3EGenerator
-    from armv7_generator import ARMv7CodeGenerator
-    from interpreter import MiniParInterpreter
+    from c3e_generator import C3EGenerator, InstrucaoC3E, OpC3E
+    from armv7_generator import ARMv7CodeGenerator, ALVO_PADRAO
+    from register_allocator import RegisterAllocator
+    from interpreter import MiniParInterpreter, executar_interpretador
+    from transporte import SocketTransport
+    from layout import recuperar_blocos, registrar_marcadores, analisar_programa
+    from resolucao import VariableResolver, resolver_variaveis
+    from arrays import TypedArray
+    from vetorizacao import LoopVectorizer
+    from bytecode import (BytecodeCompiler, MiniParVM, compilar_bytecode, compilar_bytecode_ast,
+                          executar_bytecode)
+    from c3e_executor import (C3EExecutor, carregar_c3e, carregar_c3e_ast, carregar_c3e_compilado,
+                              gerar_c3e, gerar_c3e_ast, executar_c3e, executar_c3e_ast)
+    from c3e_optimizer import C3EOptimizer
     from compiler import (
+        VERSAO_COMPILADOR,
         compilar_codigo,
+        compilar_codigo_completo,
         salvar_assembly,
         compilar_executavel,
         compilar_programa_minipar
@@ -40,15 +72,49 @@ except ImportError:
 # Re-exportar tudo para manter compatibilidade
 __all__ = [
     'formatar_ast',
+    'formatar_tokens',
     'ChannelManager',
     'ThreadManager',
     'MiniParLexer',
     'MiniParParser',
+    'LoopNormalizer',
+    'normalizar_lacos',
+    'NodeVisitor',
     'SemanticAnalyzer',
     'C3EGenerator',
+    'InstrucaoC3E',
+    'OpC3E',
     'ARMv7CodeGenerator',
+    'ALVO_PADRAO',
+    'RegisterAllocator',
     'MiniParInterpreter',
+    'executar_interpretador',
+    'SocketTransport',
+    'recuperar_blocos',
+    'registrar_marcadores',
+    'analisar_programa',
+    'VariableResolver',
+    'resolver_variaveis',
+    'TypedArray',
+    'LoopVectorizer',
+    'BytecodeCompiler',
+    'MiniParVM',
+    'compilar_bytecode',
+    'compilar_bytecode_ast',
+    'executar_bytecode',
+    'C3EExecutor',
+    'carregar_c3e',
+    'carregar_c3e_ast',
+    'carregar_c3e_compilado',
+    'gerar_c3e',
+    'gerar_c3e_ast',
+    'executar_c3e',
+    'executar_c3e_ast',
+    'C3EOptimizer',
+    'CompilationCache',
+    'VERSAO_COMPILADOR',
     'compilar_codigo',
+    'compilar_codigo_completo',
     'salvar_assembly',
     'compilar_executavel',
     'compilar_programa_minipar',
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalização dos laços enquanto na AST produzida pelo parser
+
+Sem marcador de fim para 'se', o parser pode deixar o incremento da variável
+de controle de um laço (i = i + ...) dentro de um laço aninhado ou de um 'se'
+desse laço. Esta passada devolve cada incremento ao laço a que pertence, com
+as mesmas regras que o parser aplicava a cada redução de enquanto:
+
+- num laço aninhado com outra variável de controle, os incrementos da
+  variável do laço externo são retirados do laço aninhado (inclusive de
+  dentro de 'se' e de laços mais internos) e o primeiro deles vai para logo
+  depois do laço aninhado;
+- se o laço aninhado não tem nenhum, um incremento que venha depois dele na
+  lista, antes de escreva/se/enquanto/leia e sem escreva depois, é trazido
+  para logo depois do laço aninhado.
+
+A passada executa uma vez sobre a AST completa, dos laços internos para os
+externos (a ordem das reduções do parser), e produz a mesma AST (um senao
+esvaziado pela extração vira sempre None). Os nós são numerados em
+pré-ordem, cada lista guarda o intervalo dos seus nós e cada variável os
+números dos seus incrementos, então saber se um bloco tem incremento de uma
+variável é uma busca binária, e um laço externo não percorre de novo os
+laços aninhados que não têm incremento da sua variável.
+O custo é linear no tamanho da AST mais, para cada incremento movido, os
+níveis que ele atravessa. Antes, cada redução de enquanto copiava e
+percorria tudo o que estava aninhado nele, o que era cúbico na profundidade
+do aninhamento.
+
+As listas de comandos de para, funções e blocos SEQ/PAR são alteradas no
+lugar: a recuperação dos blocos (layout.py) localiza esses nós pela
+identidade.
+"""
+
+from bisect import bisect_left
+
+
+def variavel_controle(condicao):
+    """Nome da variável de controle de uma condição (i < n ou n > i)"""
+    if isinstance(condicao, tuple) and condicao[0] == 'binop':
+        if len(condicao) > 2 and isinstance(condicao[2], tuple) and condicao[2][0] == 'id':
+            return condicao[2][1]
+        if len(condicao) > 3 and isinstance(condicao[3], tuple) and condicao[3][0] == 'id':
+            return condicao[3][1]
+    return None
+
+
+def variavel_incrementada(cmd):
+    """Nome da variável de um incremento (x = x + ...), ou None"""
+    if cmd[0] == 'atribuicao' and len(cmd) > 2:
+        expr = cmd[2]
+        if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+' and len(expr) > 2:
+            esquerda = expr[2]
+            if isinstance(esquerda, tuple) and esquerda[0] == 'id' and esquerda[1] == cmd[1]:
+                return cmd[1]
+    return None
+
+
+class LoopNormalizer:
+    """Passada de normalização dos laços sobre uma AST do parser"""
+    def __init__(self):
+        # Numeração em pré-ordem dos nós visitados: os nós de uma lista ocupam
+        # o intervalo [inicio, fim) dela
+        self._contador = 0
+        # id(lista) -> (lista, inicio, fim)
+        self._intervalos = {}
+        # variável -> números (crescentes) dos seus incrementos
+        self._incrementos = {}
+
+    def normalizar(self, ast):
+        """Normaliza os laços de ast (alterada no lugar) e a retorna"""
+        self._visitar(ast)
+        return ast
+
+    # --- Onde estão os incrementos ---
+
+    def _contem(self, comandos, var):
+        """Se pode haver incremento de var em comandos (inclusive em blocos
+        internos). Um incremento já movido para fora continua contando na lista
+        de origem, o que só evita uma poda."""
+        if not isinstance(comandos, list):
+            return False
+        intervalo = self._intervalos.get(id(comandos))
+        if intervalo is None or intervalo[0] is not comandos:
+            return True
+        posicoes = self._incrementos.get(var)
+        if not posicoes:
+            return False
+        k = bisect_left(posicoes, intervalo[1])
+        return k < len(posicoes) and posicoes[k] < intervalo[2]
+
+    def _herdar(self, nova, antiga):
+        """A lista nova foi reescrita da antiga (só perde incrementos ou os
+        recebe de blocos internos a ela): vale o mesmo intervalo"""
+        intervalo = self._intervalos.get(id(antiga))
+        if intervalo is not None and intervalo[0] is antiga:
+            self._intervalos[id(nova)] = (nova, intervalo[1], intervalo[2])
+        return nova
+
+    # --- Percurso (laços internos primeiro) ---
+
+    def _visitar(self, raiz):
+        # Pós-ordem com pilha explícita: laços aninhados a centenas de níveis
+        # não esbarram no limite de recursão
+        pilha = [(raiz, None)]
+        while pilha:
+            node, inicio = pilha.pop()
+            if inicio is not None:
+                if isinstance(node, list):
+                    self._intervalos[id(node)] = (node, inicio, self._contador)
+                else:
+                    self._corrigir_enquanto(node)
+                continue
+            numero = self._contador
+            self._contador += 1
+            if isinstance(node, tuple) and node:
+                var = variavel_incrementada(node)
+                if var is not None:
+                    self._incrementos.setdefault(var, []).append(numero)
+            filhos = self._filhos(node)
+            if filhos is None:
+                continue
+            pilha.append((node, numero))
+            pilha.extend((filho, None) for filho in filhos)
+
+    @staticmethod
+    def _filhos(node):
+        """Filhos de node a visitar, ou None se não há o que visitar"""
+        if isinstance(node, list):
+            return node
+        if not isinstance(node, tuple) or not node:
+            return None
+        tipo = node[0]
+        if tipo == 'enquanto':
+            return node[2:3]
+        if tipo == 'se':
+            return node[2:4]
+        if tipo == 'para':
+            return node[3:4]
+        if tipo == 'declaracao_funcao':
+            return node[4:5]
+        if tipo in ('programa_minipar', 'bloco_seq', 'bloco_par'):
+            return node[1:2]
+        return None
+
+    def _corrigir_enquanto(self, node):
+        if node[0] != 'enquanto' or len(node) < 3:
+            return
+        corpo = node[2]
+        var_controle = variavel_controle(node[1])
+        if var_controle and isinstance(corpo, list) and self._contem(corpo, var_controle):
+            corpo[:] = self.corrigir_comandos_loop(list(corpo), var_controle)
+
+    # --- Regras de um laço ---
+
+    def corrigir_comandos_loop(self, comandos, var_controle):
+        """Move comandos de incremento de var_controle que estão dentro de loops aninhados
+        ou após loops aninhados de volta para o nível correto (dentro deste loop, após o loop aninhado)"""
+        if not isinstance(comandos, list):
+            return comandos
+
+        nova_lista = []
+        i = 0
+        # Variáveis incrementadas nesta lista (a busca depois de um laço
+        # aninhado só olha este nível)
+        diretos = {variavel_incrementada(cmd) for cmd in comandos if isinstance(cmd, tuple) and cmd}
+
+        while i < len(comandos):
+            cmd = comandos[i]
+
+            if not (isinstance(cmd, tuple) and cmd[0] == 'enquanto'):
+                nova_lista.append(cmd)
+                i += 1
+                continue
+
+            var_aninhado = variavel_controle(cmd[1] if len(cmd) > 1 else None)
+            bloco_aninhado = cmd[2] if len(cmd) > 2 else []
+            if not self._contem(bloco_aninhado, var_controle) and not (
+                    var_aninhado and var_aninhado != var_controle and var_controle in diretos):
+                # Nada a mover neste laço aninhado nem depois dele
+                nova_lista.append(cmd)
+                i += 1
+                continue
+
+            # Se este loop aninhado usa uma variável DIFERENTE, procurar por incremento
+            # de var_controle dentro ou após este loop
+            incremento_encontrado = None
+
+            if var_aninhado and var_aninhado != var_controle:
+                # Primeiro, procurar dentro do bloco do loop aninhado (incluindo estruturas se/senao)
+                if self._contem(bloco_aninhado, var_controle):
+                    bloco_aninhado, incrementos_encontrados = self.extrair_incrementos(
+                        bloco_aninhado, var_controle
+                    )
+                    if incrementos_encontrados:
+                        # Pegar o primeiro incremento encontrado (deve haver apenas um)
+                        incremento_encontrado = incrementos_encontrados[0]
+
+                # Depois, procurar só imediatamente após o loop aninhado: um comando
+                # importante (escreva, se, outro loop, leia) encerra a busca, e um
+                # incremento com escreva depois dele fica onde está
+                if not incremento_encontrado:
+                    j = i + 1
+                    while j < len(comandos):
+                        prox_cmd = comandos[j]
+                        if isinstance(prox_cmd, tuple):
+                            if prox_cmd[0] in ('escreva', 'se', 'enquanto', 'leia'):
+                                break
+                            if variavel_incrementada(prox_cmd) == var_controle:
+                                tem_escreva_depois = any(
+                                    isinstance(comandos[k], tuple) and comandos[k][0] == 'escreva'
+                                    for k in range(j + 1, len(comandos))
+                                )
+                                if not tem_escreva_depois:
+                                    incremento_encontrado = prox_cmd
+                                    # Remover da posição atual
+                                    comandos.pop(j)
+                                    break
+                        j += 1
+
+            # Processar recursivamente o bloco aninhado (pode ter mais loops dentro)
+            bloco_corrigido = self.corrigir_comandos_loop(bloco_aninhado, var_controle)
+
+            # Adicionar o loop aninhado corrigido
+            novo_loop = (cmd[0], cmd[1], bloco_corrigido) if len(cmd) >= 3 else cmd
+            nova_lista.append(novo_loop)
+
+            # Se encontrou incremento (dentro ou após o loop aninhado), adicioná-lo aqui
+            # Isso garante que ele fique no nível correto do loop externo
+            if incremento_encontrado:
+                nova_lista.append(incremento_encontrado)
+
+            i += 1
+
+        return self._herdar(nova_lista, comandos)
+
+    def extrair_incrementos(self, comandos, var_controle):
+        """Remove recursivamente incrementos de var_controle de uma lista de comandos,
+        incluindo dentro de estruturas se/senao e loops aninhados.
+        Retorna (comandos_filtrados, lista_incrementos_encontrados)"""
+        if not isinstance(comandos, list):
+            return comandos, []
+        if not self._contem(comandos, var_controle):
+            return comandos, []
+
+        comandos_filtrados = []
+        incrementos_encontrados = []
+
+        for cmd in comandos:
+            if isinstance(cmd, tuple):
+                # Verificar se é um incremento da variável de controle
+                if variavel_incrementada(cmd) == var_controle:
+                    incrementos_encontrados.append(cmd)
+                    continue
+
+                # Se é uma estrutura se/senao, processar recursivamente
+                if cmd[0] == 'se':
+                    # cmd é: ('se', expressao, lista_comandos_then, lista_comandos_else)
+                    then_block = cmd[2] if len(cmd) > 2 else []
+                    else_block = cmd[3] if len(cmd) > 3 else None
+
+                    then_filtrado, then_incrementos = self.extrair_incrementos(then_block, var_controle)
+                    incrementos_encontrados.extend(then_incrementos)
+
+                    if else_block:
+                        else_filtrado, else_incrementos = self.extrair_incrementos(else_block, var_controle)
+                        incrementos_encontrados.extend(else_incrementos)
+                        # Um senao que ficou vazio vira None, como um se sem senao
+                        comandos_filtrados.append((cmd[0], cmd[1], then_filtrado, else_filtrado or None))
+                    else:
+                        comandos_filtrados.append((cmd[0], cmd[1], then_filtrado, None))
+                    continue
+
+                # Se é um loop, processar recursivamente mas não extrair incrementos dele
+                # (cada loop cuida dos seus próprios incrementos)
+                if cmd[0] == 'enquanto':
+                    bloco_loop = cmd[2] if len(cmd) > 2 else []
+                    bloco_corrigido, _ = self.extrair_incrementos(bloco_loop, var_controle)
+                    comandos_filtrados.append((cmd[0], cmd[1], bloco_corrigido))
+                    continue
+
+            comandos_filtrados.append(cmd)
+
+        return self._herdar(comandos_filtrados, comandos), incrementos_encontrados
+
+
+def normalizar_lacos(ast):
+    """Normaliza os laços enquanto de uma AST do parser (ver LoopNormalizer)"""
+    return LoopNormalizer().normalizar(ast)
@@ -5,16 +5,102 @@ Analisador Sintático do compilador MiniPar
 Gramática refatorada para eliminar conflitos shift/reduce
 """
 
+import hashlib
+import marshal
+import os
+
+import sly
 from sly import Parser
 try:
     from .lexer import MiniParLexer
+    from .normalizacao import normalizar_lacos
 except ImportError:
     from lexer import MiniParLexer
+    from normalizacao import normalizar_lacos
+
+
+# --- CACHE DAS TABELAS LALR ---
+# Incrementar sempre que o formato do arquivo de cache mudar
+VERSAO_CACHE_TABELAS = 1
+
+# Diretório do cache (pode ser trocado pela variável de ambiente MINIPAR_CACHE_DIR)
+DIRETORIO_CACHE_TABELAS = os.environ.get(
+    'MINIPAR_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+)
+
+# --- RECUPERAÇÃO DE ERROS ---
+# Tokens de nível de comando onde o parser se ressincroniza após um erro de sintaxe
+TOKENS_SINCRONIZACAO = frozenset({
+    'DECLARE', 'SE', 'SENAO', 'ENQUANTO', 'FIM_ENQUANTO', 'PARA',
+    'LEIA', 'ESCREVA', 'SEQ', 'PAR', 'DEF', 'RETURN', 'C_CHANNEL',
+})
+
+
+class TabelasLALR:
+    """Tabelas LALR carregadas do cache: apenas o que Parser.parse consulta"""
+    def __init__(self, lr_action, lr_goto, defaulted_states):
+        self.lr_action = lr_action
+        self.lr_goto = lr_goto
+        self.defaulted_states = defaulted_states
+        self.sr_conflicts = []
+        self.rr_conflicts = []
+
+
+def hash_gramatica(grammar, tokens):
+    """Calcula o hash que identifica as tabelas geradas para uma gramática.
+    Considera produções (na ordem em que são numeradas), precedências,
+    símbolo inicial, tokens e versão do SLY."""
+    h = hashlib.sha256()
+    h.update(f"v{VERSAO_CACHE_TABELAS}|sly-{getattr(sly, '__version__', '?')}\n".encode('utf-8'))
+    h.update(f"start={grammar.Start}\n".encode('utf-8'))
+    h.update(("tokens=" + ",".join(sorted(tokens)) + "\n").encode('utf-8'))
+    for term, (assoc, level) in sorted(grammar.Precedence.items()):
+        h.update(f"prec {term} {assoc} {level}\n".encode('utf-8'))
+    for prod in grammar.Productions[1:]:
+        h.update(f"{prod} %prec {prod.prec}\n".encode('utf-8'))
+    return h.hexdigest()
+
+
+def caminho_cache_tabelas(digest):
+    nome = f"minipar_parsetab_v{VERSAO_CACHE_TABELAS}_{digest[:16]}.marshal"
+    return os.path.join(DIRETORIO_CACHE_TABELAS, nome)
+
+
+def carregar_tabelas(digest):
+    """Carrega as tabelas do cache em disco. Retorna None se não existir ou for inválido."""
+    try:
+        with open(caminho_cache_tabelas(digest), 'rb') as f:
+            versao, digest_salvo, lr_action, lr_goto, defaulted = marshal.load(f)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if versao != VERSAO_CACHE_TABELAS or digest_salvo != digest:
+        return None
+    return TabelasLALR(lr_action, lr_goto, defaulted)
+
+
+def salvar_tabelas(digest, lrtable):
+    """Salva as tabelas no cache de forma atômica (falhas de escrita são ignoradas)"""
+    caminho = caminho_cache_tabelas(digest)
+    dados = (VERSAO_CACHE_TABELAS, digest, lrtable.lr_action, lrtable.lr_goto,
+             lrtable.defaulted_states)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(DIRETORIO_CACHE_TABELAS, exist_ok=True)
+        with open(temporario, 'wb') as f:
+            marshal.dump(dados, f)
+        os.replace(temporario, caminho)
+    except OSError:
+        try:
+            os.remove(temporario)
+        except OSError:
+            pass
 
 
 class MiniParParser(Parser):
     tokens = MiniParLexer.tokens
-    debugfile = 'parser.out'
+    # O arquivo de depuração só é escrito quando solicitado via MINIPAR_PARSER_DEBUG=<arquivo>
+    debugfile = os.environ.get('MINIPAR_PARSER_DEBUG') or None
     
     # Precedência para resolver conflitos
     # Com FIM_ENQUANTO obrigatório, o parser sabe exatamente onde termina o loop,
@@ -29,21 +115,99 @@ class MiniParParser(Parser):
         ('left', 'SE', 'PARA'),  # Outras estruturas de controle
     )
 
-    def __init__(self):
+    @classmethod
+    def _build(cls, definitions):
+        """Constrói a gramática e carrega as tabelas LALR do cache em disco,
+        gerando-as (e salvando no cache) apenas quando a gramática mudou.
+        Substitui Parser._build do SLY, chamado uma vez pela metaclasse."""
+        rules = cls._Parser__collect_rules(definitions)
+        if not cls._Parser__validate_specification():
+            raise sly.yacc.YaccError('Invalid parser specification')
+        cls._Parser__build_grammar(rules)
+
+        digest = hash_gramatica(cls._grammar, cls.tokens)
+        cls.grammar_hash = digest
+
+        # Com debugfile é preciso a tabela completa (estados e itens) para o relatório
+        tabelas = None if cls.debugfile else carregar_tabelas(digest)
+        if tabelas is not None:
+            cls._lrtable = tabelas
+        else:
+            cls._Parser__build_lrtables()
+            salvar_tabelas(digest, cls._lrtable)
+
+        if cls.debugfile:
+            with open(cls.debugfile, 'w') as f:
+                f.write(str(cls._grammar))
+                f.write('\n')
+                f.write(str(cls._lrtable))
+            cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, cls.debugfile)
+
+    def __init__(self, normalizar_lacos=True):
+        # Passada de normalização dos laços enquanto sobre a AST completa
+        # (normalizacao.py); pode ser desligada para medir o parser sozinho
+        self.normalizar_lacos = normalizar_lacos
         self.syntax_errors = []
         self.indent_level = 0
         self.last_token = None
+        self._token_sincronizacao = None
+
+    def parse(self, tokens):
+        """Faz a análise em uma única passada. Erros de sintaxe são acumulados
+        em syntax_errors e a AST retornada pode ser parcial."""
+        self.syntax_errors = []
+        self.last_token = None
+        self._token_sincronizacao = None
+        ast = super().parse(tokens)
+        if self.normalizar_lacos and ast is not None:
+            normalizar_lacos(ast)
+        return ast
 
     def error(self, p):
-        if p:
+        """Recuperação em modo pânico: registra o erro, descarta tokens até um
+        token de sincronização (TOKENS_SINCRONIZACAO) aceito por algum estado da
+        pilha, desempilha até esse estado e continua a análise."""
+        if p is None and getattr(self._token_sincronizacao, 'type', None) == '$end':
+            # Nem o fechamento forçado no fim do arquivo foi aceito
+            return None
+        if p is not None and p is self._token_sincronizacao:
+            # O token de sincronização também falhou: descartá-lo garante progresso
+            p = next(self.tokens, None)
+        elif p:
             error_message = f"Erro de Sintaxe: Token inesperado '{p.value}' (Tipo: {p.type}) na linha {p.lineno}"
             self.syntax_errors.append(error_message)
             self.last_token = p
-            return None
         else:
             error_message = "Erro de Sintaxe: Fim inesperado do arquivo."
             self.syntax_errors.append(error_message)
-            return None
+
+        while p is not None:
+            if p.type in TOKENS_SINCRONIZACAO and self._desempilhar_ate(p.type):
+                self._token_sincronizacao = p
+                self.errok()
+                return p
+            p = next(self.tokens, None)
+
+        # Fim do arquivo: fecha o que for possível para devolver uma AST parcial
+        if self._desempilhar_ate('$end'):
+            fim = sly.yacc.YaccSymbol()
+            fim.type = '$end'
+            self._token_sincronizacao = fim
+            self.errok()
+            return fim
+        return None
+
+    def _desempilhar_ate(self, tipo_token):
+        """Desempilha estados até o primeiro que tenha ação para tipo_token.
+        Retorna False (sem alterar a pilha) se nenhum estado aceitar o token."""
+        actions = self._lrtable.lr_action
+        for profundidade in range(len(self.statestack) - 1, -1, -1):
+            if tipo_token in actions[self.statestack[profundidade]]:
+                del self.statestack[profundidade + 1:]
+                del self.symstack[profundidade + 1:]
+                self.state = self.statestack[-1]
+                return True
+        return False
 
     # Regra principal do programa
     @_('PROGRAMA lista_comandos') # type: ignore
@@ -73,7 +237,11 @@ class MiniParParser(Parser):
     # para reduzir ambiguidade. O problema não é a recursão, mas a ambiguidade nas regras.
     @_('lista_comandos comando') # type: ignore
     def lista_comandos(self, p):
-        return p.lista_comandos + [p.comando]
+        # A lista da esquerda só pertence a esta redução: acrescentar nela é
+        # O(1), enquanto copiá-la a cada item (lista + [item]) tornava as
+        # listas O(N²). O mesmo vale para as demais listas da gramática.
+        p.lista_comandos.append(p.comando)
+        return p.lista_comandos
 
     @_('comando') # type: ignore
     def lista_comandos(self, p):
@@ -83,7 +251,8 @@ class MiniParParser(Parser):
     # para permitir tratamento específico se necessário
     @_('lista_comandos_loop comando') # type: ignore
     def lista_comandos_loop(self, p):
-        return p.lista_comandos_loop + [p.comando]
+        p.lista_comandos_loop.append(p.comando)
+        return p.lista_comandos_loop
 
     @_('comando') # type: ignore
     def lista_comandos_loop(self, p):
@@ -92,7 +261,8 @@ class MiniParParser(Parser):
     # Para funções - mesma estrutura
     @_('stmts comando') # type: ignore
     def stmts(self, p):
-        return p.stmts + [p.comando]
+        p.stmts.append(p.comando)
+        return p.stmts
         
     @_('comando') # type: ignore
     def stmts(self, p):
@@ -172,7 +342,8 @@ class MiniParParser(Parser):
 
     @_('dimensoes ABRE_COLCHETE NUM_INTEIRO FECHA_COLCHETE') # type: ignore
     def dimensoes(self, p):
-        return p.dimensoes + [p.NUM_INTEIRO]
+        p.dimensoes.append(p.NUM_INTEIRO)
+        return p.dimensoes
 
     @_('ABRE_COLCHETE NUM_INTEIRO FECHA_COLCHETE') # type: ignore
     def dimensoes(self, p):
@@ -194,7 +365,8 @@ class MiniParParser(Parser):
 
     @_('indices ABRE_COLCHETE expressao FECHA_COLCHETE') # type: ignore
     def indices(self, p):
-        return p.indices + [p.expressao]
+        p.indices.append(p.expressao)
+        return p.indices
 
     @_('ABRE_COLCHETE expressao FECHA_COLCHETE') # type: ignore
     def indices(self, p):
@@ -229,7 +401,8 @@ class MiniParParser(Parser):
         
     @_('lista_params VIRGULA param') # type: ignore
     def lista_params(self, p):
-        return p.lista_params + [p.param]
+        p.lista_params.append(p.param)
+        return p.lista_params
 
     @_('param') # type: ignore
     def lista_params(self, p):
@@ -263,184 +436,9 @@ class MiniParParser(Parser):
     # onde termina o bloco de comandos do loop
     @_('ENQUANTO expressao FACA opt_dois_pontos lista_comandos_loop FIM_ENQUANTO') # type: ignore
     def comando_enquanto(self, p):
-        # Identificar variável de controle deste loop
-        # CORREÇÃO: Verificar ambos os lados da comparação (pode ser i < epocas ou epocas > i)
-        var_controle = None
-        if isinstance(p.expressao, tuple) and p.expressao[0] == 'binop':
-            # Verificar lado esquerdo primeiro (mais comum: i < epocas)
-            if len(p.expressao) > 2 and isinstance(p.expressao[2], tuple) and p.expressao[2][0] == 'id':
-                var_controle = p.expressao[2][1]
-            # Verificar lado direito se não encontrou no esquerdo (caso: epocas > i)
-            if not var_controle and len(p.expressao) > 3:
-                if isinstance(p.expressao[3], tuple) and p.expressao[3][0] == 'id':
-                    var_controle = p.expressao[3][1]
-        
-        # Com FIM_ENQUANTO, não é mais necessário pós-processamento complexo,
-        # mas mantemos a correção para compatibilidade com código antigo
-        lista_comandos_corrigida = p.lista_comandos_loop
-        if var_controle and isinstance(p.lista_comandos_loop, list):
-            lista_comandos_corrigida = self._corrigir_comandos_loop(list(p.lista_comandos_loop), var_controle)
-        
-        return ('enquanto', p.expressao, lista_comandos_corrigida)
-    
-    def _corrigir_comandos_loop(self, comandos, var_controle):
-        """Move comandos de incremento de var_controle que estão dentro de loops aninhados
-        ou após loops aninhados de volta para o nível correto (dentro deste loop, após o loop aninhado)"""
-        if not isinstance(comandos, list):
-            return comandos
-        
-        nova_lista = []
-        i = 0
-        
-        while i < len(comandos):
-            cmd = comandos[i]
-            
-            # Se é um loop aninhado, processar recursivamente
-            if isinstance(cmd, tuple) and cmd[0] == 'enquanto':
-                # Identificar variável de controle do loop aninhado
-                # CORREÇÃO: Verificar ambos os lados da comparação
-                cond_aninhado = cmd[1] if len(cmd) > 1 else None
-                var_aninhado = None
-                if isinstance(cond_aninhado, tuple) and cond_aninhado[0] == 'binop':
-                    # Verificar lado esquerdo primeiro (mais comum)
-                    if len(cond_aninhado) > 2 and isinstance(cond_aninhado[2], tuple) and cond_aninhado[2][0] == 'id':
-                        var_aninhado = cond_aninhado[2][1]
-                    # Verificar lado direito se não encontrou no esquerdo
-                    if not var_aninhado and len(cond_aninhado) > 3:
-                        if isinstance(cond_aninhado[3], tuple) and cond_aninhado[3][0] == 'id':
-                            var_aninhado = cond_aninhado[3][1]
-                
-                bloco_aninhado = cmd[2] if len(cmd) > 2 else []
-                
-                # Se este loop aninhado usa uma variável DIFERENTE, procurar por incremento
-                # de var_controle dentro ou após este loop
-                incremento_encontrado = None
-                
-                if var_aninhado and var_aninhado != var_controle:
-                    # Este é um loop aninhado com variável diferente - incremento de var_controle
-                    # após este loop pertence ao loop externo
-                    
-                    # Primeiro, procurar dentro do bloco do loop aninhado (incluindo estruturas se/senao)
-                    if isinstance(bloco_aninhado, list):
-                        # Remover incrementos de var_controle do bloco aninhado
-                        # CORREÇÃO: Procurar recursivamente também dentro de estruturas se/senao
-                        bloco_filtrado, incrementos_encontrados = self._extrair_incrementos_recursivo(
-                            bloco_aninhado, var_controle
-                        )
-                        bloco_aninhado = bloco_filtrado
-                        if incrementos_encontrados:
-                            # Pegar o primeiro incremento encontrado (deve haver apenas um)
-                            incremento_encontrado = incrementos_encontrados[0]
-                    
-                    # Depois, procurar após o loop aninhado na lista de comandos
-                    # CORREÇÃO: NÃO mover incrementos que estão no final da lista de comandos
-                    # (depois de todos os outros comandos, como escreva). Apenas mover incrementos
-                    # que estão imediatamente após o loop aninhado, antes de outros comandos importantes.
-                    if not incremento_encontrado:
-                        j = i + 1
-                        # Limitar a busca: só procurar incrementos imediatamente após o loop,
-                        # não no final da lista
-                        encontrou_comando_importante = False
-                        while j < len(comandos):
-                            prox_cmd = comandos[j]
-                            if isinstance(prox_cmd, tuple):
-                                # Se encontrou um comando importante (escreva, se, outro loop), 
-                                # parar a busca - o incremento deve ficar no final
-                                if prox_cmd[0] in ('escreva', 'se', 'enquanto', 'leia'):
-                                    encontrou_comando_importante = True
-                                    break
-                                elif prox_cmd[0] == 'atribuicao':
-                                    if prox_cmd[1] == var_controle:
-                                        expr = prox_cmd[2] if len(prox_cmd) > 2 else None
-                                        if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                                            left = expr[2] if len(expr) > 2 else None
-                                            if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_controle:
-                                                # Só mover se não há comandos importantes depois
-                                                # Se há escreva depois, não mover
-                                                tem_escreva_depois = any(
-                                                    isinstance(comandos[k], tuple) and comandos[k][0] == 'escreva'
-                                                    for k in range(j + 1, len(comandos))
-                                                )
-                                                if not tem_escreva_depois:
-                                                    incremento_encontrado = prox_cmd
-                                                    # Remover da posição atual
-                                                    comandos.pop(j)
-                                                    break
-                            j += 1
-                        
-                        # Se encontrou comando importante antes de encontrar incremento,
-                        # não mover incrementos que possam estar depois
-                        if encontrou_comando_importante:
-                            pass  # Não fazer nada, deixar incremento onde está
-                
-                # Processar recursivamente o bloco aninhado (pode ter mais loops dentro)
-                bloco_corrigido = self._corrigir_comandos_loop(bloco_aninhado, var_controle)
-                
-                # Adicionar o loop aninhado corrigido
-                novo_loop = (cmd[0], cmd[1], bloco_corrigido) if len(cmd) >= 3 else cmd
-                nova_lista.append(novo_loop)
-                
-                # Se encontrou incremento (dentro ou após o loop aninhado), adicioná-lo aqui
-                # Isso garante que ele fique no nível correto do loop externo
-                if incremento_encontrado:
-                    nova_lista.append(incremento_encontrado)
-            else:
-                nova_lista.append(cmd)
-            
-            i += 1
-        
-        return nova_lista
-    
-    def _extrair_incrementos_recursivo(self, comandos, var_controle):
-        """Remove recursivamente incrementos de var_controle de uma lista de comandos,
-        incluindo dentro de estruturas se/senao e loops aninhados.
-        Retorna (comandos_filtrados, lista_incrementos_encontrados)"""
-        if not isinstance(comandos, list):
-            return comandos, []
-        
-        comandos_filtrados = []
-        incrementos_encontrados = []
-        
-        for cmd in comandos:
-            if isinstance(cmd, tuple):
-                # Verificar se é um incremento da variável de controle
-                if cmd[0] == 'atribuicao' and cmd[1] == var_controle:
-                    expr = cmd[2] if len(cmd) > 2 else None
-                    if isinstance(expr, tuple) and expr[0] == 'binop' and expr[1] == '+':
-                        left = expr[2] if len(expr) > 2 else None
-                        if isinstance(left, tuple) and left[0] == 'id' and left[1] == var_controle:
-                            # Encontrou incremento - adicionar à lista e não incluir no resultado
-                            incrementos_encontrados.append(cmd)
-                            continue
-                
-                # Se é uma estrutura se/senao, processar recursivamente
-                if cmd[0] == 'se':
-                    # cmd é: ('se', expressao, lista_comandos_then, lista_comandos_else)
-                    then_block = cmd[2] if len(cmd) > 2 else []
-                    else_block = cmd[3] if len(cmd) > 3 else None
-                    
-                    then_filtrado, then_incrementos = self._extrair_incrementos_recursivo(then_block, var_controle)
-                    incrementos_encontrados.extend(then_incrementos)
-                    
-                    if else_block:
-                        else_filtrado, else_incrementos = self._extrair_incrementos_recursivo(else_block, var_controle)
-                        incrementos_encontrados.extend(else_incrementos)
-                        comandos_filtrados.append((cmd[0], cmd[1], then_filtrado, else_filtrado))
-                    else:
-                        comandos_filtrados.append((cmd[0], cmd[1], then_filtrado, None))
-                    continue
-                
-                # Se é um loop, processar recursivamente mas não extrair incrementos dele
-                # (cada loop cuida dos seus próprios incrementos)
-                if cmd[0] == 'enquanto':
-                    bloco_loop = cmd[2] if len(cmd) > 2 else []
-                    bloco_corrigido, _ = self._extrair_incrementos_recursivo(bloco_loop, var_controle)
-                    comandos_filtrados.append((cmd[0], cmd[1], bloco_corrigido))
-                    continue
-            
-            comandos_filtrados.append(cmd)
-        
-        return comandos_filtrados, incrementos_encontrados
+        # Os incrementos da variável de controle que ficaram em laços aninhados
+        # são recolocados depois, numa passada única sobre a AST (normalizacao.py)
+        return ('enquanto', p.expressao, p.lista_comandos_loop)
 
     # LEITURA E ESCRITA
     @_('LEIA ABRE_PARENTESES ID FECHA_PARENTESES') # type: ignore
@@ -453,7 +451,8 @@ class MiniParParser(Parser):
 
     @_('lista_expressoes VIRGULA expressao') # type: ignore
     def lista_expressoes(self, p):
-        return p.lista_expressoes + [p.expressao]
+        p.lista_expressoes.append(p.expressao)
+        return p.lista_expressoes
 
     @_('expressao') # type: ignore
     def lista_expressoes(self, p):
@@ -461,7 +460,8 @@ class MiniParParser(Parser):
         
     @_('lista_ids VIRGULA ID') # type: ignore
     def lista_ids(self, p):
-        return p.lista_ids + [p.ID]
+        p.lista_ids.append(p.ID)
+        return p.lista_ids
         
     @_('ID') # type: ignore
     def lista_ids(self, p):
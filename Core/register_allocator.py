@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Alocação de Registradores por Varredura Linear (linear scan) para o ARMv7
+
+Cada bloco de C3E (programa principal ou corpo de função) é dividido em blocos
+básicos; a análise de vivacidade sobre eles dá o intervalo de vida de cada
+temporário e variável escalar, e os intervalos recebem os registradores r4-r10.
+Só vão para a pilha os que não cabem: sai o intervalo de menor densidade de
+uso (usos ponderados pela profundidade de laço, divididos pelo comprimento do
+intervalo), para manter nos registradores as variáveis dos laços internos.
+"""
+
+try:
+    from .c3e_generator import OpC3E
+    from .c3e_optimizer import DEFINEM, operandos
+except ImportError:
+    from c3e_generator import OpC3E
+    from c3e_optimizer import DEFINEM, operandos
+
+# Registradores preservados pela função chamada (AAPCS), livres no gerador
+REGISTRADORES_ALOCAVEIS = ('r4', 'r5', 'r6', 'r7', 'r8', 'r9', 'r10')
+
+DESVIOS = (OpC3E.GOTO, OpC3E.IF_GOTO)
+
+# Peso de um uso a cada nível de laço
+PESO_LACO = 10
+
+
+def blocos_basicos(codigo):
+    """Divide o código em blocos básicos.
+
+    Retorna (blocos, sucessores): blocos é a lista de (inicio, fim) com fim
+    exclusivo e sucessores[b] os índices dos blocos que podem seguir b."""
+    rotulos = {instr.result: i for i, instr in enumerate(codigo) if instr.op == OpC3E.LABEL}
+    lideres = {0}
+    for i, instr in enumerate(codigo):
+        if instr.op == OpC3E.LABEL:
+            lideres.add(i)
+        elif instr.op in DESVIOS or instr.op == OpC3E.RETURN:
+            lideres.add(i + 1)
+    inicios = sorted(l for l in lideres if l < len(codigo))
+    blocos = list(zip(inicios, inicios[1:] + [len(codigo)]))
+    bloco_em = {inicio: b for b, (inicio, _) in enumerate(blocos)}
+
+    sucessores = []
+    for b, (inicio, fim) in enumerate(blocos):
+        ultima = codigo[fim - 1]
+        seguintes = []
+        if ultima.op in DESVIOS and ultima.result in rotulos:
+            seguintes.append(bloco_em[rotulos[ultima.result]])
+        if ultima.op not in (OpC3E.GOTO, OpC3E.RETURN) and b + 1 < len(blocos):
+            seguintes.append(b + 1)
+        sucessores.append(seguintes)
+    return blocos, sucessores
+
+
+class RegisterAllocator:
+    """Alocador linear scan sobre r4-r10.
+
+    alocavel(nome) diz se um operando pode ficar em registrador (o gerador
+    exclui arrays e rótulos de strings). alocar(codigo) retorna o dicionário
+    nome -> registrador; os nomes ausentes continuam na pilha (derramados).
+    """
+    def __init__(self, alocavel=lambda nome: True, registradores=REGISTRADORES_ALOCAVEIS):
+        self.alocavel = alocavel
+        self.registradores = tuple(registradores)
+        self.derramados = []
+
+    def _nomes(self, valores):
+        return [v for v in valores if isinstance(v, str) and self.alocavel(v)]
+
+    def usos_e_definicoes(self, codigo):
+        """Por instrução: (nomes lidos, nome definido ou None)"""
+        strings = {instr.result for instr in codigo if instr.op == OpC3E.STRING_DEF}
+        resultado = []
+        for instr in codigo:
+            lidos = [n for n in self._nomes(operandos(instr)) if n not in strings]
+            definido = None
+            if instr.op in DEFINEM and isinstance(instr.result, str) and self.alocavel(instr.result):
+                definido = instr.result
+            elif instr.op == OpC3E.PARAM and self.alocavel(instr.arg1):
+                definido = instr.arg1  # recebido em r0-r3 no início da função
+            resultado.append((lidos, definido))
+        return resultado
+
+    def vivacidade(self, blocos, sucessores, usos_defs):
+        """Conjuntos vivos na entrada e na saída de cada bloco básico"""
+        geradas, mortas = [], []
+        for inicio, fim in blocos:
+            gerados, definidos = set(), set()
+            for lidos, definido in usos_defs[inicio:fim]:
+                gerados.update(n for n in lidos if n not in definidos)
+                if definido:
+                    definidos.add(definido)
+            geradas.append(gerados)
+            mortas.append(definidos)
+
+        entrada = [set() for _ in blocos]
+        saida = [set() for _ in blocos]
+        mudou = True
+        while mudou:
+            mudou = False
+            for b in reversed(range(len(blocos))):
+                novo_saida = set()
+                for s in sucessores[b]:
+                    novo_saida |= entrada[s]
+                novo_entrada = geradas[b] | (novo_saida - mortas[b])
+                if novo_saida != saida[b] or novo_entrada != entrada[b]:
+                    saida[b], entrada[b] = novo_saida, novo_entrada
+                    mudou = True
+        return entrada, saida
+
+    def intervalos(self, codigo):
+        """nome -> [inicio, fim] (posições de instrução, inclusivas)"""
+        usos_defs = self.usos_e_definicoes(codigo)
+        blocos, sucessores = blocos_basicos(codigo)
+        entrada, saida = self.vivacidade(blocos, sucessores, usos_defs)
+
+        intervalos = {}
+
+        def estender(nome, posicao):
+            if nome in intervalos:
+                intervalo = intervalos[nome]
+                intervalo[0] = min(intervalo[0], posicao)
+                intervalo[1] = max(intervalo[1], posicao)
+            else:
+                intervalos[nome] = [posicao, posicao]
+
+        for b, (inicio, fim) in enumerate(blocos):
+            for nome in entrada[b]:
+                estender(nome, inicio)
+            for nome in saida[b]:
+                estender(nome, fim - 1)
+            for i in range(inicio, fim):
+                lidos, definido = usos_defs[i]
+                for nome in lidos:
+                    estender(nome, i)
+                if definido:
+                    estender(definido, i)
+        return intervalos
+
+    def pesos(self, codigo):
+        """nome -> soma dos usos e definições, ponderados por PESO_LACO ** profundidade"""
+        rotulos = {instr.result: i for i, instr in enumerate(codigo) if instr.op == OpC3E.LABEL}
+        profundidade = [0] * (len(codigo) + 1)
+        for i, instr in enumerate(codigo):
+            if instr.op in DESVIOS and rotulos.get(instr.result, i + 1) <= i:
+                # desvio para trás: [destino, i] é o corpo de um laço
+                profundidade[rotulos[instr.result]] += 1
+                profundidade[i + 1] -= 1
+        pesos = {}
+        nivel = 0
+        for i, (lidos, definido) in enumerate(self.usos_e_definicoes(codigo)):
+            nivel += profundidade[i]
+            for nome in lidos + ([definido] if definido else []):
+                pesos[nome] = pesos.get(nome, 0) + PESO_LACO ** nivel
+        return pesos
+
+    def alocar(self, codigo):
+        intervalos = self.intervalos(codigo)
+        pesos = self.pesos(codigo)
+
+        def densidade(nome):
+            inicio, fim = intervalos[nome]
+            return pesos.get(nome, 0) / (fim - inicio + 1)
+
+        alocacao = {}
+        derramados = []
+        ativos = []  # nomes que estão com um registrador
+        livres = list(self.registradores)
+
+        for nome in sorted(intervalos, key=lambda n: (intervalos[n][0], n)):
+            inicio, fim = intervalos[nome]
+            # Libera os registradores dos intervalos que já terminaram
+            for ativo in [a for a in ativos if intervalos[a][1] < inicio]:
+                ativos.remove(ativo)
+                livres.append(alocacao[ativo])
+            if livres:
+                livres.sort(key=self.registradores.index)
+                alocacao[nome] = livres.pop(0)
+                ativos.append(nome)
+                continue
+            # Sem registrador livre: derrama o de menor densidade (o mais longo no empate)
+            vitima = min(ativos + [nome], key=lambda n: (densidade(n), -intervalos[n][1], n))
+            if vitima != nome:
+                alocacao[nome] = alocacao.pop(vitima)
+                ativos.remove(vitima)
+                ativos.append(nome)
+            derramados.append(vitima)
+
+        self.derramados = derramados
+        return alocacao
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Resolução das variáveis do interpretador em posições fixas (slots)
+
+Antes de executar, o interpretador troca cada nome de variável da AST por uma
+referência ('var', escopo, slot, nome): o escopo GLOBAL indexa a lista das
+variáveis do programa e o escopo LOCAL a lista (quadro) da chamada de função
+em andamento. Ler ou escrever uma variável vira um acesso por índice e uma
+chamada de função aloca só o quadro dela, sem copiar as variáveis globais.
+
+Os escopos vêm do SemanticAnalyzer: as globais seguem a tabela de símbolos do
+programa e as locais de cada função são os parâmetros e os nomes que o corpo
+acrescenta à tabela (function_scopes). Todo nome escrito no corpo de uma
+função (atribuição, declare, leia, receive, para) também é local, porque as
+alterações de uma função nas variáveis do programa são descartadas no
+retorno. Uma local com o nome de uma global começa a chamada com o valor da
+global; as demais começam em 0, como as variáveis não declaradas.
+
+Os arrays continuam indexados pelo nome (array_variables, ver arrays.py).
+
+Blocos PAR consecutivos numa lista de comandos, que executam juntos em
+paralelo, viram um nó ('grupo_par', [comandos de cada bloco]).
+"""
+
+try:
+    from .semantic import SemanticAnalyzer
+    from .bytecode import VALORES_INICIAIS
+except ImportError:
+    from semantic import SemanticAnalyzer
+    from bytecode import VALORES_INICIAIS
+
+# Escopos de uma referência ('var', escopo, slot, nome)
+GLOBAL = 0
+LOCAL = 1
+
+
+class FrameLayout:
+    """Quadro de uma função: número de slots, slot de cada parâmetro e pares
+    (slot local, slot global) das locais que começam com o valor da global"""
+    __slots__ = ('tamanho', 'parametros', 'copias')
+
+    def __init__(self, tamanho, parametros, copias=()):
+        self.tamanho = tamanho
+        self.parametros = parametros
+        self.copias = copias
+
+    def __reduce__(self):
+        # Enviado aos processos do pool junto com as funções
+        return (FrameLayout, (self.tamanho, self.parametros, self.copias))
+
+
+def _nos(raiz, entrar_funcoes=True):
+    """Nós (tuplas) de uma AST ou lista de comandos, em ordem. Com
+    entrar_funcoes=False o corpo das funções declaradas não é percorrido."""
+    pilha = [raiz]
+    while pilha:
+        atual = pilha.pop()
+        if isinstance(atual, list):
+            pilha.extend(reversed(atual))
+        elif isinstance(atual, tuple) and atual:
+            yield atual
+            if atual[0] == 'declaracao_funcao' and not entrar_funcoes:
+                continue
+            pilha.extend(filho for filho in reversed(atual[1:]) if isinstance(filho, (tuple, list)))
+
+
+def _nome(var):
+    """Nome de uma variável de receive (string ou nó 'id')"""
+    if isinstance(var, tuple) and len(var) > 1 and var[0] == 'id':
+        return var[1]
+    return var if isinstance(var, str) else None
+
+
+def agrupar_par(comandos):
+    """Junta os blocos PAR consecutivos (dois ou mais) de uma lista de comandos
+    num nó grupo_par"""
+    resultado = []
+    grupo = []
+    for cmd in comandos + [None]:
+        if isinstance(cmd, tuple) and cmd and cmd[0] == 'bloco_par':
+            grupo.append(cmd)
+            continue
+        if len(grupo) > 1:
+            resultado.append(('grupo_par', [bloco[1] for bloco in grupo]))
+        else:
+            resultado.extend(grupo)
+        grupo = []
+        if cmd is not None:
+            resultado.append(cmd)
+    return resultado
+
+
+def nomes_escritos(comandos):
+    """Nomes escritos pelos comandos (fora de funções declaradas neles)"""
+    nomes = []
+    for no in _nos(comandos, entrar_funcoes=False):
+        tipo = no[0]
+        if tipo in ('atribuicao', 'declaracao_var', 'leia', 'para') and isinstance(no[1], str):
+            nomes.append(no[1])
+        elif tipo == 'receive' and len(no) > 2:
+            nomes.extend(nome for nome in map(_nome, no[2] or []) if nome is not None)
+    return nomes
+
+
+class VariableResolver:
+    """Troca os nomes de variáveis da AST por referências a slots"""
+    def __init__(self):
+        self.globais = {}  # nome -> slot global
+        self.escopos_funcoes = {}  # function_scopes do SemanticAnalyzer
+        self.declaradas = set()  # declaradas com valor inicial (tipo usado por leia)
+        self._funcoes = []  # (FrameLayout, locais, parâmetros) para completar as cópias
+
+    def resolver(self, ast):
+        """AST do programa com as variáveis resolvidas"""
+        analisador = SemanticAnalyzer()
+        try:
+            analisador.visit(ast)
+        except Exception:
+            # Programas que o analisador não percorre ainda executam: os nomes
+            # que faltarem ganham slot durante a resolução
+            pass
+        for nome, tipo in analisador.symbol_table.items():
+            if tipo != 'function' and nome not in analisador.array_dims:
+                self.slot_global(nome)
+        self.escopos_funcoes = analisador.function_scopes
+        self.declaradas = {no[1] for no in _nos(ast)
+                           if no[0] == 'declaracao_var' and isinstance(no[2], str)
+                           and no[2].upper() in VALORES_INICIAIS}
+
+        resolvida = (ast[0], self.no(ast[1], None)) + tuple(ast[2:])
+        # As cópias de entrada dependem de todas as globais já terem slot
+        for layout, locais, parametros in self._funcoes:
+            layout.copias = tuple((slot, self.globais[nome]) for nome, slot in locais.items()
+                                  if nome not in parametros and nome in self.globais)
+        return resolvida
+
+    def slot_global(self, nome):
+        slot = self.globais.get(nome)
+        if slot is None:
+            slot = self.globais[nome] = len(self.globais)
+        return slot
+
+    def referencia(self, nome, locais):
+        if locais is not None and nome in locais:
+            return ('var', LOCAL, locais[nome], nome)
+        return ('var', GLOBAL, self.slot_global(nome), nome)
+
+    def no(self, node, locais):
+        """Resolve um nó (ou lista de nós) no escopo locais (None: programa)"""
+        if isinstance(node, list):
+            return agrupar_par([self.no(item, locais) for item in node])
+        if not isinstance(node, tuple) or not node:
+            return node
+        tipo = node[0]
+        if tipo == 'id':
+            return self.referencia(node[1], locais)
+        if tipo in ('atribuicao', 'declaracao_var') and isinstance(node[1], str):
+            return (tipo, self.referencia(node[1], locais)) + tuple(self.no(filho, locais) for filho in node[2:])
+        if tipo == 'leia':
+            return ('leia', self.referencia(node[1], locais), node[1] in self.declaradas)
+        if tipo == 'para':
+            return ('para', self.referencia(node[1], locais)) + tuple(self.no(filho, locais) for filho in node[2:])
+        if tipo == 'receive' and len(node) > 2:
+            variaveis = [self.referencia(nome, locais) for nome in map(_nome, node[2] or []) if nome is not None]
+            return ('receive', node[1], variaveis)
+        if tipo == 'declaracao_funcao':
+            return self.funcao(node)
+        return (tipo,) + tuple(self.no(filho, locais) for filho in node[1:])
+
+    def funcao(self, node):
+        """declaracao_funcao com o corpo resolvido no escopo da função e o
+        FrameLayout como último elemento"""
+        params = node[2] or []
+        corpo = node[4] or []
+        locais = {}
+        for param in params:
+            locais.setdefault(param[1], len(locais))
+        for nome in self.escopos_funcoes.get(node[1], ()):
+            locais.setdefault(nome, len(locais))
+        for nome in nomes_escritos(corpo):
+            locais.setdefault(nome, len(locais))
+        parametros = {param[1] for param in params}
+        layout = FrameLayout(len(locais), tuple(locais[param[1]] for param in params))
+        self._funcoes.append((layout, locais, parametros))
+        return (node[0], node[1], params, node[3], self.no(corpo, locais), layout)
+
+
+def resolver_variaveis(ast):
+    """Resolve as variáveis de uma AST de programa (programa_minipar).
+    Retorna (AST resolvida, nomes das globais na ordem dos slots)."""
+    resolvedor = VariableResolver()
+    resolvida = resolvedor.resolver(ast)
+    return resolvida, list(resolvedor.globais)
@@ -2,10 +2,21 @@
 # -*- coding: utf-8 -*-
 """
 Analisador Semântico do compilador MiniPar
+
+A análise não reconstrói a AST: cada visita retorna o próprio nó, e o tipo
+calculado para uma expressão fica na tabela tipos, indexada pela identidade
+do nó (id), até o comando que contém a expressão terminar (quem usa o tipo
+é a expressão ou o comando pai, logo depois de visitá-la).
 """
 
+try:
+    from .visitante import NodeVisitor
+except ImportError:
+    from visitante import NodeVisitor
+
+
 # --- ANALISADOR SEMÂNTICO ---
-class SemanticAnalyzer:
+class SemanticAnalyzer(NodeVisitor):
     def __init__(self):
         self.symbol_table = {}
         self.channel_table = {}
@@ -14,49 +25,41 @@ class SemanticAnalyzer:
         self.errors = []
         self.array_dims = {}  # Armazenar dimensões dos arrays
         self.declared_vars = set() 
-        
-    def visit(self, node):
-        if node is None:
-            return None
-        
-        method_name = f'visit_{node[0]}'
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(node)
-        else:
-            return self.generic_visit(node)
+        self.function_scopes = {}  # Nomes locais de cada função (parâmetros primeiro)
+        self.tipos = {}  # id(nó) -> tipo das expressões do comando em análise
+
+    def anotar(self, node, tipo):
+        """Registra o tipo da expressão e retorna o nó"""
+        self.tipos[id(node)] = tipo
+        return node
+
+    def visitar_comandos(self, comandos):
+        """Visita uma lista de comandos; os tipos anotados por um comando são
+        descartados quando ele termina"""
+        for cmd in comandos:
+            self.visit(cmd)
+            self.tipos.clear()
 
     def generic_visit(self, node):
-        node_type = node[0]
-        results = []
         for child in node[1:]:
             if isinstance(child, tuple):
-                results.append(self.visit(child))
+                self.visit(child)
             elif isinstance(child, list):
-                list_results = []
                 for item in child:
                     if isinstance(item, tuple):
-                        list_results.append(self.visit(item))
-                    else:
-                        list_results.append(item)
-                results.append(list_results)
-            else:
-                results.append(child)
-        
-        return (node_type,) + tuple(results)
+                        self.visit(item)
+        return node
 
     def visit_programa_minipar(self, node):
-        for cmd in node[1]:
-            self.visit(cmd)
+        self.visitar_comandos(node[1])
         return node
 
     def visit_bloco_seq(self, node):
-        for cmd in node[1]:
-            self.visit(cmd)
+        self.visitar_comandos(node[1])
         return node
 
     def visit_bloco_par(self, node):
-        for cmd in node[1]:
-            self.visit(cmd)
+        self.visitar_comandos(node[1])
         return node
 
     def visit_declaracao_var(self, node):
@@ -67,7 +70,7 @@ class SemanticAnalyzer:
             self.errors.append(f"Erro Semântico: Variável '{var_name}' já declarada.")
         else:
             self.symbol_table[var_name] = normalized_type
-        return (node[0], var_name, normalized_type)
+        return node
 
     def visit_declaracao_var_array(self, node):
         var_name = node[1]
@@ -79,7 +82,7 @@ class SemanticAnalyzer:
         else:
             self.symbol_table[var_name] = normalized_type
             self.array_dims[var_name] = dimensions
-        return (node[0], var_name, normalized_type, dimensions)
+        return node
 
     def visit_atribuicao_array(self, node):
         var_name = node[1]
@@ -88,11 +91,11 @@ class SemanticAnalyzer:
         
         if var_name not in self.symbol_table:
             self.errors.append(f"Erro Semântico: Variável '{var_name}' não foi declarada.")
-            return ('atribuicao_array', var_name, indices, self.visit(expr_node), 'error')
+            self.visit(expr_node)
+            return node
             
         var_type = self.symbol_table[var_name]
-        expr_type_node = self.visit(expr_node)
-        expr_type = self.get_type(expr_type_node)
+        expr_type = self.get_type(self.visit(expr_node))
 
         # Verificar índices
         for index in indices:
@@ -100,13 +103,12 @@ class SemanticAnalyzer:
             if index_type != 'INTEIRO' and index_type != 'error':
                 self.errors.append(f"Erro Semântico: Índice de array deve ser INTEIRO, mas é '{index_type}'.")
 
+        # INTEIRO pode ser atribuído a REAL
         if var_type != expr_type and expr_type != 'error':
-            if var_type == 'REAL' and expr_type == 'INTEIRO':
-                return ('atribuicao_array', var_name, indices, expr_type_node, 'REAL')
-            self.errors.append(f"Erro Semântico: Tipos incompatíveis. Não é possível atribuir '{expr_type}' à variável '{var_name}' (tipo '{var_type}').")
-            return ('atribuicao_array', var_name, indices, expr_type_node, 'error')
+            if not (var_type == 'REAL' and expr_type == 'INTEIRO'):
+                self.errors.append(f"Erro Semântico: Tipos incompatíveis. Não é possível atribuir '{expr_type}' à variável '{var_name}' (tipo '{var_type}').")
             
-        return ('atribuicao_array', var_name, indices, expr_type_node, var_type)
+        return node
 
     def visit_acesso_array(self, node):
         var_name = node[1]
@@ -115,19 +117,15 @@ class SemanticAnalyzer:
         # Verificar se a variável existe na tabela de símbolos
         if var_name not in self.symbol_table:
             self.errors.append(f"Erro Semântico: Variável '{var_name}' não foi declarada.")
-            return ('acesso_array', var_name, indices, 'error')
+            return self.anotar(node, 'error')
         
         # Processar índices
-        index_results = []
         for index in indices:
-            index_type_node = self.visit(index)
-            index_type = self.get_type(index_type_node)
+            index_type = self.get_type(self.visit(index))
             if index_type != 'INTEIRO' and index_type != 'error':
                 self.errors.append(f"Erro Semântico: Índice de array deve ser INTEIRO, mas é '{index_type}'.")
-            index_results.append(index_type_node)
         
-        var_type = self.symbol_table[var_name]
-        return ('acesso_array', var_name, index_results, var_type)
+        return self.anotar(node, self.symbol_table[var_name])
         
     def visit_c_channel(self, node):
         channel_name = node[1]
@@ -169,9 +167,11 @@ class SemanticAnalyzer:
         self.function_table[func_name] = {'type': normalized_func_type, 'params': param_types}
         
         self.current_function_type = normalized_func_type
-        for stmt in body:
-            self.visit(stmt)
+        self.visitar_comandos(body)
         self.current_function_type = None
+        # Escopo da função: parâmetros e nomes que o corpo acrescentou à tabela
+        self.function_scopes[func_name] = [name for name in self.symbol_table
+                                           if name not in old_table and name != func_name]
         self.symbol_table = old_table
         
         return node
@@ -179,7 +179,8 @@ class SemanticAnalyzer:
     def visit_return(self, node):
         if self.current_function_type is None:
             self.errors.append("Erro Semântico: Comando 'return' encontrado fora de uma função.")
-            return ('return', self.visit(node[1]), 'error')
+            self.visit(node[1])
+            return node
             
         return_type = self.visit(node[1])
         
@@ -204,7 +205,7 @@ class SemanticAnalyzer:
         if expr_type != self.current_function_type and expr_type != 'error':
             self.errors.append(f"Erro Semântico: Tipo de retorno da função ({expr_type}) não é compatível com o tipo esperado ({self.current_function_type}).")
             
-        return ('return', return_type, expr_type)
+        return node
 
     def visit_atribuicao(self, node):
         var_name = node[1]
@@ -215,17 +216,14 @@ class SemanticAnalyzer:
             self.symbol_table[var_name] = 'INTEIRO'
                 
         var_type = self.symbol_table[var_name]
-        expr_type_node = self.visit(expr_node)
-        expr_type = self.get_type(expr_type_node)
+        expr_type = self.get_type(self.visit(expr_node))
 
-        # Comparar tipos normalizados
+        # Comparar tipos normalizados (INTEIRO pode ser atribuído a REAL)
         if var_type != expr_type and expr_type != 'error':
-            if var_type == 'REAL' and expr_type == 'INTEIRO':
-                return ('atribuicao', var_name, expr_type_node, 'REAL')
-            self.errors.append(f"Erro Semântico: Tipos incompatíveis. Não é possível atribuir '{expr_type}' à variável '{var_name}' (tipo '{var_type}').")
-            return ('atribuicao', var_name, expr_type_node, 'error')
+            if not (var_type == 'REAL' and expr_type == 'INTEIRO'):
+                self.errors.append(f"Erro Semântico: Tipos incompatíveis. Não é possível atribuir '{expr_type}' à variável '{var_name}' (tipo '{var_type}').")
             
-        return ('atribuicao', var_name, expr_type_node, var_type)
+        return node
         
     def visit_send(self, node):
         channel_name = node[1]
@@ -262,33 +260,28 @@ class SemanticAnalyzer:
         bloco_then = node[2]
         bloco_else = node[3]
 
-        cond_type_node = self.visit(cond_node)
-        cond_type = self.get_type(cond_type_node)
+        cond_type = self.get_type(self.visit(cond_node))
 
         if cond_type != 'BOOL' and cond_type != 'error':
             self.errors.append(f"Erro Semântico: A condição do 'SE' deve ser 'BOOL', mas é '{cond_type}'.")
 
-        for cmd in bloco_then:
-            self.visit(cmd)
+        self.visitar_comandos(bloco_then)
         if bloco_else:
-            for cmd in bloco_else:
-                self.visit(cmd)
+            self.visitar_comandos(bloco_else)
             
-        return ('se', cond_type_node, bloco_then, bloco_else)
+        return node
 
     def visit_enquanto(self, node):
         cond_node = node[1]
         bloco_faca = node[2]
 
-        cond_type_node = self.visit(cond_node)
-        cond_type = self.get_type(cond_type_node)
+        cond_type = self.get_type(self.visit(cond_node))
 
         if cond_type != 'BOOL' and cond_type != 'error':
             self.errors.append(f"Erro Semântico: A condição do 'ENQUANTO' deve ser 'BOOL', mas é '{cond_type}'.")
 
-        for cmd in bloco_faca:
-            self.visit(cmd)
-        return ('enquanto', cond_type_node, bloco_faca)
+        self.visitar_comandos(bloco_faca)
+        return node
         
     def visit_para(self, node):
         var_name = node[1]
@@ -300,8 +293,7 @@ class SemanticAnalyzer:
              self.errors.append(f"Erro Semântico: Variável de loop '{var_name}' já declarada no escopo.")
         self.symbol_table[var_name] = 'INTEIRO'
         
-        for cmd in bloco:
-            self.visit(cmd)
+        self.visitar_comandos(bloco)
         self.symbol_table = old_table
         
         if self.get_type(intervalo[1]) != 'INTEIRO' or self.get_type(intervalo[2]) != 'INTEIRO':
@@ -311,49 +303,45 @@ class SemanticAnalyzer:
 
     def visit_binop(self, node):
         op = node[1]
-        left_node = self.visit(node[2])
-        right_node = self.visit(node[3])
-
-        left_type = self.get_type(left_node)
-        right_type = self.get_type(right_node)  # Corrigido: era right_node_type
+        left_type = self.get_type(self.visit(node[2]))
+        right_type = self.get_type(self.visit(node[3]))
 
         if left_type == 'error' or right_type == 'error':
-            return (node[0], op, left_node, right_node, 'error')
+            return self.anotar(node, 'error')
 
         # Operações aritméticas
         if op in ('+', '-', '*', '/'):
             if left_type in ('INTEIRO', 'REAL') and right_type in ('INTEIRO', 'REAL'):
                 # Se qualquer operando for REAL, o resultado é REAL
                 if left_type == 'REAL' or right_type == 'REAL' or op == '/':
-                    return (node[0], op, left_node, right_node, 'REAL')
+                    return self.anotar(node, 'REAL')
                 else:
-                    return (node[0], op, left_node, right_node, 'INTEIRO')
+                    return self.anotar(node, 'INTEIRO')
             else:
                 self.errors.append(f"Erro Semântico: Operação '{op}' entre tipos incompatíveis: '{left_type}' e '{right_type}'.")
-                return (node[0], op, left_node, right_node, 'error')
+                return self.anotar(node, 'error')
 
         # Operações relacionais
         if op in ('==', '!=', '<', '>', '<=', '>='):
             if left_type in ('INTEIRO', 'REAL') and right_type in ('INTEIRO', 'REAL'):
-                return (node[0], op, left_node, right_node, 'BOOL')
+                return self.anotar(node, 'BOOL')
             else:
                 self.errors.append(f"Erro Semântico: Operação relacional '{op}' entre tipos incompatíveis: '{left_type}' e '{right_type}'.")
-                return (node[0], op, left_node, right_node, 'error')
+                return self.anotar(node, 'error')
 
-        return (node[0], op, left_node, right_node, 'error')
+        return self.anotar(node, 'error')
 
     def visit_unop(self, node):
         op = node[1]
-        expr_node = self.visit(node[2])
-        expr_type = self.get_type(expr_node)
+        expr_type = self.get_type(self.visit(node[2]))
 
         if op == '-':
             if expr_type not in ('INTEIRO', 'REAL'):
                 self.errors.append(f"Erro Semântico: Operador '-' unário aplicado a tipo incompatível: '{expr_type}'.")
-                return (node[0], op, expr_node, 'error')
-            return (node[0], op, expr_node, expr_type)
+                return self.anotar(node, 'error')
+            return self.anotar(node, expr_type)
             
-        return (node[0], op, expr_node, 'error')
+        return self.anotar(node, 'error')
 
     def visit_chamada_funcao(self, node):
         func_name = node[1]
@@ -361,18 +349,17 @@ class SemanticAnalyzer:
         
         if func_name not in self.function_table:
             self.errors.append(f"Erro Semântico: Função '{func_name}' não foi declarada.")
-            return (node[0], func_name, args, 'error')
+            return self.anotar(node, 'error')
             
         func_info = self.function_table[func_name]
         expected_params = func_info['params']
         
         if len(args) != len(expected_params):
             self.errors.append(f"Erro Semântico: Função '{func_name}' espera {len(expected_params)} argumentos, mas recebeu {len(args)}.")
-            return (node[0], func_name, args, func_info['type']) 
+            return self.anotar(node, func_info['type'])
             
         for i, arg_node in enumerate(args):
-            arg_type_node = self.visit(arg_node)
-            arg_type = self.get_type(arg_type_node)
+            arg_type = self.get_type(self.visit(arg_node))
             expected_type = expected_params[i]
             
             # Comparar tipos normalizados
@@ -382,7 +369,7 @@ class SemanticAnalyzer:
                 else:
                     self.errors.append(f"Erro Semântico: Argumento {i+1} da função '{func_name}': esperava '{expected_type}', mas recebeu '{arg_type}'.")
         
-        return (node[0], func_name, args, func_info['type'])
+        return self.anotar(node, func_info['type'])
 
     def normalize_type(self, type_str):
         """Normaliza tipos para maiúsculas internamente"""
@@ -415,8 +402,10 @@ class SemanticAnalyzer:
                 return 'INTEIRO'
             return self.symbol_table[var_name]
             
-        if len(node) > 1 and node[-1] in ('INTEIRO', 'REAL', 'STRING_TYPE', 'BOOL', 'error'):
-            return node[-1]
+        # Tipo calculado na visita do nó
+        tipo = self.tipos.get(id(node))
+        if tipo is not None:
+            return tipo
             
         if node_type == 'chamada_funcao':
             func_name = node[1]
@@ -425,10 +414,6 @@ class SemanticAnalyzer:
                 return 'error'
             return self.function_table[func_name]['type']
 
-        if node_type in ('binop', 'unop', 'atribuicao'):
-            if node[-1] in ('INTEIRO', 'REAL', 'BOOL', 'error'):
-                return node[-1]
-
         return 'error'
     
     
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Transporte de canais por socket (TCP ou Unix) entre processos MiniPar
+
+Cada processo executa um dos computadores declarados em c_channel e escuta no
+endereço dele ("tcp://127.0.0.1:7001" ou "unix:///tmp/computador_2.sock").
+O send de um canal envia a mensagem ao endereço do outro computador do canal;
+as mensagens recebidas são entregues no buffer local do canal, de onde o
+receive as retira (os mesmos métodos de utils.Channel).
+
+Cada mensagem é um quadro com prefixo de tamanho: 4 bytes big-endian com o
+comprimento, seguidos do JSON {"canal": nome, "valores": [...]} em UTF-8.
+As conexões de saída ficam num pool, uma por computador remoto, e são
+reutilizadas por todos os canais que levam a ele.
+"""
+
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+try:
+    from .utils import CAPACIDADE_CANAL_PADRAO
+except ImportError:
+    from utils import CAPACIDADE_CANAL_PADRAO
+
+PREFIXO = struct.Struct('!I')
+TAMANHO_MAXIMO_QUADRO = 16 * 1024 * 1024
+
+# Espera máxima, em segundos, para o computador remoto começar a escutar
+TIMEOUT_CONEXAO_PADRAO = 10.0
+
+
+def analisar_endereco(endereco):
+    """'tcp://host:porta' ou 'unix:///caminho' -> (família, endereço do socket)"""
+    if endereco.startswith('tcp://'):
+        host, _, porta = endereco[len('tcp://'):].rpartition(':')
+        if not host or not porta.isdigit():
+            raise ValueError(f"Endereço TCP inválido: '{endereco}' (use tcp://host:porta)")
+        return socket.AF_INET, (host, int(porta))
+    if endereco.startswith('unix://'):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("Sockets Unix não são suportados neste sistema")
+        return socket.AF_UNIX, endereco[len('unix://'):]
+    raise ValueError(f"Endereço de canal desconhecido: '{endereco}' (use tcp:// ou unix://)")
+
+
+def enviar_quadro(sock, mensagem):
+    """Serializa a mensagem e a envia com o prefixo de tamanho"""
+    dados = json.dumps(mensagem, ensure_ascii=False).encode('utf-8')
+    sock.sendall(PREFIXO.pack(len(dados)) + dados)
+
+
+def _receber_exato(sock, tamanho):
+    partes = []
+    while tamanho:
+        parte = sock.recv(min(tamanho, 65536))
+        if not parte:
+            raise ConnectionError('conexão encerrada pelo computador remoto')
+        partes.append(parte)
+        tamanho -= len(parte)
+    return b''.join(partes)
+
+
+def receber_quadro(sock):
+    """Lê um quadro completo do socket e retorna a mensagem"""
+    tamanho, = PREFIXO.unpack(_receber_exato(sock, PREFIXO.size))
+    if tamanho > TAMANHO_MAXIMO_QUADRO:
+        raise ValueError(f"Quadro de {tamanho} bytes excede o limite de {TAMANHO_MAXIMO_QUADRO}")
+    return json.loads(_receber_exato(sock, tamanho).decode('utf-8'))
+
+
+class ConnectionPool:
+    """Uma conexão de saída por endereço remoto, aberta no primeiro envio e
+    reutilizada depois. Cada endereço tem o próprio lock, que cobre a conexão
+    e o envio de cada quadro: um computador que demora a responder não
+    segura os canais que levam a outros."""
+
+    def __init__(self, timeout_conexao=TIMEOUT_CONEXAO_PADRAO):
+        self.timeout_conexao = timeout_conexao
+        self.conexoes = {}  # endereço -> socket
+        self._locks = {}  # endereço -> lock da conexão
+        self._lock = threading.Lock()  # só para criar os locks dos endereços
+
+    def _conectar(self, endereco, timeout):
+        familia, destino = analisar_endereco(endereco)
+        limite = time.monotonic() + timeout
+        while True:
+            sock = socket.socket(familia, socket.SOCK_STREAM)
+            try:
+                sock.connect(destino)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # O computador remoto ainda não começou a escutar
+                sock.close()
+                if time.monotonic() >= limite:
+                    raise TimeoutError(f"Computador em '{endereco}' não respondeu")
+                time.sleep(0.05)
+                continue
+            if familia == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+
+    def lock(self, endereco):
+        """Lock da conexão com o endereço (criado no primeiro uso)"""
+        with self._lock:
+            return self._locks.setdefault(endereco, threading.Lock())
+
+    def conexao(self, endereco, timeout=None):
+        """Socket conectado ao endereço; quem chama segura lock(endereco)"""
+        sock = self.conexoes.get(endereco)
+        if sock is None:
+            sock = self._conectar(endereco, self.timeout_conexao if timeout is None else timeout)
+            self.conexoes[endereco] = sock
+        return sock
+
+    def enviar(self, endereco, mensagem, timeout=None):
+        """Envia a mensagem pela conexão do endereço; se ela caiu, reconecta uma
+        vez. Levanta queue.Full se o envio não termina em timeout segundos (o
+        computador remoto não está lendo), como utils.Channel."""
+        with self.lock(endereco):
+            for tentativa in range(2):
+                sock = self.conexao(endereco, timeout)
+                try:
+                    # Com os buffers do socket cheios, sendall espera o outro
+                    # lado ler: o tempo limite do canal vale também aqui
+                    sock.settimeout(timeout)
+                    enviar_quadro(sock, mensagem)
+                    return
+                except (socket.timeout, BlockingIOError):
+                    # Parte do quadro pode ter sido enviada: a conexão não serve mais
+                    self._fechar_conexao(endereco)
+                    raise queue.Full from None
+                except OSError:
+                    self._fechar_conexao(endereco)
+                    if tentativa:
+                        raise
+
+    def _fechar_conexao(self, endereco):
+        sock = self.conexoes.pop(endereco, None)
+        if sock is not None:
+            sock.close()
+
+    def descartar(self, endereco):
+        with self.lock(endereco):
+            self._fechar_conexao(endereco)
+
+    def fechar(self):
+        for endereco in list(self.conexoes):
+            self.descartar(endereco)
+
+
+class SocketChannel:
+    """Canal em que o outro computador roda em outro processo: send envia um
+    quadro ao endereço dele e receive lê do buffer local alimentado pelo
+    SocketTransport. Mesma interface de utils.Channel."""
+
+    remoto = True
+
+    def __init__(self, transporte, name, comp1, comp2, destino, fila):
+        self.transporte = transporte
+        self.name = name
+        self.comp1 = comp1
+        self.comp2 = comp2
+        self.destino = destino  # endereço do outro computador
+        self.fila = fila
+        self.capacidade = fila.maxsize
+
+    def send(self, data, timeout=None):
+        """Envia ao outro computador; queue.Full se ele não lê em timeout segundos"""
+        self.transporte.pool.enviar(self.destino, {'canal': self.name, 'valores': list(data)}, timeout)
+
+    def receive(self, timeout=None):
+        return self.fila.get(True, timeout)
+
+    def try_send(self, data):
+        """Envia sem esperar o computador remoto ficar disponível"""
+        try:
+            self.send(data, timeout=0)
+            return True
+        except (OSError, queue.Full):
+            return False
+
+    def try_receive(self):
+        try:
+            return True, self.fila.get(False)
+        except queue.Empty:
+            return False, None
+
+    def pendentes(self):
+        return self.fila.qsize()
+
+    def __reduce__(self):
+        raise TypeError("Canais por socket não podem ser enviados a outro processo "
+                        "(use o backend PAR 'threads' ou 'inline')")
+
+
+class SocketTransport:
+    """Ponto de comunicação de um computador: escuta no próprio endereço e
+    cria SocketChannel para os canais que o ligam a outro computador.
+
+    enderecos mapeia nome do computador -> endereço (tcp:// ou unix://)."""
+
+    def __init__(self, computador, enderecos, timeout_conexao=TIMEOUT_CONEXAO_PADRAO):
+        if computador not in enderecos:
+            raise ValueError(f"Computador '{computador}' sem endereço definido")
+        self.computador = computador
+        self.enderecos = dict(enderecos)
+        self.pool = ConnectionPool(timeout_conexao)
+        self.filas = {}  # canal -> buffer de mensagens recebidas
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._ativo = False
+
+    def fila(self, nome, capacidade=CAPACIDADE_CANAL_PADRAO):
+        """Buffer de entrada do canal (criado na primeira mensagem ou declaração)"""
+        with self._lock:
+            if nome not in self.filas:
+                self.filas[nome] = queue.Queue(maxsize=capacidade)
+            return self.filas[nome]
+
+    def atende(self, comp1, comp2):
+        """O canal liga este computador a outro com endereço conhecido?"""
+        outro = comp2 if comp1 == self.computador else comp1 if comp2 == self.computador else None
+        return outro is not None and outro in self.enderecos
+
+    def canal(self, nome, comp1, comp2, capacidade=CAPACIDADE_CANAL_PADRAO):
+        outro = comp2 if comp1 == self.computador else comp1
+        return SocketChannel(self, nome, comp1, comp2, self.enderecos[outro], self.fila(nome, capacidade))
+
+    def iniciar(self):
+        """Começa a escutar no endereço deste computador"""
+        familia, endereco = analisar_endereco(self.enderecos[self.computador])
+        if familia != socket.AF_INET and os.path.exists(endereco):
+            os.unlink(endereco)  # socket Unix de uma execução anterior
+        servidor = socket.socket(familia, socket.SOCK_STREAM)
+        if familia == socket.AF_INET:
+            servidor.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        servidor.bind(endereco)
+        servidor.listen()
+        self._servidor = servidor
+        self._ativo = True
+        threading.Thread(target=self._aceitar, daemon=True).start()
+        return self
+
+    def _aceitar(self):
+        while self._ativo:
+            try:
+                conexao, _ = self._servidor.accept()
+            except OSError:
+                break
+            if conexao.family == socket.AF_INET:
+                conexao.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._ler, args=(conexao,), daemon=True).start()
+
+    def _ler(self, conexao):
+        # Com o buffer do canal cheio, put bloqueia e a leitura para: o
+        # controle de fluxo do socket segura o computador que envia
+        with conexao:
+            while self._ativo:
+                try:
+                    mensagem = receber_quadro(conexao)
+                except (OSError, ValueError):
+                    break
+                self.fila(mensagem['canal']).put(tuple(mensagem['valores']))
+
+    def fechar(self):
+        self._ativo = False
+        self.pool.fechar()
+        if self._servidor is not None:
+            familia, endereco = analisar_endereco(self.enderecos[self.computador])
+            self._servidor.close()
+            self._servidor = None
+            if familia != socket.AF_INET and os.path.exists(endereco):
+                os.unlink(endereco)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *_):
+        self.fechar()
@@ -4,10 +4,116 @@
 Utilitários do compilador: funções auxiliares e gerenciadores de canais/threads
 """
 
+import asyncio
+import multiprocessing
+import queue
 import threading
 
 
 # --- SISTEMA DE CANAIS E THREADS ---
+# Capacidade padrão do buffer de um canal (mensagens) e espera máxima, em
+# segundos, de um send com o buffer cheio ou de um receive sem mensagens
+CAPACIDADE_CANAL_PADRAO = 64
+TIMEOUT_CANAL_PADRAO = 30.0
+
+
+class Channel:
+    """Canal com buffer FIFO limitado entre dois computadores.
+
+    send/receive bloqueiam (com timeout opcional) enquanto o buffer está cheio
+    ou vazio e levantam queue.Full / queue.Empty quando o tempo acaba;
+    try_send/try_receive nunca bloqueiam. Com uma fila de
+    multiprocessing.Manager o canal pode ser enviado a outros processos."""
+
+    remoto = False  # os dois computadores rodam neste programa
+
+    def __init__(self, name, comp1, comp2, capacidade=CAPACIDADE_CANAL_PADRAO, fila=None):
+        self.name = name
+        self.comp1 = comp1
+        self.comp2 = comp2
+        self.capacidade = capacidade
+        self.fila = fila if fila is not None else queue.Queue(maxsize=capacidade)
+
+    def send(self, data, timeout=None):
+        self.fila.put(data, True, timeout)
+
+    def receive(self, timeout=None):
+        return self.fila.get(True, timeout)
+
+    def try_send(self, data):
+        """Envia sem bloquear; retorna False se o buffer está cheio"""
+        try:
+            self.fila.put(data, False)
+            return True
+        except queue.Full:
+            return False
+
+    def try_receive(self):
+        """Recebe sem bloquear; retorna (True, mensagem) ou (False, None)"""
+        try:
+            return True, self.fila.get(False)
+        except queue.Empty:
+            return False, None
+
+    def pendentes(self):
+        """Número aproximado de mensagens no buffer"""
+        return self.fila.qsize()
+
+
+class AsyncChannel:
+    """Canal do backend asyncio: buffer asyncio.Queue limitado, em que
+    send_async/receive_async são aguardáveis (levantam queue.Full /
+    queue.Empty quando o tempo acaba). send/receive síncronos não podem
+    esperar dentro do laço de eventos: falham logo com o buffer cheio/vazio."""
+
+    remoto = False
+
+    def __init__(self, name, comp1, comp2, capacidade=CAPACIDADE_CANAL_PADRAO):
+        self.name = name
+        self.comp1 = comp1
+        self.comp2 = comp2
+        self.capacidade = capacidade
+        self.fila = asyncio.Queue(maxsize=capacidade)
+
+    async def send_async(self, data, timeout=None):
+        try:
+            await asyncio.wait_for(self.fila.put(data), timeout)
+        except asyncio.TimeoutError:
+            raise queue.Full from None
+
+    async def receive_async(self, timeout=None):
+        try:
+            return await asyncio.wait_for(self.fila.get(), timeout)
+        except asyncio.TimeoutError:
+            raise queue.Empty from None
+
+    def send(self, data, timeout=None):
+        if not self.try_send(data):
+            raise queue.Full
+
+    def receive(self, timeout=None):
+        recebida, data = self.try_receive()
+        if not recebida:
+            raise queue.Empty
+        return data
+
+    def try_send(self, data):
+        try:
+            self.fila.put_nowait(data)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def try_receive(self):
+        try:
+            return True, self.fila.get_nowait()
+        except asyncio.QueueEmpty:
+            return False, None
+
+    def pendentes(self):
+        return self.fila.qsize()
+
+
 class ChannelManager:
     _instance = None
     _lock = threading.Lock()
@@ -17,30 +123,57 @@ class ChannelManager:
             if cls._instance is None:
                 cls._instance = super().__new__(cls)
                 cls._instance.channels = {}
+                cls._instance._manager = None
             return cls._instance
     
-    def create_channel(self, name, comp1, comp2):
-        self.channels[name] = {
-            'comp1': comp1,
-            'comp2': comp2,
-            'data': None,
-            'lock': threading.Lock()
-        }
+    def create_channel(self, name, comp1, comp2, capacidade=CAPACIDADE_CANAL_PADRAO, entre_processos=False,
+                       assincrono=False):
+        """Cria (ou recria) o canal e o retorna. Com entre_processos=True o
+        buffer fica num processo gerenciador e o canal funciona entre os
+        processos do backend PAR 'processos'; com assincrono=True é um
+        AsyncChannel, para as corrotinas do backend 'asyncio'."""
+        if assincrono:
+            self.channels[name] = AsyncChannel(name, comp1, comp2, capacidade)
+            return self.channels[name]
+        fila = None
+        if entre_processos:
+            with self._lock:
+                if self._manager is None:
+                    self._manager = multiprocessing.Manager()
+            fila = self._manager.Queue(maxsize=capacidade)
+        self.channels[name] = Channel(name, comp1, comp2, capacidade, fila)
+        return self.channels[name]
+    
+    def send_data(self, channel_name, data, timeout=TIMEOUT_CANAL_PADRAO):
+        """Coloca data no fim do buffer, esperando vaga até timeout.
+        Retorna False se o canal não existe ou o tempo acabou."""
+        if channel_name not in self.channels:
+            return False
+        try:
+            self.channels[channel_name].send(data, timeout)
+            return True
+        except queue.Full:
+            return False
     
-    def send_data(self, channel_name, data):
-        if channel_name in self.channels:
-            with self.channels[channel_name]['lock']:
-                self.channels[channel_name]['data'] = data
-                return True
-        return False
+    def receive_data(self, channel_name, timeout=TIMEOUT_CANAL_PADRAO):
+        """Retira a mensagem mais antiga, esperando até timeout.
+        Retorna None se o canal não existe ou o tempo acabou."""
+        if channel_name not in self.channels:
+            return None
+        try:
+            return self.channels[channel_name].receive(timeout)
+        except queue.Empty:
+            return None
     
-    def receive_data(self, channel_name):
-        if channel_name in self.channels:
-            with self.channels[channel_name]['lock']:
-                data = self.channels[channel_name]['data']
-                self.channels[channel_name]['data'] = None
-                return data
-        return None
+    def try_send_data(self, channel_name, data):
+        if channel_name not in self.channels:
+            return False
+        return self.channels[channel_name].try_send(data)
+    
+    def try_receive_data(self, channel_name):
+        if channel_name not in self.channels:
+            return False, None
+        return self.channels[channel_name].try_receive()
 
 
 class ThreadManager:
@@ -73,7 +206,12 @@ class ThreadManager:
         return self.results
 
 
-# --- FUNÇÃO AUXILIAR PARA FORMATAR A AST ---
+# --- FUNÇÕES AUXILIARES DE FORMATAÇÃO ---
+def formatar_tokens(tokens):
+    """Formata os tokens do lexer em linhas legíveis (aba de tokens, depuração)"""
+    return [f"Tipo: {tok.type}, Valor: '{tok.value}', Linha: {tok.lineno}" for tok in tokens]
+
+
 def formatar_ast(node, level=0):
     """Formata uma AST em uma string legível"""
     if node is None:
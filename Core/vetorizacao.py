@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vetorização de laços simples sobre arrays no interpretador (NumPy opcional)
+
+Um laço enquanto no formato
+
+    enquanto i < limite faca:       (ou i <= limite)
+        <um comando>
+        i = i + 1
+    fim_enquanto
+
+em que o comando é uma redução (acc = acc + expr ou acc = acc - expr) ou um
+mapa (v[índices] = expr), executa de uma vez com operações NumPy sobre os
+buffers dos arrays (arrays.py), sem passar pelo interpretador a cada iteração.
+expr e os índices usam números, variáveis, acessos a arrays e + - * / e
+menos unário. O limite é avaliado uma vez.
+
+O resultado é idêntico ao da execução escalar:
+- as operações elemento a elemento são as mesmas do Python (IEEE 754, com os
+  inteiros convertidos para real como o Python faz);
+- a redução real acumula na ordem das iterações (np.add.accumulate), sem a
+  soma em pares do np.sum, e a inteira soma inteiros do Python (exata);
+- subexpressões que não dependem do contador são avaliadas uma vez pelo
+  próprio interpretador.
+
+Quando o laço pode se comportar de outro jeito, ele executa no caminho
+escalar, que trata o caso como sempre:
+- acesso fora do array, que vale o padrão ou gera IndexError;
+- divisão por zero, que vale 0;
+- inteiros que poderiam estourar 64 bits;
+- um valor real num array inteiro;
+- arrays em lista ou em visão de bloco PAR;
+- laços com mais de limite_iteracoes iterações;
+- um mapa que lê o próprio array em outra posição.
+
+Cada laço detectado aparece no perfil (LoopVectorizer.perfil), com quantas
+vezes executou vetorizado e no caminho escalar.
+"""
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # sem NumPy todos os laços executam no caminho escalar
+
+# Laços mais curtos que isto executam no caminho escalar (o custo fixo das
+# operações NumPy não compensa)
+MIN_ITERACOES_VETOR = 8
+
+# Maior valor absoluto de um inteiro nas operações vetorizadas: produtos de
+# dois deles ainda cabem em 64 bits, como no resultado exato do Python
+LIMITE_INTEIRO = 2 ** 31
+
+OPERADORES = ('+', '-', '*', '/')
+TIPOS_BUFFER = {'q': 'int64', 'd': 'float64'}
+
+# Precedência dos operadores na descrição dos laços no perfil
+PRECEDENCIA = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+
+class NaoVetorizavel(Exception):
+    """O laço precisa do caminho escalar nesta execução"""
+
+
+class LoopPlan:
+    """Laço detectado: redução (alvo = referência do acumulador) ou mapa
+    (alvo = nome do array, com os índices do comando)"""
+    __slots__ = ('tipo', 'contador', 'comparacao', 'limite', 'alvo', 'indices',
+                 'operacao', 'expressao', 'dependentes', 'descricao')
+
+    def __init__(self, tipo, contador, comparacao, limite, alvo, indices, operacao, expressao):
+        self.tipo = tipo
+        self.contador = contador
+        self.comparacao = comparacao
+        self.limite = limite
+        self.alvo = alvo
+        self.indices = indices
+        self.operacao = operacao
+        self.expressao = expressao
+        # id dos nós de expr e dos índices que dependem do contador
+        self.dependentes = set()
+        if tipo == 'reducao':
+            comando = f"{alvo[3]} = {alvo[3]} {operacao} {texto(expressao)}"
+        else:
+            comando = f"{alvo}{''.join(f'[{texto(idx)}]' for idx in indices)} = {texto(expressao)}"
+        self.descricao = f"{comando} ({contador[3]} {comparacao} {texto(limite)})"
+
+
+def _mesma_var(node, ref):
+    return isinstance(node, tuple) and node[:1] == ('var',) and node[1:3] == ref[1:3]
+
+
+def _nos(node):
+    """Nós de uma expressão (incluindo índices de acessos a arrays)"""
+    pilha = [node]
+    while pilha:
+        atual = pilha.pop()
+        if isinstance(atual, list):
+            pilha.extend(atual)
+        elif isinstance(atual, tuple) and atual:
+            yield atual
+            pilha.extend(filho for filho in atual[1:] if isinstance(filho, (tuple, list)))
+
+
+def texto(node):
+    """Expressão como no código fonte (para o perfil)"""
+    tipo = node[0]
+    if tipo == 'var':
+        return node[3]
+    if tipo in ('num_inteiro', 'num_real'):
+        return str(node[1])
+    if tipo == 'acesso_array':
+        return node[1] + ''.join(f'[{texto(idx)}]' for idx in node[2])
+    if tipo == 'unop':
+        return f"-{texto(node[2])}"
+    if tipo == 'binop':
+        esquerda, direita = texto(node[2]), texto(node[3])
+        nivel = PRECEDENCIA.get(node[1], 0)
+        if node[2][0] == 'binop' and PRECEDENCIA.get(node[2][1], 0) < nivel:
+            esquerda = f"({esquerda})"
+        if node[3][0] == 'binop' and (PRECEDENCIA.get(node[3][1], 0) < nivel or
+                                      (PRECEDENCIA.get(node[3][1], 0) == nivel and node[1] in '-/')):
+            direita = f"({direita})"
+        return f"{esquerda} {node[1]} {direita}"
+    return '?'
+
+
+class LoopVectorizer:
+    """Detecta e executa com NumPy os laços vetorizáveis de um interpretador"""
+    def __init__(self, interpretador):
+        self.interpretador = interpretador
+        self.planos = {}  # id(nó enquanto) -> (nó, LoopPlan ou None)
+        self.perfil = {}  # descrição -> [execuções vetorizadas, iterações, execuções escalares]
+
+    def reiniciar_perfil(self):
+        self.perfil = {}
+
+    def relatorio(self):
+        """Linhas do perfil de execução dos laços detectados"""
+        linhas = []
+        for descricao, (vetorizadas, iteracoes, escalares) in self.perfil.items():
+            linhas.append(f"{descricao}: {vetorizadas} vetorizada(s) ({iteracoes} iterações), "
+                          f"{escalares} escalar(es)")
+        return linhas
+
+    # --- Detecção (uma vez por nó) ---
+
+    def plano(self, node):
+        achado = self.planos.get(id(node))
+        if achado is not None and achado[0] is node:
+            return achado[1]
+        plano = self.detectar(node)
+        self.planos[id(node)] = (node, plano)
+        return plano
+
+    def detectar(self, node):
+        """LoopPlan do laço enquanto, ou None se ele não tem o formato"""
+        condicao, corpo = node[1], node[2]
+        if not (isinstance(condicao, tuple) and condicao[0] == 'binop' and condicao[1] in ('<', '<=')
+                and isinstance(condicao[2], tuple) and condicao[2][0] == 'var'):
+            return None
+        contador = condicao[2]
+        if not isinstance(corpo, list) or len(corpo) != 2:
+            return None
+        comando, incremento = corpo
+        if incremento != ('atribuicao', contador, ('binop', '+', contador, ('num_inteiro', 1))):
+            return None
+        if not isinstance(comando, tuple) or not comando:
+            return None
+
+        if comando[0] == 'atribuicao':
+            alvo, valor = comando[1], comando[2]
+            if not (isinstance(valor, tuple) and valor[0] == 'binop' and valor[1] in ('+', '-')
+                    and _mesma_var(valor[2], alvo)) or _mesma_var(alvo, contador):
+                return None
+            plano = LoopPlan('reducao', contador, condicao[1], condicao[3], alvo, (), valor[1], valor[3])
+            proibido = lambda no: _mesma_var(no, alvo)
+        elif comando[0] == 'atribuicao_array':
+            alvo, indices = comando[1], comando[2]
+            plano = LoopPlan('mapa', contador, condicao[1], condicao[3], alvo, indices, None, comando[3])
+            lido = ('acesso_array', alvo, indices)
+            # O mapa só lê o próprio array na posição que escreve
+            proibido = lambda no: no[0] == 'acesso_array' and no[1] == alvo and no != lido
+        else:
+            return None
+
+        expressoes = [plano.expressao] + list(plano.indices)
+        for no in _nos(expressoes):
+            if no[0] not in ('var', 'num_inteiro', 'num_real', 'acesso_array', 'binop', 'unop'):
+                return None
+            if no[0] == 'binop' and no[1] not in OPERADORES or no[0] == 'unop' and no[1] != '-':
+                return None
+            if proibido(no):
+                return None
+        for no in _nos(plano.limite):
+            if no[0] not in ('var', 'num_inteiro', 'num_real', 'acesso_array', 'binop', 'unop'):
+                return None
+            if _mesma_var(no, contador) or proibido(no) or (plano.tipo == 'mapa' and no[0] == 'acesso_array'
+                                                           and no[1] == plano.alvo):
+                return None
+        for expressao in expressoes:
+            self.marcar_dependentes(expressao, contador, plano.dependentes)
+        if plano.tipo == 'mapa' and not any(id(idx) in plano.dependentes for idx in plano.indices):
+            return None  # todas as iterações escrevem a mesma posição
+        return plano
+
+    def marcar_dependentes(self, node, contador, dependentes):
+        """Marca (por id) os nós que dependem do contador; retorna se node depende"""
+        if _mesma_var(node, contador):
+            dependentes.add(id(node))
+            return True
+        depende = False
+        if node[0] == 'acesso_array':
+            for idx in node[2]:
+                depende = self.marcar_dependentes(idx, contador, dependentes) or depende
+        elif node[0] in ('binop', 'unop'):
+            for filho in node[2:]:
+                depende = self.marcar_dependentes(filho, contador, dependentes) or depende
+        if depende:
+            dependentes.add(id(node))
+        return depende
+
+    # --- Execução ---
+
+    def executar(self, node):
+        """Executa o laço vetorizado; retorna False se ele deve executar no
+        caminho escalar (nada foi alterado)"""
+        plano = self.plano(node)
+        if plano is None:
+            return False
+        registro = self.perfil.get(plano.descricao)
+        if registro is None:
+            registro = self.perfil[plano.descricao] = [0, 0, 0]
+        try:
+            with np.errstate(all='ignore'):
+                iteracoes = self.executar_plano(plano)
+        except (NaoVetorizavel, OverflowError):
+            registro[2] += 1
+            return False
+        registro[0] += 1
+        registro[1] += iteracoes
+        return True
+
+    def executar_plano(self, plano):
+        it = self.interpretador
+        ref = plano.contador
+        quadro = it.quadros[ref[1]]
+        inicio = quadro[ref[2]]
+        limite = it.evaluate_expression(plano.limite)
+        if type(inicio) is not int or type(limite) is not int:
+            raise NaoVetorizavel
+        iteracoes = limite - inicio + (plano.comparacao == '<=')
+        if iteracoes < MIN_ITERACOES_VETOR:
+            raise NaoVetorizavel
+        if it.limite_iteracoes is not None and iteracoes > it.limite_iteracoes:
+            raise NaoVetorizavel
+        if abs(inicio) >= LIMITE_INTEIRO or abs(limite) >= LIMITE_INTEIRO:
+            raise NaoVetorizavel
+        self.contador = np.arange(inicio, inicio + iteracoes, dtype=np.int64)
+        self.plano_atual = plano
+
+        if plano.tipo == 'reducao':
+            valores = self.vetor(plano.expressao)
+            alvo = it.quadros[plano.alvo[1]]
+            acumulado = alvo[plano.alvo[2]]
+            if type(acumulado) not in (int, float):
+                raise NaoVetorizavel
+            if not isinstance(valores, np.ndarray):
+                valores = np.full(iteracoes, valores)
+            if type(acumulado) is int and valores.dtype.kind == 'i':
+                # Soma de inteiros do Python: exata, como no caminho escalar
+                total = sum(valores.tolist())
+                resultado = acumulado + total if plano.operacao == '+' else acumulado - total
+            else:
+                sequencia = np.empty(iteracoes + 1)
+                sequencia[0] = float(acumulado)
+                sequencia[1:] = valores if plano.operacao == '+' else -valores
+                # Acumula na ordem das iterações (o np.sum somaria em pares)
+                resultado = float(np.add.accumulate(sequencia)[-1])
+            alvo[plano.alvo[2]] = resultado
+        else:
+            array, buffer, posicoes = self.posicoes(plano.alvo, plano.indices)
+            if iteracoes > 1 and not (np.all(np.diff(posicoes) > 0) or np.all(np.diff(posicoes) < 0)):
+                raise NaoVetorizavel  # posições repetidas: vale a ordem das iterações
+            valores = self.vetor(plano.expressao)
+            inteiro = valores.dtype.kind == 'i' if isinstance(valores, np.ndarray) else type(valores) is int
+            if buffer.dtype.kind == 'i' and not inteiro:
+                raise NaoVetorizavel  # o array inteiro passaria a guardar reais
+            buffer[posicoes] = valores
+        quadro[ref[2]] = inicio + iteracoes
+        return iteracoes
+
+    def posicoes(self, nome, indices):
+        """(TypedArray, buffer NumPy, posições lineares) de um acesso, com as
+        mesmas regras de TypedArray.posicao; fora do array é NaoVetorizavel"""
+        array = self.interpretador.array_variables.get(nome)
+        tipo = TIPOS_BUFFER.get(getattr(getattr(array, 'dados', None), 'typecode', None))
+        if tipo is None:
+            raise NaoVetorizavel
+        valores = [self.vetor(idx, indice=True) for idx in indices]
+        verificar = self.interpretador.verificar_limites
+        if len(valores) == 1 and len(array.dims) != 1:
+            posicoes = valores[0]
+        elif len(valores) != len(array.dims):
+            raise NaoVetorizavel
+        else:
+            if verificar:
+                for valor, tamanho in zip(valores, array.dims):
+                    if np.any(valor < 0) or np.any(valor >= tamanho):
+                        raise NaoVetorizavel
+            posicoes = 0
+            for valor, passo in zip(valores, array.strides):
+                posicoes = posicoes + valor * passo
+        posicoes = np.broadcast_to(posicoes, self.contador.shape)
+        if np.any(posicoes < 0) or np.any(posicoes >= array.total):
+            raise NaoVetorizavel
+        return array, np.frombuffer(array.dados, dtype=tipo), posicoes
+
+    def vetor(self, node, indice=False):
+        """Valor de uma expressão em todas as iterações: ndarray, ou escalar
+        do Python quando a expressão não depende do contador"""
+        if id(node) not in self.plano_atual.dependentes:
+            valor = self.interpretador.evaluate_expression(node)
+            if type(valor) is int:
+                if abs(valor) >= LIMITE_INTEIRO:
+                    raise NaoVetorizavel
+            elif indice or type(valor) is not float:
+                raise NaoVetorizavel
+            return valor
+        tipo = node[0]
+        if tipo == 'var':
+            return self.contador
+        if tipo == 'acesso_array':
+            _, buffer, posicoes = self.posicoes(node[1], node[2])
+            valores = buffer[posicoes]
+            if valores.dtype.kind == 'i' and np.any(np.abs(valores) >= LIMITE_INTEIRO):
+                raise NaoVetorizavel
+            if indice and valores.dtype.kind != 'i':
+                raise NaoVetorizavel
+            return valores
+        if tipo == 'unop':
+            return -self.vetor(node[2], indice)
+        esquerda = self.vetor(node[2], indice)
+        direita = self.vetor(node[3], indice)
+        op = node[1]
+        if op == '+':
+            resultado = np.add(esquerda, direita)
+        elif op == '-':
+            resultado = np.subtract(esquerda, direita)
+        elif op == '*':
+            resultado = np.multiply(esquerda, direita)
+        else:
+            if indice or np.any(np.asarray(direita) == 0):
+                raise NaoVetorizavel  # divisão por zero vale 0 no caminho escalar
+            resultado = np.true_divide(esquerda, direita)
+        if resultado.dtype.kind == 'i' and np.any(np.abs(resultado) >= LIMITE_INTEIRO):
+            raise NaoVetorizavel
+        return resultado
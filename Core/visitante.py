@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Base dos percursos da AST (SemanticAnalyzer, C3EGenerator, MiniParInterpreter)
+
+Cada percurso tem um método visit_<tipo> por tipo de nó. Em vez de montar
+a string 'visit_' + node[0] e procurá-la com hasattr/getattr a cada nó
+visitado, a tabela tipo -> método é montada uma vez por classe, na criação
+da classe (subclasses que sobrescrevem um visit_* ganham a própria tabela),
+e o despacho é uma consulta ao dicionário. Nós sem método vão para
+generic_visit.
+
+O tipo de um nó é a string em node[0].
+"""
+
+PREFIXO_VISITA = 'visit_'
+
+
+class NodeVisitor:
+    """Despacho por tabela para os métodos visit_<tipo>"""
+    # tipo do nó -> função visit_<tipo> da classe (preenchida em cada subclasse)
+    _visitas = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._visitas = {
+            nome[len(PREFIXO_VISITA):]: getattr(cls, nome)
+            for nome in dir(cls)
+            if nome.startswith(PREFIXO_VISITA) and callable(getattr(cls, nome))
+        }
+
+    def visit(self, node):
+        """Visita um nó da AST (valores que não são nós, como None ou os
+        limites de um intervalo, voltam como estão)"""
+        if not isinstance(node, tuple):
+            return node
+        metodo = self._visitas.get(node[0])
+        if metodo is None:
+            return self.generic_visit(node)
+        return metodo(self, node)
+
+    def generic_visit(self, node):
+        return None
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compara os backends 'threads' e 'asyncio' dos blocos PAR com muitos blocos
+que se comunicam: um pipeline em que cada bloco recebe um número do canal
+anterior, soma 1 e envia ao próximo. Cada backend roda num processo separado
+para medir o pico de memória (ru_maxrss) só dele.
+
+O programa é montado direto como AST, com um PAR por bloco em sequência
+(como analisar_programa devolve PARs consecutivos, que o interpretador
+executa juntos num grupo_par), para não medir a análise de milhares de blocos.
+
+Uso: python Scripts/benchmark_asyncio.py [blocos]
+"""
+
+import os
+import sys
+import time
+import resource
+import subprocess
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParInterpreter
+
+
+def programa_pipeline(blocos):
+    """AST do pipeline: canal k liga o bloco k ao bloco k+1; o último bloco
+    escreve o número recebido (blocos - 1). Os blocos vão em ordem inversa,
+    então todos esperam antes do primeiro send."""
+    canais = [('c_channel', f'c{k}', f'computador_{k}', f'computador_{k + 1}') for k in range(blocos)]
+    corpo = [[('send', 'c0', [('num_inteiro', 0)])]]
+    for k in range(1, blocos):
+        corpo.append([
+            ('declaracao_var', 't', 'inteiro'),
+            ('receive', f'c{k - 1}', ['t']),
+            ('send', f'c{k}', [('binop', '+', ('id', 't'), ('num_inteiro', 1))]),
+        ])
+    corpo.append([
+        ('declaracao_var', 't', 'inteiro'),
+        ('receive', f'c{blocos - 1}', ['t']),
+        ('escreva', [('string', 'valor final: '), ('id', 't')]),
+    ])
+    blocos_par = [('bloco_par', comandos) for comandos in reversed(corpo)]
+    return ('programa_minipar', canais + blocos_par)
+
+
+def medir(executor_par, blocos):
+    """Executa no processo atual e imprime 'segundos pico_kb saída'"""
+    ast = programa_pipeline(blocos)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    saida = MiniParInterpreter(executor_par).execute(ast)
+    tempo = time.perf_counter() - inicio
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base
+    print(f"{tempo:.3f} {pico} {saida}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--medir':
+        medir(sys.argv[2], int(sys.argv[3]))
+        sys.exit(0)
+
+    blocos = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    print(f"Pipeline com {blocos + 1} blocos PAR e {blocos} canais")
+    print(f"{'Backend':<10} {'Tempo':>9} {'Memória':>12}  Saída")
+    print('-' * 50)
+    for executor_par in ('threads', 'asyncio'):
+        resultado = subprocess.run([sys.executable, os.path.abspath(__file__), '--medir', executor_par, str(blocos)],
+                                   capture_output=True, text=True)
+        linhas = [l for l in resultado.stdout.splitlines() if l and not l.startswith('WARNING')]
+        if resultado.returncode != 0 or not linhas:
+            print(f"{executor_par:<10} ❌ Erro: {resultado.stderr.strip().splitlines()[-1:]}")
+            continue
+        tempo, pico, saida = linhas[-1].split(' ', 2)
+        print(f"{executor_par:<10} {float(tempo):>8.3f}s {int(pico) / 1024:>9.1f} MB  {saida}")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compara o tempo de execução do interpretador (MiniParInterpreter) com a
+máquina virtual de bytecode (MiniParVM) nos programas de teste.
+
+Uso: python Scripts/benchmark_bytecode.py [teste4_XOR.mp ...]
+"""
+
+import os
+import sys
+import glob
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import (MiniParInterpreter, MiniParVM, analisar_programa,
+                              compilar_bytecode_ast)
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+# Entradas usadas pelos programas que leem dados
+ENTRADAS = {
+    'teste1_servidor.mp': "+\n10\n5",
+}
+
+
+def cronometrar(funcao):
+    """Executa funcao() e retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def comparar(arquivo_mp):
+    """Executa o programa nos dois motores e retorna (saídas iguais, t_interp, t_vm),
+    ou None se a máquina virtual não executa o programa (ex.: blocos PAR)"""
+    with open(arquivo_mp, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    entrada = ENTRADAS.get(os.path.basename(arquivo_mp), "")
+
+    # A compilação fica fora da medição: só a execução é comparada
+    ast, erros = analisar_programa(codigo)
+    if ast is None:
+        raise RuntimeError(erros)
+    programa, _ = compilar_bytecode_ast(ast)
+    if programa is None:
+        return None
+
+    saida_interp, t_interp = cronometrar(lambda: MiniParInterpreter().execute(ast, entrada))
+    saida_vm, t_vm = cronometrar(lambda: MiniParVM().execute(programa, entrada))
+    return saida_interp == saida_vm, t_interp, t_vm
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        arquivos = [os.path.join(testes_dir, nome) for nome in sys.argv[1:]]
+    else:
+        arquivos = sorted(glob.glob(os.path.join(testes_dir, '*.mp')))
+
+    print(f"{'Programa':<26} {'Interpretador':>14} {'Bytecode':>10} {'Ganho':>7}  Saída")
+    print('-' * 70)
+    total_interp = total_vm = 0.0
+    for arquivo in arquivos:
+        try:
+            resultado = comparar(arquivo)
+        except Exception as e:
+            print(f"{os.path.basename(arquivo):<26} ❌ Erro: {e}")
+            continue
+        if resultado is None:
+            print(f"{os.path.basename(arquivo):<26} ⏭ executado só pelo interpretador")
+            continue
+        iguais, t_interp, t_vm = resultado
+        total_interp += t_interp
+        total_vm += t_vm
+        ganho = t_interp / t_vm if t_vm > 0 else float('inf')
+        print(f"{os.path.basename(arquivo):<26} {t_interp:>13.3f}s {t_vm:>9.3f}s {ganho:>6.1f}x  "
+              f"{'✅ igual' if iguais else '❌ diferente'}")
+    print('-' * 70)
+    if total_vm > 0:
+        print(f"{'Total':<26} {total_interp:>13.3f}s {total_vm:>9.3f}s {total_interp / total_vm:>6.1f}x")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mede os canais por socket (transporte.py) entre dois processos na mesma
+máquina, por TCP e por socket Unix:
+
+- teste1_servidor.mp como cliente (computador_1) falando com um servidor da
+  calculadora em MiniPar (computador_2) em outro processo;
+- latência de ida e volta (ping-pong) de uma mensagem pequena;
+- vazão de mensagens enviadas num sentido só.
+
+Uso: python Scripts/benchmark_canais.py [mensagens]
+     python Scripts/benchmark_canais.py --mostrar-servidor   (programa do servidor)
+"""
+
+import os
+import sys
+import socket
+import subprocess
+import tempfile
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+sys.path.insert(0, script_dir)
+from motor_compilador import SocketTransport
+from executar_computador import executar_computador
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+# Lado computador_2 do teste1: recebe a operação, calcula e devolve o resultado
+PROGRAMA_SERVIDOR = """programa-miniPar
+c_channel calculadora computador_1 computador_2
+
+SEQ:
+    declare operacao : string
+    declare valor1 : real
+    declare valor2 : real
+    declare resultado : real
+
+    calculadora.receive(operacao, valor1, valor2, resultado)
+    escreva("Processando operação: ", valor1, " ", operacao, " ", valor2)
+    se operacao == "+" entao:
+        resultado = valor1 + valor2
+    senao:
+        se operacao == "-" entao:
+            resultado = valor1 - valor2
+        senao:
+            se operacao == "*" entao:
+                resultado = valor1 * valor2
+            senao:
+                resultado = valor1 / valor2
+    calculadora.send(operacao, valor1, valor2, resultado)
+"""
+
+TAMANHO_MENSAGEM = 64  # bytes de texto por mensagem na medida de vazão
+
+
+def enderecos_livres(familia, pasta):
+    """Endereços de computador_1 e computador_2 para a família ('tcp' ou 'unix')"""
+    if familia == 'unix':
+        return {nome: f"unix://{os.path.join(pasta, nome + '.sock')}"
+                for nome in ('computador_1', 'computador_2')}
+    enderecos = {}
+    for nome in ('computador_1', 'computador_2'):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            enderecos[nome] = f"tcp://127.0.0.1:{sock.getsockname()[1]}"
+    return enderecos
+
+
+def iniciar_processo(*argumentos):
+    return subprocess.Popen([sys.executable, *argumentos], stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, text=True)
+
+
+def papel_eco(local, remoto):
+    """Processo auxiliar (computador_2): devolve os pings e conta as
+    mensagens de vazão até receber 'fim'"""
+    enderecos = {'computador_1': remoto, 'computador_2': local}
+    with SocketTransport('computador_2', enderecos) as transporte:
+        canal = transporte.canal('eco', 'computador_1', 'computador_2')
+        recebidas = 0
+        while True:
+            mensagem = canal.receive()
+            if mensagem[0] == 'ping':
+                canal.send(mensagem)
+            elif mensagem[0] == 'fim':
+                canal.send(('fim', recebidas))
+                break
+            else:
+                recebidas += 1
+
+
+def medir_calculadora(enderecos, pasta):
+    """Executa o teste1 contra o servidor em outro processo; retorna (saída, segundos)"""
+    arquivo_servidor = os.path.join(pasta, 'servidor.mp')
+    with open(arquivo_servidor, 'w', encoding='utf-8') as f:
+        f.write(PROGRAMA_SERVIDOR)
+    servidor = iniciar_processo(os.path.join(script_dir, 'executar_computador.py'), arquivo_servidor,
+                                '--computador', 'computador_2',
+                                *[f"--endereco={nome}={endereco}" for nome, endereco in enderecos.items()])
+    with open(os.path.join(testes_dir, 'teste1_servidor.mp'), 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    inicio = time.perf_counter()
+    saida = executar_computador(codigo, 'computador_1', enderecos, "+\n10\n5", timeout_canais=10)
+    tempo = time.perf_counter() - inicio
+    servidor.wait(timeout=10)
+    return saida, tempo
+
+
+def medir_canal(enderecos, mensagens):
+    """Retorna (latências de ida e volta em segundos, mensagens por segundo)"""
+    eco = iniciar_processo(os.path.abspath(__file__), '--eco',
+                           enderecos['computador_2'], enderecos['computador_1'])
+    with SocketTransport('computador_1', enderecos) as transporte:
+        canal = transporte.canal('eco', 'computador_1', 'computador_2')
+        canal.send(('ping', 0))  # aquecimento: abre a conexão
+        canal.receive(timeout=10)
+
+        latencias = []
+        for i in range(mensagens):
+            inicio = time.perf_counter()
+            canal.send(('ping', i))
+            canal.receive(timeout=10)
+            latencias.append(time.perf_counter() - inicio)
+
+        carga = 'x' * TAMANHO_MENSAGEM
+        inicio = time.perf_counter()
+        for i in range(mensagens):
+            canal.send(('dado', carga))
+        canal.send(('fim',))
+        _, recebidas = canal.receive(timeout=30)
+        vazao = recebidas / (time.perf_counter() - inicio)
+    eco.wait(timeout=10)
+    return latencias, vazao
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--eco':
+        papel_eco(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == '--mostrar-servidor':
+        print(PROGRAMA_SERVIDOR, end='')
+        sys.exit(0)
+
+    mensagens = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    familias = ['tcp'] + (['unix'] if hasattr(socket, 'AF_UNIX') else [])
+    with tempfile.TemporaryDirectory() as pasta:
+        for familia in familias:
+            enderecos = enderecos_livres(familia, pasta)
+            saida, tempo = medir_calculadora(enderecos, pasta)
+            print(f"== {familia.upper()}: teste1 com o servidor em outro processo ({tempo * 1000:.1f} ms)")
+            print(saida)
+
+            enderecos = enderecos_livres(familia, pasta)
+            latencias, vazao = medir_canal(enderecos, mensagens)
+            media = sum(latencias) / len(latencias)
+            print(f"Ida e volta ({mensagens} mensagens): média {media * 1e6:.0f} µs, "
+                  f"p50 {percentil(latencias, 0.5) * 1e6:.0f} µs, p99 {percentil(latencias, 0.99) * 1e6:.0f} µs")
+            print(f"Vazão: {vazao:,.0f} mensagens/s ({vazao * TAMANHO_MENSAGEM / 1e6:.1f} MB/s de carga)")
+            print()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mede a vazão do interpretador (MiniParInterpreter) em comandos executados
+por segundo, nos programas de Testes/ e em três programas sintéticos (um laço,
+uma função recursiva e um laço sobre uma matriz).
+
+Os comandos de cada programa são contados uma vez, numa execução à parte com
+um contador em visit(); a medição de tempo usa o interpretador sem contador.
+
+Com --comparar, mede também outra versão do interpretador (por exemplo, a de
+um commit anterior). Versões com executar_interpretador executam a AST com os
+blocos recuperados, como a atual; as anteriores, a AST do parser, como ela
+era usada antes da recuperação dos blocos:
+
+  git show <commit>:Core/interpreter.py > /tmp/interpreter_antigo.py
+  python Scripts/benchmark_interpretador.py --comparar /tmp/interpreter_antigo.py
+
+Uso: python Scripts/benchmark_interpretador.py [--comparar interpreter.py] [teste4_XOR.mp ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import importlib.util
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParLexer, MiniParParser, MiniParInterpreter, analisar_programa
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+# Entradas usadas pelos programas que leem dados
+ENTRADAS = {
+    'teste1_servidor.mp': "+\n10\n5",
+}
+
+# Laço com condicional e aritmética, sem canais nem arrays
+PROGRAMA_LACO = """programa-miniPar
+declare soma : inteiro
+declare k : inteiro
+soma = 0
+k = 0
+enquanto k < 50000 faca:
+    se k > 10 entao:
+        soma = soma + k * 2
+    senao:
+        soma = soma - 1
+    k = k + 1
+fim_enquanto
+escreva("soma: ", soma)
+"""
+
+# Recursão num programa com muitas variáveis globais: o custo de cada chamada
+# não depende do número de globais (cada chamada aloca só o quadro da função)
+PROGRAMA_RECURSAO = ("programa-miniPar\n" +
+                     "".join(f"declare g{i} : inteiro\n" for i in range(500)) + """
+def fib(n : inteiro) : inteiro:
+    se n < 2 entao:
+        return n
+    senao:
+        return fib(n - 1) + fib(n - 2)
+escreva("fib: ", fib(20))
+""")
+
+# Laços indexados sobre uma matriz real (arrays em buffer tipado, arrays.py)
+PROGRAMA_MATRIZ = """programa-miniPar
+declare m : real[120][120]
+declare i : inteiro
+declare j : inteiro
+declare soma : real
+i = 0
+enquanto i < 120 faca:
+    j = 0
+    enquanto j < 120 faca:
+        m[i][j] = i * 0.5 + j
+        j = j + 1
+    fim_enquanto
+    i = i + 1
+fim_enquanto
+soma = 0.0
+i = 0
+enquanto i < 120 faca:
+    j = 0
+    enquanto j < 120 faca:
+        soma = soma + m[i][j] * m[j][i]
+        j = j + 1
+    fim_enquanto
+    i = i + 1
+fim_enquanto
+escreva("soma: ", soma)
+"""
+
+
+class ContadorComandos(MiniParInterpreter):
+    """Interpretador que conta os nós de comando visitados (sem vetorizar os
+    laços, para contar os comandos de todas as iterações)"""
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('vetorizar', False)
+        super().__init__(*args, **kwargs)
+        self.comandos = 0
+
+    def visit(self, node):
+        self.comandos += 1
+        return super().visit(node)
+
+    def executar_par(self, par_blocks):
+        # Os blocos PAR rodariam em outros interpretadores: aqui só são contados
+        for bloco in par_blocks:
+            self.executar_comandos(bloco)
+
+
+def carregar_referencia(caminho):
+    """(classe MiniParInterpreter, usa a AST com blocos recuperados) de outro
+    arquivo interpreter.py"""
+    spec = importlib.util.spec_from_file_location('interpretador_referencia', caminho)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo.MiniParInterpreter, hasattr(modulo, 'executar_interpretador')
+
+
+def cronometrar(funcao):
+    """Executa funcao() e retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def medir(codigo, entrada, referencia=None):
+    """Retorna (comandos, t_atual, t_referencia, saídas iguais)"""
+    ast, erros = analisar_programa(codigo)
+    if ast is None:
+        raise RuntimeError(erros)
+    contador = ContadorComandos()
+    contador.execute(ast, entrada)
+
+    saida, tempo = cronometrar(lambda: MiniParInterpreter().execute(ast, entrada))
+    if referencia is None:
+        return contador.comandos, tempo, None, True
+    classe, recuperada = referencia
+    ast_ref = ast if recuperada else MiniParParser().parse(MiniParLexer().tokenize(codigo))
+    saida_ref, tempo_ref = cronometrar(lambda: classe().execute(ast_ref, entrada))
+    return contador.comandos, tempo, tempo_ref, saida == saida_ref
+
+
+def vazao(comandos, tempo):
+    return f"{comandos / tempo:>12,.0f}" if tempo > 0 else f"{'-':>12}"
+
+
+if __name__ == '__main__':
+    argumentos = sys.argv[1:]
+    referencia = None
+    if '--comparar' in argumentos:
+        posicao = argumentos.index('--comparar')
+        referencia = carregar_referencia(argumentos[posicao + 1])
+        del argumentos[posicao:posicao + 2]
+    if argumentos:
+        arquivos = [os.path.join(testes_dir, nome) for nome in argumentos]
+    else:
+        arquivos = sorted(glob.glob(os.path.join(testes_dir, '*.mp')))
+
+    programas = [('laço sintético', PROGRAMA_LACO, ""), ('recursão sintética', PROGRAMA_RECURSAO, ""),
+                 ('matriz sintética', PROGRAMA_MATRIZ, "")]
+    for arquivo in arquivos:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            programas.append((os.path.basename(arquivo), f.read(), ENTRADAS.get(os.path.basename(arquivo), "")))
+
+    cabecalho = f"{'Programa':<24} {'Comandos':>10} {'Tempo':>9} {'Comandos/s':>12}"
+    if referencia is not None:
+        cabecalho += f" {'Ref. tempo':>10} {'Ref. cmd/s':>12} {'Ganho':>7}  Saída"
+    print(cabecalho)
+    print('-' * len(cabecalho))
+    total_comandos = total_tempo = total_ref = 0.0
+    for nome, codigo, entrada in programas:
+        try:
+            comandos, tempo, tempo_ref, iguais = medir(codigo, entrada, referencia)
+        except Exception as e:
+            print(f"{nome:<24} ❌ Erro: {e}")
+            continue
+        total_comandos += comandos
+        total_tempo += tempo
+        linha = f"{nome:<24} {comandos:>10,} {tempo:>8.3f}s {vazao(comandos, tempo)}"
+        if tempo_ref is not None:
+            total_ref += tempo_ref
+            ganho = tempo_ref / tempo if tempo > 0 else float('inf')
+            linha += (f" {tempo_ref:>9.3f}s {vazao(comandos, tempo_ref)} {ganho:>6.1f}x  "
+                      f"{'✅ igual' if iguais else '❌ diferente'}")
+        print(linha)
+    print('-' * len(cabecalho))
+    linha = f"{'Total':<24} {int(total_comandos):>10,} {total_tempo:>8.3f}s {vazao(total_comandos, total_tempo)}"
+    if referencia is not None:
+        ganho = total_ref / total_tempo if total_tempo > 0 else float('inf')
+        linha += f" {total_ref:>9.3f}s {vazao(total_comandos, total_ref)} {ganho:>6.1f}x"
+    print(linha)
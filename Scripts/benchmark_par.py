@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compara os backends de execução dos blocos PAR do interpretador (threads,
+processos, asyncio e inline) num programa com dois blocos PAR de cálculo pesado.
+
+Com threads os blocos disputam o GIL; com processos rodam em núcleos
+diferentes (o ganho depende do número de núcleos da máquina).
+
+Uso: python Scripts/benchmark_par.py [iteracoes_por_bloco]
+"""
+
+import os
+import sys
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParInterpreter, analisar_programa
+from interpreter import EXECUTORES_PAR
+
+PROGRAMA = """programa-miniPar
+declare limite : inteiro
+limite = {iteracoes}
+PAR:
+    declare i : inteiro
+    declare soma : inteiro
+    i = 0
+    soma = 0
+    enquanto i < limite faca:
+        soma = soma + i * i
+        i = i + 1
+    fim_enquanto
+    escreva("soma dos quadrados: ", soma)
+PAR:
+    declare k : inteiro
+    declare alternada : inteiro
+    k = 0
+    alternada = 0
+    enquanto k < limite faca:
+        alternada = k - alternada
+        k = k + 1
+    fim_enquanto
+    escreva("soma alternada: ", alternada)
+"""
+
+
+def cronometrar(funcao):
+    """Executa funcao() e retorna (resultado, segundos)"""
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+if __name__ == '__main__':
+    iteracoes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    codigo = PROGRAMA.format(iteracoes=iteracoes)
+    ast, _ = analisar_programa(codigo)
+
+    print(f"Dois blocos PAR com {iteracoes} iterações cada ({os.cpu_count()} núcleos)")
+    print(f"{'Backend':<12} {'Tempo':>9}  Saída")
+    print('-' * 40)
+    referencia = None
+    for executor_par in EXECUTORES_PAR:
+        saida, tempo = cronometrar(lambda: MiniParInterpreter(executor_par).execute(ast))
+        if referencia is None:
+            referencia = saida
+        print(f"{executor_par:<12} {tempo:>8.3f}s  {'✅ igual' if saida == referencia else '❌ diferente'}")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mede o tempo do parser (MiniParParser, com o lexer) em programas gerados
+com cada vez mais comandos, para conferir que ele escala linearmente: o tempo
+por comando deve ficar estável de 1 mil a 100 mil comandos.
+
+Os programas têm declarações de arrays, atribuições com índices, escreva com
+várias expressões, receive com vários nomes e laços, e são repetidos até o
+número de comandos pedido.
+
+Com --aninhados, mede laços enquanto aninhados em profundidades crescentes,
+cada um incrementando a sua variável depois do laço interno, com e sem a
+passada de normalização dos laços (normalizacao.py). O tempo por nível deve
+ficar estável nos dois casos.
+
+Uso: python Scripts/benchmark_parser.py [comandos ...]
+     python Scripts/benchmark_parser.py --aninhados [profundidades ...]
+"""
+
+import os
+import sys
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParLexer, MiniParParser
+
+TAMANHOS = [1000, 2000, 5000, 10000, 20000, 50000, 100000]
+PROFUNDIDADES = [25, 50, 100, 200, 400]
+
+# Trecho repetido: 7 comandos no nível do programa (o laço conta como um)
+TRECHO = """declare v{k} : real[4][3]
+v{k}[1][2] = {k} * 0.5 + x
+x = x + v{k}[1][2]
+escreva("v", {k}, ": ", v{k}[1][2], " x: ", x)
+canal.receive(a, b, c)
+enquanto x < {k} faca:
+    x = x + 1
+fim_enquanto
+y = x - {k}
+"""
+
+
+def gerar_programa(comandos):
+    """Programa com (aproximadamente) `comandos` comandos no nível do programa"""
+    partes = ["programa-miniPar\ndeclare x : real\ndeclare y : real\n"]
+    for k in range(max(1, comandos // 7)):
+        partes.append(TRECHO.format(k=k))
+    return ''.join(partes)
+
+
+def gerar_aninhados(profundidade):
+    """Programa com `profundidade` laços enquanto aninhados (sem recuo, para
+    o tamanho do código crescer linearmente com a profundidade)"""
+    linhas = ["programa-miniPar"]
+    for nivel in range(profundidade):
+        linhas.append(f"i{nivel} = 0")
+        linhas.append(f"enquanto i{nivel} < 2 faca:")
+        linhas.append(f"escreva(i{nivel})")
+    for nivel in reversed(range(profundidade)):
+        linhas.append(f"i{nivel} = i{nivel} + 1")
+        linhas.append("fim_enquanto")
+    return '\n'.join(linhas) + '\n'
+
+
+def medir(codigo, normalizar_lacos=True):
+    """(comandos no nível do programa, segundos) da análise de codigo"""
+    lexer, parser = MiniParLexer(), MiniParParser(normalizar_lacos=normalizar_lacos)
+    inicio = time.perf_counter()
+    ast = parser.parse(lexer.tokenize(codigo))
+    tempo = time.perf_counter() - inicio
+    if ast is None:
+        raise RuntimeError("o parser não gerou a AST")
+    return len(ast[1]), tempo
+
+
+def comparar_aninhados(profundidades):
+    """Tempo de laços aninhados com e sem a normalização dos laços"""
+    print(f"{'Níveis':>8} {'Sem passada':>12} {'Com passada':>12} {'µs/nível':>9} {'Relativo':>9}")
+    print('-' * 54)
+    base = None
+    for profundidade in profundidades:
+        codigo = gerar_aninhados(profundidade)
+        _, sem = medir(codigo, normalizar_lacos=False)
+        _, com = medir(codigo)
+        por_nivel = com / profundidade * 1e6
+        base = base or por_nivel
+        print(f"{profundidade:>8} {sem:>11.4f}s {com:>11.4f}s {por_nivel:>9.1f} {por_nivel / base:>8.2f}x")
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--aninhados']:
+        comparar_aninhados([int(n) for n in sys.argv[2:]] or PROFUNDIDADES)
+        sys.exit(0)
+    tamanhos = [int(n) for n in sys.argv[1:]] or TAMANHOS
+    # Relativo: tempo por comando dividido pelo do primeiro tamanho (perto de
+    # 1 em todos os tamanhos quando o parser é linear)
+    print(f"{'Comandos':>10} {'Tempo':>9} {'µs/comando':>11} {'Relativo':>9}")
+    print('-' * 42)
+    base = None
+    for tamanho in tamanhos:
+        comandos, tempo = medir(gerar_programa(tamanho))
+        por_comando = tempo / comandos * 1e6
+        base = base or por_comando
+        print(f"{comandos:>10,} {tempo:>8.3f}s {por_comando:>11.1f} {por_comando / base:>8.2f}x")
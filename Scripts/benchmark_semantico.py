@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mede a memória e o tempo da análise semântica num programa escalado (um
+trecho com declarações, arrays, expressões, chamada de função, se e
+enquanto, repetido com nomes novos).
+
+- Criado pelas visitas: bytes dos objetos que as visitas devolvem além dos
+  nós da própria AST (uma subclasse guarda todos os resultados de visit, e
+  a diferença para uma análise normal é o que as visitas alocaram para
+  devolver). Quando a análise reconstruía cada nó, isso era outra cópia da
+  AST; com os tipos na tabela tipos as visitas devolvem o próprio nó.
+- Pico e retido: tracemalloc durante SemanticAnalyzer().visit(ast) (o
+  retido são as tabelas de símbolos, funções etc.).
+
+Uso: python Scripts/benchmark_semantico.py [blocos ...]
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import SemanticAnalyzer, analisar_programa
+
+BLOCOS = [250, 1000, 4000]
+
+CABECALHO = """programa-miniPar
+
+SEQ:
+    def soma(p : inteiro, q : inteiro) : inteiro:
+        return p + q
+"""
+
+TRECHO = """    declare a{k} : inteiro
+    declare r{k} : real
+    declare v{k} : inteiro[10]
+    a{k} = {k} + 2 * 3
+    r{k} = a{k} * 1.5 - (a{k} + 1) / 2
+    v{k}[a{k} - 1] = soma(a{k} * a{k}, 2)
+    enquanto a{k} < 10 faca:
+        se v{k}[a{k}] > 3 entao:
+            r{k} = r{k} + 0.5 * -r{k}
+        a{k} = a{k} + 1
+    fim_enquanto
+    escreva("r", r{k}, a{k} + v{k}[0])
+"""
+
+
+def gerar_programa(blocos):
+    return CABECALHO + ''.join(TRECHO.replace('{k}', str(k)) for k in range(blocos))
+
+
+class AnalisadorRetendo(SemanticAnalyzer):
+    """Guarda o resultado de cada visita (nada do que elas devolvem é liberado)"""
+    def __init__(self):
+        super().__init__()
+        self.resultados = []
+
+    def visit(self, node):
+        resultado = super().visit(node)
+        self.resultados.append(resultado)
+        return resultado
+
+
+def tamanho(node):
+    """(nós, bytes) da AST: tuplas e listas, por sys.getsizeof"""
+    if isinstance(node, list):
+        nos, total = 0, sys.getsizeof(node)
+        for item in node:
+            n, b = tamanho(item)
+            nos, total = nos + n, total + b
+        return nos, total
+    if isinstance(node, tuple) and node:
+        nos, total = 1, sys.getsizeof(node)
+        for valor in node[1:]:
+            n, b = tamanho(valor)
+            nos, total = nos + n, total + b
+        return nos, total
+    return 0, 0
+
+
+def memoria(classe, ast):
+    """(analisador, bytes retidos, pico) de uma análise"""
+    tracemalloc.start()
+    analisador = classe()
+    analisador.visit(ast)
+    retido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return analisador, retido, pico
+
+
+def tempo(ast, repeticoes=3):
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        analisador = SemanticAnalyzer()
+        inicio = time.perf_counter()
+        analisador.visit(ast)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+if __name__ == '__main__':
+    blocos_lista = [int(n) for n in sys.argv[1:]] or BLOCOS
+    print(f"{'Blocos':>7} {'Nós':>8} {'AST':>12} {'Criado pelas visitas':>21} {'Pico':>11} "
+          f"{'Retido':>11} {'Tempo':>10}")
+    print('-' * 87)
+    for blocos in blocos_lista:
+        ast, erros = analisar_programa(gerar_programa(blocos))
+        if ast is None:
+            print(f"{blocos:>7} erro de sintaxe: {erros}")
+            continue
+        analisador, retido, pico = memoria(SemanticAnalyzer, ast)
+        if analisador.errors:
+            print(f"{blocos:>7} erros semânticos: {analisador.errors[:3]}")
+        retendo, retido_retendo, _ = memoria(AnalisadorRetendo, ast)
+        criado = retido_retendo - sys.getsizeof(retendo.resultados) - retido
+        nos, bytes_ast = tamanho(ast)
+        print(f"{blocos:>7} {nos:>8} {bytes_ast / 1024:>8.1f} KiB {criado / 1024:>17.1f} KiB "
+              f"{pico / 1024:>7.1f} KiB {retido / 1024:>7.1f} KiB {tempo(ast) * 1e3:>8.1f}ms")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Compara o interpretador com e sem a vetorização de laços sobre arrays
+(vetorizacao.py) nos programas de rede neural de Testes/ e numa camada densa
+sintética maior, conferindo que as saídas e os arrays finais são idênticos, e
+mostra o perfil dos laços detectados.
+
+Sem NumPy instalado a vetorização fica desativada e os dois tempos são do
+caminho escalar.
+
+Uso: python Scripts/benchmark_vetorizacao.py [entradas_da_camada]
+"""
+
+import os
+import sys
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParInterpreter, analisar_programa
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+TESTES = ['teste3_neuronio.mp', 'teste4_XOR.mp', 'teste5_rede_neural.mp']
+
+# Camada densa: saida = W * entrada + bias, com os pesos inicializados por laços
+PROGRAMA_CAMADA = """programa-miniPar
+declare entrada : real[{n}]
+declare W : real[{total}]
+declare bias : real[{m}]
+declare saida : real[{m}]
+declare i : inteiro
+declare j : inteiro
+declare soma : real
+i = 0
+enquanto i < {n} faca:
+    entrada[i] = i * 0.001 - 0.25
+    i = i + 1
+fim_enquanto
+j = 0
+enquanto j < {m} faca:
+    i = 0
+    enquanto i < {n} faca:
+        W[j * {n} + i] = (i - j) * 0.0007 + 0.01
+        i = i + 1
+    fim_enquanto
+    bias[j] = j * 0.1
+    j = j + 1
+fim_enquanto
+j = 0
+enquanto j < {m} faca:
+    soma = 0.0
+    i = 0
+    enquanto i < {n} faca:
+        soma = soma + entrada[i] * W[j * {n} + i]
+        i = i + 1
+    fim_enquanto
+    saida[j] = soma + bias[j]
+    j = j + 1
+fim_enquanto
+soma = 0.0
+j = 0
+enquanto j < {m} faca:
+    soma = soma + saida[j] * saida[j]
+    j = j + 1
+fim_enquanto
+escreva("saida[0]: ", saida[0], " soma dos quadrados: ", soma)
+"""
+
+
+def executar(ast, vetorizar):
+    """(saída, arrays finais, perfil, segundos) de uma execução"""
+    interpretador = MiniParInterpreter(vetorizar=vetorizar)
+    inicio = time.perf_counter()
+    saida = interpretador.execute(ast)
+    tempo = time.perf_counter() - inicio
+    arrays = {nome: list(array.dados) for nome, array in interpretador.array_variables.items()}
+    perfil = interpretador.vetorizador.relatorio() if interpretador.vetorizador else []
+    return (saida, arrays), perfil, tempo
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    programas = []
+    for nome in TESTES:
+        with open(os.path.join(testes_dir, nome), 'r', encoding='utf-8') as f:
+            programas.append((nome, f.read()))
+    programas.append((f'camada densa {n}x{n}', PROGRAMA_CAMADA.format(n=n, m=n, total=n * n)))
+
+    print(f"{'Programa':<24} {'Escalar':>9} {'Vetorizado':>11} {'Ganho':>7}  Resultado")
+    print('-' * 68)
+    perfis = []
+    for nome, codigo in programas:
+        ast, erros = analisar_programa(codigo)
+        if ast is None:
+            print(f"{nome:<24} ❌ Erro: {erros}")
+            continue
+        escalar, _, tempo_escalar = executar(ast, False)
+        vetorizado, perfil, tempo_vetorizado = executar(ast, True)
+        ganho = tempo_escalar / tempo_vetorizado if tempo_vetorizado > 0 else float('inf')
+        print(f"{nome:<24} {tempo_escalar:>8.3f}s {tempo_vetorizado:>10.3f}s {ganho:>6.1f}x  "
+              f"{'✅ idêntico' if escalar == vetorizado else '❌ diferente'}")
+        perfis.append((nome, perfil))
+
+    print()
+    print("Perfil dos laços vetorizados")
+    for nome, perfil in perfis:
+        print(f"  {nome}:")
+        for linha in perfil or ["nenhum laço vetorizável"]:
+            print(f"    {linha}")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Mede o custo do despacho dos visitantes (visitante.py) nos programas de
+Testes/: cada percurso (análise semântica, geração de C3E e interpretação)
+roda com o despacho por tabela e com o despacho anterior pelo nome do método
+('visit_' + node[0] com hasattr/getattr), e a diferença é dividida pelo
+número de nós visitados.
+
+Uso: python Scripts/benchmark_visitantes.py [repeticoes]
+"""
+
+import glob
+import os
+import sys
+import time
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import C3EGenerator, MiniParInterpreter, SemanticAnalyzer, analisar_programa
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+# Entrada dos programas que leem do teclado
+ENTRADAS = {'teste1_servidor.mp': "+\n10\n5"}
+
+
+def visit_por_nome(self, node):
+    """Despacho anterior de SemanticAnalyzer e C3EGenerator"""
+    if node is None:
+        return None
+    method_name = f'visit_{node[0]}'
+    if hasattr(self, method_name):
+        return getattr(self, method_name)(node)
+    return self.generic_visit(node)
+
+
+def visit_interpretador_por_nome(self, node):
+    """Despacho anterior de MiniParInterpreter"""
+    if not isinstance(node, tuple):
+        return node
+    method_name = f'visit_{node[0]}'
+    if hasattr(self, method_name):
+        return getattr(self, method_name)(node)
+    return self.generic_visit(node)
+
+
+class SemanticoPorNome(SemanticAnalyzer):
+    visit = visit_por_nome
+
+
+class C3EPorNome(C3EGenerator):
+    visit = visit_por_nome
+
+
+class InterpretadorPorNome(MiniParInterpreter):
+    visit = visit_interpretador_por_nome
+
+
+def contador(classe):
+    """Subclasse que conta as chamadas de visit"""
+    class Contador(classe):
+        visitas = 0
+
+        def visit(self, node):
+            Contador.visitas += 1
+            return super().visit(node)
+    return Contador
+
+
+# Percursos: nome -> (classe com tabela, classe com despacho pelo nome, execução)
+PERCURSOS = {
+    'Semântico': (SemanticAnalyzer, SemanticoPorNome, lambda v, ast, entrada: v.visit(ast)),
+    'C3E': (C3EGenerator, C3EPorNome, lambda v, ast, entrada: v.generate(ast)),
+    'Interpretador': (MiniParInterpreter, InterpretadorPorNome,
+                      lambda v, ast, entrada: v.execute(ast, entrada)),
+}
+
+
+def medir(classe, executar, ast, entrada, repeticoes):
+    """Menor tempo de repeticoes execuções (um visitante novo em cada)"""
+    melhor = float('inf')
+    for _ in range(repeticoes):
+        visitante = classe()
+        inicio = time.perf_counter()
+        executar(visitante, ast, entrada)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+if __name__ == '__main__':
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'Programa':<26} {'Percurso':<14} {'Visitas':>8} {'Por nome':>10} {'Tabela':>10} {'ns/visita':>10}")
+    print('-' * 84)
+    totais = {nome: [0, 0.0, 0.0] for nome in PERCURSOS}
+    for caminho in sorted(glob.glob(os.path.join(testes_dir, '*.mp'))):
+        programa = os.path.basename(caminho)
+        with open(caminho, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        ast, erros = analisar_programa(codigo)
+        if ast is None:
+            continue
+        entrada = ENTRADAS.get(programa)
+        for nome, (tabela, por_nome, executar) in PERCURSOS.items():
+            Contador = contador(tabela)
+            executar(Contador(), ast, entrada)
+            tempo_nome = medir(por_nome, executar, ast, entrada, repeticoes)
+            tempo_tabela = medir(tabela, executar, ast, entrada, repeticoes)
+            economia = (tempo_nome - tempo_tabela) / Contador.visitas * 1e9 if Contador.visitas else 0.0
+            print(f"{programa:<26} {nome:<14} {Contador.visitas:>8} {tempo_nome * 1e3:>8.2f}ms "
+                  f"{tempo_tabela * 1e3:>8.2f}ms {economia:>10.0f}")
+            total = totais[nome]
+            total[0] += Contador.visitas
+            total[1] += tempo_nome
+            total[2] += tempo_tabela
+
+    print()
+    for nome, (visitas, tempo_nome, tempo_tabela) in totais.items():
+        economia = (tempo_nome - tempo_tabela) / visitas * 1e9 if visitas else 0.0
+        print(f"{nome:<14} {visitas:>8} visitas: {tempo_nome * 1e3:.1f}ms por nome, "
+              f"{tempo_tabela * 1e3:.1f}ms por tabela ({economia:.0f} ns por visita)")
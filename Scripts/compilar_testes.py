@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 """
 Script para compilar todos os programas de teste e gerar executáveis
+
+Uso: python Scripts/compilar_testes.py [-O1] [--target armv7ve+vfpv3]
 """
 
 import os
@@ -47,7 +49,7 @@ def extrair_descricao_teste(nome_arquivo):
     
     return ''
 
-def compilar_todos_testes():
+def compilar_todos_testes(nivel_otimizacao=0, alvo='armv7'):
     """Compila todos os arquivos teste*.mp e gera executáveis"""
     
     # Lista de arquivos de teste
@@ -85,7 +87,9 @@ def compilar_todos_testes():
                 codigo, 
                 nome_arquivo_saida=nome_base,
                 gerar_asm=True,
-                gerar_executavel=True
+                gerar_executavel=True,
+                nivel_otimizacao=nivel_otimizacao,
+                alvo=alvo
             )
             
             resultados.append((arquivo, resultado))
@@ -94,6 +98,9 @@ def compilar_todos_testes():
             if resultado['sucesso']:
                 print(f"✅ Compilação bem-sucedida!")
                 
+                if resultado.get('otimizacao'):
+                    print("   " + resultado['otimizacao'].replace("\n", "\n   "))
+                
                 if resultado.get('arquivo_asm'):
                     print(f"   📄 Assembly: {resultado['arquivo_asm']}")
                 
@@ -139,7 +146,9 @@ if __name__ == '__main__':
     print("=" * 70)
     
     try:
-        compilar_todos_testes()
+        argumentos = sys.argv[1:]
+        alvo = argumentos[argumentos.index('--target') + 1] if '--target' in argumentos[:-1] else 'armv7'
+        compilar_todos_testes(nivel_otimizacao=1 if '-O1' in argumentos else 0, alvo=alvo)
     except KeyboardInterrupt:
         print("\n\n⚠️  Compilação interrompida pelo usuário.")
         sys.exit(1)
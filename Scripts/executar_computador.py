@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Executa um programa MiniPar como um dos computadores de seus canais, com os
+canais ligados por socket aos outros computadores (rodando em outros processos).
+
+Uso:
+  python Scripts/executar_computador.py programa.mp --computador computador_2 \\
+      --endereco computador_1=tcp://127.0.0.1:7001 \\
+      --endereco computador_2=tcp://127.0.0.1:7002 [--entrada "+\\n10\\n5"]
+
+Exemplo com o teste1 (cliente) e um servidor da calculadora, em dois terminais:
+  python Scripts/benchmark_canais.py --mostrar-servidor > servidor.mp
+  python Scripts/executar_computador.py servidor.mp --computador computador_2 \\
+      --endereco computador_1=unix:///tmp/c1.sock --endereco computador_2=unix:///tmp/c2.sock
+  python Scripts/executar_computador.py Testes/teste1_servidor.mp --computador computador_1 \\
+      --endereco computador_1=unix:///tmp/c1.sock --endereco computador_2=unix:///tmp/c2.sock \\
+      --entrada "+\\n10\\n5"
+"""
+
+import os
+import sys
+import argparse
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParInterpreter, SocketTransport, analisar_programa
+
+
+def executar_computador(codigo, computador, enderecos, entrada="", timeout_canais=None):
+    """Executa o código como `computador` e retorna a saída do programa"""
+    ast, erros = analisar_programa(codigo)
+    if ast is None:
+        return erros
+    opcoes = {} if timeout_canais is None else {'timeout_canais': timeout_canais}
+    with SocketTransport(computador, enderecos) as transporte:
+        return MiniParInterpreter(transporte=transporte, **opcoes).execute(ast, entrada)
+
+
+def ler_enderecos(pares):
+    enderecos = {}
+    for par in pares:
+        nome, separador, endereco = par.partition('=')
+        if not separador:
+            raise SystemExit(f"--endereco espera computador=endereço, recebeu '{par}'")
+        enderecos[nome] = endereco
+    return enderecos
+
+
+if __name__ == '__main__':
+    argumentos = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    argumentos.add_argument('arquivo', help="programa MiniPar (.mp)")
+    argumentos.add_argument('--computador', required=True, help="computador executado por este processo")
+    argumentos.add_argument('--endereco', action='append', default=[],
+                            help="computador=tcp://host:porta ou computador=unix:///caminho")
+    argumentos.add_argument('--entrada', default="", help="entrada do programa (\\n separa as linhas)")
+    argumentos.add_argument('--timeout', type=float, default=None,
+                            help="espera máxima de send/receive, em segundos")
+    args = argumentos.parse_args()
+
+    with open(args.arquivo, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    entrada = args.entrada.replace('\\n', '\n')
+    print(executar_computador(codigo, args.computador, ler_enderecos(args.endereco), entrada, args.timeout))
@@ -11,7 +11,7 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
 sys.path.insert(0, core_dir)
 from motor_compilador import (MiniParLexer, MiniParParser, SemanticAnalyzer, 
-                              MiniParInterpreter)
+                              MiniParInterpreter, recuperar_blocos)
 
 # Diretório dos testes
 testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
@@ -64,7 +64,8 @@ def testar_execucao(arquivo_mp):
         elif "teste3" in arquivo_mp:
             entrada = ""  # Não precisa entrada
         
-        saida = interpreter.execute(ast, entrada)
+        # O interpretador executa a AST com os blocos recuperados pela indentação
+        saida = interpreter.execute(recuperar_blocos(ast, parser, codigo, tokens), entrada)
         
         print("\n📋 SAÍDA DO PROGRAMA:")
         print("-" * 60)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Testa os backends dos blocos PAR (threads, processos, asyncio, inline):
+
+- os programas abaixo (canais, funções com return dentro de laços chamadas
+  nos blocos) devem ter a mesma saída em todos os backends;
+- no caminho assíncrono (visit_async), um return dentro de um laço com
+  send encerra a função como no visitante comum;
+- send/receive dentro de funções chamadas nos blocos são aguardados no
+  backend asyncio (mesma saída dos threads, com o receptor primeiro);
+- a máquina virtual e o executor de C3E recusam canais usados com blocos
+  PAR (a rota /executar roda esses programas no interpretador).
+
+Uso: python Scripts/testar_executores_par.py
+"""
+
+import os
+import sys
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import (MiniParInterpreter, analisar_programa, compilar_bytecode_ast,
+                              carregar_c3e_ast)
+from interpreter import EXECUTORES_PAR, RETORNO, Frame
+
+# Configurar encoding para UTF-8
+if sys.stdout.encoding != 'utf-8':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+PROGRAMAS = {
+    'retorno_em_laco': """programa-miniPar
+c_channel dados computador_1 computador_2
+def primeiro_multiplo(base : inteiro, minimo : inteiro) : inteiro:
+    declare k : inteiro
+    k = 1
+    enquanto k < 100 faca:
+        se k * base >= minimo entao:
+            return k * base
+        k = k + 1
+    fim_enquanto
+    return 0
+PAR:
+    declare i : inteiro
+    i = 1
+    enquanto i <= 3 faca:
+        dados.send(primeiro_multiplo(i + 2, 10))
+        i = i + 1
+    fim_enquanto
+PAR:
+    declare v : inteiro
+    declare n : inteiro
+    n = 0
+    enquanto n < 3 faca:
+        dados.receive(v)
+        escreva("recebido ", v)
+        n = n + 1
+    fim_enquanto
+""",
+    'retorno_em_para': """programa-miniPar
+def soma_ate(limite : inteiro) : inteiro:
+    declare total : inteiro
+    total = 0
+    para j em 1..10
+        total = total + j
+        se j == limite entao:
+            return total
+    return total
+PAR:
+    escreva("A ", soma_ate(3))
+PAR:
+    escreva("B ", soma_ate(4))
+""",
+}
+
+# Retorno dentro de um laço com send, executado pelo caminho assíncrono
+PROGRAMA_ASYNC = """programa-miniPar
+c_channel saida computador_1 computador_2
+def procura(limite : inteiro) : inteiro:
+    declare k : inteiro
+    k = 0
+    enquanto k < limite faca:
+        saida.send(k)
+        se k == 2 entao:
+            return k
+        k = k + 1
+    fim_enquanto
+    return 0 - 1
+escreva("ok")
+"""
+
+# send/receive dentro de funções: o bloco que recebe vem antes do que envia
+# (no backend inline os blocos rodam em sequência, então fica de fora)
+PROGRAMA_FUNCAO_CANAL = """programa-miniPar
+c_channel dados computador_1 computador_2
+def pega() : inteiro:
+    declare v : inteiro
+    dados.receive(v)
+    return v
+def manda(x : inteiro) : inteiro:
+    dados.send(x)
+    return 0
+def repassa(x : inteiro) : inteiro:
+    return manda(x)
+PAR:
+    declare n : inteiro
+    n = 0
+    enquanto n < 3 faca:
+        escreva("recebido ", pega() + 1)
+        n = n + 1
+    fim_enquanto
+PAR:
+    declare i : inteiro
+    declare r : inteiro
+    i = 1
+    enquanto i <= 3 faca:
+        r = repassa(i * 10)
+        i = i + 1
+    fim_enquanto
+"""
+
+
+def comparar_backends(nome, codigo):
+    ast, erros = analisar_programa(codigo)
+    if ast is None:
+        print(f"❌ {nome}: {erros}")
+        return False
+    saidas = {executor: MiniParInterpreter(executor).execute(ast) for executor in EXECUTORES_PAR}
+    esperada = saidas['inline']
+    divergentes = [executor for executor, saida in saidas.items() if saida != esperada]
+    if divergentes:
+        print(f"❌ {nome}: saída diferente em {', '.join(divergentes)}")
+        for executor, saida in saidas.items():
+            print(f"   {executor}: {saida!r}")
+        return False
+    print(f"✅ {nome}: {esperada!r}")
+    return True
+
+
+def testar_retorno_async():
+    """Executa o corpo de procura(5) com executar_comandos_async: o return
+    em k == 2 deve encerrar o laço (3 envios e valor 2)"""
+    ast, erros = analisar_programa(PROGRAMA_ASYNC)
+    if ast is None:
+        print(f"❌ retorno_async: {erros}")
+        return False
+    interpretador = MiniParInterpreter('asyncio', capacidade_canais=10)
+    interpretador.execute(ast)
+    funcao = interpretador.functions['procura']
+    layout = funcao['quadro']
+    variaveis = [0] * layout.tamanho
+    variaveis[layout.parametros[0]] = 5
+    frame = Frame('procura', variaveis)
+    interpretador.pilha_chamadas.append(frame)
+    interpretador.quadros[1] = variaveis
+    laco = interpretador.laco_asyncio()
+    try:
+        sinal = laco.run_until_complete(interpretador.executar_comandos_async(funcao['body']))
+    finally:
+        laco.close()
+    canal = interpretador.channels['saida']['canal']
+    envios = 0
+    while canal.try_receive()[0]:
+        envios += 1
+    if sinal is not RETORNO or frame.retorno != 2 or envios != 3:
+        print(f"❌ retorno_async: sinal={sinal!r} retorno={frame.retorno!r} envios={envios}")
+        return False
+    print("✅ retorno_async: return encerra o laço no caminho assíncrono")
+    return True
+
+
+def testar_funcao_com_canal_async():
+    """Funções com send/receive (também via outra função) chamadas num bloco
+    PAR: no backend asyncio a chamada é aguardada, sem esgotar o tempo"""
+    ast, erros = analisar_programa(PROGRAMA_FUNCAO_CANAL)
+    if ast is None:
+        print(f"❌ funcao_com_canal: {erros}")
+        return False
+    esperada = 'recebido 11\nrecebido 21\nrecebido 31'
+    saidas = {executor: MiniParInterpreter(executor).execute(ast) for executor in ('threads', 'asyncio')}
+    divergentes = [executor for executor, saida in saidas.items() if saida != esperada]
+    if divergentes:
+        for executor in divergentes:
+            print(f"❌ funcao_com_canal: {executor}: {saidas[executor]!r}")
+        return False
+    print(f"✅ funcao_com_canal: {esperada!r}")
+    return True
+
+
+def testar_motores_recusam_canais():
+    """A VM e o C3E só simulam o servidor no send/receive: com blocos PAR os
+    dois devem recusar o programa (programa None)"""
+    ast, erros = analisar_programa(PROGRAMAS['retorno_em_laco'])
+    if ast is None:
+        print(f"❌ canais_par: {erros}")
+        return False
+    aceitos = [motor for motor, (programa, _) in
+               (('bytecode', compilar_bytecode_ast(ast)), ('c3e', carregar_c3e_ast(ast)))
+               if programa is not None]
+    if aceitos:
+        print(f"❌ canais_par: aceito por {', '.join(aceitos)}")
+        return False
+    print("✅ canais_par: bytecode e c3e deixam o programa para o interpretador")
+    return True
+
+
+if __name__ == '__main__':
+    resultados = [comparar_backends(nome, codigo) for nome, codigo in PROGRAMAS.items()]
+    resultados.append(testar_retorno_async())
+    resultados.append(testar_funcao_com_canal_async())
+    resultados.append(testar_motores_recusam_canais())
+    sys.exit(0 if all(resultados) else 1)
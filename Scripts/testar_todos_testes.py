@@ -11,7 +11,7 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
 sys.path.insert(0, core_dir)
 from motor_compilador import (MiniParLexer, MiniParParser, SemanticAnalyzer, 
-                              MiniParInterpreter)
+                              MiniParInterpreter, recuperar_blocos)
 
 # Diretório dos testes
 testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
@@ -79,7 +79,8 @@ def testar(teste_num):
             return
         
         inter = MiniParInterpreter()
-        saida = inter.execute(ast)
+        # O interpretador executa a AST com os blocos recuperados pela indentação
+        saida = inter.execute(recuperar_blocos(ast, parser, codigo, tokens))
         
         print("\n📋 SAÍDA:")
         print("-" * 70)
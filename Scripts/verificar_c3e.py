@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Executa o C3E dos programas de teste (o mesmo passado ao gerador ARMv7) e
+compara com a saída do interpretador.
+
+Com -O1 o C3E é otimizado (C3EOptimizer) antes de ser executado.
+
+Uso: python Scripts/verificar_c3e.py [-v] [-O1] [teste4_XOR.mp ...]
+"""
+
+import os
+import sys
+import glob
+import time
+import difflib
+
+# Ajustar path para importar motor_compilador do diretório Core
+script_dir = os.path.dirname(os.path.abspath(__file__))
+core_dir = os.path.join(os.path.dirname(script_dir), 'Core')
+sys.path.insert(0, core_dir)
+from motor_compilador import MiniParInterpreter, C3EExecutor, analisar_programa, carregar_c3e_ast
+
+# Diretório dos testes
+testes_dir = os.path.join(os.path.dirname(script_dir), 'Testes')
+
+# Entradas usadas pelos programas que leem dados
+ENTRADAS = {
+    'teste1_servidor.mp': "+\n10\n5",
+}
+
+# Interrompe programas com laços que não terminam
+LIMITE_ITERACOES = 1000000
+
+
+def executar_c3e_cronometrado(programa, entrada):
+    inicio = time.perf_counter()
+    saida = C3EExecutor(limite_iteracoes=LIMITE_ITERACOES).execute(programa, entrada)
+    return saida, time.perf_counter() - inicio
+
+
+def verificar(arquivo_mp, detalhar=False, nivel_otimizacao=0):
+    with open(arquivo_mp, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    nome = os.path.basename(arquivo_mp)
+    entrada = ENTRADAS.get(nome, "")
+
+    ast, erros = analisar_programa(codigo)
+    if ast is None:
+        print(f"{nome:<26} ❌ Erro: {erros}")
+        return
+    inicio = time.perf_counter()
+    esperado = MiniParInterpreter().execute(ast, entrada)
+    t_interp = time.perf_counter() - inicio
+
+    programa, erros = carregar_c3e_ast(ast, nivel_otimizacao)
+    if programa is None:
+        # Ex.: blocos PAR, que só o interpretador executa
+        print(f"{nome:<26} interpretador: {t_interp:.3f}s  c3e: ⏭ {erros}")
+        return
+    saida, tempo = executar_c3e_cronometrado(programa, entrada)
+    resultado = f"c3e: {'✅' if saida == esperado else '❌'} {tempo:.3f}s"
+    if detalhar and saida != esperado:
+        diferenca = difflib.unified_diff(esperado.split('\n'), saida.split('\n'),
+                                         'interpretador', 'c3e', lineterm='')
+        resultado += '\n' + '\n'.join(list(diferenca)[:30]) + '\n'
+    print(f"{nome:<26} interpretador: {t_interp:.3f}s  {resultado}")
+
+
+if __name__ == '__main__':
+    argumentos = [arg for arg in sys.argv[1:] if arg not in ('-v', '-O1')]
+    detalhar = '-v' in sys.argv[1:]
+    nivel_otimizacao = 1 if '-O1' in sys.argv[1:] else 0
+    if argumentos:
+        arquivos = [os.path.join(testes_dir, nome) for nome in argumentos]
+    else:
+        arquivos = sorted(glob.glob(os.path.join(testes_dir, '*.mp')))
+
+    for arquivo in arquivos:
+        try:
+            verificar(arquivo, detalhar, nivel_otimizacao)
+        except Exception as e:
+            print(f"{os.path.basename(arquivo):<26} ❌ Erro: {e}")